@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+API Worker job latency by stage: queue wait, provider, storage, notification.
+
+Runs a batch of generations through the Worker with tts_bench.job_latency
+tracing each one (dense task polling to see provider_status change), then
+joins the client timings with the tasks and generations rows and reports a
+distribution per stage:
+
+  submit, queue_wait, synthesis, provider_download, persist, notify, download
+
+with each stage's share of end-to-end time, the poll resolution of the
+boundaries, and row checks: generation_time_seconds against the task's own
+created_at -> completed_at, duration_seconds (the Qwen path leaves it null;
+the downloaded WAV's length is used instead), provider_poll_count and
+updated_at after completion.
+
+The notify stage here is measured at the trace interval (--trace-interval);
+bench_polling.py measures it under the production poll schedule.
+
+By default the target is the Worker stand-in with raised per-user rate
+limits (dense polling would otherwise exhaust the tier-2 budget) and rows
+read through its service-role /rest/v1 route; the stand-in's own per-job
+trace is reported next to the estimates. For `wrangler dev` and
+`supabase start`, raise RATE_LIMIT_TIER2_USER_LIMIT in workers/api/.dev.vars
+and set SUPABASE_SERVICE_ROLE_KEY (from `supabase status`) to read the rows
+directly; without it the rows come from the Worker's routes.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python analyze_job_latency.py
+    uv run --with requests --with numpy python analyze_job_latency.py --concurrency 8 --max-concurrency 2
+    SUPABASE_SERVICE_ROLE_KEY=... UTTER_EMAIL=... UTTER_PASSWORD=... \\
+        uv run --with requests --with numpy python analyze_job_latency.py \\
+        --api-url http://127.0.0.1:8787 --voice-id <uuid>
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import numpy  # noqa: F401
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python analyze_job_latency.py")
+    sys.exit(1)
+
+from tts_bench import config, job_latency, results
+from tts_bench.standin import add_standin_arguments, standin_kwargs
+from tts_bench.standin_dashscope import DEFAULT_GPU_SLOTS
+from tts_bench.standin_worker import add_worker_arguments, start_worker_standin, worker_kwargs
+from tts_bench.stats import fmt_seconds, summarize
+from tts_bench.worker_client import WorkerAPIError, WorkerClient
+from tts_bench.workload import mixed_jobs
+
+
+def standin_truth(server, trace: dict, task: dict) -> dict:
+    """The stand-in's own stage times for a job, on the same clock as the estimates."""
+    truth = server.traces.get(trace.get("task_id"), {})
+    epoch = server.epoch.timestamp()
+    created = job_latency.parse_timestamp(task.get("created_at"))
+    marks = [truth.get(k) for k in ("provider_start", "synth_end", "provider_end", "stored")]
+    if created is None or any(m is None for m in marks):
+        return {}
+    start, synth_end, provider_end, stored = (epoch + m for m in marks)
+    completed = job_latency.parse_timestamp(task.get("completed_at"))
+    return {
+        "queue_wait": start - created,
+        "synthesis": synth_end - start,
+        "provider_download": provider_end - synth_end,
+        "persist": completed - provider_end if completed is not None else None,
+        "storage_put": stored - provider_end,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API Worker job latency by stage")
+    parser.add_argument("--captions", type=int, default=8, help="Single-sentence jobs")
+    parser.add_argument("--paragraphs", type=int, default=4, help="2-4 sentence jobs")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs in flight")
+    parser.add_argument("--trace-interval", type=float, default=0.25, help="Poll interval while tracing (seconds)")
+    parser.add_argument("--api-url", default=None, help="Real API Worker base URL (default: local stand-in)")
+    parser.add_argument("--email", default=os.getenv("UTTER_EMAIL"), help="Sign-in email (default: $UTTER_EMAIL)")
+    parser.add_argument("--password", default=os.getenv("UTTER_PASSWORD"), help="Password (default: $UTTER_PASSWORD)")
+    parser.add_argument("--token", default=os.getenv("UTTER_ACCESS_TOKEN"), help="Bearer access token instead")
+    parser.add_argument("--voice-id", default=None, help="Voice to generate with (required with --api-url)")
+    parser.add_argument("--supabase-url", default=config.SUPABASE_URL, help="PostgREST base for row reads")
+    parser.add_argument("--timeout", type=float, default=90.0)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    add_worker_arguments(parser)
+    parser.set_defaults(
+        gpu_slots=DEFAULT_GPU_SLOTS,
+        rate_limit=["RATE_LIMIT_TIER1_USER_LIMIT=100000", "RATE_LIMIT_TIER2_USER_LIMIT=100000"],
+    )
+    args = parser.parse_args()
+
+    server = None
+    if args.api_url:
+        if not (args.voice_id and (args.token or (args.email and args.password))):
+            print("Error: --api-url needs --voice-id and --email/--password or --token")
+            return 1
+        endpoint = {
+            "name": f"API Worker ({args.api_url})",
+            "base_url": args.api_url,
+            "email": args.email,
+            "password": args.password,
+            "token": args.token,
+            "voice_id": args.voice_id,
+            "supabase_url": args.supabase_url,
+            "service_role_key": config.SUPABASE_SERVICE_ROLE_KEY,
+        }
+        clock = time.time
+        time_scale = 1.0
+    else:
+        server, endpoint = start_worker_standin(
+            time_scale=args.time_scale,
+            seed=args.seed,
+            provider_kwargs={**standin_kwargs(args), "deployment": "qwen-cloud-vc"},
+            **worker_kwargs(args),
+        )
+        epoch = server.epoch.timestamp()
+
+        def clock() -> float:
+            return epoch + server.now()
+
+        time_scale = args.time_scale
+
+    jobs = mixed_jobs(args.captions, args.paragraphs, paragraph_sentences=(2, 4))
+    jobs = [job for job in jobs if len(job["text"]) <= config.WORKER_MAX_TEXT_CHARS]
+
+    print("=" * 70)
+    print("API Worker Job Latency by Stage")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {endpoint['name']}")
+    print(f"Jobs: {len(jobs)}  Concurrency: {args.concurrency}  Trace interval: {args.trace_interval:g}s")
+    row_source = "PostgREST (service role)" if endpoint.get("service_role_key") else "Worker routes"
+    print(f"Rows: {row_source}")
+
+    worker = WorkerClient(
+        endpoint["base_url"],
+        access_token=endpoint.get("token"),
+        pool_size=max(args.concurrency, 1),
+        timeout=args.timeout,
+        time_scale=time_scale,
+    )
+    try:
+        if not endpoint.get("token"):
+            worker.sign_in(endpoint["email"], endpoint["password"])
+
+        def run(job: dict) -> dict:
+            trace = job_latency.trace_job(
+                worker, endpoint["voice_id"], job["text"], interval=args.trace_interval, clock=clock
+            )
+            return {"id": job["id"], **trace}
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            traces = list(pool.map(run, jobs))
+
+        task_ids = [t.get("task_id") for t in traces]
+        generation_ids = [t.get("generation_id") for t in traces]
+        if endpoint.get("service_role_key"):
+            tasks, generations = job_latency.rows_from_supabase(
+                task_ids, generation_ids, endpoint["supabase_url"], endpoint["service_role_key"]
+            )
+        else:
+            tasks, generations = job_latency.rows_from_worker(worker, task_ids, generation_ids)
+    except (RuntimeError, WorkerAPIError, requests.exceptions.RequestException) as e:
+        print(f"Error: {e}")
+        if server:
+            server.shutdown()
+        return 1
+    finally:
+        worker.close()
+
+    records = []
+    for trace in traces:
+        task = tasks.get(trace.get("task_id"), {})
+        record = {**trace, **job_latency.decompose(trace, task, generations.get(trace.get("generation_id")))}
+        if server:
+            record["truth"] = standin_truth(server, trace, task)
+        record["seen"] = {status: list(span) for status, span in trace["seen"].items()}
+        records.append(record)
+    if server:
+        server.shutdown()
+
+    ok = [r for r in records if "error" not in r]
+    print("\n" + "=" * 70)
+    print("SUMMARY (emulated seconds)" if server else "SUMMARY")
+    print("=" * 70)
+    header = f"\n{'Stage':<17} │ {'mean':>8} {'p50':>8} {'p95':>8} {'max':>8} │ {'Share':>6}"
+    if server:
+        header += f" │ {'Stand-in':>8} {'Error':>7}"
+    print(header)
+    print("-" * (80 if server else 62))
+    end_to_end = summarize([r["end_to_end"] for r in ok if r["end_to_end"] is not None])
+    stages = {}
+    for stage in job_latency.STAGES:
+        values = [r["stages"][stage] for r in ok if r["stages"][stage] is not None]
+        entry = summarize(values)
+        entry["share"] = entry["mean"] / end_to_end["mean"] if entry["mean"] and end_to_end["mean"] else None
+        line = (
+            f"{stage:<17} │ {fmt_seconds(entry['mean'])} {fmt_seconds(entry['p50'])} {fmt_seconds(entry['p95'])} "
+            f"{fmt_seconds(entry['max'])} │ {entry['share'] or 0:>6.1%}"
+        )
+        if server:
+            pairs = [(r["stages"][stage], r["truth"].get(stage)) for r in ok if r.get("truth")]
+            pairs = [(est, true) for est, true in pairs if est is not None and true is not None]
+            if pairs:
+                entry["truth_mean"] = sum(t for _, t in pairs) / len(pairs)
+                entry["truth_error"] = sum(abs(e - t) for e, t in pairs) / len(pairs)
+                line += f" │ {fmt_seconds(entry['truth_mean'])} {fmt_seconds(entry['truth_error'], 7)}"
+        stages[stage] = entry
+        print(line)
+    print(f"{'end to end':<17} │ " + " ".join(fmt_seconds(end_to_end[k]) for k in ("mean", "p50", "p95", "max")) + " │")
+
+    resolution = summarize([r["resolution"] for r in ok if r["resolution"] is not None])
+    server_total = summarize([r["server_total"] for r in ok if r["server_total"] is not None])
+    gen_time = summarize([r["generation_time_seconds"] for r in ok if r["generation_time_seconds"] is not None])
+    missing_duration = sum(1 for r in ok if r["duration_seconds"] is None)
+    rtf = summarize(
+        [r["server_total"] / r["audio_seconds"] for r in ok if r["server_total"] and r.get("audio_seconds")]
+    )
+    poll_counts = sorted({r["provider_poll_count"] for r in ok if r["provider_poll_count"] is not None})
+    after = summarize([r["updated_after_completed"] for r in ok if r["updated_after_completed"] is not None])
+
+    print(f"\nCompleted: {len(ok)}/{len(records)}  Boundary resolution: ±{resolution['max'] or 0:.2f}s (max)")
+    print(f"tasks created_at -> completed_at: mean {server_total['mean'] or 0:.2f}s", end="")
+    print(f"; generation_time_seconds: mean {gen_time['mean'] or 0:.2f}s")
+    print(f"Server time / audio duration (RTF): mean {rtf['mean'] or 0:.2f}")
+    print(f"duration_seconds null on {missing_duration}/{len(ok)} generations (WAV length used)")
+    print(f"provider_poll_count values: {poll_counts or '-'}")
+    if after["n"]:
+        print(f"updated_at after completed_at: mean {after['mean']:.3f}s, max {after['max']:.3f}s")
+    for record in records:
+        if "error" in record:
+            print(f"  {record['id']}: ERROR - {record['error']}")
+
+    if not args.no_save:
+        path = results.save_runs(
+            "job_latency_analysis",
+            args.api_url or "local",
+            records,
+            extra={
+                "stand_in": server is not None,
+                "time_scale": time_scale,
+                "concurrency": args.concurrency,
+                "trace_interval": args.trace_interval,
+                "row_source": row_source,
+                "stages": stages,
+                "end_to_end": end_to_end,
+                "server_total": server_total,
+                "generation_time_seconds": gen_time,
+                "rtf": rtf,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Playback-buffer underrun analysis for streamed runs.
+
+Replays the chunk arrival times and per-chunk audio recorded by
+bench_streaming.py through a simulated player (tts_bench.playback) and
+reports, per deployment and streaming mode:
+
+- stall count, stalled-run share and stall duration at each startup buffer
+- the startup buffer that avoids stalls in 95% of runs (p95 of each run's
+  minimum stall-free buffer) and the playback start delay it costs
+
+Stand-in results are grouped under the deployment they emulate; their times
+are already in emulated seconds.
+
+Usage:
+    cd test/scripts
+    uv run --with numpy python analyze_playback.py                    # Every streaming_benchmark_*.json
+    uv run --with numpy python analyze_playback.py --buffers 0 1 2 5 --rebuffer 1
+    uv run --with numpy python analyze_playback.py ../results/streaming_benchmark_20260301_120000.json
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    print("Error: numpy library not installed.")
+    print("Install with: uv run --with numpy python analyze_playback.py")
+    sys.exit(1)
+
+from tts_bench import config, playback, results
+from tts_bench.stats import fmt_seconds
+
+DEFAULT_BUFFERS = [0.0, 0.5, 1.0, 2.0, 4.0]
+
+
+def load_streamed_runs(paths: list[Path]) -> dict[tuple[str, str], list[dict]]:
+    """Streamed runs with chunk timings, grouped by (deployment, mode)."""
+    groups: dict[tuple[str, str], list[dict]] = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("stand_in"):
+            deployment = f"{data.get('emulates') or data['deployment']} (stand-in)"
+        else:
+            deployment = data["deployment"]
+        for run in data.get("runs", []):
+            if "error" in run or not run.get("chunk_times") or not run.get("chunk_audio"):
+                continue
+            groups.setdefault((deployment, run.get("mode", "stream")), []).append(run)
+    return groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate playback stalls for streamed runs")
+    parser.add_argument(
+        "files",
+        type=Path,
+        nargs="*",
+        help="streaming_benchmark results files (default: all in test/results)",
+    )
+    parser.add_argument(
+        "--buffers",
+        type=float,
+        nargs="+",
+        default=DEFAULT_BUFFERS,
+        help="Startup buffers to simulate (seconds of audio)",
+    )
+    parser.add_argument(
+        "--rebuffer",
+        type=float,
+        default=0.0,
+        help="Audio to rebuffer after a stall before resuming (0 = resume on the next chunk)",
+    )
+    parser.add_argument("--percentile", type=float, default=95.0, help="Share of runs that must play stall-free")
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    args = parser.parse_args()
+
+    paths = args.files or [p for p in results.result_files() if p.name.startswith("streaming_benchmark_")]
+    groups = load_streamed_runs(paths)
+    if not groups:
+        print("No streamed runs with chunk timings found; run bench_streaming.py first")
+        return 1
+
+    print("=" * 70)
+    print("Playback Buffer Simulation")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Files: {len(paths)}  Rebuffer after stall: {args.rebuffer:g}s of audio")
+
+    summary = {}
+    for (deployment, mode), runs in sorted(groups.items()):
+        entry = playback.summarize_runs(runs, args.buffers, args.rebuffer, args.percentile)
+        summary.setdefault(deployment, {})[mode] = entry
+        print(f"\n[{deployment} / {mode}] {len(runs)} runs")
+        print(f"  {'Buffer':>7} │ {'Stalled':>8} {'Stalls':>7} {'max':>4} │ {'Stall mean':>10} {'p95':>8} │ {'Start mean':>10}")
+        for startup, stats in entry["by_startup"].items():
+            stalled = stats["stalled_runs"] / stats["runs"] if stats["runs"] else 0.0
+            print(
+                f"  {startup:>6.1f}s │ {stalled:>8.0%} {stats['stalls']['mean'] or 0:>7.1f} "
+                f"{stats['stalls']['max'] or 0:>4.0f} │ "
+                f"{fmt_seconds(stats['stall_seconds']['mean'], 10)} {fmt_seconds(stats['stall_seconds']['p95'])} │ "
+                f"{fmt_seconds(stats['start']['mean'], 10)}"
+            )
+
+    print("\n" + "=" * 70)
+    print(f"STALL-FREE STARTUP BUFFER (p{args.percentile:g} of runs)")
+    print("=" * 70)
+    print(f"\n{'Deployment':<30} {'Mode':<8} {'Runs':>5} │ {'Min buffer p50':>14} {'max':>8} │ {'Required':>9} {'Start p95':>10}")
+    print("-" * 96)
+    for deployment, modes in summary.items():
+        for mode, entry in modes.items():
+            minimum = entry["min_startup"]
+            print(
+                f"{deployment[:30]:<30} {mode:<8} {minimum['n']:>5} │ "
+                f"{fmt_seconds(minimum['p50'], 14)} {fmt_seconds(minimum['max'])} │ "
+                f"{fmt_seconds(entry['required_startup'], 9)} {fmt_seconds(entry['required_start_delay'], 10)}"
+            )
+
+    if not args.no_save:
+        path = results.save_runs(
+            "playback_analysis",
+            "all",
+            [],
+            extra={
+                "sources": [p.name for p in paths],
+                "buffers": args.buffers,
+                "rebuffer": args.rebuffer,
+                "percentile": args.percentile,
+                "deployments": summary,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
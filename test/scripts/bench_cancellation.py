@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Cancellation storm: how much provider work cancelled jobs still burn.
+
+Submits a stream of jobs (one every --arrival-gap seconds) and cancels
+--cancel-fraction of them, each a random --cancel-delay after its submit,
+through POST /api/tasks/:id/cancel (tts_bench.cancellation). The consumer
+only checks for cancellation between provider calls, so this reports:
+
+  response       cancel answers: cancelled, too_late (400, already
+                 terminal), conflict (409), or the job finished first
+  stage          where each cancel landed: queued, synthesis, download,
+                 persist
+  cancel API     cancel request -> response (the task reads cancelled)
+  effective      cancel request -> the end of the job's last provider call
+  after cancel   provider seconds (synthesis + download) spent on the job
+                 after the cancel request, total and per stage
+  kept jobs      throughput and submit -> completed latency of the jobs
+                 that were not cancelled, against a baseline run of the same
+                 workload with no cancels (--no-baseline skips it)
+
+Provider work is read from the DashScope stand-in's call log. By default
+each run gets a fresh API Worker stand-in (tts_bench/standin_worker.py,
+one-message batches and one consumer like wrangler.jsonc) with a DashScope
+stand-in behind it, which also reports when the consumer itself let go of
+each cancelled job. With --api-url the target is `wrangler dev` (workers/
+api) instead, and the DashScope stand-in runs here on --dashscope-port at
+real time for the Worker to call; start the Worker with
+
+    npx wrangler dev --local --var DASHSCOPE_BASE_URL:http://127.0.0.1:8767 \\
+        --var DASHSCOPE_API_KEY:sk-standin
+
+The stand-in synthesizes the user's existing voices with the checked-in
+reference. Jobs are spread over users so the 4-active-job cap does not
+gate arrivals: the stand-in creates them, with --api-url pass
+UTTER_EMAIL/UTTER_PASSWORD and --account for more.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python bench_cancellation.py
+    uv run --with requests --with numpy python bench_cancellation.py --cancel-fraction 0.5 --cancel-delay 0 5
+    UTTER_EMAIL=... UTTER_PASSWORD=... uv run --with requests --with numpy python bench_cancellation.py \\
+        --api-url http://127.0.0.1:8787 --account second@example.com:pass
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import numpy  # noqa: F401
+    import requests
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python bench_cancellation.py")
+    sys.exit(1)
+
+from tts_bench import cancellation, config, results
+from tts_bench.standin import add_standin_arguments, standin_kwargs
+from tts_bench.standin_dashscope import DEFAULT_GPU_SLOTS, STANDIN_API_KEY, start_dashscope_standin
+from tts_bench.standin_worker import STANDIN_PASSWORD, add_worker_arguments, start_worker_standin, worker_kwargs
+from tts_bench.stats import fmt_seconds, summarize
+from tts_bench.worker_client import WorkerAPIError, WorkerClient
+from tts_bench.workload import mixed_jobs
+
+ACTIVE_JOB_CAP = 4  # _shared/tasks.ts, paid tiers
+
+
+def run_jobs(accounts: list[dict], jobs: list[dict], args, time_scale: float) -> list[dict]:
+    """Sign every account in, then submit job i at i * --arrival-gap, round-robin over the accounts."""
+    workers = []
+    try:
+        for account in accounts:
+            worker = WorkerClient(
+                account["base_url"], pool_size=len(jobs), timeout=args.timeout, time_scale=time_scale
+            )
+            workers.append(worker)
+            worker.sign_in(account["email"], account["password"])
+            if not account.get("voice_id"):
+                voices = worker.list_voices()
+                if not voices:
+                    raise RuntimeError(f"{account['email']} has no voices; clone one first")
+                account["voice_id"] = voices[0]["id"]
+        start = time.time() + 1.0
+        with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+            futures = [
+                pool.submit(
+                    cancellation.run_job,
+                    workers[i % len(workers)],
+                    accounts[i % len(accounts)]["voice_id"],
+                    job,
+                    start + i * args.arrival_gap * time_scale,
+                    args.poll_interval,
+                    args.timeout,
+                )
+                for i, job in enumerate(jobs)
+            ]
+            return [f.result() for f in futures]
+    finally:
+        for worker in workers:
+            worker.close()
+
+
+def summarize_run(records: list[dict], time_scale: float) -> dict:
+    kept = [r for r in records if r["cancel_delay"] is None]
+    done = [r for r in kept if r.get("status") == "completed"]
+    starts = [r["submit_start"] for r in records if "submit_start" in r]
+    makespan = (max(r["detected_at"] for r in done) - min(starts)) / time_scale if done else None
+    planned = [r for r in records if r["cancel_delay"] is not None]
+    cancelled = [r for r in planned if r.get("cancel_response") == "cancelled"]
+    summary = {
+        "jobs": len(records),
+        "errors": sum(1 for r in records if "error" in r),
+        "kept": len(kept),
+        "kept_completed": len(done),
+        "kept_jobs_per_minute": len(done) / makespan * 60 if makespan else None,
+        "kept_latency": summarize([(r["detected_at"] - r["submit_start"]) / time_scale for r in done]),
+        "planned_cancels": len(planned),
+        "responses": dict(Counter(r.get("cancel_response", "error") for r in planned)),
+        "cancelled": len(cancelled),
+        "cancel_latency": summarize([r["cancel_latency"] for r in cancelled]),
+        "effective": summarize([r["effective"] for r in cancelled]),
+        "after_cancel": summarize([r["after_cancel"] for r in cancelled]),
+        "after_cancel_total": sum(r["after_cancel"] for r in cancelled),
+        "cancelled_provider_seconds": sum(r["provider_seconds"] for r in cancelled),
+        "cancelled_billed_chars": sum(r["text_chars"] for r in cancelled if "synthesis" in r),
+        "provider_seconds": sum(r.get("provider_seconds", 0.0) for r in records),
+        "stages": {},
+    }
+    for stage in cancellation.STAGES:
+        hits = [r for r in cancelled if r["stage"] == stage]
+        summary["stages"][stage] = {
+            "n": len(hits),
+            "effective": summarize([r["effective"] for r in hits]),
+            "after_cancel": sum(r["after_cancel"] for r in hits),
+        }
+    released = [r["consumer_release"] for r in cancelled if r.get("consumer_release") is not None]
+    if released:
+        summary["consumer_release"] = summarize(released)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cancellation storm: wasted provider work and kept-job throughput")
+    parser.add_argument("--captions", type=int, default=12, help="Single-sentence jobs")
+    parser.add_argument("--paragraphs", type=int, default=6, help="2-4 sentence jobs")
+    parser.add_argument("--cancel-fraction", type=float, default=0.3, help="Share of jobs cancelled")
+    parser.add_argument(
+        "--cancel-delay",
+        type=float,
+        nargs=2,
+        default=[0.0, 15.0],
+        metavar=("MIN", "MAX"),
+        help="Cancel uniformly this many seconds after the submit (default: 0 15)",
+    )
+    parser.add_argument("--arrival-gap", type=float, default=2.0, help="Seconds between job submits")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Task poll interval (seconds)")
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the run without cancels")
+    parser.add_argument("--api-url", default=None, help="wrangler dev base URL (default: local stand-in)")
+    parser.add_argument(
+        "--account",
+        action="append",
+        default=[],
+        metavar="EMAIL:PASSWORD",
+        help="Extra signed-up user for --api-url (repeatable; $UTTER_EMAIL/$UTTER_PASSWORD is the first)",
+    )
+    parser.add_argument("--dashscope-port", type=int, default=8767, help="DashScope stand-in port for --api-url")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-job poll timeout (seconds)")
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    add_worker_arguments(parser)
+    parser.set_defaults(
+        gpu_slots=DEFAULT_GPU_SLOTS,
+        rate_limit=["RATE_LIMIT_TIER1_USER_LIMIT=100000", "RATE_LIMIT_TIER2_USER_LIMIT=100000"],
+    )
+    args = parser.parse_args()
+
+    provider = None
+    if args.api_url:
+        pairs = [(os.getenv("UTTER_EMAIL"), os.getenv("UTTER_PASSWORD"))] if os.getenv("UTTER_EMAIL") else []
+        pairs += [tuple(item.split(":", 1)) for item in args.account]
+        if not pairs or any(len(pair) != 2 or not all(pair) for pair in pairs):
+            print("Error: --api-url needs UTTER_EMAIL/UTTER_PASSWORD and/or --account EMAIL:PASSWORD")
+            return 1
+        time_scale = 1.0
+        try:
+            provider, _ = start_dashscope_standin(
+                port=args.dashscope_port,
+                adopt_voices=True,
+                **{**standin_kwargs(args), "deployment": "qwen-cloud-vc", "time_scale": 1.0},
+            )
+        except OSError as e:
+            print(f"Error: DashScope stand-in on port {args.dashscope_port}: {e}")
+            return 1
+    else:
+        time_scale = args.time_scale
+
+    jobs = mixed_jobs(args.captions, args.paragraphs, paragraph_sentences=(2, 4), seed=args.seed)
+    jobs = [job for job in jobs if len(job["text"]) <= config.WORKER_MAX_TEXT_CHARS]
+    storm = cancellation.plan(jobs, args.cancel_fraction, tuple(args.cancel_delay), seed=args.seed)
+    runs = [("storm", storm)]
+    if not args.no_baseline:
+        runs.insert(0, ("baseline", [{**job, "cancel_delay": None} for job in storm]))
+
+    print("=" * 70)
+    print("Cancellation Storm")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    if args.api_url:
+        print(f"Target: wrangler dev ({args.api_url}), DashScope stand-in on :{args.dashscope_port}")
+        print(f"  (Worker vars: DASHSCOPE_BASE_URL=http://127.0.0.1:{args.dashscope_port} ", end="")
+        print(f"DASHSCOPE_API_KEY={STANDIN_API_KEY})")
+    else:
+        print(f"Target: API Worker stand-in (x{time_scale:g})")
+    print(f"Jobs: {len(jobs)}, one every {args.arrival_gap:g}s  Poll interval: {args.poll_interval:g}s")
+    print(
+        f"Cancels: {sum(1 for j in storm if j['cancel_delay'] is not None)} jobs "
+        f"({args.cancel_fraction:.0%}), {args.cancel_delay[0]:g}-{args.cancel_delay[1]:g}s after submit"
+    )
+
+    all_records, summaries = [], {}
+    for name, workload in runs:
+        server = None
+        print(f"\n[{name}] ", end="", flush=True)
+        try:
+            if args.api_url:
+                accounts = [{"base_url": args.api_url, "email": e, "password": p} for e, p in pairs]
+                log = provider
+            else:
+                server, endpoint = start_worker_standin(
+                    time_scale=args.time_scale,
+                    seed=args.seed,
+                    provider_kwargs={**standin_kwargs(args), "deployment": "qwen-cloud-vc"},
+                    **worker_kwargs(args),
+                )
+                accounts = [endpoint]
+                for i in range(1, -(-len(jobs) // ACTIVE_JOB_CAP)):
+                    user = server.add_user(email=f"bench{i}@example.com", password=STANDIN_PASSWORD)
+                    voice = server.seed_voice(user["id"])
+                    accounts.append({**endpoint, "email": user["email"], "voice_id": voice["id"]})
+                log = server.provider_server
+            first_call = len(log.calls)
+            records = run_jobs(accounts, workload, args, time_scale)
+            cancellation.match_provider_calls(records, log.calls[first_call:])
+            for record in records:
+                cancellation.cancel_costs(record, time_scale)
+                trace = server.traces.get(record.get("task_id"), {}) if server else {}
+                if record.get("cancel_response") == "cancelled" and "cancelled_at" in trace:
+                    record["consumer_release"] = trace["cancelled_at"] - trace["cancel_requested"]
+        except (RuntimeError, WorkerAPIError, requests.exceptions.RequestException) as e:
+            print(f"ERROR - {e}")
+            if provider:
+                provider.shutdown()
+            return 1
+        finally:
+            if server:
+                server.shutdown()
+        summary = summaries[name] = summarize_run(records, time_scale)
+        print(
+            f"{summary['kept_completed']}/{summary['kept']} kept jobs completed, "
+            f"{summary['cancelled']}/{summary['planned_cancels']} cancelled"
+        )
+        if not any("synthesis" in r for r in records):
+            print("  No provider calls matched: is the Worker calling the DashScope stand-in?")
+        for record in records:
+            record["run"] = name
+        all_records.extend(records)
+    if provider:
+        provider.shutdown()
+
+    summary = summaries["storm"]
+    print("\n" + "=" * 70)
+    print("SUMMARY" if args.api_url else "SUMMARY (emulated seconds)")
+    print("=" * 70)
+    responses = ", ".join(f"{n} {response}" for response, n in sorted(summary["responses"].items()))
+    print(f"\nCancel responses: {responses or '-'}")
+    print(f"\n{'Measure':<16} │ {'n':>4} {'p50':>8} {'p95':>8} {'max':>8}")
+    print("-" * 50)
+    rows = [("cancel API", summary["cancel_latency"]), ("effective", summary["effective"])]
+    if "consumer_release" in summary:
+        rows.append(("consumer release", summary["consumer_release"]))
+    rows.append(("after cancel", summary["after_cancel"]))
+    for label, stats in rows:
+        print(f"{label:<16} │ {stats['n']:>4} " + " ".join(fmt_seconds(stats[k]) for k in ("p50", "p95", "max")))
+
+    print(f"\n{'Cancel landed':<13} │ {'Jobs':>4} │ {'effective p50':>13} {'max':>8} │ {'provider s after':>16}")
+    print("-" * 66)
+    for stage, row in summary["stages"].items():
+        print(
+            f"{stage:<13} │ {row['n']:>4} │ {fmt_seconds(row['effective']['p50'], 13)} "
+            f"{fmt_seconds(row['effective']['max'])} │ {fmt_seconds(row['after_cancel'], 16)}"
+        )
+
+    total = summary["provider_seconds"]
+    print(
+        f"\nProvider seconds after cancel requests: {summary['after_cancel_total']:.1f}s"
+        + (f" ({summary['after_cancel_total'] / total:.1%} of {total:.1f}s in the run)" if total else "")
+    )
+    print(
+        f"Cancelled jobs' provider seconds in all: {summary['cancelled_provider_seconds']:.1f}s; "
+        f"characters synthesized for them: {summary['cancelled_billed_chars']:,}"
+    )
+
+    print(f"\n{'Kept jobs':<9} │ {'Done':>5} {'Jobs/min':>8} │ {'p50':>8} {'p95':>8}")
+    print("-" * 48)
+    for name, run_summary in summaries.items():
+        latency = run_summary["kept_latency"]
+        print(
+            f"{name:<9} │ {run_summary['kept_completed']:>5} {run_summary['kept_jobs_per_minute'] or 0:>8.1f} │ "
+            + " ".join(fmt_seconds(latency[k]) for k in ("p50", "p95"))
+        )
+    baseline = summaries.get("baseline")
+    if baseline and baseline["kept_jobs_per_minute"] and summary["kept_jobs_per_minute"]:
+        change = summary["kept_jobs_per_minute"] / baseline["kept_jobs_per_minute"] - 1
+        print(f"Kept-job throughput with the storm: {change:+.1%} vs baseline")
+    print("Kept jobs: the jobs not picked for cancelling, submit -> completed seen by a poll")
+
+    if not args.no_save:
+        path = results.save_runs(
+            "cancellation_storm",
+            args.api_url or "local",
+            all_records,
+            extra={
+                "stand_in": not args.api_url,
+                "time_scale": time_scale,
+                "cancel_fraction": args.cancel_fraction,
+                "cancel_delay": args.cancel_delay,
+                "arrival_gap": args.arrival_gap,
+                "poll_interval": args.poll_interval,
+                "summaries": summaries,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Maximum sustainable throughput under a latency SLO.
+
+Answers "how many generations per minute can this deployment serve with
+p95 latency under the SLO?" by searching over arrival rate with open-loop
+load (tts_bench.loadgen): each step sends clone requests on a Poisson
+schedule at one rate, whatever is still in flight, runs --warmup seconds
+to reach steady state and then judges the --measure window. A step passes
+when p95 latency (from each request's scheduled send) is within --slo,
+errors stay under --max-error-rate and latency is not still climbing
+across the window. The rate doubles from --min-rate until a step fails,
+then bisects until the bounds are within --tolerance.
+
+Reports every step (offered rate, completed per minute, latency
+percentiles, drift, verdict), then the highest passing rate with its full
+latency distribution. The job mix is single-sentence captions and
+paragraphs from the input texts (--captions/--paragraphs) or --jobs.
+
+By default the target is the local stand-in emulating --emulate with
+--gpu-slots concurrent generations, time-scaled (--time-scale) so a step
+takes seconds; --deployment runs the search against a real endpoint in
+real time, where every step is billed GPU time and a step's warmup should
+cover the autoscaler. Latency under load never feeds the latency model.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python bench_capacity.py
+    uv run --with requests --with numpy python bench_capacity.py --gpu-slots 4 --slo 60 --captions 20 --paragraphs 0
+    uv run --with requests --with numpy python bench_capacity.py --deployment 0.6B-A10G-SDPA \\
+        --min-rate 1 --max-rate 16 --warmup 300 --measure 900
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy  # noqa: F401
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python bench_capacity.py")
+    sys.exit(1)
+
+from tts_bench import client, config, loadgen, results
+from tts_bench.latency_model import load_trained
+from tts_bench.standin import add_standin_arguments, standin_kwargs, start_standin
+from tts_bench.stats import fmt_seconds, percentile
+from tts_bench.workload import load_jobs, mixed_jobs
+
+DISTRIBUTION = [50, 75, 90, 95, 99]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maximum sustainable throughput under a latency SLO")
+    parser.add_argument("--deployment", default=None, help="Real deployment key (default: local stand-in)")
+    parser.add_argument("--slo", type=float, default=120.0, help="p95 latency target (seconds)")
+    parser.add_argument("--min-rate", type=float, default=0.5, help="First rate tried (requests per minute)")
+    parser.add_argument("--max-rate", type=float, default=64.0, help="Highest rate tried (requests per minute)")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Stop when bounds are this close (relative)")
+    parser.add_argument("--max-steps", type=int, default=12, help="Steps at most")
+    parser.add_argument("--warmup", type=float, default=300.0, help="Seconds per step before measuring")
+    parser.add_argument("--measure", type=float, default=900.0, help="Measured seconds per step")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error share a passing step may have")
+    parser.add_argument(
+        "--drift", type=float, default=loadgen.DEFAULT_DRIFT, help="Max late/early median latency in the window"
+    )
+    parser.add_argument("--max-in-flight", type=int, default=64, help="Outstanding requests before shedding")
+    parser.add_argument("--timeout", type=float, default=config.FALLBACK_TIMEOUT, help="Per-request timeout")
+    parser.add_argument("--jobs", type=Path, default=None, help="JSON job set (default: generated mix)")
+    parser.add_argument("--captions", type=int, default=12, help="Caption jobs in the generated mix")
+    parser.add_argument("--paragraphs", type=int, default=4, help="Paragraph jobs in the generated mix")
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    jobs = load_jobs(args.jobs) if args.jobs else mixed_jobs(args.captions, args.paragraphs, seed=args.seed)
+    ref_audio_b64, ref_text = client.load_reference()
+    server = None
+    if args.deployment:
+        endpoint = config.get_deployment(args.deployment)
+        if endpoint.get("provider"):
+            print(f"Error: {args.deployment} is not a Modal deployment")
+            return 1
+        time_scale = 1.0
+    else:
+        server, endpoint = start_standin(model=load_trained(), **standin_kwargs(args))
+        time_scale = args.time_scale
+
+    print("=" * 70)
+    print("Maximum Sustainable Throughput")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {endpoint['name']}" + (f" ({args.gpu_slots} GPU slots)" if server else ""))
+    print(f"SLO: p95 <= {args.slo:g}s  Errors <= {args.max_error_rate:.0%}  Drift <= x{args.drift:g}")
+    print(f"Rates: {args.min_rate:g}-{args.max_rate:g}/min  Step: {args.warmup:g}s warmup + {args.measure:g}s measured")
+    print(f"Jobs: {len(jobs)} texts, {sum(len(j['text']) for j in jobs) / len(jobs):.0f} chars on average")
+    if not server:
+        health = client.check_health(endpoint)
+        if health.get("status") == "error":
+            print(f"Error: health check failed: {health.get('error')}")
+            return 1
+
+    records, steps = [], []
+
+    def step(rate: float) -> dict:
+        print(f"\n[{rate:.2f}/min] ", end="", flush=True)
+        step_records = loadgen.run_step(
+            endpoint,
+            jobs,
+            ref_audio_b64,
+            ref_text,
+            rate,
+            args.warmup,
+            args.measure,
+            timeout=args.timeout,
+            max_in_flight=args.max_in_flight,
+            time_scale=time_scale,
+            seed=args.seed + len(steps),
+        )
+        summary = loadgen.judge(
+            step_records, rate, args.warmup, args.measure, args.slo, args.max_error_rate, args.drift
+        )
+        for record in step_records:
+            record.update(rate=rate, step=len(steps))
+        records.extend(step_records)
+        steps.append(summary)
+        print(
+            f"{summary['completed']}/{summary['requests']} measured, p95 "
+            f"{fmt_seconds(summary['latency']['p95']).strip()}: "
+            + ("pass" if summary["passed"] else f"fail ({summary['reason']})")
+        )
+        return summary
+
+    try:
+        best = loadgen.find_max_rate(step, args.min_rate, args.max_rate, args.tolerance, args.max_steps)
+    finally:
+        if server:
+            server.shutdown()
+
+    print("\n" + "=" * 70)
+    print("SUMMARY" + (" (emulated seconds)" if server else ""))
+    print("=" * 70)
+    print(
+        f"\n{'Rate/min':>8} │ {'Done/min':>8} {'Errors':>6} │ {'p50':>8} {'p95':>8} {'p99':>8} │ "
+        f"{'Drift':>5} │ Verdict"
+    )
+    print("-" * 96)
+    for summary in sorted(steps, key=lambda s: s["rate"]):
+        latency = summary["latency"]
+        drift = f"x{summary['drift']:.1f}" if summary["drift"] is not None else "-"
+        print(
+            f"{summary['rate']:>8.2f} │ {summary['throughput']:>8.2f} {summary['errors']:>6} │ "
+            f"{fmt_seconds(latency['p50'])} {fmt_seconds(latency['p95'])} {fmt_seconds(latency['p99'])} │ "
+            f"{drift:>5} │ {'pass' if summary['passed'] else summary['reason']}"
+        )
+
+    distribution = None
+    if best is None:
+        print(f"\nNo rate met the SLO: {args.min_rate:g}/min already fails")
+    else:
+        ok = [
+            r["latency"]
+            for r in records
+            if r["rate"] == best["rate"] and r["measured"] and "error" not in r
+        ]
+        distribution = {f"p{q}": percentile(ok, q) for q in DISTRIBUTION}
+        print(
+            f"\nMax sustainable rate: {best['rate']:.2f}/min "
+            f"({best['throughput']:.2f} completed/min, {best['rate'] * 60:,.0f}/hour)"
+        )
+        failed = [s["rate"] for s in steps if not s["passed"] and s["rate"] > best["rate"]]
+        if failed:
+            print(f"Lowest failing rate: {min(failed):.2f}/min")
+        else:
+            print(f"No step failed up to {args.max_rate:g}/min: the limit is at least that")
+        print(
+            "Latency at that rate: "
+            + "  ".join(f"p{q} {distribution[f'p{q}']:.1f}s" for q in DISTRIBUTION)
+            + f"  max {best['latency']['max']:.1f}s"
+        )
+        print(
+            f"Response (send -> done) p95 {best['response']['p95']:.1f}s, "
+            f"send lag p95 {best['send_lag']['p95']:.2f}s, {best['completed']} requests measured"
+        )
+
+    if not args.no_save:
+        path = results.save_runs(
+            "capacity_search",
+            args.deployment or "local",
+            records,
+            extra={
+                "stand_in": server is not None,
+                "target": endpoint["name"],
+                "time_scale": time_scale,
+                "gpu_slots": args.gpu_slots if server else None,
+                "slo": args.slo,
+                "warmup": args.warmup,
+                "measure": args.measure,
+                "steps": steps,
+                "best": best,
+                "distribution": distribution,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Contention on the credit and rate-limit RPCs, one hot user vs many.
+
+Drives rate_limit_check_and_increment() and credit_apply_event() from
+supabase/schemas/03_functions.sql directly against local Postgres from
+parallel connections (tts_bench.contention):
+
+    rate_limit  the per-request counter upsert
+    debit       a generate debit (profiles row FOR UPDATE + ledger insert)
+    generate    rate limit + debit, and a refund for --refund-share of jobs
+
+Each operation runs at every --clients count, first with every client as
+the same user and IP ("hot": one user batch-generating from one machine),
+then with one user and IP per client ("spread"). For each cell it reports
+calls and transactions per second, p50/p99 latency, the mean number of
+clients waiting on a row lock (pg_stat_activity samples) and what that
+costs per call, plus errors and deadlocks. The hot rows give the per-user
+throughput ceiling; the spread rows show what the database does without
+the shared row.
+
+Every call is its own transaction, as with PostgREST; the Worker's HTTP
+hop and PostgREST's pool (10 connections by default) are left out, so
+these are upper bounds for the database alone.
+
+Needs `supabase start` (SUPABASE_DB_URL, default the local database port
+from supabase/config.toml) and psycopg. Bench users under
+@credit-bench.test are created for the run and removed afterwards
+(--keep leaves them).
+
+Usage:
+    cd test/scripts
+    uv run --with numpy --with 'psycopg[binary]' python bench_credit_contention.py
+    uv run --with numpy --with 'psycopg[binary]' python bench_credit_contention.py --operations debit --clients 1 8 32
+    uv run --with numpy --with 'psycopg[binary]' python bench_credit_contention.py --duration 30 --actors hot
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+try:
+    import numpy  # noqa: F401
+    import psycopg
+except ImportError:
+    print("Error: numpy and psycopg libraries required")
+    print("Run: uv run --with numpy --with 'psycopg[binary]' python bench_credit_contention.py")
+    sys.exit(1)
+
+from tts_bench import config, contention, history, results
+from tts_bench.stats import summarize
+
+
+def fmt_ms(value: float | None, width: int = 8) -> str:
+    return f"{value * 1000:>{width - 2}.1f}ms" if value is not None else f"{'-':>{width}}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Credit and rate-limit RPC contention")
+    parser.add_argument("--operations", nargs="+", choices=contention.OPERATIONS, default=list(contention.OPERATIONS))
+    parser.add_argument("--clients", nargs="+", type=int, default=[1, 2, 4, 8, 16, 32], help="Parallel connections")
+    parser.add_argument(
+        "--actors", nargs="+", choices=["hot", "spread"], default=["hot", "spread"], help="One user/IP, or one each"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per cell")
+    parser.add_argument("--amount", type=int, default=300, help="Credits per debit (characters per generation)")
+    parser.add_argument("--refund-share", type=float, default=0.1, help="Share of generate debits refunded")
+    parser.add_argument("--db-url", default=config.SUPABASE_DB_URL, help="Postgres URL (default: $SUPABASE_DB_URL)")
+    parser.add_argument("--keep", action="store_true", help="Keep the bench users and counters afterwards")
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Credit and Rate-Limit RPC Contention")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    try:
+        setup = history.connect(args.db_url, application_name=f"{contention.APP_NAME}_setup")
+        contention.drop(setup)
+        users = contention.create_users(setup, max(args.clients))
+        with setup.cursor() as cur:
+            cur.execute("SELECT version(), current_setting('max_connections')")
+            version, max_connections = cur.fetchone()
+    except psycopg.Error as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"Database: {version.split(',')[0]}  max_connections: {max_connections}")
+    print(f"Operations: {', '.join(args.operations)}  Clients: {args.clients}  {args.duration:g}s per cell")
+    print(f"Bench users: {len(users)}  Debit: {args.amount} credits  Refunds: {args.refund_share:.0%} of generates")
+
+    records = []
+    try:
+        for operation in args.operations:
+            print(f"\n{operation}")
+            for mode in args.actors:
+                for clients in args.clients:
+                    actors = 1 if mode == "hot" else clients
+                    cell = contention.run_cell(
+                        args.db_url,
+                        operation,
+                        clients,
+                        users,
+                        actors,
+                        duration=args.duration,
+                        amount=args.amount,
+                        refund_share=args.refund_share,
+                    )
+                    latency = summarize(cell.pop("latencies"))
+                    cell.update(
+                        mode=mode,
+                        calls_per_second=cell["calls"] / cell["elapsed"],
+                        transactions_per_second=cell["transactions"] / cell["elapsed"],
+                        latency=latency,
+                    )
+                    records.append(cell)
+                    print(
+                        f"  {mode:<6} {clients:>3} clients: {cell['calls_per_second']:>8,.0f} calls/s  "
+                        f"p99 {fmt_ms(latency['p99']).strip()}  lock-waiting {cell['lock_waiting']:.1f}"
+                        + (f"  ({cell['dropped']} lost their connection)" if cell["dropped"] else "")
+                    )
+        consistent = contention.balances_consistent(setup, users)
+        if not args.keep:
+            contention.drop(setup)
+    except (psycopg.Error, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        setup.close()
+
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+    for operation in args.operations:
+        print(f"\n{operation}")
+        print(
+            f"{'Actors':<6} {'Clients':>7} │ {'calls/s':>8} {'txn/s':>8} │ {'p50':>8} {'p99':>8} │ "
+            f"{'Lock wait':>9} {'per call':>8} │ {'Top wait event':<24} {'Errors':>6}"
+        )
+        print("-" * 116)
+        for cell in (r for r in records if r["operation"] == operation):
+            top = next(iter(cell["waits"]), "-")
+            errors = sum(cell["errors"].values()) + cell["deadlocks"]
+            print(
+                f"{cell['mode']:<6} {cell['clients']:>7} │ {cell['calls_per_second']:>8,.0f} "
+                f"{cell['transactions_per_second']:>8,.0f} │ {fmt_ms(cell['latency']['p50'])} "
+                f"{fmt_ms(cell['latency']['p99'])} │ {cell['lock_waiting']:>9.2f} "
+                f"{fmt_ms(cell['lock_wait_per_call'])} │ {top:<24} {errors:>6}"
+            )
+
+    ceilings = {}
+    print("\nPer-user ceiling (hot actor, best client count):")
+    for operation in args.operations:
+        hot = [r for r in records if r["operation"] == operation and r["mode"] == "hot"]
+        spread = {r["clients"]: r for r in records if r["operation"] == operation and r["mode"] == "spread"}
+        if not hot:
+            continue
+        best = max(hot, key=lambda r: r["calls_per_second"])
+        ceilings[operation] = {"calls_per_second": best["calls_per_second"], "clients": best["clients"]}
+        line = f"  {operation:<10} {best['calls_per_second']:>8,.0f}/s at {best['clients']} clients"
+        line += f" ({best['calls_per_second'] * 60:,.0f}/min)"
+        widest = max(hot, key=lambda r: r["clients"])
+        if widest["clients"] in spread:
+            ratio = spread[widest["clients"]]["calls_per_second"] / max(widest["calls_per_second"], 1e-9)
+            ceilings[operation]["spread_speedup"] = ratio
+            line += f"; {widest['clients']} users instead of one: {ratio:.1f}x"
+        print(line)
+    print(f"\nBalances match the ledger: {'yes' if consistent else 'NO'}")
+
+    if not args.no_save:
+        path = results.save_runs(
+            "credit_contention",
+            "local",
+            records,
+            extra={
+                "database": version,
+                "duration": args.duration,
+                "amount": args.amount,
+                "refund_share": args.refund_share,
+                "ceilings": ceilings,
+                "balances_consistent": consistent,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Concurrent audio downloads through the API Worker: MB/s, TTFB, per-request overhead.
+
+Exports the same set of completed generations once per --concurrency level
+with tts_bench.export (GET /api/generations/:id/audio -> 302 -> GET
+/api/storage/download?token=..., streamed to disk) and reports per level:
+
+  throughput  MB/s and clips/s over the level's wall time
+  redirect    the audio route's 302 (auth, generation lookup, signing)
+  ttfb        signed-URL request -> response headers
+  429s        rate-limited requests (both routes are tier 3, per IP)
+
+From the uncontended level (the lowest concurrency) it fits, across clip
+sizes, fetch seconds = overhead + bytes / bandwidth and ttfb = first byte +
+bytes x slope: the intercepts are the Worker's fixed cost per request, and
+a ttfb that grows with size means the object is read whole before the
+response starts (routes/storage.ts does). It also asks one signed URL for
+`Range: bytes=1-` to see whether an interrupted download can resume, and
+sizes an export: the best level's rate for --export-size clips, against the
+ceiling the tier-3 IP limit puts on two requests per clip.
+
+By default the target is the Worker stand-in at real time (--time-scale 1)
+seeded with --clips generations of --durations seconds of audio (log-uniform),
+its tier-3 IP limit lifted so the sweep is not throttled; --storage-mbps
+emulates R2 read bandwidth. With --api-url the target is `wrangler dev` with
+local R2 (workers/api, `npm run dev`), exporting the user's own completed
+generations (--clips of the newest); the RATE_LIMIT_* values there come from
+workers/api/.dev.vars.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python bench_downloads.py
+    uv run --with requests --with numpy python bench_downloads.py --concurrency 1 4 16 --storage-mbps 200
+    UTTER_EMAIL=... UTTER_PASSWORD=... uv run --with requests --with numpy python bench_downloads.py \\
+        --api-url http://127.0.0.1:8787 --clips 50
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy as np
+    import requests
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python bench_downloads.py")
+    sys.exit(1)
+
+from tts_bench import audio, config, export, results
+from tts_bench.standin_worker import parse_rate_limits, start_worker_standin
+from tts_bench.stats import summarize
+from tts_bench.worker_client import RATE_LIMIT_DEFAULTS, WorkerAPIError, WorkerClient
+from tts_bench.workload import corpus_sentences
+
+MB = 1e6
+
+
+def fmt_ms(value: float | None, width: int = 8) -> str:
+    return f"{value * 1000:>{width - 2}.1f}ms" if value is not None else f"{'-':>{width}}"
+
+
+def seed_clips(server, endpoint: dict, count: int, durations: tuple[float, float], seed: int):
+    """Completed generations with synthetic speech of log-uniform durations on the stand-in."""
+    rng = random.Random(seed)
+    sentences = corpus_sentences()
+    with server.db_lock:
+        user_id = next(u["id"] for u in server.users.values() if u["email"] == endpoint["email"])
+    low, high = math.log(durations[0]), math.log(durations[1])
+    for i in range(count):
+        seconds = math.exp(rng.uniform(low, high))
+        wav = audio.encode_wav(audio.synth_speech(seconds, seed=seed + i), audio.MODEL_SAMPLE_RATE)
+        server.seed_generation(user_id, endpoint["voice_id"], rng.choice(sentences), wav)
+
+
+def fit(x: list[float], y: list[float]) -> tuple[float, float] | None:
+    """Least-squares (intercept, slope) of y on x; None without two distinct sizes."""
+    if len(x) < 2 or len(set(x)) < 2:
+        return None
+    slope, intercept = np.polyfit(np.asarray(x, dtype=float), np.asarray(y, dtype=float), 1)
+    return float(intercept), float(slope)
+
+
+def summarize_level(records: list[dict], wall: float) -> dict:
+    ok = [r for r in records if "error" not in r]
+    total = sum(r["bytes"] for r in ok)
+    return {
+        "clips": len(records),
+        "completed": len(ok),
+        "errors": len(records) - len(ok),
+        "bytes": total,
+        "wall": wall,
+        "mb_per_second": total / MB / wall if wall else None,
+        "clips_per_second": len(ok) / wall if wall else None,
+        "redirect": summarize([r["redirect"] for r in ok]),
+        "ttfb": summarize([r["ttfb"] for r in ok]),
+        "fetch": summarize([r["fetch"] for r in ok]),
+        "rate_limited": sum(r["rate_limited"] for r in records),
+        "restarted_bytes": sum(r.get("restarted_bytes", 0) for r in records),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent audio downloads through the API Worker")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Downloads in flight")
+    parser.add_argument("--clips", type=int, default=60, help="Clips per level (stand-in: generations seeded)")
+    parser.add_argument(
+        "--durations",
+        type=float,
+        nargs=2,
+        default=[2.0, 120.0],
+        metavar=("MIN", "MAX"),
+        help="Stand-in clip lengths in seconds, log-uniform (default: 2 120)",
+    )
+    parser.add_argument("--storage-mbps", type=float, default=None, help="Stand-in R2 read bandwidth (Mbit/s)")
+    parser.add_argument("--export-size", type=int, default=1000, help="Clips to size an export job for")
+    parser.add_argument("--api-url", default=None, help="wrangler dev base URL (default: local stand-in)")
+    parser.add_argument("--email", default=os.getenv("UTTER_EMAIL"), help="Sign-in email (default: $UTTER_EMAIL)")
+    parser.add_argument("--password", default=os.getenv("UTTER_PASSWORD"), help="Password (default: $UTTER_PASSWORD)")
+    parser.add_argument("--token", default=os.getenv("UTTER_ACCESS_TOKEN"), help="Bearer access token instead")
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="The target's RATE_LIMIT_* values (.dev.vars), for the export ceiling; applied to the stand-in",
+    )
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Stand-in time scale (default: 1, real time)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=90.0, help="Per-request timeout (seconds)")
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    args = parser.parse_args()
+
+    rate_limits = parse_rate_limits(args.rate_limit)
+    server = None
+    if args.api_url:
+        if not args.token and not (args.email and args.password):
+            print("Error: --api-url needs --email/--password or --token")
+            return 1
+        endpoint = {"name": f"API Worker ({args.api_url})", "base_url": args.api_url}
+        endpoint.update(email=args.email, password=args.password, token=args.token)
+    else:
+        server, endpoint = start_worker_standin(
+            time_scale=args.time_scale,
+            seed=args.seed,
+            provider_kwargs={"deployment": "qwen-cloud-vc"},
+            rate_limits={**rate_limits, "RATE_LIMIT_TIER3_IP_LIMIT": 1_000_000},
+            storage_mbps=args.storage_mbps,
+        )
+        seed_clips(server, endpoint, args.clips, tuple(args.durations), args.seed)
+    limits = {**RATE_LIMIT_DEFAULTS, **rate_limits}
+
+    print("=" * 70)
+    print("Concurrent Audio Downloads")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {endpoint['name']}")
+    if server:
+        print(f"Seeded clips: {args.clips}, {args.durations[0]:g}-{args.durations[1]:g}s of audio", end="")
+        print(f"  Storage bandwidth: {f'{args.storage_mbps:g} Mbit/s' if args.storage_mbps else 'unlimited'}")
+
+    worker = WorkerClient(
+        endpoint["base_url"],
+        access_token=endpoint.get("token"),
+        pool_size=max(args.concurrency),
+        timeout=args.timeout,
+        time_scale=args.time_scale if server else 1.0,
+    )
+    levels, all_records = [], []
+    try:
+        if not endpoint.get("token"):
+            worker.sign_in(endpoint["email"], endpoint["password"])
+        generations = export.completed_generations(worker, limit=args.clips)
+        if not generations:
+            print("Error: the user has no completed generations to download")
+            return 1
+        probe_session = export.storage_session(1)
+        try:
+            shortest = min(generations, key=lambda g: g.get("duration_seconds") or 0.0)
+            range_probe = export.range_supported(worker, shortest, probe_session)
+        finally:
+            probe_session.close()
+        print(f"Clips: {len(generations)}  Levels: {args.concurrency}")
+
+        for concurrency in args.concurrency:
+            print(f"\n[{concurrency} in flight] ", end="", flush=True)
+            with tempfile.TemporaryDirectory(prefix="downloads-") as out_dir:
+                start = time.perf_counter()
+                records = export.export(worker, generations, Path(out_dir), workers=concurrency, timeout=args.timeout)
+                wall = time.perf_counter() - start
+            level = {"concurrency": concurrency, **summarize_level(records, wall)}
+            levels.append(level)
+            for record in records:
+                record.update(concurrency=concurrency, path=None)
+            all_records.extend(records)
+            print(
+                f"{level['completed']}/{level['clips']} clips, {level['bytes'] / MB:.1f} MB in {wall:.2f}s "
+                f"({level['mb_per_second'] or 0:.1f} MB/s), {level['rate_limited']} x 429"
+            )
+    except (RuntimeError, WorkerAPIError, requests.exceptions.RequestException) as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        worker.close()
+        if server:
+            server.shutdown()
+
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+    print(
+        f"\n{'Conc':>4} │ {'MB':>7} {'Wall':>7} │ {'MB/s':>7} {'clips/s':>7} │ {'redirect':>8} {'p95':>8} │ "
+        f"{'ttfb p50':>8} {'p95':>8} │ {'429s':>5} {'Errors':>6}"
+    )
+    print("-" * 101)
+    for level in levels:
+        print(
+            f"{level['concurrency']:>4} │ {level['bytes'] / MB:>7.1f} {level['wall']:>6.2f}s │ "
+            f"{level['mb_per_second'] or 0:>7.1f} {level['clips_per_second'] or 0:>7.2f} │ "
+            f"{fmt_ms(level['redirect']['p50'])} {fmt_ms(level['redirect']['p95'])} │ "
+            f"{fmt_ms(level['ttfb']['p50'])} {fmt_ms(level['ttfb']['p95'])} │ "
+            f"{level['rate_limited']:>5} {level['errors']:>6}"
+        )
+
+    base = min(levels, key=lambda level: level["concurrency"])
+    uncontended = [r for r in all_records if r["concurrency"] == base["concurrency"] and "error" not in r]
+    sizes = [r["bytes"] / MB for r in uncontended]
+    fetch_fit = fit(sizes, [r["fetch"] for r in uncontended])
+    ttfb_fit = fit(sizes, [r["ttfb"] for r in uncontended])
+    overhead = {}
+    print(f"\nPer-request overhead (at {base['concurrency']} in flight, {len(uncontended)} clip sizes):")
+    print(f"  audio route (302):   p50 {fmt_ms(base['redirect']['p50']).strip()}")
+    if fetch_fit:
+        intercept, slope = fetch_fit
+        overhead["fetch_intercept"], overhead["fetch_seconds_per_mb"] = intercept, slope
+        print(
+            f"  storage download:    {fmt_ms(intercept).strip()} + {slope * 1000:.1f}ms/MB "
+            f"({1 / slope if slope > 0 else float('inf'):,.1f} MB/s per stream)"
+        )
+        overhead["per_clip"] = intercept + (base["redirect"]["p50"] or 0.0)
+        print(f"  fixed cost per clip: {fmt_ms(overhead['per_clip']).strip()} (302 + download intercept)")
+    if ttfb_fit:
+        intercept, slope = ttfb_fit
+        overhead["ttfb_intercept"], overhead["ttfb_seconds_per_mb"] = intercept, slope
+        print(f"  ttfb:                {fmt_ms(intercept).strip()} + {slope * 1000:.1f}ms/MB", end="")
+        buffered = fetch_fit is not None and fetch_fit[1] > 0 and slope > 0.5 * fetch_fit[1]
+        print("  (grows with size: the object is read whole before the response)" if buffered else "")
+        overhead["buffered"] = buffered
+    resumable = "yes" if range_probe["supported"] else f"no ({range_probe['status']} to Range: bytes=1-)"
+    print(f"Resume of a dropped download: {resumable}")
+
+    best = max(levels, key=lambda level: level["clips_per_second"] or 0)
+    window = limits.get("RATE_LIMIT_TIER3_WINDOW_SECONDS", limits["RATE_LIMIT_WINDOW_SECONDS"])
+    ceiling = limits["RATE_LIMIT_TIER3_IP_LIMIT"] / 2 / window  # Two tier-3 requests per clip
+    sizing = {"best_concurrency": best["concurrency"], "tier3_clips_per_second": ceiling}
+    if best["clips_per_second"]:
+        rate = min(best["clips_per_second"], ceiling)
+        sizing["export_seconds"] = args.export_size / rate
+        mean_mb = best["bytes"] / MB / max(best["completed"], 1)
+        print(
+            f"\nExport of {args.export_size:,} clips (~{args.export_size * mean_mb:,.0f} MB): "
+            f"{sizing['export_seconds'] / 60:,.1f} min at {best['concurrency']} in flight "
+            f"({best['clips_per_second']:.2f} clips/s measured"
+            + (f", capped at {ceiling:.2f}/s by the tier-3 IP limit)" if ceiling < best["clips_per_second"] else ")")
+        )
+    print(
+        f"Tier-3 ceiling: {limits['RATE_LIMIT_TIER3_IP_LIMIT']} requests per {window}s per IP = "
+        f"{ceiling * 60:,.0f} clips/min" + ("" if args.api_url else " (raised on the stand-in for the sweep)")
+    )
+
+    if not args.no_save:
+        path = results.save_runs(
+            "download_benchmark",
+            args.api_url or "local",
+            all_records,
+            extra={
+                "stand_in": server is not None,
+                "storage_mbps": args.storage_mbps,
+                "levels": levels,
+                "overhead": overhead,
+                "range": range_probe,
+                "sizing": sizing,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Clone body encodings: JSON/base64 vs gzip JSON vs binary multipart.
+
+Sends the same short text with each stored reference (inputs/reference/*.wav,
+raw and preprocessed) in every encoding the endpoint supports, and reports
+per encoding:
+
+- request bytes on the wire
+- client encode time (JSON serialization, gzip, multipart assembly)
+- upload and server decode time (stand-in X-* headers)
+- request overhead: wall time minus the stand-in's generation time
+- end-to-end latency (overhead + emulated generation against the stand-in)
+
+The stand-in emulates a --uplink-mbps client link (default 20 Mbit/s here) so
+upload size turns into time the way it does from a home connection.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python bench_encodings.py
+    uv run --with requests --with numpy python bench_encodings.py --uplink-mbps 100 --runs 5
+    uv run --with requests --with numpy python bench_encodings.py --deployment 0.6B-A10G-SDPA
+"""
+
+import argparse
+import base64
+import sys
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy  # noqa: F401
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python bench_encodings.py")
+    sys.exit(1)
+
+from tts_bench import client, config, reference, results
+from tts_bench.standin import add_standin_arguments, standin_kwargs, start_standin
+from tts_bench.stats import fmt_seconds, summarize
+
+
+def stored_references(paths: list[Path]) -> list[tuple[str, bytes]]:
+    """Each reference as stored and as the preprocessing pipeline sends it."""
+    refs = []
+    for path in paths:
+        wav = path.read_bytes()
+        refs.append((path.name, wav))
+        refs.append((f"{path.stem} (preprocessed)", reference.preprocessed(wav)))
+    return refs
+
+
+def mean_of(records: list[dict], key: str) -> float | None:
+    values = [r[key] for r in records if r.get(key) is not None]
+    return sum(values) / len(values) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark clone body encodings")
+    parser.add_argument(
+        "--reference",
+        type=Path,
+        nargs="+",
+        default=None,
+        help="Reference WAV(s) (default: every inputs/reference/*.wav)",
+    )
+    parser.add_argument("--text", default="short", help="inputs/texts name to synthesize")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per (reference, encoding)")
+    parser.add_argument(
+        "--encodings",
+        nargs="+",
+        default=list(client.ENCODINGS),
+        choices=client.ENCODINGS,
+        help="Encodings to compare (unsupported ones are skipped)",
+    )
+    parser.add_argument("--deployment", default=None, help="Target deployment (default: local stand-in)")
+    parser.add_argument("--timeout", type=float, default=config.FALLBACK_TIMEOUT)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    parser.set_defaults(uplink_mbps=20.0)
+    args = parser.parse_args()
+
+    paths = args.reference or sorted((config.INPUTS_DIR / "reference").glob("*.wav"))
+    if not paths:
+        print(f"Error: no reference WAVs found in {config.INPUTS_DIR / 'reference'}")
+        return 1
+
+    server = None
+    if args.deployment:
+        endpoint = config.get_deployment(args.deployment)
+        time_scale = 1.0
+    else:
+        server, endpoint = start_standin(**standin_kwargs(args))
+        time_scale = args.time_scale
+
+    supported = client.supported_encodings(endpoint)
+    encodings = [e for e in args.encodings if e in supported]
+    skipped = [e for e in args.encodings if e not in supported]
+    _, ref_text = client.load_reference()
+    text = client.load_text(args.text)
+
+    print("=" * 70)
+    print("Clone Body Encodings")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {endpoint['name']}")
+    print(f"Encodings: {', '.join(encodings)}" + (f" (unsupported: {', '.join(skipped)})" if skipped else ""))
+    if server:
+        print(f"Uplink: {args.uplink_mbps:g} Mbit/s" if args.uplink_mbps else "Uplink: unlimited")
+    print(f"Text: {args.text} ({len(text)} chars)  Runs: {args.runs}")
+
+    records = []
+    for name, wav in stored_references(paths):
+        info = reference.describe(wav)
+        payload = client.build_payload(text, base64.b64encode(wav).decode("utf-8"), ref_text)
+        print(f"\n[{name}] {info['seconds']:.1f}s {info['rate']}Hz, {info['wav_bytes']:,} WAV bytes")
+        for run in range(1, args.runs + 1):
+            # Interleave encodings within a run so drift hits all of them
+            for encoding in encodings:
+                record, _ = client.measure_request(
+                    endpoint, payload, timeout=args.timeout, ref_seconds=info["seconds"], encoding=encoding
+                )
+                record.update({"reference": name, "run": run, "wav_bytes": info["wav_bytes"]})
+                if "service_seconds" in record:
+                    record["overhead"] = record["time"] - record["service_seconds"] * time_scale
+                    record["end_to_end"] = record["overhead"] + record["service_seconds"]
+                else:
+                    record["end_to_end"] = record["time"]
+                if "error" in record:
+                    print(f"  Run {run} {encoding:<10}: ERROR - {record['error']}")
+                else:
+                    print(
+                        f"  Run {run} {encoding:<10}: {record['request_bytes']:>11,} bytes  "
+                        f"{record['end_to_end']:.2f}s"
+                    )
+                records.append(record)
+
+    print("\n" + "=" * 70)
+    print("SUMMARY (end-to-end in emulated seconds, overhead in real seconds)" if server else "SUMMARY")
+    print("=" * 70)
+    print(
+        f"\n{'Reference':<30} {'Encoding':<10} {'Bytes':>11} {'vs json':>8} │ "
+        f"{'Encode':>8} {'Upload':>8} {'Decode':>8} {'Overhead':>9} │ {'E2E mean':>9} {'p95':>8}"
+    )
+    print("-" * 122)
+
+    summary = {}
+    for name in dict.fromkeys(r["reference"] for r in records):
+        summary[name] = {}
+        json_bytes = None
+        for encoding in encodings:
+            ok = [r for r in records if r["reference"] == name and r["encoding"] == encoding and "error" not in r]
+            if not ok:
+                continue
+            request_bytes = ok[0]["request_bytes"]
+            if encoding == "json":
+                json_bytes = request_bytes
+            entry = {
+                "request_bytes": request_bytes,
+                "encode_seconds": mean_of(ok, "encode_seconds"),
+                "upload_seconds": mean_of(ok, "upload_seconds"),
+                "decode_seconds": mean_of(ok, "decode_seconds"),
+                "overhead": mean_of(ok, "overhead"),
+                "end_to_end": summarize([r["end_to_end"] for r in ok]),
+            }
+            summary[name][encoding] = entry
+            ratio = f"{request_bytes / json_bytes:>7.0%}" if json_bytes else f"{'-':>7}"
+
+            def ms(value):
+                return f"{value * 1000:>6.0f}ms" if value is not None else f"{'-':>8}"
+
+            print(
+                f"{name[:30]:<30} {encoding:<10} {request_bytes:>11,} {ratio} │ "
+                f"{ms(entry['encode_seconds'])} {fmt_seconds(entry['upload_seconds'])} "
+                f"{ms(entry['decode_seconds'])} {fmt_seconds(entry['overhead'], 9)} │ "
+                f"{fmt_seconds(entry['end_to_end']['mean'], 9)} {fmt_seconds(entry['end_to_end']['p95'])}"
+            )
+        print("-" * 122)
+
+    if server:
+        server.shutdown()
+
+    if not args.no_save:
+        path = results.save_runs(
+            "encoding_benchmark",
+            args.deployment or "local",
+            records,
+            extra={
+                "stand_in": server is not None,
+                "text": args.text,
+                "time_scale": time_scale,
+                "uplink_mbps": args.uplink_mbps if server else None,
+                "encodings": summary,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+History listing load test: GET /api/generations at scale, by page depth.
+
+Drives the listing the History page makes (10 rows a page) for the users
+load_history.py created, with the filter, sort and search combinations
+HistoryFilterBar offers:
+
+    newest / oldest      sort created_at desc / asc (the default is newest)
+    duration_desc/_asc   sort duration_seconds
+    name_asc / name_desc sort voice_name
+    completed, failed    status filter
+    voice                voice filter (the user's most used voice)
+    search_common/_rare  search for a word in most / in few of the texts
+    search_none          search that matches nothing
+
+at page depths 1, 10, 100, 1000 and the last page, for the heaviest and the
+median user. Each (user, scenario, depth) is requested --repeats times
+after one warm-up request. The report gives p50 per scenario and depth,
+p50/p95 by depth across scenarios, whether name-sorted pages came back in
+name order, and EXPLAIN (ANALYZE, BUFFERS) plans for every case slower
+than --slow-ms, run as the user the way PostgREST runs the listing
+(tts_bench.history.listing_sql).
+
+By default requests go through the API Worker (`wrangler dev` against
+`supabase start`). The limiter counts the listing in tier 3 (300 requests
+per IP per 5 minutes), so raise RATE_LIMIT_TIER3_IP_LIMIT in
+workers/api/.dev.vars for a full run. --sql-only runs the same statement
+directly in Postgres instead, which isolates database time from the Worker
+and needs nothing but the database.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy --with 'psycopg[binary]' python load_history.py
+    uv run --with requests --with numpy --with 'psycopg[binary]' python bench_history.py
+    uv run --with requests --with numpy --with 'psycopg[binary]' python bench_history.py --sql-only
+    uv run --with requests --with numpy --with 'psycopg[binary]' python bench_history.py \\
+        --users heavy --scenarios newest duration_desc search_none --depths 1 100 last
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+
+try:
+    import numpy  # noqa: F401
+    import psycopg
+    import requests
+except ImportError:
+    print("Error: requests, numpy and psycopg libraries required")
+    print("Run: uv run --with requests --with numpy --with 'psycopg[binary]' python bench_history.py")
+    sys.exit(1)
+
+from tts_bench import config, history, results
+from tts_bench.stats import summarize
+from tts_bench.worker_client import WorkerAPIError, WorkerClient
+
+SCENARIO_NAMES = [
+    "newest",
+    "oldest",
+    "duration_desc",
+    "duration_asc",
+    "name_asc",
+    "name_desc",
+    "completed",
+    "failed",
+    "voice",
+    "search_common",
+    "search_rare",
+    "search_none",
+]
+USER_ROLES = ["heavy", "median", "light"]
+
+
+def fmt_ms(value: float | None, width: int = 8) -> str:
+    return f"{value * 1000:>{width - 2}.1f}ms" if value is not None else f"{'-':>{width}}"
+
+
+def scenarios(voice_id: str | None, terms: dict) -> dict:
+    """Listing filters per scenario, as the frontend sends them (sort_dir only when not desc)."""
+    table = {
+        "newest": {},
+        "oldest": {"sort_dir": "asc"},
+        "duration_desc": {"sort": "duration_seconds"},
+        "duration_asc": {"sort": "duration_seconds", "sort_dir": "asc"},
+        "name_asc": {"sort": "voice_name", "sort_dir": "asc"},
+        "name_desc": {"sort": "voice_name"},
+        "completed": {"status": "completed"},
+        "failed": {"status": "failed"},
+        "voice": {"voice_id": voice_id} if voice_id else None,
+        "search_common": {"search": terms["common"]},
+        "search_rare": {"search": terms["rare"]},
+        "search_none": {"search": terms["none"]},
+    }
+    return {name: filters for name, filters in table.items() if filters is not None}
+
+
+def pick_users(users: list[dict], roles: list[str]) -> dict:
+    """Heaviest, median and lightest load user (users come heaviest first)."""
+    index = {"heavy": 0, "median": len(users) // 2, "light": len(users) - 1}
+    return {role: users[index[role]] for role in roles}
+
+
+def resolve_depths(depths: list[str], pages: int) -> list[tuple[str, int]]:
+    """(label, page) for each requested depth that exists; "last" is the last page."""
+    resolved = []
+    for depth in depths:
+        page = pages if depth == "last" else int(depth)
+        if page <= pages and page not in [p for _, p in resolved]:
+            resolved.append((depth, page))
+    return resolved
+
+
+def name_ordered(rows: list[dict], descending: bool) -> bool:
+    """Whether a page's rows are in voice name order (the route's "Name" sort)."""
+    names = [row.get("voice_name") or (row.get("voices") or {}).get("name") or "" for row in rows]
+    return names == sorted(names, reverse=descending)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="History listing load test by page depth")
+    parser.add_argument("--users", nargs="+", choices=USER_ROLES, default=["heavy", "median"])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIO_NAMES, default=SCENARIO_NAMES)
+    parser.add_argument("--depths", nargs="+", default=["1", "10", "100", "1000", "last"], help="Pages, or 'last'")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed requests per case (after one warm-up)")
+    parser.add_argument("--per-page", type=int, default=history.PER_PAGE)
+    parser.add_argument("--slow-ms", type=float, default=200.0, help="EXPLAIN cases with p50 above this")
+    parser.add_argument("--show-plans", type=int, default=8, help="Print plans for this many slow cases")
+    parser.add_argument("--sql-only", action="store_true", help="Run the listing statement in Postgres directly")
+    parser.add_argument("--api-url", default=config.WORKER_API_URL, help="API Worker base URL")
+    parser.add_argument("--db-url", default=config.SUPABASE_DB_URL, help="Postgres URL (default: $SUPABASE_DB_URL)")
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    args = parser.parse_args()
+    if any(d != "last" and not d.isdigit() for d in args.depths):
+        parser.error("--depths takes page numbers or 'last'")
+
+    try:
+        conn = history.connect(args.db_url)
+        users = history.load_users(conn)
+    except psycopg.Error as e:
+        print(f"Error: {e}")
+        return 1
+    if not users:
+        print(f"Error: no load users in {args.db_url} (run load_history.py first)")
+        return 1
+    terms = history.search_terms()
+    target = "Postgres (listing statement, RLS as the user)" if args.sql_only else f"API Worker ({args.api_url})"
+
+    print("=" * 70)
+    print("History Listing Load Test")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {target}")
+    print(f"Load users: {len(users)}, {sum(u['generations'] for u in users):,} generations")
+    print(f"Searches: common '{terms['common']}', rare '{terms['rare']}', none '{terms['none']}'")
+    print(f"Depths: {' '.join(args.depths)}  Per page: {args.per_page}  Repeats: {args.repeats} (+1 warm-up)")
+
+    records = []
+    selected = pick_users(users, args.users)
+    worker = None
+    try:
+        for role, user in selected.items():
+            print(f"\n{role}: {user['email']} ({user['generations']:,} generations)")
+            if not args.sql_only:
+                worker = WorkerClient(args.api_url, timeout=60.0)
+                worker.sign_in(user["email"], history.LOAD_PASSWORD)
+
+            def fetch(filters: dict, page: int) -> tuple[float, int, list]:
+                if worker is None:
+                    sql, params = history.listing_sql(page=page, per_page=args.per_page, **filters)
+                    return history.run_listing(conn, user["id"], sql, params)
+                start = time.perf_counter()
+                data = worker.list_generations(page, per_page=args.per_page, **filters)
+                return time.perf_counter() - start, data["pagination"]["total"], data["generations"]
+
+            for name, filters in scenarios(history.top_voice(conn, user["id"]), terms).items():
+                if name not in args.scenarios:
+                    continue
+                _, total, _ = fetch(filters, 1)
+                pages = max(1, -(-total // args.per_page))
+                line = []
+                for label, page in resolve_depths(args.depths, pages):
+                    fetch(filters, page)
+                    timings, ordered = [], []
+                    for _ in range(args.repeats):
+                        elapsed, total, rows = fetch(filters, page)
+                        timings.append(elapsed)
+                        if filters.get("sort") == "voice_name" and rows:
+                            ordered.append(name_ordered(rows, filters.get("sort_dir") != "asc"))
+                    record = {
+                        "user": role,
+                        "scenario": name,
+                        "filters": filters,
+                        "depth": label,
+                        "page": page,
+                        "total": total,
+                        "timings": timings,
+                        **{k: v for k, v in summarize(timings).items() if k in ("p50", "p95", "max")},
+                    }
+                    if ordered:
+                        record["name_ordered"] = all(ordered)
+                    records.append(record)
+                    line.append(f"{label}={fmt_ms(record['p50']).strip()}")
+                print(f"  {name:<14} {total:>9,} rows  {'  '.join(line)}")
+            if worker:
+                worker.close()
+                worker = None
+
+        slow = [r for r in records if r["p50"] is not None and r["p50"] * 1000 > args.slow_ms]
+        for record in slow:
+            sql, params = history.listing_sql(page=record["page"], per_page=args.per_page, **record["filters"])
+            explained = history.explain_listing(conn, selected[record["user"]]["id"], sql, params)
+            record["plan"] = history.plan_summary(explained)
+            record["plan_lines"] = history.plan_lines(explained["Plan"])
+    except (psycopg.Error, WorkerAPIError, requests.exceptions.RequestException) as e:
+        print(f"Error: {e}")
+        if isinstance(e, WorkerAPIError) and e.status == 429:
+            print("       (raise RATE_LIMIT_TIER3_IP_LIMIT in workers/api/.dev.vars, or use --sql-only)")
+        return 1
+    finally:
+        if worker:
+            worker.close()
+        conn.close()
+
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+    for role in args.users:
+        rows = [r for r in records if r["user"] == role]
+        print(f"\n{role} user, p50 by page depth")
+        print(f"{'Scenario':<14} │ {'Rows':>9} │ " + " ".join(f"{d:>8}" for d in args.depths))
+        print("-" * (28 + 9 * len(args.depths)))
+        for name in dict.fromkeys(r["scenario"] for r in rows):
+            cases = {r["depth"]: r for r in rows if r["scenario"] == name}
+            total = next(iter(cases.values()))["total"]
+            cells = " ".join(fmt_ms(cases[d]["p50"]) if d in cases else f"{'-':>8}" for d in args.depths)
+            print(f"{name:<14} │ {total:>9,} │ {cells}")
+
+    by_depth = {}
+    print(f"\n{'Depth':<8} │ {'Cases':>5} {'p50':>8} {'p95':>8} {'max':>8}")
+    print("-" * 44)
+    for depth in args.depths:
+        timings = [t for r in records if r["depth"] == depth for t in r["timings"]]
+        if timings:
+            by_depth[depth] = summarize(timings)
+            cases = sum(1 for r in records if r["depth"] == depth)
+            entry = by_depth[depth]
+            print(f"{depth:<8} │ {cases:>5} {fmt_ms(entry['p50'])} {fmt_ms(entry['p95'])} {fmt_ms(entry['max'])}")
+
+    name_cases = [r for r in records if "name_ordered" in r]
+    if name_cases:
+        unordered = sum(1 for r in name_cases if not r["name_ordered"])
+        print(f"\nName sort: {unordered}/{len(name_cases)} cases returned pages out of voice name order")
+
+    slow = sorted((r for r in records if "plan" in r), key=lambda r: r["p50"], reverse=True)
+    print(f"\nSlow cases (p50 > {args.slow_ms:g} ms): {len(slow)}", end="")
+    print(f", plans for the slowest {args.show_plans}" if len(slow) > args.show_plans else "")
+    for record in slow[: args.show_plans]:
+        plan = record["plan"]
+        print(
+            f"\n{record['user']} / {record['scenario']} / page {record['page']} ({record['depth']}): "
+            f"p50 {fmt_ms(record['p50']).strip()}, execution {plan['execution_ms'] or 0:.1f} ms, "
+            f"buffers hit {plan['shared_hit_blocks'] or 0:,} read {plan['shared_read_blocks'] or 0:,}"
+        )
+        if plan["seq_scans"]:
+            print(f"  Seq scans: {', '.join(plan['seq_scans'])}")
+        if plan["rows_removed_by_filter"]:
+            print(f"  Rows removed by filter: {plan['rows_removed_by_filter']:,}")
+        for line in record["plan_lines"]:
+            print(f"    {line}")
+
+    if not args.no_save:
+        path = results.save_runs(
+            "history_listing",
+            "local",
+            records,
+            extra={
+                "target": "sql" if args.sql_only else args.api_url,
+                "load_users": len(users),
+                "load_rows": sum(u["generations"] for u in users),
+                "users": {role: {"email": u["email"], "generations": u["generations"]} for role, u in selected.items()},
+                "searches": terms,
+                "per_page": args.per_page,
+                "repeats": args.repeats,
+                "slow_ms": args.slow_ms,
+                "by_depth": by_depth,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+HTTP/2 multiplexing vs pooled HTTP/1.1 under concurrent load.
+
+Starts the local stand-in in a subprocess with an HTTP/1.1 and an HTTP/2
+(h2c) listener sharing one emulated deployment, then at each concurrency
+level runs workers that each alternate a /health check and a /clone request,
+once over the pooled requests session and once over the httpx HTTP/2 client.
+The stand-in runs out of process so the CPU time measured here is the
+client's alone.
+
+Reports per transport and concurrency:
+- connections the server accepted (from its /health stats)
+- clone and health latency (real seconds)
+- throughput and client CPU milliseconds per request
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy --with 'httpx[http2]' python bench_http2.py
+    uv run --with requests --with numpy --with 'httpx[http2]' python bench_http2.py --concurrency 1 8 64 --requests-per-worker 5
+"""
+
+import argparse
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import h2  # noqa: F401
+    import httpx  # noqa: F401
+    import numpy  # noqa: F401
+    import requests
+except ImportError:
+    print("Error: requests, numpy and httpx[http2] libraries required")
+    print("Run: uv run --with requests --with numpy --with 'httpx[http2]' python bench_http2.py")
+    sys.exit(1)
+
+from tts_bench import client, config, results
+from tts_bench.standin import add_standin_arguments
+from tts_bench.stats import fmt_seconds, summarize
+
+DEFAULT_CONCURRENCY = [1, 2, 4, 8, 16, 32, 64]
+TRANSPORTS = ["http1", "http2"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_standin_process(args, port: int, http2_port: int) -> subprocess.Popen:
+    """Run `python -m tts_bench.standin` with both listeners and wait for /health."""
+    command = [
+        sys.executable,
+        "-m",
+        "tts_bench.standin",
+        "--port",
+        str(port),
+        "--http2-port",
+        str(http2_port),
+        "--emulate",
+        args.emulate,
+        "--time-scale",
+        str(args.time_scale),
+        "--gpu-slots",
+        str(args.gpu_slots),
+        "--seed",
+        str(args.seed),
+    ]
+    process = subprocess.Popen(command, cwd=config.SCRIPTS_DIR, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).ok:
+                return process
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Stand-in did not start within 30s")
+
+
+def server_stats(port: int) -> dict:
+    """Server counters, read over a fresh HTTP/1.1 connection (counted too)."""
+    return requests.get(f"http://127.0.0.1:{port}/health", timeout=5).json()["stats"]
+
+
+def run_level(endpoint: dict, payload: dict, concurrency: int, per_worker: int, timeout: float) -> dict:
+    """Run `concurrency` workers of health+clone pairs; return records and timing."""
+
+    def worker(index: int) -> list[dict]:
+        records = []
+        for i in range(per_worker):
+            start = time.perf_counter()
+            health = client.check_health(endpoint, timeout=timeout)
+            records.append(
+                {
+                    "kind": "health",
+                    "time": time.perf_counter() - start,
+                    **({"error": health.get("error")} if health.get("status") == "error" else {}),
+                }
+            )
+            record, _ = client.measure_request(endpoint, payload, timeout=timeout)
+            record["kind"] = "clone"
+            records.append(record)
+        return records
+
+    client.reset_connections()
+    cpu = time.process_time()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        batches = list(pool.map(worker, range(concurrency)))
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    records = [r for batch in batches for r in batch]
+    return {"records": records, "wall": wall, "cpu": cpu}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/2 vs pooled HTTP/1.1 under concurrency")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--requests-per-worker", type=int, default=3, help="health+clone pairs per worker")
+    parser.add_argument("--text", default="short", help="inputs/texts name to synthesize")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    parser.set_defaults(gpu_slots=64, time_scale=0.01)
+    args = parser.parse_args()
+
+    port, http2_port = free_port(), free_port()
+    process = start_standin_process(args, port, http2_port)
+    endpoints = {
+        "http1": {
+            "name": "HTTP/1.1 (pooled requests.Session)",
+            "clone": f"http://127.0.0.1:{port}/clone",
+            "health": f"http://127.0.0.1:{port}/health",
+            "encodings": ["json", "gzip", "multipart"],
+        },
+        "http2": {
+            "name": "HTTP/2 h2c (httpx)",
+            "clone": f"http://127.0.0.1:{http2_port}/clone",
+            "health": f"http://127.0.0.1:{http2_port}/health",
+            "encodings": ["json", "gzip", "multipart"],
+            "http2": True,
+        },
+    }
+
+    ref_audio_b64, ref_text = client.load_reference(preprocess=True)
+    payload = client.build_payload(client.load_text(args.text), ref_audio_b64, ref_text)
+
+    print("=" * 70)
+    print("HTTP/2 vs HTTP/1.1")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Stand-in: {args.emulate} x{args.time_scale:g}, {args.gpu_slots} GPU slots (subprocess)")
+    print(f"Concurrency: {args.concurrency}  health+clone pairs per worker: {args.requests_per_worker}")
+
+    records = []
+    levels = []
+    try:
+        for concurrency in args.concurrency:
+            for transport in TRANSPORTS:
+                before = server_stats(port)
+                level = run_level(
+                    endpoints[transport], payload, concurrency, args.requests_per_worker, args.timeout
+                )
+                after = server_stats(port)
+                if transport == "http1":
+                    # The second stats request's own connection is counted too
+                    connections = after["connections"] - before["connections"] - 1
+                else:
+                    connections = after["h2_connections"] - before["h2_connections"]
+
+                level_records = level["records"]
+                for record in level_records:
+                    record.update({"transport": transport, "concurrency": concurrency})
+                records.extend(level_records)
+                ok = [r for r in level_records if "error" not in r]
+                clone = summarize([r["time"] for r in ok if r["kind"] == "clone"])
+                health = summarize([r["time"] for r in ok if r["kind"] == "health"])
+                entry = {
+                    "transport": transport,
+                    "concurrency": concurrency,
+                    "connections": connections,
+                    "errors": len(level_records) - len(ok),
+                    "clone": clone,
+                    "health": health,
+                    "throughput": len(level_records) / level["wall"],
+                    "cpu_ms_per_request": level["cpu"] * 1000 / len(level_records),
+                }
+                levels.append(entry)
+                print(
+                    f"  {transport} x{concurrency:<3} {connections:>3} conns  clone {clone['mean'] or 0:.3f}s  "
+                    f"{entry['throughput']:.1f} req/s  {entry['errors']} errors"
+                )
+    finally:
+        process.terminate()
+        process.wait()
+
+    print("\n" + "=" * 70)
+    print("SUMMARY (real seconds)")
+    print("=" * 70)
+    print(
+        f"\n{'Transport':<9} {'Conc':>5} │ {'Conns':>6} │ {'Clone mean':>10} {'p95':>8} │ "
+        f"{'Health p50':>10} {'p95':>8} │ {'req/s':>7} {'CPU/req':>9} {'Errors':>7}"
+    )
+    print("-" * 100)
+    for entry in levels:
+        print(
+            f"{entry['transport']:<9} {entry['concurrency']:>5} │ {entry['connections']:>6} │ "
+            f"{fmt_seconds(entry['clone']['mean'], 10)} {fmt_seconds(entry['clone']['p95'])} │ "
+            f"{fmt_seconds(entry['health']['p50'], 10)} {fmt_seconds(entry['health']['p95'])} │ "
+            f"{entry['throughput']:>7.1f} {entry['cpu_ms_per_request']:>7.1f}ms {entry['errors']:>7}"
+        )
+
+    if not args.no_save:
+        path = results.save_runs(
+            "http2_benchmark",
+            "local",
+            records,
+            extra={
+                "stand_in": True,
+                "emulates": args.emulate,
+                "time_scale": args.time_scale,
+                "gpu_slots": args.gpu_slots,
+                "levels": levels,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Task polling: poll requests per task and detection lag, fixed vs adaptive.
+
+The web app polls GET /api/tasks/:id every 3s per active task. This compares
+that schedule with tts_bench.polling.AdaptiveSchedule, which waits until
+close to the job's predicted duration (tts_bench.polling.DurationPredictor:
+the Worker's estimate, then a running fit on text length) and backs off
+with elapsed time after an overrun. Two phases:
+
+  live    the same job batch through the API Worker for each schedule, jobs
+          submitted --concurrency at a time and watched by one
+          tts_bench.polling.TaskPoller; reports polls per completed task,
+          detection lag (completed_at -> the poll that saw it), the busiest
+          5-minute poll count for the user against the Worker's tier-2 budget
+          (90 per 5 minutes) and 429s
+  replay  both schedules in virtual time over --replay-tasks tasks whose
+          durations and predictions are resampled from the live adaptive
+          run, arriving over --replay-window seconds, with at most
+          --max-in-flight poll requests outstanding; reports the same
+          per-task numbers plus peak polls per second
+
+By default the target is the Worker stand-in with the tier-1 and tier-2
+per-user limits raised, so that neither schedule's lag includes rate-limit
+waits; pass --rate-limit RATE_LIMIT_TIER2_USER_LIMIT=90 to see the default.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy --with httpx python bench_polling.py
+    uv run --with requests --with numpy --with httpx python bench_polling.py --replay-tasks 20000 --max-in-flight 8
+    UTTER_EMAIL=... UTTER_PASSWORD=... uv run --with requests --with numpy --with httpx python bench_polling.py \\
+        --api-url http://127.0.0.1:8787 --voice-id <uuid>
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+try:
+    import numpy  # noqa: F401
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python bench_polling.py")
+    sys.exit(1)
+
+from tts_bench import config, polling, results
+from tts_bench.standin import add_standin_arguments, standin_kwargs
+from tts_bench.standin_dashscope import DEFAULT_GPU_SLOTS
+from tts_bench.standin_worker import RATE_LIMIT_DEFAULTS, add_worker_arguments, start_worker_standin, worker_kwargs
+from tts_bench.stats import fmt_seconds, summarize
+from tts_bench.worker_client import AsyncWorkerClient, WorkerAPIError
+from tts_bench.workload import mixed_jobs
+
+SCHEDULES = ["fixed", "adaptive"]
+RATE_LIMIT_WINDOW = RATE_LIMIT_DEFAULTS["RATE_LIMIT_WINDOW_SECONDS"]
+TIER2_BUDGET = RATE_LIMIT_DEFAULTS["RATE_LIMIT_TIER2_USER_LIMIT"]
+
+
+def make_schedule(name: str, args):
+    if name == "fixed":
+        return polling.FixedSchedule(args.poll_interval)
+    return polling.AdaptiveSchedule(
+        min_interval=args.min_interval, max_interval=args.max_interval, jitter=args.jitter
+    )
+
+
+async def run_live(endpoint: dict, jobs: list[dict], schedule, args, time_scale: float, clock) -> tuple[list, dict]:
+    """Submit every job and watch it under `schedule`; returns (records, poller stats)."""
+    async with AsyncWorkerClient(
+        endpoint["base_url"],
+        access_token=endpoint.get("token"),
+        pool_size=max(args.max_in_flight, args.concurrency),
+        timeout=args.timeout,
+        time_scale=time_scale,
+    ) as worker:
+        if not endpoint.get("token"):
+            await worker.sign_in(endpoint["email"], endpoint["password"])
+        poller = polling.TaskPoller(
+            worker.get_task, schedule, args.max_in_flight, time_scale=time_scale, clock=clock, seed=args.seed
+        )
+        predictor = polling.DurationPredictor()
+        slots = asyncio.Semaphore(args.concurrency)
+
+        async def run(job: dict) -> dict:
+            async with slots:
+                chars = len(job["text"])
+                admission = {"admission_retries": 0, "rate_limited": 0, "cap_rejected": 0}
+                try:
+                    submitted = await worker.submit(endpoint["voice_id"], job["text"], "Auto", admission, 1.0)
+                except WorkerAPIError as e:
+                    return {"id": job["id"], "text_chars": chars, "error": str(e)}
+                estimate = submitted.get("estimated_duration_minutes", 0.1) * 60
+                predicted = predictor.predict(chars, estimate)
+                record = await poller.watch(submitted["task_id"], predicted, submitted_at=clock())
+                if record["status"] == "completed" and record["duration"] is not None:
+                    predictor.observe(chars, record["duration"])
+                else:
+                    record["error"] = record["status"]
+                return {"id": job["id"], "text_chars": chars, "estimate": estimate, **record}
+
+        records = await asyncio.gather(*(run(job) for job in jobs))
+    poll_times = sorted(poller.poll_times)
+    return records, {"poll_times": poll_times, "peak_in_flight": poller.peak_in_flight}
+
+
+def replay_tasks(records: list[dict], count: int, window: float, seed: int) -> list[dict]:
+    """Resample (duration, predicted) pairs from live records, arriving uniformly over `window`."""
+    rng = random.Random(seed)
+    pairs = [(r["duration"], r["predicted"]) for r in records if r.get("duration") is not None]
+    if not pairs:
+        return []
+    tasks = []
+    for _ in range(count):
+        duration, predicted = rng.choice(pairs)
+        tasks.append({"submitted": rng.uniform(0, window), "duration": duration, "predicted": predicted})
+    return tasks
+
+
+def header(last: str) -> str:
+    return f"\n{'Schedule':<9} │ {'Polls/task':>7} {'max':>6} │ {'Lag mean':>8} {'p50':>8} {'p95':>8} │ {last}"
+
+
+def report_row(name: str, polls: dict, lag: dict, extra: str) -> str:
+    return (
+        f"{name:<9} │ {polls['mean'] or 0:>7.2f} {polls['max'] or 0:>6.0f} │ "
+        f"{fmt_seconds(lag['mean'])} {fmt_seconds(lag['p50'])} {fmt_seconds(lag['p95'])} │ {extra}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task polling: polls per task and detection lag")
+    parser.add_argument("--captions", type=int, default=8, help="Single-sentence jobs")
+    parser.add_argument("--paragraphs", type=int, default=4, help="2-4 sentence jobs")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs in flight (the paid active-job cap)")
+    parser.add_argument("--poll-interval", type=float, default=config.WORKER_POLL_INTERVAL, help="Fixed interval")
+    parser.add_argument("--min-interval", type=float, default=1.0, help="Adaptive minimum interval")
+    parser.add_argument("--max-interval", type=float, default=10.0, help="Adaptive maximum interval")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Adaptive ± jitter fraction")
+    parser.add_argument("--max-in-flight", type=int, default=16, help="Poll requests outstanding at once")
+    parser.add_argument("--replay-tasks", type=int, default=5000, help="Tasks in the virtual-time replay")
+    parser.add_argument("--replay-window", type=float, default=600.0, help="Replay arrival window (seconds)")
+    parser.add_argument("--request-seconds", type=float, default=0.05, help="Replay poll service time")
+    parser.add_argument("--api-url", default=None, help="Real API Worker base URL (default: local stand-in)")
+    parser.add_argument("--email", default=os.getenv("UTTER_EMAIL"), help="Sign-in email (default: $UTTER_EMAIL)")
+    parser.add_argument("--password", default=os.getenv("UTTER_PASSWORD"), help="Password (default: $UTTER_PASSWORD)")
+    parser.add_argument("--token", default=os.getenv("UTTER_ACCESS_TOKEN"), help="Bearer access token instead")
+    parser.add_argument("--voice-id", default=None, help="Voice to generate with (required with --api-url)")
+    parser.add_argument("--timeout", type=float, default=90.0)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    add_worker_arguments(parser)
+    parser.set_defaults(
+        gpu_slots=DEFAULT_GPU_SLOTS,
+        rate_limit=["RATE_LIMIT_TIER1_USER_LIMIT=100000", "RATE_LIMIT_TIER2_USER_LIMIT=100000"],
+    )
+    args = parser.parse_args()
+
+    if args.api_url and not (args.voice_id and (args.token or (args.email and args.password))):
+        print("Error: --api-url needs --voice-id and --email/--password or --token")
+        return 1
+
+    jobs = mixed_jobs(args.captions, args.paragraphs, paragraph_sentences=(2, 4))
+    jobs = [job for job in jobs if len(job["text"]) <= config.WORKER_MAX_TEXT_CHARS]
+
+    print("=" * 70)
+    print("Task Polling: Fixed vs Adaptive")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {f'API Worker ({args.api_url})' if args.api_url else 'Local API Worker stand-in'}")
+    print(f"Jobs: {len(jobs)}  Concurrency: {args.concurrency}  Max polls in flight: {args.max_in_flight}")
+    print(
+        f"Fixed: every {args.poll_interval:g}s  Adaptive: {args.min_interval:g}-{args.max_interval:g}s, "
+        f"±{args.jitter:.0%} jitter"
+    )
+
+    records = []
+    live = {}
+    time_scale = 1.0 if args.api_url else args.time_scale
+    for name in SCHEDULES:
+        server = None
+        if args.api_url:
+            endpoint = {
+                "base_url": args.api_url,
+                "email": args.email,
+                "password": args.password,
+                "token": args.token,
+                "voice_id": args.voice_id,
+            }
+            clock = time.time
+        else:
+            server, endpoint = start_worker_standin(
+                time_scale=args.time_scale,
+                seed=args.seed,
+                provider_kwargs={**standin_kwargs(args), "deployment": "qwen-cloud-vc"},
+                **worker_kwargs(args),
+            )
+            epoch = server.epoch.timestamp()
+
+            def clock(server=server, epoch=epoch) -> float:
+                return epoch + server.now()
+
+        try:
+            schedule = make_schedule(name, args)
+            run_records, stats = asyncio.run(run_live(endpoint, jobs, schedule, args, time_scale, clock))
+        except (RuntimeError, WorkerAPIError) as e:
+            print(f"Error: {e}")
+            if server:
+                server.shutdown()
+            return 1
+        health = server.health() if server else None
+        if server:
+            server.shutdown()
+
+        ok = [r for r in run_records if "error" not in r]
+        polls = summarize([r["polls"] for r in ok])
+        lag = summarize([r["lag"] for r in ok if r.get("lag") is not None])
+        live[name] = {
+            "completed": len(ok),
+            "errors": len(run_records) - len(ok),
+            "polls": polls,
+            "lag": lag,
+            "total_polls": len(stats["poll_times"]),
+            "peak_polls_per_window": polling.peak_rate(stats["poll_times"], RATE_LIMIT_WINDOW),
+            "rate_limited": sum(r.get("rate_limited", 0) for r in run_records),
+            "peak_in_flight": stats["peak_in_flight"],
+            "worker_task_polls": health["stats"]["task_polls"] if health else None,
+        }
+        for record in run_records:
+            record.update({"phase": "live", "schedule": name})
+        records.extend(run_records)
+        print(
+            f"  {name:<9} {len(ok)}/{len(run_records)} completed, {live[name]['total_polls']} polls, "
+            f"lag p50 {lag['p50'] or 0:.2f}s"
+        )
+
+    print("\n" + "=" * 70)
+    print("LIVE (emulated seconds)" if not args.api_url else "LIVE")
+    print("=" * 70)
+    print(header("Busiest 5 min"))
+    print("-" * 80)
+    for name, entry in live.items():
+        peak = entry["peak_polls_per_window"]
+        budget = f"{peak} polls ({peak / TIER2_BUDGET:.0%} of {TIER2_BUDGET})"
+        print(report_row(name, entry["polls"], entry["lag"], budget))
+    fixed, adaptive = live["fixed"], live["adaptive"]
+    if fixed["total_polls"]:
+        print(f"\nAdaptive issues {1 - adaptive['total_polls'] / fixed['total_polls']:.0%} fewer polls", end="")
+        if fixed["lag"]["mean"] is not None and adaptive["lag"]["mean"] is not None:
+            print(f" for {adaptive['lag']['mean'] - fixed['lag']['mean']:+.2f}s mean detection lag")
+        else:
+            print()
+    if any(entry["rate_limited"] for entry in live.values()):
+        print("429s while polling: " + ", ".join(f"{name} {entry['rate_limited']}" for name, entry in live.items()))
+
+    replay = {}
+    adaptive_records = [r for r in records if r["schedule"] == "adaptive"]
+    tasks = replay_tasks(adaptive_records, args.replay_tasks, args.replay_window, args.seed)
+    if tasks:
+        print("\n" + "=" * 70)
+        print(f"REPLAY ({len(tasks)} tasks over {args.replay_window:g}s, {args.max_in_flight} polls in flight)")
+        print("=" * 70)
+        print(header("Peak polls/s"))
+        print("-" * 80)
+        for name in SCHEDULES:
+            replay_records, poll_times = polling.replay(
+                make_schedule(name, args), tasks, args.request_seconds, args.max_in_flight, args.seed
+            )
+            polls = summarize([r["polls"] for r in replay_records])
+            lag = summarize([r["lag"] for r in replay_records])
+            replay[name] = {
+                "polls": polls,
+                "lag": lag,
+                "queued": summarize([r["queued"] for r in replay_records]),
+                "total_polls": len(poll_times),
+                "peak_polls_per_second": polling.peak_rate(poll_times, 1.0),
+            }
+            print(report_row(name, polls, lag, f"{replay[name]['peak_polls_per_second']}"))
+
+    if not args.no_save:
+        path = results.save_runs(
+            "polling_benchmark",
+            args.api_url or "local",
+            records,
+            extra={
+                "stand_in": args.api_url is None,
+                "time_scale": time_scale,
+                "concurrency": args.concurrency,
+                "max_in_flight": args.max_in_flight,
+                "poll_interval": args.poll_interval,
+                "adaptive": {
+                    "min_interval": args.min_interval,
+                    "max_interval": args.max_interval,
+                    "jitter": args.jitter,
+                },
+                "live": live,
+                "replay": replay,
+                "replay_tasks": len(tasks),
+                "replay_window": args.replay_window,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Audio-URL prefetch: wall time saved by overlapping downloads with synthesis.
+
+Runs one batch of DashScope generations twice with the same synthesis
+concurrency:
+
+  inline    each worker synthesizes, then downloads output.audio.url before
+            taking its next job (what the API Worker does per task)
+  prefetch  each worker hands the URL to tts_bench.prefetch.AudioPrefetcher
+            (bounded pool, streamed to disk, resumed on dropped connections)
+            and moves straight on to its next synthesis call
+
+and reports batch wall time, the time saved by the overlap, total download
+time, resumed downloads, and whether every WAV on disk is complete.
+
+By default the target is the DashScope stand-in with a --download-mbps link
+that drops --fetch-failure-rate of downloads halfway through.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python bench_prefetch.py
+    uv run --with requests --with numpy python bench_prefetch.py --synth-workers 8 --fetch-workers 2 --captions 24
+    DASHSCOPE_API_KEY=... uv run --with requests --with numpy python bench_prefetch.py --deployment qwen-cloud-vc
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy  # noqa: F401
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python bench_prefetch.py")
+    sys.exit(1)
+
+from tts_bench import audio, client, config, dashscope, results
+from tts_bench.prefetch import BACKOFF_SECONDS, DEFAULT_RETRIES, AudioPrefetcher, download
+from tts_bench.standin import add_standin_arguments, standin_kwargs
+from tts_bench.standin_dashscope import DEFAULT_GPU_SLOTS, start_dashscope_standin
+from tts_bench.stats import fmt_seconds, summarize
+from tts_bench.workload import mixed_jobs
+
+MODES = ["inline", "prefetch"]
+
+
+def run_batch(endpoint: dict, voice: str, jobs: list[dict], mode: str, args, out_dir: Path, time_scale: float) -> dict:
+    """Synthesize every job with `synth_workers` workers; download inline or via the prefetcher."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    backoff = BACKOFF_SECONDS * time_scale  # Retry backoff in emulated time too
+    prefetcher = AudioPrefetcher(
+        out_dir, workers=args.fetch_workers, timeout=args.timeout, retries=args.retries, backoff=backoff
+    )
+
+    def worker(job: dict) -> dict:
+        record = dashscope.synthesize(endpoint, voice, job["text"], timeout=args.timeout)
+        record.update({"id": job["id"], "text_chars": len(job["text"]), "mode": mode})
+        if "error" in record:
+            return record
+        name = f"{job['id']}.wav"
+        if mode == "inline":
+            fetch = download(record["audio_url"], out_dir / name, args.timeout, args.retries, backoff=backoff)
+            record["fetch"] = {**fetch, "queued_seconds": 0.0}
+        else:
+            record["future"] = prefetcher.submit(record["audio_url"], name)
+        return record
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.synth_workers) as pool:
+        records = list(pool.map(worker, jobs))
+    synth_done = time.perf_counter() - start
+    for record in records:
+        if "future" in record:
+            record["fetch"] = record.pop("future").result()
+    wall = time.perf_counter() - start
+    prefetcher.close()
+    return {"records": records, "wall": wall, "synth_done": synth_done}
+
+
+def check_outputs(records: list[dict]) -> int:
+    """Count downloads whose WAV is missing or does not decode."""
+    bad = 0
+    for record in records:
+        fetch = record.get("fetch")
+        if not fetch or "error" in fetch:
+            bad += 1
+            continue
+        try:
+            audio.decode_wav(Path(fetch["path"]).read_bytes())
+        except Exception:
+            bad += 1
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio-URL prefetch: time saved by overlapping downloads")
+    parser.add_argument("--captions", type=int, default=16, help="Single-sentence jobs")
+    parser.add_argument("--paragraphs", type=int, default=8, help="2-4 sentence jobs")
+    parser.add_argument("--synth-workers", type=int, default=4, help="Concurrent synthesis calls")
+    parser.add_argument("--fetch-workers", type=int, default=4, help="Prefetch pool size")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Resumes per download")
+    parser.add_argument("--deployment", default=None, help="DashScope target (default: local stand-in)")
+    parser.add_argument("--output-dir", type=Path, default=None, help="Keep downloads here (default: temp dir)")
+    parser.add_argument("--timeout", type=float, default=90.0)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    group = parser.add_argument_group("DashScope stand-in")
+    group.add_argument("--download-mbps", type=float, default=10.0, help="Audio URL download bandwidth")
+    group.add_argument("--fetch-failure-rate", type=float, default=0.1, help="Downloads dropped halfway")
+    parser.set_defaults(gpu_slots=DEFAULT_GPU_SLOTS)
+    args = parser.parse_args()
+
+    server = None
+    if args.deployment:
+        endpoint = config.get_deployment(args.deployment)
+        if endpoint.get("provider") != "dashscope":
+            print(f"Error: {args.deployment} is not a DashScope target")
+            return 1
+        time_scale = 1.0
+    else:
+        kwargs = {**standin_kwargs(args), "deployment": "qwen-cloud-vc"}
+        server, endpoint = start_dashscope_standin(
+            download_mbps=args.download_mbps, fetch_failure_rate=args.fetch_failure_rate, **kwargs
+        )
+        time_scale = args.time_scale
+
+    jobs = mixed_jobs(args.captions, args.paragraphs, paragraph_sentences=(2, 4))
+    skipped = [job for job in jobs if len(job["text"]) > config.DASHSCOPE_MAX_TEXT_CHARS]
+    jobs = [job for job in jobs if len(job["text"]) <= config.DASHSCOPE_MAX_TEXT_CHARS]
+
+    print("=" * 70)
+    print("Audio-URL Prefetch")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {endpoint['name']}")
+    print(f"Jobs: {len(jobs)}" + (f" ({len(skipped)} over {config.DASHSCOPE_MAX_TEXT_CHARS} chars skipped)" if skipped else ""))
+    print(f"Synthesis workers: {args.synth_workers}  Prefetch workers: {args.fetch_workers}")
+    if server:
+        print(f"Download: {args.download_mbps:g} Mbit/s, {args.fetch_failure_rate:.0%} dropped halfway")
+
+    ref_audio_b64, ref_text = client.load_reference()
+    voice = dashscope.create_clone_voice(endpoint, ref_audio_b64, ref_text)
+    if "error" in voice:
+        print(f"Error: voice enrollment failed - {voice['error']}")
+        return 1
+
+    batches = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.output_dir or Path(tmp)
+        for mode in MODES:
+            batch = run_batch(endpoint, voice["voice"], jobs, mode, args, root / mode, time_scale)
+            batch["bad_outputs"] = check_outputs(batch["records"])
+            batches[mode] = batch
+            print(
+                f"  {mode:<9} wall {batch['wall'] / time_scale:>8.2f}s  "
+                f"(synthesis done at {batch['synth_done'] / time_scale:.2f}s)  "
+                f"{batch['bad_outputs']} incomplete"
+            )
+
+    if server:
+        server.shutdown()
+
+    print("\n" + "=" * 70)
+    print("SUMMARY (emulated seconds)" if server else "SUMMARY")
+    print("=" * 70)
+    print(
+        f"\n{'Mode':<9} │ {'Wall':>8} {'Saved':>8} │ {'Fetch sum':>9} {'mean':>7} {'p95':>7} {'Queued':>7} │ "
+        f"{'Resumed':>7} {'Errors':>6} {'Bad':>4}"
+    )
+    print("-" * 92)
+    summary = {}
+    records = []
+    inline_wall = batches["inline"]["wall"] / time_scale
+    for mode, batch in batches.items():
+        fetches = [r["fetch"] for r in batch["records"] if "fetch" in r]
+        seconds = [f["seconds"] / time_scale for f in fetches]
+        wall = batch["wall"] / time_scale
+        entry = {
+            "wall": wall,
+            "synth_done": batch["synth_done"] / time_scale,
+            "saved": inline_wall - wall,
+            "fetch_seconds": sum(seconds),
+            "fetch": summarize(seconds),
+            "queued": summarize([f["queued_seconds"] / time_scale for f in fetches]),
+            "resumed": sum(1 for f in fetches if f["attempts"] > 1),
+            "errors": sum(1 for r in batch["records"] if "error" in r or "error" in r.get("fetch", {})),
+            "bad_outputs": batch["bad_outputs"],
+        }
+        summary[mode] = entry
+        print(
+            f"{mode:<9} │ {fmt_seconds(wall)} {fmt_seconds(entry['saved'])} │ {fmt_seconds(entry['fetch_seconds'], 9)} "
+            f"{fmt_seconds(entry['fetch']['mean'], 7)} {fmt_seconds(entry['fetch']['p95'], 7)} "
+            f"{fmt_seconds(entry['queued']['mean'], 7)} │ {entry['resumed']:>7} {entry['errors']:>6} {entry['bad_outputs']:>4}"
+        )
+        for record in batch["records"]:
+            fetch = record.pop("fetch", None)
+            if fetch:
+                record.update(
+                    {
+                        "fetch_seconds": fetch["seconds"] / time_scale,
+                        "fetch_attempts": fetch["attempts"],
+                        "fetch_bytes": fetch["bytes"],
+                        **({"fetch_error": fetch["error"]} if "error" in fetch else {}),
+                    }
+                )
+            record["time"] /= time_scale
+            record.pop("audio_url", None)
+            records.append(record)
+
+    saved = summary["prefetch"]["saved"]
+    hidden = saved / summary["inline"]["fetch_seconds"] if summary["inline"]["fetch_seconds"] else 0.0
+    print(f"\nPrefetch saves {saved:.2f}s ({saved / inline_wall:.0%} of the batch), hiding {hidden:.0%} of download time")
+
+    if not args.no_save:
+        path = results.save_runs(
+            "prefetch_benchmark",
+            args.deployment or "local",
+            records,
+            extra={
+                "stand_in": server is not None,
+                "time_scale": time_scale,
+                "synth_workers": args.synth_workers,
+                "fetch_workers": args.fetch_workers,
+                "download_mbps": args.download_mbps if server else None,
+                "fetch_failure_rate": args.fetch_failure_rate if server else None,
+                "modes": summary,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Self-hosted Modal vs Qwen cloud (DashScope): latency, RTF and cost.
+
+Runs the same texts through each target with its own workflow
+(tts_bench.providers):
+
+  Modal      one clone request carrying the reference
+  DashScope  voice enrollment (VC) or design (VD) once, then per text a
+             synthesis call plus a fetch of the returned audio URL
+
+and reports onboarding time, request latency (synthesis and fetch split for
+DashScope), real-time factor (latency / audio seconds) and cost per request,
+per 1k characters and per audio minute, then ranks the targets.
+
+By default every target is a local stand-in (the Modal one emulating
+--emulate, plus a DashScope stand-in serving both VC and VD), so the
+comparison runs without credentials. Pass --deployments to hit real
+endpoints; DashScope targets need DASHSCOPE_API_KEY (and DASHSCOPE_BASE_URL
+for the Beijing region). DashScope rejects texts over 600 characters, so
+longer texts are skipped there; the summary and rankings only cover the
+texts every target completed, so each target is judged on the same set.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python bench_providers.py
+    uv run --with requests --with numpy python bench_providers.py --lengths 150 500 --runs 5
+    uv run --with requests --with numpy python bench_providers.py --deployments 0.6B-A10G-SDPA qwen-cloud-vc
+"""
+
+import argparse
+import base64
+import sys
+from datetime import datetime
+
+try:
+    import numpy  # noqa: F401
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python bench_providers.py")
+    sys.exit(1)
+
+from tts_bench import audio, client, config, results
+from tts_bench.providers import get_provider
+from tts_bench.standin import add_standin_arguments, standin_kwargs, start_standin
+from tts_bench.standin_dashscope import DEFAULT_GPU_SLOTS, start_dashscope_standin, standin_endpoint
+from tts_bench.stats import fmt_seconds, summarize
+from tts_bench.workload import text_of_length
+
+DASHSCOPE_KEYS = ["qwen-cloud-vc", "qwen-cloud-vd"]
+
+
+def start_standins(args) -> tuple[list, dict[str, dict]]:
+    """Start the Modal and DashScope stand-ins; return (servers, targets)."""
+    server, endpoint = start_standin(**standin_kwargs(args))
+    emulated = config.DEPLOYMENTS[args.emulate]
+    targets = {
+        f"{args.emulate} (stand-in)": {
+            **endpoint,
+            "gpu": emulated.get("gpu"),
+            "usd_per_hour": emulated.get("usd_per_hour"),
+        }
+    }
+    kwargs = {**standin_kwargs(args), "deployment": DASHSCOPE_KEYS[0], "gpu_slots": args.dashscope_slots}
+    cloud, _ = start_dashscope_standin(download_mbps=args.download_mbps, **kwargs)
+    for key in DASHSCOPE_KEYS:
+        targets[f"{key} (stand-in)"] = standin_endpoint(cloud, key)
+    return [server, cloud], targets
+
+
+def audio_seconds(wav: bytes) -> float | None:
+    try:
+        return audio.duration_seconds(*audio.decode_wav(wav))
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Modal and Qwen cloud on latency, RTF and cost")
+    parser.add_argument("--deployments", nargs="+", default=None, help="Real targets (default: local stand-ins)")
+    parser.add_argument("--texts", nargs="+", default=["short"], help="inputs/texts names")
+    parser.add_argument("--lengths", type=int, nargs="*", default=[300, 500], help="Corpus texts of these lengths")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per (target, text)")
+    parser.add_argument("--language", default=config.DEFAULT_LANGUAGE)
+    parser.add_argument("--timeout", type=float, default=config.FALLBACK_TIMEOUT)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    group = parser.add_argument_group("DashScope stand-in")
+    group.add_argument("--dashscope-slots", type=int, default=DEFAULT_GPU_SLOTS, help="Concurrent generations")
+    group.add_argument("--download-mbps", type=float, default=None, help="Audio URL download bandwidth")
+    args = parser.parse_args()
+
+    servers = []
+    if args.deployments:
+        targets = {key: config.get_deployment(key) for key in args.deployments}
+        time_scale = 1.0
+    else:
+        servers, targets = start_standins(args)
+        time_scale = args.time_scale
+
+    texts = [(name, client.load_text(name)) for name in args.texts]
+    texts += [(f"corpus-{chars}", text_of_length(chars)) for chars in args.lengths]
+    ref_audio_b64, ref_text = client.load_reference()
+    ref_seconds = audio_seconds(base64.b64decode(ref_audio_b64))
+
+    print("=" * 70)
+    print("Provider Comparison: Modal vs Qwen cloud")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    for label, endpoint in targets.items():
+        print(f"  {label:<32} {endpoint['name']}")
+    print(f"Texts: {', '.join(f'{n} ({len(t)} chars)' for n, t in texts)}  Runs: {args.runs}")
+
+    records = []
+    onboarding = {}
+    for label, endpoint in targets.items():
+        provider = get_provider(endpoint)
+        print(f"\n[{label}]")
+        voice = provider.create_voice(ref_audio_b64, ref_text, args.language)
+        voice["time"] /= time_scale
+        onboarding[label] = voice
+        if "error" in voice:
+            print(f"  Voice {voice['kind']}: ERROR - {voice['error']}")
+            continue
+        if voice["kind"] != "reference":
+            print(f"  Voice {voice['kind']}: {voice['time']:.2f}s ({voice['voice']})")
+
+        for name, text in texts:
+            if provider.kind == "dashscope" and len(text) > config.DASHSCOPE_MAX_TEXT_CHARS:
+                print(f"  {name}: skipped ({len(text)} chars > {config.DASHSCOPE_MAX_TEXT_CHARS})")
+                continue
+            for run in range(1, args.runs + 1):
+                record, wav = provider.generate(voice["voice"], text, args.language, timeout=args.timeout)
+                for key in ("time", "synth_seconds", "fetch_seconds"):
+                    if key in record:
+                        record[key] /= time_scale
+                record.update(
+                    {
+                        "target": label,
+                        "deployment": label.split(" ")[0],
+                        "provider": provider.kind,
+                        "name": name,
+                        "run": run,
+                    }
+                )
+                if provider.kind == "modal":
+                    record["ref_seconds"] = ref_seconds
+                if wav:
+                    record["audio_seconds"] = audio_seconds(wav)
+                    if record["audio_seconds"]:
+                        record["rtf"] = record["time"] / record["audio_seconds"]
+                    record["cost_usd"] = provider.request_cost(record)
+                    fetch = f" (fetch {record['fetch_seconds']:.2f}s)" if "fetch_seconds" in record else ""
+                    print(f"  {name} run {run}: {record['time']:.2f}s{fetch}  RTF {record.get('rtf') or 0:.2f}")
+                else:
+                    print(f"  {name} run {run}: ERROR - {record['error']}")
+                records.append(record)
+
+    for server in servers:
+        server.shutdown()
+
+    print("\n" + "=" * 70)
+    print("LATENCY BY TEXT (emulated seconds)" if servers else "LATENCY BY TEXT")
+    print("=" * 70)
+    print(f"\n{'Target':<32} {'Text':<12} │ {'Mean':>8} {'p95':>8} │ {'Synth':>8} {'Fetch':>8} │ {'RTF':>5}")
+    print("-" * 88)
+    for label in targets:
+        for name, _ in texts:
+            ok = [r for r in records if r["target"] == label and r["name"] == name and "error" not in r]
+            if not ok:
+                continue
+            latency = summarize([r["time"] for r in ok])
+            synth = summarize([r["synth_seconds"] for r in ok if "synth_seconds" in r])
+            fetch = summarize([r["fetch_seconds"] for r in ok if "fetch_seconds" in r])
+            rtf = summarize([r["rtf"] for r in ok if "rtf" in r])
+            print(
+                f"{label[:32]:<32} {name:<12} │ {fmt_seconds(latency['mean'])} {fmt_seconds(latency['p95'])} │ "
+                f"{fmt_seconds(synth['mean'])} {fmt_seconds(fetch['mean'])} │ {rtf['mean'] or 0:>5.2f}"
+            )
+        print("-" * 88)
+
+    completed = {label: {r["name"] for r in records if r["target"] == label and "error" not in r} for label in targets}
+    shared = [name for name, _ in texts if all(name in names for names in completed.values() if names)]
+    summary = {}
+    for label, endpoint in targets.items():
+        ok = [r for r in records if r["target"] == label and "error" not in r and r["name"] in shared]
+        costs = [r["cost_usd"] for r in ok if r.get("cost_usd") is not None]
+        chars = sum(r["text_chars"] for r in ok)
+        minutes = sum(r.get("audio_seconds") or 0 for r in ok) / 60
+        summary[label] = {
+            "provider": endpoint.get("provider", "modal"),
+            "onboarding_seconds": onboarding[label]["time"] if "error" not in onboarding[label] else None,
+            "voice_cost_usd": get_provider(endpoint).voice_cost(),
+            "requests": len(ok),
+            "errors": len([r for r in records if r["target"] == label]) - len(ok),
+            "latency": summarize([r["time"] for r in ok]),
+            "rtf": summarize([r["rtf"] for r in ok if "rtf" in r]),
+            "usd_per_request": sum(costs) / len(costs) if costs else None,
+            "usd_per_1k_chars": sum(costs) / chars * 1000 if costs and chars else None,
+            "usd_per_audio_minute": sum(costs) / minutes if costs and minutes else None,
+        }
+
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+    excluded = [name for name, _ in texts if name not in shared]
+    if excluded:
+        print(f"Texts every target completed: {', '.join(shared) or 'none'} (excluded: {', '.join(excluded)})")
+    print(
+        f"\n{'Target':<32} │ {'Onboard':>8} {'Voice $':>8} │ {'p50':>8} {'p95':>8} {'RTF':>5} │ "
+        f"{'$/req':>9} {'$/1k chr':>9} {'$/audio-min':>11} │ {'Err':>4}"
+    )
+    print("-" * 120)
+
+    def usd(value, width=9):
+        return f"{value:>{width}.5f}" if value is not None else f"{'-':>{width}}"
+
+    for label, entry in summary.items():
+        print(
+            f"{label[:32]:<32} │ {fmt_seconds(entry['onboarding_seconds'])} {entry['voice_cost_usd']:>8.2f} │ "
+            f"{fmt_seconds(entry['latency']['p50'])} {fmt_seconds(entry['latency']['p95'])} "
+            f"{entry['rtf']['mean'] or 0:>5.2f} │ {usd(entry['usd_per_request'])} {usd(entry['usd_per_1k_chars'])} "
+            f"{usd(entry['usd_per_audio_minute'], 11)} │ {entry['errors']:>4}"
+        )
+
+    ranked = [label for label, entry in summary.items() if entry["requests"]]
+    print()
+    for title, key in [("latency p50", lambda e: e["latency"]["p50"]), ("RTF", lambda e: e["rtf"]["mean"] or 0)]:
+        order = sorted(ranked, key=lambda label: key(summary[label]))
+        print(f"Ranked by {title}: {' < '.join(order)}")
+    priced = [label for label in ranked if summary[label]["usd_per_1k_chars"] is not None]
+    order = sorted(priced, key=lambda label: summary[label]["usd_per_1k_chars"])
+    print(f"Ranked by $/1k chars: {' < '.join(order)}")
+    print("(Modal cost is GPU-seconds only; compare_costs.py amortizes idle, boot and keep-warm time)")
+
+    if not args.no_save:
+        path = results.save_runs(
+            "provider_comparison",
+            "multi",
+            records,
+            extra={
+                "stand_in": bool(servers),
+                "time_scale": time_scale,
+                "onboarding": {
+                    label: {k: v for k, v in rec.items() if k != "voice"} for label, rec in onboarding.items()
+                },
+                "targets": summary,
+                "summary_texts": shared,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+tts-jobs queue consumer settings: batch size x batch timeout x concurrency.
+
+wrangler.jsonc runs the TTS queue consumer with max_batch_size 1 and
+max_batch_timeout 2 (and Cloudflare's default max_concurrency) in every
+environment. This repeats the same bursty load under each consumer setting
+in the matrix and reports per setting:
+
+  jobs/min     completed jobs over first submit -> last completed_at
+  queue wait   tasks.created_at -> provider_synthesizing (poll-gap midpoint,
+               as in tts_bench.job_latency), p50/p95/max
+  retries      consumer redeliveries, and dead-lettered messages
+  stuck        jobs that never left the queue before --timeout
+
+Each burst submits its jobs at once, spread over several users: the Worker
+caps a user at 4 active jobs, so one account cannot fill the queue. The
+stand-in creates enough users for every job to be active at once; with
+--wrangler, pass the users you have. Admission rejections (409 at the cap,
+429) are retried every WORKER_POLL_INTERVAL seconds, as the web app would.
+Jobs are polled every --poll-interval seconds and not downloaded.
+
+By default each setting gets a fresh Worker stand-in (tts_bench/
+standin_worker.py, DashScope stand-in behind it) whose in-process queue
+follows the consumer settings; --failure-rate injects consumer failures to
+exercise retries and the DLQ. With --wrangler each setting instead starts
+`wrangler dev --local` in workers/api on a copy of wrangler.jsonc whose local
+tts-jobs consumer carries the setting, with --rate-limit values passed as
+--var. There the DLQ has no consumer to count, so "stuck" is what to read;
+whether local queues honour max_concurrency depends on the wrangler version.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python bench_queue_consumer.py
+    uv run --with requests --with numpy python bench_queue_consumer.py --batch-sizes 1 4 --concurrencies 1 4 \\
+        --failure-rate 0.3
+    UTTER_EMAIL=... UTTER_PASSWORD=... uv run --with requests --with numpy python bench_queue_consumer.py \\
+        --wrangler --account second@example.com:pass --account third@example.com:pass
+"""
+
+import argparse
+import itertools
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import numpy  # noqa: F401
+    import requests
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python bench_queue_consumer.py")
+    sys.exit(1)
+
+from tts_bench import config, job_latency, results
+from tts_bench.polling import parse_timestamp
+from tts_bench.standin import add_standin_arguments, standin_kwargs
+from tts_bench.standin_dashscope import DEFAULT_GPU_SLOTS
+from tts_bench.standin_worker import STANDIN_PASSWORD, parse_rate_limits, start_worker_standin
+from tts_bench.stats import fmt_seconds, summarize
+from tts_bench.worker_client import WorkerAPIError, WorkerClient
+from tts_bench.workload import mixed_jobs
+
+SWEEP_CONFIG = "wrangler.queue-sweep.jsonc"  # Written next to wrangler.jsonc so `main` resolves
+QUEUED_STATUSES = {"queued", "pending", "provider_queued"}
+ACTIVE_JOB_CAP = 4  # _shared/tasks.ts, paid tiers
+
+
+def label(setting: dict) -> str:
+    return f"b{setting['max_batch_size']} t{setting['max_batch_timeout']:g} c{setting['max_concurrency']}"
+
+
+def wrangler_config(text: str, setting: dict) -> str:
+    """wrangler.jsonc with its first (local) tts-jobs consumer set to `setting`."""
+    start = text.index('"consumers"')
+    end = text.index("]", start)
+    block = re.sub(r'\s*"max_concurrency":\s*\d+,?', "", text[start:end])
+    block = re.sub(r'"max_batch_size":\s*\d+', f'"max_batch_size": {setting["max_batch_size"]}', block)
+    block = re.sub(r'"max_batch_timeout":\s*[\d.]+', f'"max_batch_timeout": {setting["max_batch_timeout"]:g}', block)
+    block = re.sub(
+        r'(\s*)"max_retries":\s*\d+',
+        lambda m: f'{m.group(1)}"max_concurrency": {setting["max_concurrency"]},'
+        f'{m.group(1)}"max_retries": {setting["max_retries"]}',
+        block,
+    )
+    return text[:start] + block + text[end:]
+
+
+def start_wrangler(setting: dict, args, rate_limits: dict) -> subprocess.Popen:
+    """`wrangler dev --local` on a config carrying `setting`; waits for /api/health."""
+    source = (config.WORKER_DIR / "wrangler.jsonc").read_text(encoding="utf-8")
+    (config.WORKER_DIR / SWEEP_CONFIG).write_text(wrangler_config(source, setting), encoding="utf-8")
+    port = args.api_url.rsplit(":", 1)[-1].split("/")[0]
+    command = ["npx", "wrangler", "dev", "--local", "--port", port, "--config", SWEEP_CONFIG]
+    for name, value in rate_limits.items():
+        command += ["--var", f"{name}:{value}"]
+    process = subprocess.Popen(command, cwd=config.WORKER_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{args.api_url}/api/health", timeout=1).ok:
+                return process
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.5)
+    process.kill()
+    raise RuntimeError("wrangler dev did not start within 120s")
+
+
+def stop_wrangler(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+    (config.WORKER_DIR / SWEEP_CONFIG).unlink(missing_ok=True)
+
+
+def run_job(worker: WorkerClient, voice_id: str, job: dict, start_at: float, args, clock) -> dict:
+    """Submit one job at `start_at` (clock time) and poll it to a terminal status."""
+    record = {
+        "id": job["id"],
+        "burst": job["burst"],
+        "text_chars": len(job["text"]),
+        "seen": {},
+        "polls": 0,
+        "admission_retries": 0,
+        "rate_limited": 0,
+        "cap_rejected": 0,
+    }
+    last = {}
+    if start_at > clock():
+        worker.sleep(start_at - clock())
+    try:
+        record["submit_start"] = clock()
+        submitted = worker.submit(voice_id, job["text"], "Auto", record, config.WORKER_POLL_INTERVAL)
+        record["submit_end"] = previous = clock()
+        record["task_id"] = submitted["task_id"]
+
+        def on_poll(task: dict):
+            nonlocal previous
+            now = clock()
+            last.update(task)
+            record["seen"].setdefault(task.get("provider_status") or task.get("status"), (previous, now))
+            previous = now
+
+        task, record["polls"] = worker.wait(submitted["task_id"], args.poll_interval, args.timeout, on_poll=on_poll)
+        record.update(status=task["status"], detected_at=previous)
+        if task["status"] != "completed":
+            record["error"] = task.get("error") or task["status"]
+    except (WorkerAPIError, TimeoutError, requests.exceptions.RequestException) as e:
+        record["error"] = str(e) or type(e).__name__
+        record["stuck"] = isinstance(e, TimeoutError) and last.get("status") in QUEUED_STATUSES
+    record["queue_wait"] = job_latency.decompose(record, last, None)["stages"]["queue_wait"]
+    record["created_at"] = parse_timestamp(last.get("created_at"))
+    record["completed_at"] = parse_timestamp(last.get("completed_at"))
+    record["seen"] = {status: list(span) for status, span in record["seen"].items()}
+    return record
+
+
+def run_setting(accounts: list[dict], bursts: list[list[dict]], args, clock, time_scale: float) -> list[dict]:
+    """Sign every account in, then submit each burst --burst-gap seconds after the last."""
+    per_account = -(-sum(len(b) for b in bursts) // len(accounts))
+    workers = []
+    try:
+        for account in accounts:
+            worker = WorkerClient(
+                account["base_url"], pool_size=per_account, timeout=args.timeout, time_scale=time_scale
+            )
+            workers.append(worker)
+            worker.sign_in(account["email"], account["password"])
+            if not account.get("voice_id"):
+                voices = worker.list_voices()
+                if not voices:
+                    raise RuntimeError(f"{account['email']} has no voices; clone one first")
+                account["voice_id"] = voices[0]["id"]
+        start = clock() + 1.0
+        jobs = [(job, start + burst * args.burst_gap) for burst, burst_jobs in enumerate(bursts) for job in burst_jobs]
+        with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+            futures = [
+                pool.submit(
+                    run_job, workers[i % len(workers)], accounts[i % len(accounts)]["voice_id"], job, at, args, clock
+                )
+                for i, (job, at) in enumerate(jobs)
+            ]
+            return [f.result() for f in futures]
+    finally:
+        for worker in workers:
+            worker.close()
+
+
+def standin_truth(server, records: list[dict]) -> dict:
+    """The stand-in queue's own view: enqueue -> provider start, redeliveries, DLQ."""
+    waits, retries = [], 0
+    for record in records:
+        trace = server.traces.get(record.get("task_id"), {})
+        if "provider_start" in trace and "enqueued" in trace:
+            record["truth_queue_wait"] = trace["provider_start"] - trace["enqueued"]
+            waits.append(record["truth_queue_wait"])
+        retries += max(len(trace.get("deliveries", [])) - 1, 0)
+    health = server.health()["queue"]
+    return {
+        "queue_wait": summarize(waits),
+        "retries": retries,
+        "dead_letters": health["dead_letters"],
+        "batches": health["batches"],
+        "deliveries": health["deliveries"],
+        "mean_batch": health["deliveries"] / health["batches"] if health["batches"] else None,
+    }
+
+
+def summarize_setting(records: list[dict]) -> dict:
+    ok = [r for r in records if "error" not in r and r["completed_at"] is not None]
+    starts = [r["submit_start"] for r in records if "submit_start" in r]
+    makespan = max(r["completed_at"] for r in ok) - min(starts) if ok and starts else None
+    return {
+        "jobs": len(records),
+        "completed": len(ok),
+        "errors": len(records) - len(ok),
+        "stuck": sum(1 for r in records if r.get("stuck")),
+        "makespan": makespan,
+        "jobs_per_minute": len(ok) / makespan * 60 if makespan else None,
+        "queue_wait": summarize([r["queue_wait"] for r in ok if r["queue_wait"] is not None]),
+        "admission_retries": sum(r["admission_retries"] for r in records),
+        "polls": sum(r["polls"] for r in records),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tts-jobs queue consumer batch size / concurrency sweep")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 5, 10], help="max_batch_size values")
+    parser.add_argument("--batch-timeouts", type=float, nargs="+", default=[2.0], help="max_batch_timeout values")
+    parser.add_argument("--concurrencies", type=int, nargs="+", default=[1, 2, 4], help="max_concurrency values")
+    parser.add_argument("--max-retries", type=int, default=3, help="Consumer max_retries (default: 3)")
+    parser.add_argument("--bursts", type=int, default=3, help="Bursts per setting")
+    parser.add_argument("--burst-gap", type=float, default=30.0, help="Seconds between burst starts")
+    parser.add_argument("--captions", type=int, default=8, help="Single-sentence jobs per burst")
+    parser.add_argument("--paragraphs", type=int, default=4, help="2-4 sentence jobs per burst")
+    parser.add_argument(
+        "--accounts", type=int, default=None, help="Stand-in users to spread jobs over (default: none at the cap)"
+    )
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Task poll interval (seconds)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Injected consumer failures (stand-in)")
+    parser.add_argument("--wrangler", action="store_true", help="Run `wrangler dev --local` per setting instead")
+    parser.add_argument("--api-url", default=config.WORKER_API_URL, help="wrangler dev URL (with --wrangler)")
+    parser.add_argument(
+        "--account",
+        action="append",
+        default=[],
+        metavar="EMAIL:PASSWORD",
+        help="Extra signed-up user for --wrangler (repeatable; $UTTER_EMAIL/$UTTER_PASSWORD is the first)",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        default=["RATE_LIMIT_TIER1_USER_LIMIT=100000", "RATE_LIMIT_TIER2_USER_LIMIT=100000"],
+        metavar="NAME=VALUE",
+        help="Worker rate-limit override (repeatable; tier 1 and 2 user limits are raised by default)",
+    )
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-job poll timeout (seconds)")
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    parser.set_defaults(gpu_slots=DEFAULT_GPU_SLOTS)
+    args = parser.parse_args()
+
+    rate_limits = parse_rate_limits(args.rate_limit)
+    if args.wrangler:
+        pairs = [(os.getenv("UTTER_EMAIL"), os.getenv("UTTER_PASSWORD"))] if os.getenv("UTTER_EMAIL") else []
+        pairs += [tuple(item.split(":", 1)) for item in args.account]
+        if not pairs or any(len(pair) != 2 or not all(pair) for pair in pairs):
+            print("Error: --wrangler needs UTTER_EMAIL/UTTER_PASSWORD and/or --account EMAIL:PASSWORD")
+            return 1
+        time_scale = 1.0
+    else:
+        time_scale = args.time_scale
+        if args.accounts is None:
+            args.accounts = -(-args.bursts * (args.captions + args.paragraphs) // ACTIVE_JOB_CAP)
+
+    settings = [
+        {"max_batch_size": b, "max_batch_timeout": t, "max_concurrency": c, "max_retries": args.max_retries}
+        for b, t, c in itertools.product(args.batch_sizes, args.batch_timeouts, args.concurrencies)
+    ]
+    bursts = []
+    for burst in range(args.bursts):
+        jobs = mixed_jobs(args.captions, args.paragraphs, paragraph_sentences=(2, 4), seed=burst)
+        bursts.append(
+            [
+                {**job, "id": f"{burst}-{job['id']}", "burst": burst}
+                for job in jobs
+                if len(job["text"]) <= config.WORKER_MAX_TEXT_CHARS
+            ]
+        )
+
+    print("=" * 70)
+    print("Queue Consumer Settings Sweep")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {f'wrangler dev --local ({args.api_url})' if args.wrangler else 'API Worker stand-in'}")
+    print(f"Settings: {len(settings)}  Bursts: {args.bursts} x {len(bursts[0]) if bursts else 0} jobs")
+    print(f"Burst gap: {args.burst_gap:g}s  Poll interval: {args.poll_interval:g}s  Max retries: {args.max_retries}")
+    if not args.wrangler:
+        print(f"Accounts: {args.accounts}  Injected consumer failure rate: {args.failure_rate:.0%}")
+
+    all_records, summaries = [], []
+    for setting in settings:
+        name = label(setting)
+        server, process = None, None
+        print(f"\n[{name}] ", end="", flush=True)
+        try:
+            if args.wrangler:
+                process = start_wrangler(setting, args, rate_limits)
+                accounts = [{"base_url": args.api_url, "email": e, "password": p} for e, p in pairs]
+                clock = time.time
+            else:
+                server, endpoint = start_worker_standin(
+                    time_scale=args.time_scale,
+                    seed=args.seed,
+                    provider_kwargs={**standin_kwargs(args), "deployment": "qwen-cloud-vc"},
+                    rate_limits=rate_limits,
+                    consumer_failure_rate=args.failure_rate,
+                    **setting,
+                )
+                accounts = [endpoint]
+                for i in range(1, args.accounts):
+                    user = server.add_user(email=f"bench{i}@example.com", password=STANDIN_PASSWORD)
+                    voice = server.seed_voice(user["id"])
+                    accounts.append({**endpoint, "email": user["email"], "voice_id": voice["id"]})
+                epoch = server.epoch.timestamp()
+
+                def clock() -> float:
+                    return epoch + server.now()
+
+            records = run_setting(accounts, bursts, args, clock, time_scale)
+            summary = {"setting": setting, "label": name, **summarize_setting(records)}
+            if server:
+                summary["standin"] = standin_truth(server, records)
+        except (RuntimeError, WorkerAPIError, requests.exceptions.RequestException) as e:
+            print(f"ERROR - {e}")
+            summaries.append({"setting": setting, "label": name, "error": str(e)})
+            continue
+        finally:
+            if server:
+                server.shutdown()
+            if process:
+                stop_wrangler(process)
+        print(f"{summary['completed']}/{summary['jobs']} completed, {summary['jobs_per_minute'] or 0:.1f} jobs/min")
+        for record in records:
+            record["setting"] = name
+        all_records.extend(records)
+        summaries.append(summary)
+
+    print("\n" + "=" * 70)
+    print("SUMMARY (emulated seconds)" if not args.wrangler else "SUMMARY")
+    print("=" * 70)
+    print(
+        f"\n{'Setting':<13} │ {'Jobs/min':>8} │ {'wait p50':>8} {'p95':>8} {'max':>8} │ "
+        f"{'Retries':>7} {'DLQ':>4} {'Stuck':>5} │ {'Batch':>5}"
+    )
+    print("-" * 84)
+    for summary in summaries:
+        if "error" in summary:
+            print(f"{summary['label']:<13} │ ERROR - {summary['error']}")
+            continue
+        wait, truth = summary["queue_wait"], summary.get("standin", {})
+        mean_batch = truth.get("mean_batch")
+        print(
+            f"{summary['label']:<13} │ {summary['jobs_per_minute'] or 0:>8.1f} │ "
+            + " ".join(fmt_seconds(wait[k]) for k in ("p50", "p95", "max"))
+            + f" │ {truth.get('retries', '-'):>7} {truth.get('dead_letters', '-'):>4} {summary['stuck']:>5} │ "
+            + (f"{mean_batch:>5.1f}" if mean_batch else f"{'-':>5}")
+        )
+
+    measured = [s for s in summaries if s.get("jobs_per_minute")]
+    if measured:
+        best = max(measured, key=lambda s: s["jobs_per_minute"])
+        print(f"\nHighest throughput: {best['label']} ({best['jobs_per_minute']:.1f} jobs/min)")
+        close = [s for s in measured if s["jobs_per_minute"] >= 0.95 * best["jobs_per_minute"]]
+        calmest = min(close, key=lambda s: s["queue_wait"]["p95"] or float("inf"))
+        if calmest is not best:
+            print(f"Within 5% of it with the lowest queue-wait p95: {calmest['label']}")
+    if not args.wrangler and measured:
+        errors = [
+            abs(r["queue_wait"] - r["truth_queue_wait"])
+            for r in all_records
+            if r.get("queue_wait") is not None and r.get("truth_queue_wait") is not None
+        ]
+        if errors:
+            print(f"Queue-wait estimate vs stand-in trace: mean error {sum(errors) / len(errors):.2f}s")
+    print("Jobs/min: completed jobs over first submit -> last completed_at; Batch: mean messages per batch")
+
+    if not args.no_save:
+        path = results.save_runs(
+            "queue_consumer_sweep",
+            args.api_url if args.wrangler else "local",
+            all_records,
+            extra={
+                "stand_in": not args.wrangler,
+                "time_scale": time_scale,
+                "bursts": args.bursts,
+                "burst_gap": args.burst_gap,
+                "poll_interval": args.poll_interval,
+                "failure_rate": args.failure_rate,
+                "settings": summaries,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Streaming synthesis: time-to-first-audio, inter-chunk gaps and total time.
+
+Runs each text three ways against the clone endpoint:
+
+  full      the current non-streaming request (first audio = whole WAV)
+  chunked   "stream": true, chunked WAV response
+  sse       "stream": true with Accept: text/event-stream
+
+and reports time to first audio byte, gaps between audio chunks and total
+time per mode. Chunk arrival times and the audio each chunk carried are kept
+in the results file, so playback can be replayed from them later.
+
+The Modal endpoints don't stream yet (their whole WAV arrives as one chunk),
+so the default target is the local stand-in, which sends its first chunk
+after the prefill/voice-prompt share of the service time and then
+--stream-fps chunks per second of audio.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python bench_streaming.py
+    uv run --with requests --with numpy python bench_streaming.py --stream-fps 12 --lengths 2600 --runs 3
+    uv run --with requests --with numpy python bench_streaming.py --deployment 0.6B-A10G-SDPA --modes full chunked
+"""
+
+import argparse
+import base64
+import sys
+from datetime import datetime
+
+try:
+    import numpy as np
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python bench_streaming.py")
+    sys.exit(1)
+
+from tts_bench import client, config, results
+from tts_bench.standin import add_standin_arguments, standin_kwargs, start_standin
+from tts_bench.stats import fmt_seconds, summarize
+from tts_bench.workload import text_of_length
+
+MODES = ["full", "chunked", "sse"]
+
+
+def audio_gaps(record: dict) -> list[float]:
+    """Gaps between consecutive audio-bearing chunks (seconds)."""
+    times = [t for t, a in zip(record["chunk_times"], record["chunk_audio"]) if a > 0]
+    return np.diff(times).tolist() if len(times) > 1 else []
+
+
+def run_once(endpoint: dict, payload: dict, mode: str, timeout: float) -> dict:
+    """One request in `mode`, as a record with first_audio/time/gaps."""
+    if mode == "full":
+        record, wav = client.measure_request(endpoint, payload, timeout=timeout)
+        record["first_audio"] = record["time"] if wav else None
+        record["gaps"] = []
+        return record
+    record, _ = client.stream_clone(endpoint, payload, timeout=timeout, sse=mode == "sse")
+    record["gaps"] = audio_gaps(record)
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming synthesis: time-to-first-audio and chunk gaps")
+    parser.add_argument("--texts", nargs="+", default=["short", "medium", "long"], help="inputs/texts names")
+    parser.add_argument("--lengths", type=int, nargs="*", default=[2600], help="Extra corpus texts of these lengths")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--runs", type=int, default=2, help="Runs per (text, mode)")
+    parser.add_argument("--deployment", default=None, help="Target deployment (default: local stand-in)")
+    parser.add_argument("--timeout", type=float, default=config.FALLBACK_TIMEOUT)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    if args.deployment:
+        endpoint = config.get_deployment(args.deployment)
+        time_scale = 1.0
+    else:
+        server, endpoint = start_standin(**standin_kwargs(args))
+        time_scale = args.time_scale
+
+    texts = [(name, client.load_text(name)) for name in args.texts]
+    texts += [(f"corpus-{chars}", text_of_length(chars)) for chars in args.lengths]
+    ref_audio_b64, ref_text = client.load_reference()
+    if server:
+        server.prepare([text for _, text in texts], base64.b64decode(ref_audio_b64))
+
+    print("=" * 70)
+    print("Streaming Synthesis")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {endpoint['name']}")
+    if server:
+        print(f"Stand-in chunks: {args.stream_fps:g} per second of audio")
+    print(f"Modes: {', '.join(args.modes)}  Runs: {args.runs}")
+
+    records = []
+    for name, text in texts:
+        payload = client.build_payload(text, ref_audio_b64, ref_text)
+        print(f"\n[{name}] {len(text)} chars")
+        for run in range(1, args.runs + 1):
+            for mode in args.modes:
+                record = run_once(endpoint, payload, mode, args.timeout)
+                # Report emulated seconds against the stand-in
+                for key in ("time", "first_byte", "first_audio"):
+                    if record.get(key) is not None:
+                        record[key] /= time_scale
+                record["chunk_times"] = [t / time_scale for t in record.get("chunk_times", [])]
+                record["gaps"] = [g / time_scale for g in record["gaps"]]
+                record.update({"name": name, "mode": mode, "run": run})
+                records.append(record)
+                if "error" in record:
+                    print(f"  Run {run} {mode:<8}: ERROR - {record['error']}")
+                else:
+                    gap = f"max gap {max(record['gaps']):.2f}s" if record["gaps"] else "one chunk"
+                    print(
+                        f"  Run {run} {mode:<8}: first audio {record['first_audio']:>7.2f}s  "
+                        f"total {record['time']:>7.2f}s  {gap}"
+                    )
+
+    print("\n" + "=" * 70)
+    print("SUMMARY (emulated seconds)" if server else "SUMMARY")
+    print("=" * 70)
+    print(
+        f"\n{'Text':<13} {'Mode':<8} │ {'TTFA mean':>9} {'p95':>8} │ {'Gap mean':>8} {'p95':>8} {'max':>8} │ "
+        f"{'Total':>8} │ {'TTFA vs full':>12}"
+    )
+    print("-" * 100)
+    summary = {}
+    for name, _ in texts:
+        summary[name] = {}
+        for mode in args.modes:
+            ok = [r for r in records if r["name"] == name and r["mode"] == mode and "error" not in r]
+            ttfa = summarize([r["first_audio"] for r in ok if r.get("first_audio") is not None])
+            gaps = summarize([g for r in ok for g in r["gaps"]])
+            total = summarize([r["time"] for r in ok])
+            summary[name][mode] = {"first_audio": ttfa, "gaps": gaps, "total": total}
+            full = summary[name].get("full", {}).get("first_audio", {}).get("mean")
+            speedup = f"{full / ttfa['mean']:>11.1f}x" if full and ttfa["mean"] and mode != "full" else f"{'-':>12}"
+            print(
+                f"{name:<13} {mode:<8} │ {fmt_seconds(ttfa['mean'], 9)} {fmt_seconds(ttfa['p95'])} │ "
+                f"{fmt_seconds(gaps['mean'])} {fmt_seconds(gaps['p95'])} {fmt_seconds(gaps['max'])} │ "
+                f"{fmt_seconds(total['mean'])} │ {speedup}"
+            )
+        print("-" * 100)
+
+    if server:
+        server.shutdown()
+
+    if not args.no_save:
+        path = results.save_runs(
+            "streaming_benchmark",
+            args.deployment or "local",
+            records,
+            extra={
+                "stand_in": server is not None,
+                "emulates": args.emulate if server else None,
+                "time_scale": time_scale,
+                "stream_fps": args.stream_fps if server else None,
+                "summary": summary,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Reference-transcript (ASR) benchmark: what transcription adds to onboarding.
+
+The clone flow needs the reference transcript. When the user does not type
+it, the API Worker gets it from Qwen ASR (tts_bench.asr mirrors that call).
+This runs three phases against one DashScope target:
+
+  clips       ASR latency and RTF for the reference and trimmed clips of it
+              (--clip-seconds), never cached
+  cache       tts_bench.asr.TranscriptCache on the full reference: the first
+              (missing) call, memory hits, a disk hit from a fresh cache, and
+              --concurrency simultaneous requests for the same clip
+              (upstream calls should be 1)
+  onboarding  voice enrollment with the transcript already known, after an
+              uncached transcription, and after a cache hit
+
+and reports how much transcription adds to end-to-end clone onboarding.
+
+By default the target is the DashScope stand-in, which answers ASR requests
+with the checked-in transcript (see tts_bench/standin_dashscope.py). Cache
+hits are local work and are reported in real milliseconds, never scaled.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python bench_transcription.py
+    uv run --with requests --with numpy python bench_transcription.py --clip-seconds 5 15 --runs 5
+    DASHSCOPE_API_KEY=... uv run --with requests --with numpy python bench_transcription.py --deployment qwen-cloud-vc
+"""
+
+import argparse
+import base64
+import difflib
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy  # noqa: F401
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python bench_transcription.py")
+    sys.exit(1)
+
+from tts_bench import asr, audio, client, config, dashscope, reference, results
+from tts_bench.standin import add_standin_arguments, standin_kwargs
+from tts_bench.standin_dashscope import DEFAULT_GPU_SLOTS, start_dashscope_standin
+from tts_bench.stats import fmt_seconds, summarize
+
+FLOWS = ["text known", "asr", "asr cached"]
+
+
+def word_match(text: str, expected: str) -> float:
+    """Word-level similarity of a transcript to the expected text (1.0 = same words)."""
+    return difflib.SequenceMatcher(None, text.lower().split(), expected.lower().split()).ratio()
+
+
+def build_clips(wav: bytes, clip_seconds: list[float]) -> list[tuple[str, bytes]]:
+    """The full reference plus its first N seconds for each shorter N."""
+    samples, rate = audio.decode_wav(wav)
+    duration = audio.duration_seconds(samples, rate)
+    clips = [
+        (f"{seconds:g}s", reference.make_variant(samples, rate, seconds))
+        for seconds in sorted(clip_seconds)
+        if seconds < duration
+    ]
+    return clips + [("full", wav)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR reference-transcript latency and transcript cache")
+    parser.add_argument("--reference", type=Path, default=config.REFERENCE_AUDIO, help="Reference WAV")
+    parser.add_argument("--clip-seconds", type=float, nargs="*", default=[5.0, 10.0, 20.0], help="Trimmed clip lengths")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per clip and per onboarding flow")
+    parser.add_argument("--concurrency", type=int, default=8, help="Simultaneous requests for one clip")
+    parser.add_argument("--language", default=config.DEFAULT_LANGUAGE)
+    parser.add_argument("--deployment", default=None, help="DashScope VC target (default: local stand-in)")
+    parser.add_argument("--timeout", type=float, default=90.0)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    parser.set_defaults(gpu_slots=DEFAULT_GPU_SLOTS)
+    args = parser.parse_args()
+
+    server = None
+    if args.deployment:
+        endpoint = config.get_deployment(args.deployment)
+        if endpoint.get("provider") != "dashscope" or endpoint.get("voice_type") != "vc":
+            print(f"Error: {args.deployment} is not a DashScope voice-clone target")
+            return 1
+        time_scale = 1.0
+    else:
+        server, endpoint = start_dashscope_standin(**{**standin_kwargs(args), "deployment": "qwen-cloud-vc"})
+        time_scale = args.time_scale
+
+    ref_wav = args.reference.read_bytes()
+    ref_b64 = base64.b64encode(ref_wav).decode("ascii")
+    _, ref_text = client.load_reference()
+    clips = build_clips(ref_wav, args.clip_seconds)
+
+    print("=" * 70)
+    print("Reference Transcription (ASR)")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {endpoint['name']}")
+    print(f"ASR model: {endpoint.get('asr_model', config.QWEN_ASR_MODEL)}")
+    print(f"Clips: {', '.join(f'{name} ({audio.wav_duration(wav):.1f}s)' for name, wav in clips)}  Runs: {args.runs}")
+
+    records = []
+
+    def scaled(record: dict) -> dict:
+        if "time" in record and not record.get("cached"):
+            record["time"] /= time_scale
+        return record
+
+    # -- clips --------------------------------------------------------------
+    print("\n[clips]")
+    for name, wav in clips:
+        for run in range(1, args.runs + 1):
+            record = scaled(asr.transcribe(endpoint, wav, args.language, timeout=args.timeout))
+            record.update({"phase": "clips", "clip": name, "clip_seconds": audio.wav_duration(wav), "run": run})
+            if name == "full" and "text" in record:
+                record["word_match"] = word_match(record["text"], ref_text)
+            records.append(record)
+            status = f"ERROR - {record['error']}" if "error" in record else f"{record['time']:.2f}s"
+            print(f"  {name} run {run}: {status}")
+
+    # -- cache ----------------------------------------------------------------
+    print("\n[cache]")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = asr.TranscriptCache(Path(tmp))
+        cache_records = [scaled(cache.transcribe(endpoint, ref_wav, args.language, args.timeout))]
+        cache_records += [cache.transcribe(endpoint, ref_wav, args.language, args.timeout) for _ in range(args.runs)]
+        disk = asr.TranscriptCache(Path(tmp)).transcribe(endpoint, ref_wav, args.language, args.timeout)
+
+    shared = asr.TranscriptCache(cache_dir=None)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [
+            pool.submit(shared.transcribe, endpoint, ref_wav, args.language, args.timeout)
+            for _ in range(args.concurrency)
+        ]
+        burst = [future.result() for future in futures]
+    burst_wall = (time.perf_counter() - start) / time_scale
+    for i, record in enumerate(cache_records + [disk]):
+        kind = "miss" if i == 0 else ("disk hit" if record is disk else "memory hit")
+        records.append({**record, "phase": "cache", "lookup": kind})
+    records += [{**scaled(record), "phase": "cache", "lookup": "burst"} for record in burst]
+    miss = cache_records[0]
+    hits = [r for r in cache_records[1:] if r.get("cached")]
+    print(f"  miss {miss['time']:.2f}s, {len(hits)} memory hits, disk hit {'yes' if disk.get('cached') else 'no'}")
+    print(f"  {args.concurrency} concurrent requests: {shared.misses} upstream call(s), {burst_wall:.2f}s")
+
+    # -- onboarding -----------------------------------------------------------
+    print("\n[onboarding]")
+    warm = asr.TranscriptCache(cache_dir=None)
+    warm.transcribe(endpoint, ref_wav, args.language, args.timeout)
+    onboarding = {flow: [] for flow in FLOWS}
+    for run in range(1, args.runs + 1):
+        for flow in FLOWS:
+            if flow == "text known":
+                step = {"time": 0.0, "text": ref_text}
+            elif flow == "asr":
+                step = scaled(asr.transcribe(endpoint, ref_wav, args.language, timeout=args.timeout))
+            else:
+                step = warm.transcribe(endpoint, ref_wav, args.language, args.timeout)
+            record = {"phase": "onboarding", "flow": flow, "run": run, "asr_seconds": step["time"]}
+            if "error" in step:
+                record["error"] = f"ASR failed: {step['error']}"
+            else:
+                voice = dashscope.create_clone_voice(endpoint, ref_b64, step["text"], args.language, args.timeout)
+                record["enroll_seconds"] = voice["time"] / time_scale
+                record["time"] = record["asr_seconds"] + record["enroll_seconds"]
+                if "error" in voice:
+                    record["error"] = f"Enrollment failed: {voice['error']}"
+            onboarding[flow].append(record)
+            records.append(record)
+            status = f"ERROR - {record['error']}" if "error" in record else f"{record['time']:.2f}s"
+            print(f"  {flow} run {run}: {status}")
+
+    if server:
+        server.shutdown()
+
+    emulated = " (emulated seconds)" if server else ""
+    print("\n" + "=" * 70)
+    print(f"ASR LATENCY BY CLIP{emulated}")
+    print("=" * 70)
+    print(f"\n{'Clip':<8} {'Audio':>7} {'WAV KB':>8} │ {'Mean':>8} {'p95':>8} {'RTF':>6} │ {'Match':>6} {'Err':>4}")
+    print("-" * 70)
+    clip_summary = {}
+    for name, wav in clips:
+        runs = [r for r in records if r.get("phase") == "clips" and r["clip"] == name]
+        ok = [r for r in runs if "error" not in r]
+        seconds = audio.wav_duration(wav)
+        latency = summarize([r["time"] for r in ok])
+        matches = [r["word_match"] for r in ok if "word_match" in r]
+        clip_summary[name] = {
+            "audio_seconds": seconds,
+            "wav_bytes": len(wav),
+            "latency": latency,
+            "rtf": latency["mean"] / seconds if latency["mean"] is not None else None,
+            "word_match": sum(matches) / len(matches) if matches else None,
+            "errors": len(runs) - len(ok),
+        }
+        entry = clip_summary[name]
+        match = f"{entry['word_match']:>6.2f}" if entry["word_match"] is not None else f"{'-':>6}"
+        print(
+            f"{name:<8} {seconds:>6.1f}s {len(wav) / 1024:>8.0f} │ {fmt_seconds(latency['mean'])} "
+            f"{fmt_seconds(latency['p95'])} {entry['rtf'] or 0:>6.3f} │ {match} {entry['errors']:>4}"
+        )
+
+    hit_ms = summarize([r["time"] * 1000 for r in hits])
+    cache_summary = {
+        "miss_seconds": miss["time"],
+        "memory_hit_ms": hit_ms,
+        "disk_hit_ms": disk["time"] * 1000 if disk.get("cached") else None,
+        "burst": {"requests": args.concurrency, "upstream_calls": shared.misses, "wall": burst_wall},
+    }
+    print("\n" + "=" * 70)
+    print("TRANSCRIPT CACHE")
+    print("=" * 70)
+    print(f"Miss (ASR call):        {miss['time']:.2f}s{emulated}")
+    print(f"Memory hit:             {hit_ms['mean'] or 0:.3f} ms mean, {hit_ms['p95'] or 0:.3f} ms p95 (real)")
+    if cache_summary["disk_hit_ms"] is not None:
+        print(f"Disk hit (fresh cache): {cache_summary['disk_hit_ms']:.3f} ms (real)")
+    print(f"{args.concurrency} concurrent misses:   {shared.misses} upstream call(s)")
+
+    print("\n" + "=" * 70)
+    print(f"ONBOARDING{emulated}")
+    print("=" * 70)
+    print(f"\n{'Flow':<12} │ {'ASR':>8} {'Enroll':>8} │ {'Total':>8} {'p95':>8} │ {'Added':>8}")
+    print("-" * 70)
+    onboarding_summary = {}
+    known = summarize([r["time"] for r in onboarding["text known"] if "error" not in r])
+    for flow in FLOWS:
+        ok = [r for r in onboarding[flow] if "error" not in r]
+        total = summarize([r["time"] for r in ok])
+        asr_time = summarize([r["asr_seconds"] for r in ok])
+        onboarding_summary[flow] = {
+            "asr": asr_time,
+            "enroll": summarize([r["enroll_seconds"] for r in ok]),
+            "total": total,
+            # The ASR step itself; total minus "text known" would mostly be enrollment noise
+            "added_seconds": asr_time["mean"],
+            "added_vs_known": asr_time["mean"] / known["mean"] if asr_time["mean"] is not None and known["mean"] else None,
+            "errors": len(onboarding[flow]) - len(ok),
+        }
+        entry = onboarding_summary[flow]
+        print(
+            f"{flow:<12} │ {fmt_seconds(asr_time['mean'])} {fmt_seconds(entry['enroll']['mean'])} │ "
+            f"{fmt_seconds(total['mean'])} {fmt_seconds(total['p95'])} │ {entry['added_vs_known'] or 0:>+8.0%}"
+        )
+
+    uncached, cached = onboarding_summary["asr"], onboarding_summary["asr cached"]
+    if uncached["added_vs_known"] is not None:
+        print(
+            f"\nTranscription adds {uncached['added_seconds']:.2f}s ({uncached['added_vs_known']:.0%}) to onboarding; "
+            f"a cached transcript adds {(cached['added_seconds'] or 0) * 1000:.1f} ms"
+        )
+
+    if not args.no_save:
+        path = results.save_runs(
+            "transcription_benchmark",
+            args.deployment or "local",
+            [{k: v for k, v in r.items() if k != "key"} for r in records],
+            extra={
+                "stand_in": server is not None,
+                "time_scale": time_scale,
+                "asr_model": endpoint.get("asr_model", config.QWEN_ASR_MODEL),
+                "clips": clip_summary,
+                "cache": cache_summary,
+                "onboarding": onboarding_summary,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
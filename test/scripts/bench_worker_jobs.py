@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+API Worker job flow: generate -> poll task -> download, end to end.
+
+Runs a batch of generations through the production path with
+tts_bench.worker_client (the asyncio client by default, --sync for the
+threaded one), --concurrency jobs in flight, and reports per stage:
+
+  admission waiting out generate rejections (429 from the rate limiter,
+            409 from the active-job cap) before the accepted attempt
+  submit    the accepted POST /api/generate
+  wait      polling GET /api/tasks/:id every --poll-interval seconds until
+            the task is terminal (queue wait + provider + persistence)
+  download  GET /api/generations/:id/audio (302) + the signed storage URL
+
+plus polls per job, admission retries, errors and jobs per minute. The
+default 10 jobs fit one window of the Worker's tier-1 limit (10 generates
+per user per 300s); more jobs measure mostly admission waits.
+
+By default the target is the Worker stand-in (tts_bench/standin_worker.py)
+with a DashScope stand-in behind it, the Worker's default rate limits and a
+one-message, one-batch queue consumer. Point --api-url at `wrangler dev`
+(workers/api, `npm run dev`) with a signed-up user to run the real Worker.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy --with httpx python bench_worker_jobs.py
+    uv run --with requests --with numpy --with httpx python bench_worker_jobs.py --captions 16 --concurrency 4 \\
+        --rate-limit RATE_LIMIT_TIER1_USER_LIMIT=100
+    UTTER_EMAIL=... UTTER_PASSWORD=... uv run --with requests --with numpy --with httpx python bench_worker_jobs.py \\
+        --api-url http://127.0.0.1:8787
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import numpy  # noqa: F401
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python bench_worker_jobs.py")
+    sys.exit(1)
+
+from tts_bench import config, results
+from tts_bench.standin import add_standin_arguments, standin_kwargs
+from tts_bench.standin_dashscope import DEFAULT_GPU_SLOTS
+from tts_bench.standin_worker import add_worker_arguments, start_worker_standin, worker_kwargs
+from tts_bench.stats import fmt_seconds, summarize
+from tts_bench.worker_client import AsyncWorkerClient, WorkerAPIError, WorkerClient
+from tts_bench.workload import mixed_jobs
+
+STAGES = ["admission", "submit", "wait", "download", "total"]
+
+
+def client_options(endpoint: dict, args, time_scale: float) -> dict:
+    return {
+        "base_url": endpoint["base_url"],
+        "access_token": endpoint.get("token"),
+        "origin": endpoint.get("origin", config.WORKER_ORIGIN),
+        "pool_size": max(args.concurrency, 1),
+        "timeout": args.timeout,
+        "time_scale": time_scale,
+    }
+
+
+def run_sync(endpoint: dict, jobs: list[dict], args, time_scale: float) -> list[dict]:
+    with WorkerClient(**client_options(endpoint, args, time_scale)) as worker:
+        if not endpoint.get("token"):
+            worker.sign_in(endpoint["email"], endpoint["password"])
+
+        def run(job: dict) -> dict:
+            record = worker.run_job(endpoint["voice_id"], job["text"], interval=args.poll_interval)
+            return {"id": job["id"], **record}
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            return list(pool.map(run, jobs))
+
+
+async def run_async(endpoint: dict, jobs: list[dict], args, time_scale: float) -> list[dict]:
+    async with AsyncWorkerClient(**client_options(endpoint, args, time_scale)) as worker:
+        if not endpoint.get("token"):
+            await worker.sign_in(endpoint["email"], endpoint["password"])
+        slots = asyncio.Semaphore(args.concurrency)
+
+        async def run(job: dict) -> dict:
+            async with slots:
+                record = await worker.run_job(endpoint["voice_id"], job["text"], interval=args.poll_interval)
+                return {"id": job["id"], **record}
+
+        return await asyncio.gather(*(run(job) for job in jobs))
+
+
+def resolve_voice(endpoint: dict, args) -> str | None:
+    """--voice-id, or the user's most recent voice."""
+    if args.voice_id:
+        return args.voice_id
+    with WorkerClient(**client_options(endpoint, args, 1.0)) as worker:
+        if not endpoint.get("token"):
+            worker.sign_in(endpoint["email"], endpoint["password"])
+        voices = worker.list_voices()
+    return voices[0]["id"] if voices else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API Worker job flow: generate, poll, download")
+    parser.add_argument("--captions", type=int, default=6, help="Single-sentence jobs")
+    parser.add_argument("--paragraphs", type=int, default=4, help="2-4 sentence jobs")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs in flight")
+    parser.add_argument("--poll-interval", type=float, default=config.WORKER_POLL_INTERVAL, help="Task poll interval")
+    parser.add_argument("--sync", action="store_true", help="Threaded WorkerClient instead of AsyncWorkerClient")
+    parser.add_argument("--api-url", default=None, help="Real API Worker base URL (default: local stand-in)")
+    parser.add_argument("--email", default=os.getenv("UTTER_EMAIL"), help="Sign-in email (default: $UTTER_EMAIL)")
+    parser.add_argument("--password", default=os.getenv("UTTER_PASSWORD"), help="Password (default: $UTTER_PASSWORD)")
+    parser.add_argument("--token", default=os.getenv("UTTER_ACCESS_TOKEN"), help="Bearer access token instead")
+    parser.add_argument("--voice-id", default=None, help="Voice to generate with (default: most recent)")
+    parser.add_argument("--timeout", type=float, default=90.0)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    add_worker_arguments(parser)
+    parser.set_defaults(gpu_slots=DEFAULT_GPU_SLOTS)
+    args = parser.parse_args()
+
+    server = None
+    if args.api_url:
+        if not args.token and not (args.email and args.password):
+            print("Error: --api-url needs --email/--password or --token")
+            return 1
+        endpoint = {
+            "name": f"API Worker ({args.api_url})",
+            "base_url": args.api_url,
+            "email": args.email,
+            "password": args.password,
+            "token": args.token,
+        }
+        try:
+            endpoint["voice_id"] = resolve_voice(endpoint, args)
+        except (WorkerAPIError, requests.exceptions.RequestException) as e:
+            print(f"Error: {e}")
+            return 1
+        if not endpoint["voice_id"]:
+            print("Error: the user has no voices; clone one or pass --voice-id")
+            return 1
+        time_scale = 1.0
+    else:
+        server, endpoint = start_worker_standin(
+            time_scale=args.time_scale,
+            seed=args.seed,
+            provider_kwargs={**standin_kwargs(args), "deployment": "qwen-cloud-vc"},
+            **worker_kwargs(args),
+        )
+        time_scale = args.time_scale
+
+    jobs = mixed_jobs(args.captions, args.paragraphs, paragraph_sentences=(2, 4))
+    skipped = [job for job in jobs if len(job["text"]) > config.WORKER_MAX_TEXT_CHARS]
+    jobs = [job for job in jobs if len(job["text"]) <= config.WORKER_MAX_TEXT_CHARS]
+
+    print("=" * 70)
+    print("API Worker Job Flow")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {endpoint['name']}")
+    print(f"Client: {'WorkerClient (threads)' if args.sync else 'AsyncWorkerClient (asyncio)'}")
+    print(
+        f"Jobs: {len(jobs)}"
+        + (f" ({len(skipped)} over {config.WORKER_MAX_TEXT_CHARS} chars skipped)" if skipped else "")
+    )
+    print(f"Concurrency: {args.concurrency}  Poll interval: {args.poll_interval:g}s")
+    if server:
+        queue = server.queue
+        print(
+            f"Queue: max_batch_size {queue.max_batch_size}, max_batch_timeout {queue.max_batch_timeout:g}s, "
+            f"max_concurrency {queue.max_concurrency}"
+        )
+
+    start = time.perf_counter()
+    try:
+        if args.sync:
+            records = run_sync(endpoint, jobs, args, time_scale)
+        else:
+            records = asyncio.run(run_async(endpoint, jobs, args, time_scale))
+    except (RuntimeError, WorkerAPIError) as e:
+        print(f"Error: {e}")
+        if server:
+            server.shutdown()
+        return 1
+    wall = (time.perf_counter() - start) / time_scale
+
+    health = server.health() if server else None
+    if server:
+        server.shutdown()
+
+    for record in records:
+        for key in (*STAGES, "redirect", "fetch"):
+            if key in record:
+                record[key] /= time_scale
+
+    ok = [r for r in records if "error" not in r]
+    print("\n" + "=" * 70)
+    print("SUMMARY (emulated seconds)" if server else "SUMMARY")
+    print("=" * 70)
+    print(f"\n{'Stage':<9} │ {'mean':>8} {'p50':>8} {'p95':>8} {'max':>8}")
+    print("-" * 48)
+    stages = {}
+    for stage in STAGES:
+        stages[stage] = summarize([r[stage] for r in ok])
+        print(f"{stage:<9} │ " + " ".join(fmt_seconds(stages[stage][k]) for k in ("mean", "p50", "p95", "max")))
+
+    polls = summarize([r["polls"] for r in ok])
+    summary = {
+        "jobs": len(records),
+        "completed": len(ok),
+        "errors": len(records) - len(ok),
+        "wall": wall,
+        "jobs_per_minute": len(ok) / wall * 60 if wall else None,
+        "polls_per_job": polls["mean"],
+        "rate_limited": sum(r["rate_limited"] for r in records),
+        "cap_rejected": sum(r["cap_rejected"] for r in records),
+        "stages": stages,
+    }
+    print(f"\nCompleted: {summary['completed']}/{summary['jobs']}  Wall: {wall:.1f}s", end="")
+    print(f"  Jobs/min: {summary['jobs_per_minute']:.1f}")
+    if polls["n"]:
+        print(f"Polls per job: mean {polls['mean']:.1f}, max {polls['max']:.0f}")
+    print(
+        f"Admission retries: {summary['rate_limited']} rate limited (429), "
+        f"{summary['cap_rejected']} at the job cap (409)"
+    )
+    if health:
+        stats, q = health["stats"], health["queue"]
+        print(f"Worker 429s (all routes): {stats['rate_limited']}  Task polls: {stats['task_polls']}")
+        print(f"Queue: {q['deliveries']} deliveries in {q['batches']} batches, {q['dead_letters']} dead-lettered")
+    for record in records:
+        if "error" in record:
+            print(f"  {record['id']}: ERROR - {record['error']}")
+
+    if not args.no_save:
+        path = results.save_runs(
+            "worker_jobs_benchmark",
+            args.api_url or "local",
+            records,
+            extra={
+                "stand_in": server is not None,
+                "time_scale": time_scale,
+                "client": "sync" if args.sync else "async",
+                "concurrency": args.concurrency,
+                "poll_interval": args.poll_interval,
+                "queue": health["queue"] if health else None,
+                "summary": summary,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
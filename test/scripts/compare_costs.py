@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Cost per generated audio-hour and per 1k characters, with the latency/cost frontier.
+
+Prices each Modal deployment from its config "usd_per_hour" and the measured
+timings in results/ (tts_bench.cost):
+
+  measured    GPU-seconds per audio-second of every warm benchmark run, the
+              floor a deployment costs when a container is never idle
+  amortized   per workload (--chars per request at each of --rates requests
+              per hour), the billed seconds per request including idle
+              scaledown windows and boots (scale to zero after each
+              --scaledown) or a --keep-warm container billed all hour
+
+and lists, per rate, every deployment and scaling policy with its expected
+latency (warm time plus boots waited for), utilization and cost, then the
+Pareto frontier of latency against cost per audio-hour: the configurations
+no other one beats on both. Nothing is sent; refresh the latency model with
+fit_latency_model.py after new benchmark runs.
+
+Usage:
+    cd test/scripts
+    uv run --with numpy python compare_costs.py
+    uv run --with numpy python compare_costs.py --chars 1000 --rates 30 600 --scaledown 60 300 600
+    uv run --with numpy python compare_costs.py --deployments 0.6B-T4-SDPA 0.6B-A10G-SDPA --keep-warm 0
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    print("Error: numpy library required")
+    print("Run: uv run --with numpy python compare_costs.py")
+    sys.exit(1)
+
+from tts_bench import config, cost, fleet, results
+from tts_bench.latency_model import load_trained
+
+
+def usd(value: float | None, width: int = 9) -> str:
+    return f"{value:>{width}.3f}" if value is not None else f"{'-':>{width}}"
+
+
+def print_points(points: list[dict], front: list[dict]):
+    print(
+        f"  {'Deployment':<16} {'Policy':<22} │ {'Latency':>8} {'Cold':>5} │ {'Ctr':>3} {'Util':>5} │ "
+        f"{'$/request':>9} {'$/audio-h':>9} {'$/1k chr':>9}"
+    )
+    print("  " + "-" * 100)
+    for point in sorted(points, key=lambda p: (p["usd_per_audio_hour"] is None, p["usd_per_audio_hour"])):
+        marker = "*" if point in front else " "
+        print(
+            f"{marker} {point['deployment']:<16} {point['policy']:<22} │ {point['latency']:>7.1f}s "
+            f"{point['cold_share']:>5.0%} │ {point['containers']:>3} {point['utilization']:>5.0%} │ "
+            f"{usd(point['usd_per_request'])} {usd(point['usd_per_audio_hour'])} {usd(point['usd_per_1k_chars'])}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost per audio-hour and the latency/cost Pareto frontier")
+    parser.add_argument("--deployments", nargs="+", default=None, help="Default: every fitted Modal deployment")
+    parser.add_argument("--chars", type=int, default=300, help="Characters per request")
+    parser.add_argument("--rates", type=float, nargs="+", default=[10.0, 60.0, 600.0], help="Requests per hour")
+    parser.add_argument(
+        "--scaledown", type=float, nargs="+", default=[cost.DEFAULT_SCALEDOWN], help="Idle seconds before scale-down"
+    )
+    parser.add_argument("--keep-warm", type=int, default=1, help="Containers kept warm in that policy (0 = skip)")
+    parser.add_argument("--language", default=config.DEFAULT_LANGUAGE)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    args = parser.parse_args()
+
+    if min(args.rates) <= 0:
+        print("Error: --rates must be positive")
+        return 1
+    model = load_trained()
+    deployments = args.deployments or fleet.fitted_deployments(model)
+    if not deployments:
+        print("Error: no Modal deployment has a latency fit with cold starts (run fit_latency_model.py)")
+        return 1
+    unpriced = [d for d in deployments if cost.hourly_usd(d) is None]
+    if unpriced:
+        print(f"Error: no \"usd_per_hour\" in the config for {', '.join(unpriced)}")
+        return 1
+    totals = cost.measured_totals(results.load_samples())
+
+    print("=" * 70)
+    print("Cost per Audio-Hour")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Workload: {args.chars} chars per request at {', '.join(f'{r:g}' for r in args.rates)} requests/hour")
+    print(f"Policies: scale to zero after {', '.join(f'{s:g}s' for s in args.scaledown)}", end="")
+    print(f", keep {args.keep_warm} warm" if args.keep_warm else "")
+
+    print("\n" + "=" * 70)
+    print("MEASURED (GPU-seconds only, warm runs in results/)")
+    print("=" * 70)
+    print(
+        f"\n{'Deployment':<16} {'$/hour':>6} │ {'Runs':>5} {'Audio':>7} │ {'GPU s/audio s':>13} │ "
+        f"{'$/audio-h':>9} {'$/1k chr':>9}"
+    )
+    print("-" * 78)
+    measured = {}
+    for deployment in deployments:
+        if deployment not in totals:
+            print(f"{deployment:<16} {cost.hourly_usd(deployment):>6.2f} │ no warm runs with audio sizes")
+            continue
+        row = measured[deployment] = cost.gpu_only(deployment, totals[deployment])
+        print(
+            f"{deployment:<16} {cost.hourly_usd(deployment):>6.2f} │ {row['requests']:>5} "
+            f"{row['audio_seconds'] / 60:>6.1f}m │ {row['gpu_seconds_per_audio_second']:>13.2f} │ "
+            f"{usd(row['usd_per_audio_hour'])} {usd(row['usd_per_1k_chars'])}"
+        )
+
+    points, fronts = [], {}
+    policies = [(scaledown, 0) for scaledown in args.scaledown]
+    if args.keep_warm:
+        policies.append((None, args.keep_warm))
+    for rate in args.rates:
+        rate_points = [
+            cost.operating_point(
+                model,
+                deployment,
+                args.chars,
+                rate,
+                scaledown=scaledown,
+                min_containers=keep_warm,
+                totals=totals.get(deployment),
+                language=args.language,
+            )
+            for deployment in deployments
+            for scaledown, keep_warm in policies
+        ]
+        front = cost.pareto_front(rate_points)
+        points.extend(rate_points)
+        fronts[f"{rate:g}"] = front
+
+        print("\n" + "=" * 70)
+        print(f"{rate:g} requests/hour: amortized (* = on the latency/cost frontier)")
+        print("=" * 70)
+        print_points(rate_points, front)
+        print("\n  Pareto frontier (fastest first):")
+        for point in front:
+            print(
+                f"    {point['deployment']:<16} {point['policy']:<22} {point['latency']:>7.1f}s  "
+                f"${point['usd_per_audio_hour']:.2f}/audio-hour  ${point['usd_per_1k_chars']:.4f}/1k chars"
+            )
+
+    if not args.no_save:
+        path = results.save_runs(
+            "cost_report",
+            "modeled",
+            points,
+            extra={
+                "text_chars": args.chars,
+                "rates": args.rates,
+                "scaledown": args.scaledown,
+                "keep_warm": args.keep_warm,
+                "usd_per_hour": {d: cost.hourly_usd(d) for d in deployments},
+                "measured": measured,
+                "pareto": {rate: [(p["deployment"], p["policy"]) for p in front] for rate, front in fronts.items()},
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
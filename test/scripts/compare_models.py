@@ -22,6 +22,11 @@ from pathlib import Path
 
 import requests
 
+try:
+    from tts_bench.latency_model import load_trained
+except ImportError:  # numpy not installed: keep the fixed timeout
+    load_trained = None
+
 # =============================================================================
 # Configuration
 # =============================================================================
@@ -51,7 +56,11 @@ RESULTS_DIR = TEST_DIR / "results"
 
 # Test configuration
 NUM_WARM_RUNS = 3  # Number of runs after warmup for averaging
-REQUEST_TIMEOUT = 600  # 10 minutes max per request
+REQUEST_TIMEOUT = 600  # Fallback when no latency model is available
+
+# Per-request timeouts from the fitted latency model (fit_latency_model.py),
+# loaded by run_comparison() so importing this module writes nothing
+LATENCY_MODEL = None
 
 
 def load_reference_audio() -> tuple[str, str]:
@@ -107,11 +116,20 @@ def clone_voice(
     ref_audio_b64: str,
     ref_text: str,
     language: str = "English",
+    may_be_cold: bool = False,
 ) -> tuple[float, bytes | None, str | None]:
     """
     Call the clone endpoint and return (time_seconds, audio_bytes, error).
     """
     endpoint = ENDPOINTS[model]["clone"]
+    timeout = REQUEST_TIMEOUT
+    if LATENCY_MODEL is not None:
+        timeout = LATENCY_MODEL.timeout_for(
+            ENDPOINTS[model]["output_folder"],
+            len(text),
+            language,
+            may_be_cold=may_be_cold,
+        )
     payload = {
         "text": text,
         "language": language,
@@ -121,7 +139,7 @@ def clone_voice(
 
     start = time.time()
     try:
-        resp = requests.post(endpoint, json=payload, timeout=REQUEST_TIMEOUT)
+        resp = requests.post(endpoint, json=payload, timeout=timeout)
         elapsed = time.time() - start
 
         if resp.status_code == 200:
@@ -156,6 +174,10 @@ def save_audio(audio_bytes: bytes, model: str, text_name: str, run_num: int = 0)
 
 def run_comparison():
     """Run the full comparison between 1.7B and 0.6B models."""
+    global LATENCY_MODEL
+    if load_trained:
+        LATENCY_MODEL = load_trained()
+
     print("=" * 70)
     print("Qwen3-TTS Model Comparison: 1.7B vs 0.6B")
     print("=" * 70)
@@ -201,7 +223,9 @@ def run_comparison():
 
     for model in ENDPOINTS:
         print(f"\n{model} cold start...")
-        elapsed, audio, error = clone_voice(model, warmup_text, ref_audio_b64, ref_text)
+        elapsed, audio, error = clone_voice(
+            model, warmup_text, ref_audio_b64, ref_text, may_be_cold=True
+        )
 
         if error:
             print(f"  ERROR: {error}")
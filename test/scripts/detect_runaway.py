@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Runaway-generation detector: flag looping/silent outputs and abort them early.
+
+Three modes:
+
+  Saved outputs (default): analyze test/outputs/<folder>/{short,medium,long}.wav
+  (or --wav files with --text) against the text they were generated from.
+
+  Self-check (--self-check): render clean synthetic speech for the job mix
+  and input texts as the stand-in does and fail if any clip is flagged.
+
+  Live (--live): run a caption/paragraph mix through the clone endpoint with
+  streaming. Each response is aborted as soon as its audio exceeds
+  --abort-ratio x the expected duration, and every output is analyzed for
+  duration overshoot, silence and repetition. Against the stand-in,
+  --runaway-rate injects the failure so the saved GPU time can be measured.
+  Aborted and flagged runs are saved with "runaway_time" instead of "time",
+  so their truncated timings never train the latency model.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python detect_runaway.py
+    uv run --with requests --with numpy python detect_runaway.py --wav out.wav --text "Hello there."
+    uv run --with requests --with numpy python detect_runaway.py --self-check
+    uv run --with requests --with numpy python detect_runaway.py --live --runaway-rate 0.2
+    uv run --with requests --with numpy python detect_runaway.py --live --no-abort --runaway-rate 0.2
+    uv run --with requests --with numpy python detect_runaway.py --live --deployment 0.6B-A10G-SDPA
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy  # noqa: F401
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python detect_runaway.py")
+    sys.exit(1)
+
+from tts_bench import audio, client, config, results, runaway
+from tts_bench.standin import add_standin_arguments, standin_kwargs, start_standin
+from tts_bench.workload import mixed_jobs
+
+
+def print_row(name: str, finding: dict, extra: str = ""):
+    flag = "RUNAWAY" if finding["runaway"] else "ok"
+    print(
+        f"{name:<34} {finding['duration']:>7.1f}s {finding['expected']:>7.1f}s "
+        f"{finding['duration_ratio']:>6.2f}x {finding['repetition_score']:>6.2f} "
+        f"{finding['silent_tail']:>6.1f}s │ {flag:<8}{extra}"
+    )
+    for reason in finding["reasons"]:
+        print(f"{'':<36}- {reason}")
+
+
+def print_header():
+    print(f"\n{'Output':<34} {'Dur':>8} {'Expect':>8} {'Ratio':>7} {'Repeat':>6} {'Tail':>7} │ Result")
+    print("-" * 90)
+
+
+def analyze_saved(args) -> int:
+    """Analyze WAV files on disk."""
+    items = []
+    if args.wav:
+        if not args.text:
+            print("Error: --text is required with --wav")
+            return 1
+        items = [(path, args.text) for path in args.wav]
+    else:
+        texts = {p.stem: p.read_text(encoding="utf-8").strip() for p in config.TEXTS_DIR.glob("*.txt")}
+        for path in sorted(config.OUTPUTS_DIR.glob("*/*.wav")):
+            if path.stem in texts:
+                items.append((path, texts[path.stem]))
+
+    print_header()
+    findings = []
+    for path, text in items:
+        finding = runaway.analyze_wav(
+            path.read_bytes(),
+            text,
+            max_new_tokens=args.max_new_tokens,
+            duration_ratio=args.abort_ratio,
+        )
+        findings.append(finding)
+        name = str(path.relative_to(config.TEST_DIR)) if path.is_relative_to(config.TEST_DIR) else str(path)
+        print_row(name[-34:], finding)
+
+    outliers = runaway.flag_outliers([f["duration_ratio"] for f in findings])
+    flagged = sum(1 for f, o in zip(findings, outliers) if f["runaway"] or o)
+    print(f"\n{flagged}/{len(findings)} outputs flagged")
+    return 0
+
+
+def self_check(args) -> int:
+    """Analyze clean synthetic speech the way the stand-in renders each job; none may be flagged."""
+    texts = [job["text"] for job in mixed_jobs(args.captions, args.paragraphs, seed=args.seed)]
+    texts += [p.read_text(encoding="utf-8").strip() for p in sorted(config.TEXTS_DIR.glob("*.txt"))]
+    print_header()
+    flagged = 0
+    for text in texts:
+        seconds = runaway.expected_seconds(text, max_new_tokens=args.max_new_tokens)
+        samples = audio.synth_speech(seconds, seed=len(text))
+        finding = runaway.analyze(
+            samples,
+            audio.MODEL_SAMPLE_RATE,
+            text,
+            max_new_tokens=args.max_new_tokens,
+            duration_ratio=args.abort_ratio,
+        )
+        flagged += finding["runaway"]
+        print_row(f"clean {len(text)} chars", finding)
+    print(f"\n{flagged}/{len(texts)} clean clips flagged" + (" (false positives)" if flagged else ""))
+    return 1 if flagged else 0
+
+
+def run_live(args) -> int:
+    """Stream a job mix through the endpoint with the abort guard."""
+    server = None
+    if args.deployment:
+        endpoint = config.get_deployment(args.deployment)
+        target = args.deployment
+    else:
+        server, endpoint = start_standin(**standin_kwargs(args))
+        target = endpoint["name"]
+
+    ref_audio_b64, ref_text = client.load_reference(preprocess=args.preprocess_reference)
+    jobs = mixed_jobs(args.captions, args.paragraphs, seed=args.seed)
+
+    print("=" * 70)
+    print("Runaway Detection (live)")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {target}")
+    print(f"Jobs: {len(jobs)}, max_new_tokens={args.max_new_tokens}")
+    print(f"Abort: {'off' if args.no_abort else f'> {args.abort_ratio:g}x expected duration'}")
+    print_header()
+
+    records = []
+    for job in jobs:
+        payload = client.build_payload(
+            job["text"], ref_audio_b64, ref_text, max_new_tokens=args.max_new_tokens
+        )
+        guard = None if args.no_abort else runaway.abort_guard(job["text"], ratio=args.abort_ratio)
+        record, body = client.stream_clone(endpoint, payload, timeout=args.timeout, on_chunk=guard)
+        record.update({"id": job["id"], "kind": job["kind"]})
+        if body:
+            finding = runaway.analyze_wav(
+                body,
+                job["text"],
+                max_new_tokens=args.max_new_tokens,
+                duration_ratio=args.abort_ratio,
+            )
+            if record.get("aborted"):
+                finding["runaway"] = True
+                finding["reasons"].insert(0, f"aborted at {finding['duration']:.1f}s of audio")
+            record["finding"] = finding
+            print_row(job["id"], finding, f" {record['time']:.2f}s")
+        else:
+            print(f"{job['id']:<34} ERROR: {record.get('error')}")
+        del record["chunk_times"], record["chunk_audio"]
+        records.append(record)
+
+    analyzed = [r for r in records if "finding" in r]
+    outliers = runaway.flag_outliers([r["finding"]["duration_ratio"] for r in analyzed])
+    for record, outlier in zip(analyzed, outliers):
+        record["outlier"] = outlier
+
+    flagged = sum(1 for r in analyzed if r["finding"]["runaway"] or r["outlier"])
+    aborted = sum(1 for r in records if r.get("aborted"))
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+    print(f"Flagged: {flagged}/{len(records)}  Aborted early: {aborted}")
+    print(f"Client wall time: {sum(r['time'] for r in records):.1f}s")
+
+    summary = {"flagged": flagged, "aborted": aborted}
+    if server:
+        # GPU time is emulated seconds, comparable across time scales
+        print(f"Injected runaways (stand-in): {server.runaway_count}")
+        print(f"Emulated GPU time spent: {server.gpu_seconds:.1f}s")
+        summary.update({"injected": server.runaway_count, "gpu_seconds": server.gpu_seconds})
+        server.shutdown()
+
+    if not args.no_save:
+        for record in records:
+            if record.get("aborted") or record.get("outlier") or record.get("finding", {}).get("runaway"):
+                # Cut short or looping: save the timing under another key so
+                # results.load_file() never trains the latency model on it
+                record["runaway_time"] = record.pop("time")
+        path = results.save_runs(
+            "runaway_detection",
+            args.deployment or "local",
+            records,
+            extra={"stand_in": server is not None, "target": target, "summary": summary},
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect and abort runaway TTS generations")
+    parser.add_argument("--wav", type=Path, nargs="+", default=None, help="WAV file(s) to analyze")
+    parser.add_argument("--text", default=None, help="Text the --wav files were generated from")
+    parser.add_argument("--live", action="store_true", help="Run jobs against an endpoint with streaming")
+    parser.add_argument(
+        "--self-check", action="store_true", help="Check that clean stand-in speech for the job mix is not flagged"
+    )
+    parser.add_argument("--deployment", default=None, help="Live target deployment (default: local stand-in)")
+    parser.add_argument("--captions", type=int, default=8)
+    parser.add_argument("--paragraphs", type=int, default=2)
+    parser.add_argument("--max-new-tokens", type=int, default=2048)
+    parser.add_argument(
+        "--abort-ratio",
+        type=float,
+        default=runaway.DURATION_RATIO,
+        help=f"Abort/flag when audio exceeds this multiple of expected duration (default: {runaway.DURATION_RATIO:g})",
+    )
+    parser.add_argument("--no-abort", action="store_true", help="Let runaways finish (baseline for GPU time)")
+    parser.add_argument("--timeout", type=float, default=config.FALLBACK_TIMEOUT)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    parser.add_argument(
+        "--preprocess-reference",
+        action="store_true",
+        help="Send the trimmed/mono/24kHz reference instead of the raw file",
+    )
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    if args.self_check:
+        return self_check(args)
+    if args.live:
+        return run_live(args)
+    return analyze_saved(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
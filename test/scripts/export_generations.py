@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Export a user's completed generations from the API Worker to WAV files.
+
+Lists the completed generations (newest first, --limit of them) and
+downloads each through GET /api/generations/:id/audio and the signed
+storage URL it redirects to, --workers at a time, streaming to
+<out>/<generation id>.wav with a manifest.json (text, voice, language,
+duration) next to them (tts_bench.export). Files already in --out are
+skipped, so rerunning an interrupted export finishes it. A 429 waits
+the Worker's retry_after_seconds; both requests count against the tier-3
+IP limit (300 per 5 minutes by default, about 30 clips a minute).
+
+Usage:
+    cd test/scripts
+    UTTER_EMAIL=... UTTER_PASSWORD=... uv run --with requests python export_generations.py
+    UTTER_EMAIL=... UTTER_PASSWORD=... uv run --with requests python export_generations.py \\
+        --api-url http://127.0.0.1:8787 --out ../outputs/export --limit 200 --workers 8
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import requests
+except ImportError:
+    print("Error: requests library required")
+    print("Run: uv run --with requests python export_generations.py")
+    sys.exit(1)
+
+from tts_bench import config, export
+from tts_bench.stats import fmt_seconds
+from tts_bench.worker_client import WorkerAPIError, WorkerClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export completed generations to WAV files")
+    parser.add_argument("--api-url", default=config.WORKER_API_URL, help="API Worker base URL")
+    parser.add_argument("--email", default=os.getenv("UTTER_EMAIL"), help="Sign-in email (default: $UTTER_EMAIL)")
+    parser.add_argument("--password", default=os.getenv("UTTER_PASSWORD"), help="Password (default: $UTTER_PASSWORD)")
+    parser.add_argument("--token", default=os.getenv("UTTER_ACCESS_TOKEN"), help="Bearer access token instead")
+    parser.add_argument(
+        "--out", type=Path, default=config.OUTPUTS_DIR / "export", help="Output directory (default: outputs/export)"
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Newest N generations only")
+    parser.add_argument("--workers", type=int, default=export.DEFAULT_WORKERS, help="Downloads in flight")
+    parser.add_argument("--timeout", type=float, default=90.0, help="Per-request timeout (seconds)")
+    args = parser.parse_args()
+
+    if not args.token and not (args.email and args.password):
+        print("Error: --email/--password or --token required")
+        return 1
+
+    print("=" * 70)
+    print("Export Generations")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"API: {args.api_url}  Output: {args.out}  Workers: {args.workers}")
+
+    worker = WorkerClient(args.api_url, access_token=args.token, pool_size=args.workers, timeout=args.timeout)
+    done = {"count": 0}
+    print_lock = threading.Lock()
+
+    def on_done(record: dict):
+        if "error" in record:
+            state = f"error: {record['error']}"
+        elif record.get("skipped"):
+            state = "already exported"
+        else:
+            state = f"{record['bytes'] / 1e6:.1f} MB in {fmt_seconds(record['total']).strip()}"
+        with print_lock:
+            done["count"] += 1
+            print(f"  [{done['count']}/{len(generations)}] {record['id']}  {state}", flush=True)
+
+    try:
+        if not args.token:
+            worker.sign_in(args.email, args.password)
+        generations = export.completed_generations(worker, limit=args.limit)
+        print(f"Completed generations: {len(generations)}\n")
+        start = time.perf_counter()
+        records = export.export(
+            worker, generations, args.out, workers=args.workers, timeout=args.timeout, on_done=on_done
+        )
+        wall = time.perf_counter() - start
+    except (WorkerAPIError, requests.exceptions.RequestException) as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        worker.close()
+
+    fetched = [r for r in records if "error" not in r and not r.get("skipped")]
+    skipped = sum(1 for r in records if r.get("skipped"))
+    failed = [r for r in records if "error" in r]
+    total = sum(r["bytes"] for r in fetched)
+    print(f"\nExported {len(fetched)} clips ({total / 1e6:,.1f} MB) in {fmt_seconds(wall).strip()}", end="")
+    print(f", {total / 1e6 / wall:.1f} MB/s" if wall and fetched else "")
+    print(f"Skipped (already exported): {skipped}  Failed: {len(failed)}  ", end="")
+    print(f"429s: {sum(r['rate_limited'] for r in records)}")
+    print(f"Manifest: {args.out / 'manifest.json'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Fit (or incrementally update) the per-deployment latency model.
+
+Reads every results/*.json file not yet ingested, folds it into the persisted
+model at results/_latency_model.json, and prints the fitted coefficients plus
+predictions and adaptive timeouts for the standard input texts.
+
+Usage:
+    cd test/scripts
+    uv run --with numpy python fit_latency_model.py                  # Update with new results
+    uv run --with numpy python fit_latency_model.py --rebuild        # Refit from scratch
+    uv run --with numpy python fit_latency_model.py --chars 2600 --deployment 0.6B-T4-SDPA
+    uv run --with numpy python fit_latency_model.py --chars 300 --language Chinese --cold
+"""
+
+import argparse
+import sys
+
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    print("Error: numpy library not installed.")
+    print("Install with: uv run --with numpy python fit_latency_model.py")
+    sys.exit(1)
+
+from tts_bench import config
+from tts_bench.client import load_text
+from tts_bench.latency_model import MODEL_PATH, LatencyModel
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the per-deployment latency model")
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Discard the persisted model and re-ingest every results file",
+    )
+    parser.add_argument(
+        "--deployment",
+        default=None,
+        help="Only report this deployment (default: all fitted deployments)",
+    )
+    parser.add_argument(
+        "--chars",
+        type=int,
+        action="append",
+        default=None,
+        help="Text length(s) to predict (default: inputs/texts/*.txt)",
+    )
+    parser.add_argument("--language", default=config.DEFAULT_LANGUAGE)
+    parser.add_argument("--ref-seconds", type=float, default=None)
+    parser.add_argument("--max-new-tokens", type=int, default=None)
+    parser.add_argument(
+        "--cold",
+        action="store_true",
+        help="Include cold-start allowance in the suggested timeouts",
+    )
+    args = parser.parse_args()
+
+    model = LatencyModel() if args.rebuild else LatencyModel.load()
+    new_files = model.update()
+    model.save()
+
+    print("=" * 70)
+    print("Latency Model")
+    print("=" * 70)
+    print(f"Model file: {MODEL_PATH.relative_to(config.TEST_DIR)}")
+    print(f"Ingested: {len(model.ingested)} files ({len(new_files)} new)")
+    for name in new_files:
+        print(f"  + {name}")
+
+    summary = model.summary()
+    print(f"\n{'Deployment':<18} {'Samples':>8} {'Cold':>5} │ {'b0':>8} {'b/speech_s':>11} {'b/ref_s':>8} │ {'rel std':>8}")
+    print("-" * 78)
+    for key, info in summary.items():
+        coef = info["coefficients"] or {}
+        rel = info["relative_std"]
+        print(
+            f"{key:<18} {info['samples']:>8} {info['cold_samples']:>5} │ "
+            f"{coef.get('intercept', 0):>8.2f} {coef.get('speech_seconds', 0):>11.3f} "
+            f"{coef.get('ref_seconds', 0):>8.3f} │ {(rel or 0):>8.1%}"
+            + ("  (pooled)" if info["pooled"] else "")
+        )
+
+    if args.chars:
+        lengths = [(f"{c} chars", c) for c in args.chars]
+    else:
+        lengths = []
+        for path in sorted(config.TEXTS_DIR.glob("*.txt")):
+            lengths.append((path.stem, len(load_text(path.stem))))
+
+    deployments = [args.deployment] if args.deployment else [k for k in summary if k != "_all"]
+    print(f"\nPredictions ({args.language}, max_new_tokens={args.max_new_tokens}, cold={args.cold})")
+    print(f"\n{'Deployment':<18} {'Text':<12} {'Chars':>6} │ {'Expected':>9} {'± std':>8} │ {'Timeout':>8}")
+    print("-" * 70)
+    for deployment in deployments:
+        for label, chars in lengths:
+            prediction = model.predict(
+                deployment, chars, args.language, args.ref_seconds, args.max_new_tokens
+            )
+            timeout = model.timeout_for(
+                deployment,
+                chars,
+                args.language,
+                args.ref_seconds,
+                args.max_new_tokens,
+                may_be_cold=args.cold,
+            )
+            if prediction:
+                mean, std = prediction
+                print(f"{deployment:<18} {label:<12} {chars:>6} │ {mean:>8.1f}s {std:>7.1f}s │ {timeout:>7.0f}s")
+            else:
+                print(f"{deployment:<18} {label:<12} {chars:>6} │ {'-':>9} {'-':>8} │ {timeout:>7.0f}s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
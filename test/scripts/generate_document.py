@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Generate a long document through the API Worker in one run.
+
+Splits the document into chunks the Worker accepts (tts_bench.bulk),
+prices them (1 credit per character), checks the total against the
+balance from /api/credits/usage, then generates every chunk under
+credit, rate-limit (token bucket per tier) and active-job admission,
+downloads the results and stitches them in document order.
+
+Reports:
+- chunks, credits planned vs debited (balance before/after)
+- 429s per tier, failed debits (402), cap rejections (409)
+- time spent waiting on each tier's bucket
+- sustained throughput (chunks, characters and audio seconds per minute)
+  next to the tier-1 ceiling the Worker's generate limit allows
+
+A document that costs more than the balance is refused before anything is
+submitted; --allow-partial generates the leading chunks that fit instead.
+
+By default the target is the Worker stand-in with its default rate limits,
+so the limiter is what sets the pace. --rate-limit must match the target's
+RATE_LIMIT_* settings (workers/api/.dev.vars for `wrangler dev`).
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python generate_document.py
+    uv run --with requests --with numpy python generate_document.py --input chapter.txt --output chapter.wav
+    uv run --with requests --with numpy python generate_document.py --repeat 2 --credits 3000 --allow-partial
+    UTTER_EMAIL=... UTTER_PASSWORD=... uv run --with requests --with numpy python generate_document.py \\
+        --api-url http://127.0.0.1:8787 --voice-id <uuid> --input chapter.txt --output chapter.wav
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy  # noqa: F401
+    import requests
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python generate_document.py")
+    sys.exit(1)
+
+from tts_bench import bulk, config, results
+from tts_bench.standin import add_standin_arguments, standin_kwargs
+from tts_bench.standin_dashscope import DEFAULT_GPU_SLOTS
+from tts_bench.standin_worker import parse_rate_limits, start_worker_standin
+from tts_bench.stats import fmt_seconds, summarize
+from tts_bench.worker_client import RATE_LIMIT_DEFAULTS, WorkerAPIError, WorkerClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a long document through the API Worker")
+    parser.add_argument("--input", type=Path, default=config.TEXTS_DIR / "long.txt", help="Document (plain text)")
+    parser.add_argument("--repeat", type=int, default=4, help="Repeat the document N times (paragraph breaks)")
+    parser.add_argument("--output", type=Path, default=None, help="Write the stitched WAV here")
+    parser.add_argument(
+        "--max-chars", type=int, default=bulk.CHUNK_CHARS, help=f"Chunk length cap (default: {bulk.CHUNK_CHARS})"
+    )
+    parser.add_argument("--gap", type=float, default=0.3, help="Silence between chunks when stitching (seconds)")
+    parser.add_argument("--burst", type=int, default=1, help="Token-bucket capacity per rate-limit tier")
+    parser.add_argument("--max-active", type=int, default=None, help="Jobs in flight (default: the plan's cap)")
+    parser.add_argument("--allow-partial", action="store_true", help="Generate the chunks the balance covers")
+    parser.add_argument("--language", default="Auto")
+    parser.add_argument("--api-url", default=None, help="Real API Worker base URL (default: local stand-in)")
+    parser.add_argument("--email", default=os.getenv("UTTER_EMAIL"), help="Sign-in email (default: $UTTER_EMAIL)")
+    parser.add_argument("--password", default=os.getenv("UTTER_PASSWORD"), help="Password (default: $UTTER_PASSWORD)")
+    parser.add_argument("--voice-id", default=None, help="Voice to generate with (required with --api-url)")
+    parser.add_argument("--credits", type=int, default=None, help="Stand-in user's starting balance")
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="The target's RATE_LIMIT_* override, for the stand-in and the limiter alike (repeatable)",
+    )
+    parser.add_argument("--timeout", type=float, default=900.0, help="Per-chunk poll timeout (seconds)")
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    parser.set_defaults(gpu_slots=DEFAULT_GPU_SLOTS)
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"Error: {args.input} not found")
+        return 1
+    document = "\n\n".join([args.input.read_text(encoding="utf-8").strip()] * args.repeat)
+    chunks = bulk.split_document(document, min(args.max_chars, config.WORKER_MAX_TEXT_CHARS))
+    rate_limits = parse_rate_limits(args.rate_limit)
+
+    server = None
+    if args.api_url:
+        if not (args.voice_id and args.email and args.password):
+            print("Error: --api-url needs --voice-id and --email/--password")
+            return 1
+        endpoint = {"name": f"API Worker ({args.api_url})", "base_url": args.api_url, "voice_id": args.voice_id}
+        endpoint.update(email=args.email, password=args.password)
+        time_scale = 1.0
+    else:
+        server, endpoint = start_worker_standin(
+            time_scale=args.time_scale,
+            seed=args.seed,
+            provider_kwargs={**standin_kwargs(args), "deployment": "qwen-cloud-vc"},
+            rate_limits=rate_limits,
+            max_concurrency=4,
+        )
+        if args.credits is not None:
+            for user in server.users.values():
+                user["credits"] = args.credits
+        time_scale = args.time_scale
+
+    limits = {**RATE_LIMIT_DEFAULTS, **rate_limits}
+    window = limits["RATE_LIMIT_WINDOW_SECONDS"]
+    tier1_limit = min(limits["RATE_LIMIT_TIER1_USER_LIMIT"], limits["RATE_LIMIT_TIER1_IP_LIMIT"])
+
+    print("=" * 70)
+    print("Bulk Document Generation")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {endpoint['name']}")
+    print(f"Document: {args.input.name} x{args.repeat}, {len(document):,} characters -> {len(chunks)} chunks")
+    print(f"Chunk length: {summarize([len(c) for c in chunks])['mean'] or 0:.0f} mean, {max(map(len, chunks))} max")
+
+    worker = WorkerClient(endpoint["base_url"], pool_size=8, timeout=60.0, time_scale=time_scale)
+    try:
+        worker.sign_in(endpoint["email"], endpoint["password"])
+        before = bulk.plan(worker, chunks)
+        max_active = min(args.max_active or before["max_active"], before["max_active"])
+        print(
+            f"Plan: {before['tier']}  Balance: {before['balance']:,}  Cost: {before['cost']:,} credits  "
+            f"Active cap: {before['max_active']}"
+        )
+        print(f"Admission: {max_active} in flight, token buckets of {args.burst} (limits over {window}s windows)")
+        if not before["fits"]:
+            if not args.allow_partial:
+                print(f"Error: the document needs {before['cost'] - before['balance']:,} more credits")
+                print("       (--allow-partial generates the chunks the balance covers)")
+                return 1
+            print("Balance short: generating the leading chunks that fit (--allow-partial)")
+
+        generator = bulk.BulkGenerator(
+            worker,
+            endpoint["voice_id"],
+            before["balance"],
+            max_active=max_active,
+            limits=rate_limits,
+            burst=args.burst,
+            language=args.language,
+            timeout=args.timeout,
+            seed=args.seed,
+        )
+        start = time.perf_counter()
+        records = generator.run(chunks)
+        wall = (time.perf_counter() - start) / time_scale
+        after = bulk.plan(worker, chunks)
+    except (RuntimeError, WorkerAPIError, requests.exceptions.RequestException) as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        worker.close()
+        if server:
+            server.shutdown()
+
+    # In document order up to the first chunk that did not come back
+    done = [r for r in records if "wav" in r]
+    prefix = next((i for i, r in enumerate(records) if "wav" not in r), len(records))
+    stitched, audio_seconds = bulk.stitch([r["wav"] for r in records[:prefix]], args.gap)
+    if args.output and stitched:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_bytes(stitched)
+    for record in records:
+        record.pop("wav", None)
+
+    ok_chars = sum(r["text_chars"] for r in done)
+    debited = before["balance"] - after["balance"]
+    rate_limited = generator.rate_limited
+    print("\n" + "=" * 70)
+    print("SUMMARY (emulated seconds)" if server else "SUMMARY")
+    print("=" * 70)
+    print(f"\nChunks: {len(done)}/{len(records)} generated  Wall: {fmt_seconds(wall).strip()}")
+    print(
+        f"Credits: {sum(r['credits'] for r in done):,} for the generated chunks, "
+        f"{debited:,} net debited (balance {after['balance']:,})"
+    )
+    print(
+        f"429s: tier1 {rate_limited['tier1']}, tier2 {rate_limited['tier2']}, tier3 {rate_limited['tier3']}  "
+        f"Failed debits (402): {sum(1 for r in records if r.get('failed_debit'))}  "
+        f"Cap rejections (409): {sum(r['cap_rejected'] for r in records)}"
+    )
+    print(f"\n{'Bucket':<7} │ {'Requests':>8} {'Waited':>9}")
+    print("-" * 28)
+    for tier, bucket in generator.buckets.items():
+        print(f"{tier:<7} │ {bucket.acquired:>8} {fmt_seconds(bucket.waited, 9)}")
+
+    throughput = {
+        "chunks_per_minute": len(done) / wall * 60 if wall else None,
+        "chars_per_minute": ok_chars / wall * 60 if wall else None,
+        "audio_seconds_per_minute": sum(r["audio_seconds"] for r in done) / wall * 60 if wall else None,
+        "tier1_ceiling_chunks_per_minute": tier1_limit / window * 60,
+    }
+    polls = summarize([r["polls"] for r in done])
+    print(
+        f"\nThroughput: {throughput['chunks_per_minute'] or 0:.2f} chunks/min "
+        f"(tier-1 ceiling {throughput['tier1_ceiling_chunks_per_minute']:.2f}), "
+        f"{throughput['chars_per_minute'] or 0:,.0f} chars/min, "
+        f"{throughput['audio_seconds_per_minute'] or 0:.0f} audio s/min"
+    )
+    print(f"Polls per chunk: mean {polls['mean'] or 0:.1f}, max {polls['max'] or 0:.0f}")
+    print(f"Stitched: {prefix} chunks, {audio_seconds:.1f}s of audio", end="")
+    print(f" -> {args.output}" if args.output and stitched else "")
+    for record in records:
+        if "error" in record:
+            print(f"  chunk {record['index']}: {record['status'].upper()} - {record['error']}")
+
+    if not args.no_save:
+        path = results.save_runs(
+            "bulk_generation",
+            args.api_url or "local",
+            records,
+            extra={
+                "stand_in": server is not None,
+                "time_scale": time_scale,
+                "document": args.input.name,
+                "repeat": args.repeat,
+                "burst": args.burst,
+                "max_active": max_active,
+                "plan": before,
+                "balance_after": after["balance"],
+                "debited": debited,
+                "rate_limited": rate_limited,
+                "wall": wall,
+                "throughput": throughput,
+                "stitched_chunks": prefix,
+                "audio_seconds": audio_seconds,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Load synthetic History rows into local Supabase for bench_history.py.
+
+Creates --users sign-in-able users whose generation counts follow a heavy
+tail (the first user gets the most) and COPYs --rows generations, one
+generate task each, plus their voices (tts_bench.history). The tables are
+vacuumed and analyzed afterwards so the planner sees the real row counts.
+
+Load users live under @history-load.test with a shared password. A new
+load needs the previous one removed first (--drop); --drop-only removes
+it and stops. Nothing outside that email domain is touched.
+
+Needs `supabase start` (SUPABASE_DB_URL, default the local database port
+from supabase/config.toml) and psycopg.
+
+Usage:
+    cd test/scripts
+    uv run --with numpy --with 'psycopg[binary]' python load_history.py
+    uv run --with numpy --with 'psycopg[binary]' python load_history.py --rows 200000 --users 50 --drop
+    uv run --with numpy --with 'psycopg[binary]' python load_history.py --drop-only
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+
+try:
+    import numpy  # noqa: F401
+    import psycopg
+except ImportError:
+    print("Error: numpy and psycopg libraries required")
+    print("Run: uv run --with numpy --with 'psycopg[binary]' python load_history.py")
+    sys.exit(1)
+
+from tts_bench import config, history
+from tts_bench.stats import summarize
+
+TABLES = ["voices", "generations", "tasks"]
+
+
+def table_sizes(conn) -> dict:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT relname, n_live_tup, pg_total_relation_size(relid), pg_indexes_size(relid)
+            FROM pg_stat_user_tables WHERE schemaname = 'public' AND relname = ANY(%s)
+            """,
+            [TABLES],
+        )
+        return {name: {"rows": rows, "bytes": total, "index_bytes": idx} for name, rows, total, idx in cur.fetchall()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load synthetic History rows into local Supabase")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Generations to load (one task each)")
+    parser.add_argument("--users", type=int, default=200, help="Load users")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of rows per user")
+    parser.add_argument("--days", type=int, default=365, help="created_at spread (days back from now)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db-url", default=config.SUPABASE_DB_URL, help="Postgres URL (default: $SUPABASE_DB_URL)")
+    parser.add_argument("--drop", action="store_true", help="Delete the previous load users first")
+    parser.add_argument("--drop-only", action="store_true", help="Delete the load users and stop")
+    args = parser.parse_args()
+
+    if args.users < 1 or args.rows < args.users:
+        print("Error: need --users >= 1 and --rows >= --users")
+        return 1
+
+    print("=" * 70)
+    print("History Load")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    try:
+        conn = history.connect(args.db_url)
+    except psycopg.Error as e:
+        print(f"Error: {e}")
+        return 1
+
+    with conn:
+        existing = history.load_users(conn)
+        if existing and (args.drop or args.drop_only):
+            start = time.perf_counter()
+            deleted = history.drop(conn)
+            print(f"Dropped {deleted} load users in {time.perf_counter() - start:.1f}s")
+            existing = []
+        if args.drop_only:
+            return 0
+        if existing:
+            print(f"Error: {len(existing)} load users already exist ({sum(u['generations'] for u in existing):,} rows)")
+            print("       (--drop replaces them, --drop-only removes them)")
+            return 1
+
+        counts = history.rows_per_user(args.rows, args.users, args.skew)
+        spread = summarize(counts)
+        print(f"Rows: {args.rows:,} generations + tasks across {args.users} users (Zipf {args.skew:g})")
+        print(f"Rows per user: max {counts[0]:,}, p95 {spread['p95']:,.0f}, median {spread['p50']:,.0f}")
+        print(f"created_at spread: {args.days} days  Seed: {args.seed}\n")
+
+        loaded = 0
+        started = time.perf_counter()
+
+        def on_user(index: int, email: str, count: int):
+            nonlocal loaded
+            loaded += count
+            if count >= 10_000 or index + 1 == args.users or (index + 1) % 50 == 0:
+                rate = loaded / (time.perf_counter() - started)
+                print(f"  [{index + 1:>4}/{args.users}] {email:<32} {count:>9,} rows  ({rate:,.0f} rows/s overall)")
+
+        try:
+            totals = history.load(conn, args.rows, args.users, args.skew, args.days, args.seed, on_user=on_user)
+        except psycopg.Error as e:
+            print(f"Error: {e} (the load was rolled back)")
+            return 1
+        sizes = table_sizes(conn)
+
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+    print(
+        f"\nLoaded {totals['generations']:,} generations, {totals['tasks']:,} tasks, {totals['voices']:,} voices "
+        f"in {totals['load_seconds']:.1f}s ({totals['generations'] / totals['load_seconds']:,.0f} generations/s)"
+    )
+    print(f"VACUUM ANALYZE: {totals['vacuum_seconds']:.1f}s")
+    print(f"\n{'Table':<12} │ {'Rows':>11} {'Total MB':>9} {'Index MB':>9}")
+    print("-" * 46)
+    for table in TABLES:
+        size = sizes.get(table)
+        if size:
+            print(f"{table:<12} │ {size['rows']:>11,} {size['bytes'] / 1e6:>9.1f} {size['index_bytes'] / 1e6:>9.1f}")
+    print(f"\nSign in as history0000@{history.LOAD_DOMAIN} (heaviest, {totals['heaviest']:,} rows) ... ", end="")
+    print(f"history{args.users - 1:04d}@{history.LOAD_DOMAIN}, password {history.LOAD_PASSWORD}")
+    print("Next: python bench_history.py")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
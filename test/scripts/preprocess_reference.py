@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Reference preprocessing benchmark: bytes saved and latency change.
+
+Every script base64-encodes the reference WAV verbatim. This runs the same
+text with each reference sent three ways, interleaved run by run so drift
+hits all of them equally:
+
+  raw         the file as stored
+  processed   silence trimmed, mono, resampled to 24kHz (tts_bench.reference)
+  normalized  processed + loudness normalized to --target-dbfs
+
+and reports upload bytes saved, the request-latency change against raw, and
+how close each output's spectral signature stays to the raw output.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python preprocess_reference.py
+    uv run --with requests --with numpy python preprocess_reference.py --runs 5 --text medium
+    uv run --with requests --with numpy python preprocess_reference.py --deployment 0.6B-A10G-SDPA
+"""
+
+import argparse
+import base64
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy  # noqa: F401
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python preprocess_reference.py")
+    sys.exit(1)
+
+from tts_bench import audio, client, config, reference, results
+from tts_bench.standin import add_standin_arguments, standin_kwargs, start_standin
+from tts_bench.stats import fmt_seconds, summarize
+
+MODES = ["raw", "processed", "normalized"]
+
+
+def build_modes(wav: bytes, target_dbfs: float) -> dict[str, tuple[bytes, float]]:
+    """WAV bytes per mode and the (uncached) preprocessing time it cost."""
+    modes = {"raw": (wav, 0.0)}
+    for mode, normalize in [("processed", False), ("normalized", True)]:
+        start = time.perf_counter()
+        processed = reference.preprocess(wav, normalize=normalize, target_dbfs=target_dbfs)
+        modes[mode] = (processed, time.perf_counter() - start)
+    return modes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reference preprocessing: bytes saved and latency change")
+    parser.add_argument(
+        "--reference",
+        type=Path,
+        nargs="+",
+        default=None,
+        help="Reference WAV(s) (default: every inputs/reference/*.wav)",
+    )
+    parser.add_argument("--text", default="short", help="inputs/texts name to synthesize")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per (reference, mode)")
+    parser.add_argument("--target-dbfs", type=float, default=-20.0, help="Loudness target for 'normalized'")
+    parser.add_argument("--deployment", default=None, help="Target deployment (default: local stand-in)")
+    parser.add_argument("--timeout", type=float, default=config.FALLBACK_TIMEOUT)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    paths = args.reference or sorted((config.INPUTS_DIR / "reference").glob("*.wav"))
+    if not paths:
+        print(f"Error: no reference WAVs found in {config.INPUTS_DIR / 'reference'}")
+        return 1
+
+    server = None
+    if args.deployment:
+        endpoint = config.get_deployment(args.deployment)
+        time_scale = 1.0
+    else:
+        server, endpoint = start_standin(**standin_kwargs(args))
+        time_scale = args.time_scale
+
+    _, ref_text = client.load_reference()
+    text = client.load_text(args.text)
+
+    print("=" * 70)
+    print("Reference Preprocessing")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {endpoint['name']}")
+    print(f"Text: {args.text} ({len(text)} chars)  Runs: {args.runs}")
+
+    records = []
+    summary = {}
+    for path in paths:
+        modes = build_modes(path.read_bytes(), args.target_dbfs)
+        payloads = {}
+        for mode, (wav, prep_time) in modes.items():
+            info = reference.describe(wav)
+            payloads[mode] = (client.build_payload(text, base64.b64encode(wav).decode("utf-8"), ref_text), info)
+            print(
+                f"\n[{path.name} / {mode}] {info['seconds']:.1f}s {info['rate']}Hz {info['channels']}ch, "
+                f"{info['payload_bytes']:,} bytes (prep {prep_time * 1000:.0f}ms)"
+            )
+
+        outputs = {}
+        for run in range(1, args.runs + 1):
+            for mode in MODES:
+                payload, info = payloads[mode]
+                record, out = client.measure_request(
+                    endpoint, payload, timeout=args.timeout, ref_seconds=info["seconds"]
+                )
+                record.update({"reference": path.name, "mode": mode, "run": run, "payload_bytes": info["payload_bytes"]})
+                if out:
+                    outputs.setdefault(mode, out)
+                    print(f"  Run {run} {mode:<10}: {record['time'] / time_scale:.2f}s")
+                else:
+                    print(f"  Run {run} {mode:<10}: ERROR - {record['error']}")
+                records.append(record)
+
+        signatures = {mode: audio.spectral_signature(*audio.decode_wav(out)) for mode, out in outputs.items()}
+        summary[path.name] = {}
+        for mode in MODES:
+            info = payloads[mode][1]
+            latency = summarize(
+                [r["time"] / time_scale for r in records if r["reference"] == path.name and r["mode"] == mode and "error" not in r]
+            )
+            similarity = (
+                audio.signature_similarity(signatures[mode], signatures["raw"])
+                if mode in signatures and "raw" in signatures
+                else None
+            )
+            summary[path.name][mode] = {**info, "prep_seconds": modes[mode][1], "latency": latency, "similarity": similarity}
+
+    print("\n" + "=" * 70)
+    print("SUMMARY (latency in emulated seconds)" if server else "SUMMARY")
+    print("=" * 70)
+    print(f"\n{'Reference':<26} {'Mode':<10} {'Payload':>11} {'Saved':>7} │ {'Mean':>8} {'Δ vs raw':>9} │ {'Similarity':>10}")
+    print("-" * 92)
+    for name, modes in summary.items():
+        raw = modes["raw"]
+        for mode, entry in modes.items():
+            saved = 1 - entry["payload_bytes"] / raw["payload_bytes"]
+            mean, raw_mean = entry["latency"]["mean"], raw["latency"]["mean"]
+            delta = f"{mean - raw_mean:>+8.2f}s" if mean is not None and raw_mean is not None else f"{'-':>9}"
+            entry["bytes_saved"] = raw["payload_bytes"] - entry["payload_bytes"]
+            entry["latency_delta"] = mean - raw_mean if mean is not None and raw_mean is not None else None
+            sim = f"{entry['similarity']:.3f}" if entry["similarity"] is not None else "-"
+            print(
+                f"{name[:26]:<26} {mode:<10} {entry['payload_bytes']:>11,} {saved:>6.0%} │ "
+                f"{fmt_seconds(mean)} {delta} │ {sim:>10}"
+            )
+        print("-" * 92)
+
+    if server:
+        server.shutdown()
+
+    if not args.no_save:
+        path = results.save_runs(
+            "reference_preprocessing",
+            args.deployment or "local",
+            records,
+            extra={
+                "stand_in": server is not None,
+                "text": args.text,
+                "time_scale": time_scale,
+                "target_dbfs": args.target_dbfs,
+                "references": summary,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Batch scheduling benchmark: FIFO vs shortest-expected-job-first (SEJF).
+
+Replays the same mixed job set (short captions + long paragraphs) under each
+policy and reports mean/p95 completion time, so the head-of-line blocking cost
+of submission-order dispatch is visible next to SEJF with aging.
+
+Runs against the local stand-in by default; pass --deployment (repeatable) to
+replay against real endpoints instead.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python schedule_batch.py
+    uv run --with requests --with numpy python schedule_batch.py --captions 30 --paragraphs 6 --aging 0 0.5 2
+    uv run --with requests --with numpy python schedule_batch.py --arrival-interval 5 --max-wait 300
+    uv run --with requests --with numpy python schedule_batch.py --deployment 0.6B-A10G-SDPA --slots 1
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy  # noqa: F401
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python schedule_batch.py")
+    sys.exit(1)
+
+from tts_bench import config, results
+from tts_bench.client import load_reference
+from tts_bench.latency_model import load_trained
+from tts_bench.scheduler import BatchScheduler
+from tts_bench.standin import add_standin_arguments, standin_kwargs, start_standin
+from tts_bench.stats import fmt_seconds, summarize
+from tts_bench.workload import load_jobs, mixed_jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FIFO vs SEJF batch scheduling benchmark")
+    parser.add_argument("--jobs", type=str, default=None, help="JSON job set (default: generated mix)")
+    parser.add_argument("--captions", type=int, default=12, help="Short caption jobs in the generated mix")
+    parser.add_argument("--paragraphs", type=int, default=4, help="Long paragraph jobs in the generated mix")
+    parser.add_argument(
+        "--arrival-interval",
+        type=float,
+        default=0.0,
+        help="Seconds between job submissions (0 = whole batch at once)",
+    )
+    parser.add_argument(
+        "--aging",
+        type=float,
+        nargs="+",
+        default=[0.0, 1.0],
+        help="SEJF aging factors to compare (default: 0 1)",
+    )
+    parser.add_argument("--max-wait", type=float, default=None, help="Serve any job waiting this long first")
+    parser.add_argument(
+        "--deployment",
+        action="append",
+        default=None,
+        help="Replay against this deployment (repeatable; default: local stand-in)",
+    )
+    parser.add_argument(
+        "--slots",
+        type=int,
+        default=None,
+        help="In-flight requests per --deployment (default: 1; the stand-in uses --gpu-slots)",
+    )
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    parser.add_argument(
+        "--preprocess-reference",
+        action="store_true",
+        help="Send the trimmed/mono/24kHz reference instead of the raw file",
+    )
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    if args.slots is not None and not args.deployment:
+        print("Error: --slots applies to --deployment; size the stand-in with --gpu-slots")
+        return 1
+    jobs = load_jobs(Path(args.jobs)) if args.jobs else mixed_jobs(args.captions, args.paragraphs, seed=args.seed)
+    for i, job in enumerate(jobs):
+        job.setdefault("arrival", i * args.arrival_interval)
+
+    model = load_trained()
+    ref_audio_b64, ref_text = load_reference(preprocess=args.preprocess_reference)
+
+    server = None
+    if args.deployment:
+        workers = [(key, config.get_deployment(key)) for key in args.deployment for _ in range(args.slots or 1)]
+        time_scale = 1.0
+        target = ", ".join(args.deployment)
+    else:
+        server, endpoint = start_standin(model=model, **standin_kwargs(args))
+        workers = [(args.emulate, endpoint)] * args.gpu_slots
+        time_scale = args.time_scale
+        target = endpoint["name"]
+
+    print("=" * 70)
+    print("Batch Scheduling: FIFO vs SEJF")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {target} ({len(workers)} slots)")
+    kinds = {}
+    for job in jobs:
+        kinds[job.get("kind", "job")] = kinds.get(job.get("kind", "job"), 0) + 1
+    print(f"Jobs: {len(jobs)} ({', '.join(f'{n} {k}' for k, n in kinds.items())})")
+
+    runs = [("fifo", "fifo", 0.0)] + [(f"sejf aging={a:g}", "sejf", a) for a in args.aging]
+    all_records = []
+    summary = {}
+
+    for label, policy, aging in runs:
+        print(f"\n  {label}...", flush=True)
+        scheduler = BatchScheduler(
+            workers,
+            model,
+            ref_audio_b64,
+            ref_text,
+            policy=policy,
+            aging=aging,
+            max_wait=args.max_wait,
+            time_scale=time_scale,
+        )
+        records = scheduler.run(jobs)
+        for record in records:
+            record["policy"] = label
+        all_records.extend(records)
+
+        ok = [r for r in records if "error" not in r]
+        errors = len(records) - len(ok)
+        completion = summarize([r["completion"] for r in ok])
+        by_kind = {
+            kind: summarize([r["completion"] for r in ok if r.get("kind") == kind])["mean"] for kind in kinds
+        }
+        makespan = max((r["finished"] for r in records), default=0.0)
+        summary[label] = {"completion": completion, "by_kind_mean": by_kind, "makespan": makespan, "errors": errors}
+        print(
+            f"    mean={fmt_seconds(completion['mean']).strip()} p95={fmt_seconds(completion['p95']).strip()} "
+            f"errors={errors}"
+        )
+
+    # Completion times are in model seconds (stand-in wall time / time scale)
+    print("\n" + "=" * 70)
+    print("SUMMARY (completion time = finish - submission, emulated seconds)")
+    print("=" * 70)
+    kind_cols = "".join(f" {k[:9] + ' mean':>15}" for k in kinds)
+    print(f"\n{'Policy':<18} │ {'Mean':>8} {'p95':>8} {'Max':>8} │{kind_cols} │ {'Makespan':>9}")
+    print("-" * (60 + 16 * len(kinds)))
+    for label, info in summary.items():
+        c = info["completion"]
+        kind_vals = "".join(f" {fmt_seconds(info['by_kind_mean'][k], 15)}" for k in kinds)
+        print(
+            f"{label:<18} │ {fmt_seconds(c['mean'])} {fmt_seconds(c['p95'])} {fmt_seconds(c['max'])} │"
+            f"{kind_vals} │ {fmt_seconds(info['makespan'], 9)}"
+        )
+
+    fifo = summary["fifo"]["completion"]
+    for label, info in summary.items():
+        if label == "fifo" or not fifo["mean"] or not info["completion"]["mean"]:
+            continue
+        c = info["completion"]
+        print(
+            f"\n{label} vs FIFO: mean {(1 - c['mean'] / fifo['mean']) * 100:+.0f}% faster, "
+            f"p95 {(1 - c['p95'] / fifo['p95']) * 100:+.0f}% faster"
+        )
+
+    if server:
+        server.shutdown()
+
+    if not args.no_save:
+        deployment = "local" if server else args.deployment[0]
+        path = results.save_runs(
+            "batch_schedule",
+            deployment,
+            all_records,
+            extra={
+                "stand_in": server is not None,
+                "target": target,
+                "time_scale": time_scale,
+                "summary": summary,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Capacity planning for the tts-jobs queue + GPU fleet by discrete-event simulation.
+
+Sweeps fleet configurations (deployment, min/max containers, scaledown
+window, queue consumer batch size, batch timeout and concurrency) against
+one or more workloads and simulates each pair with tts_bench.fleet, using
+the measured latency model (warm synthesis per deployment, cold starts)
+and the Worker's measured per-job overhead. Per configuration it predicts:
+
+  wait         arrival -> synthesis start, p50/p95
+  completion   arrival -> persisted, p95 (checked against --slo)
+  utilization  GPU busy seconds / container seconds
+  cost         USD per generated audio-hour (every container second billed)
+
+and lists, per workload, the cheapest configurations that meet the SLO and
+the cheapest per deployment. Workloads are synthetic (--rates per minute
+for --duration seconds in a --pattern) or a replayed trace (--trace: a job
+file with "arrival" seconds and "text" or "text_chars" per job).
+
+A simulation runs in milliseconds, so the default grid (a few hundred
+configurations per rate) takes seconds; widen the lists to sweep thousands.
+The predictions are only as good as the latency model: refresh it with
+fit_latency_model.py after new benchmark runs.
+
+Usage:
+    cd test/scripts
+    uv run --with numpy python simulate_fleet.py
+    uv run --with numpy python simulate_fleet.py --rates 2 10 30 --pattern bursty --slo 90
+    uv run --with numpy python simulate_fleet.py --deployments 0.6B-T4-SDPA 0.6B-A10G-SDPA \\
+        --max-containers 1 2 3 4 6 8 12 16 --min-containers 0 1 2 --scaledown 30 60 120 300 600
+    uv run --with numpy python simulate_fleet.py --trace arrivals.json
+"""
+
+import argparse
+import itertools
+import math
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    print("Error: numpy library required")
+    print("Run: uv run --with numpy python simulate_fleet.py")
+    sys.exit(1)
+
+from tts_bench import config, fleet, results
+from tts_bench.latency_model import load_trained
+from tts_bench.stats import fmt_seconds
+from tts_bench.workload import load_jobs
+
+
+def fleet_grid(args, deployments: list[str]) -> list[dict]:
+    """Every combination of the swept settings (min_containers <= max_containers)."""
+    grid = []
+    for deployment, low, high, scaledown, size, timeout, concurrency in itertools.product(
+        deployments,
+        args.min_containers,
+        args.max_containers,
+        args.scaledown,
+        args.max_batch_size,
+        args.max_batch_timeout,
+        args.max_concurrency,
+    ):
+        if low > high:
+            continue
+        grid.append(
+            {
+                "deployment": deployment,
+                "min_containers": low,
+                "max_containers": high,
+                "scaledown": scaledown,
+                "max_batch_size": size,
+                "max_batch_timeout": timeout,
+                "max_concurrency": concurrency,
+            }
+        )
+    return grid
+
+
+def print_rows(rows: list[dict]):
+    print(
+        f"{'Deployment':<16} {'Ctr':>5} {'Idle':>5} {'Queue':>8} │ {'wait p50':>8} {'p95':>8} │ "
+        f"{'done p95':>8} │ {'Util':>5} {'Cold':>5} │ {'$/audio-h':>9}"
+    )
+    print("-" * 99)
+    for row in rows:
+        per_hour = row["usd_per_audio_hour"]
+        print(
+            f"{row['deployment']:<16} {row['min_containers']:>2}-{row['max_containers']:<2} "
+            f"{row['scaledown']:>4g}s {row['max_batch_size']:>2}/{row['max_batch_timeout']:g}/"
+            f"{row['max_concurrency']:<3} │ "
+            f"{fmt_seconds(row['wait']['p50'])} {fmt_seconds(row['wait']['p95'])} │ "
+            f"{fmt_seconds(row['completion']['p95'])} │ {row['utilization'] or 0:>5.0%} {row['cold_starts']:>5} │ "
+            + (f"{per_hour:>9.2f}" if per_hour is not None else f"{'-':>9}")
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue + GPU fleet capacity simulation")
+    parser.add_argument("--trace", type=Path, default=None, help="Job file with arrival times to replay")
+    parser.add_argument("--rates", type=float, nargs="+", default=[2.0, 6.0, 12.0], help="Jobs per minute")
+    parser.add_argument("--pattern", choices=fleet.PATTERNS, default="poisson", help="Synthetic arrival pattern")
+    parser.add_argument("--duration", type=float, default=3600.0, help="Synthetic workload length (seconds)")
+    parser.add_argument("--period", type=float, default=600.0, help="Burst / diurnal period (seconds)")
+    parser.add_argument("--caption-share", type=float, default=0.7, help="Share of single-sentence jobs")
+    parser.add_argument("--deployments", nargs="+", default=None, help="Default: every fitted Modal deployment")
+    parser.add_argument("--min-containers", type=int, nargs="+", default=[0, 1], help="Warm containers kept")
+    parser.add_argument("--max-containers", type=int, nargs="+", default=[1, 2, 4, 8], help="Autoscaling limit")
+    parser.add_argument("--scaledown", type=float, nargs="+", default=[60.0, 300.0], help="Idle seconds to stop")
+    parser.add_argument("--max-batch-size", type=int, nargs="+", default=[1], help="Queue consumer max_batch_size")
+    parser.add_argument(
+        "--max-batch-timeout", type=float, nargs="+", default=[2.0], help="Queue consumer max_batch_timeout"
+    )
+    parser.add_argument(
+        "--max-concurrency", type=int, nargs="+", default=[1, 4, 16], help="Queue consumer max_concurrency"
+    )
+    parser.add_argument("--overhead", type=float, default=None, help="Per-job seconds after synthesis")
+    parser.add_argument("--slo", type=float, default=120.0, help="p95 completion target (seconds)")
+    parser.add_argument("--top", type=int, default=10, help="Configurations listed per workload")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    args = parser.parse_args()
+
+    model = load_trained()
+    deployments = args.deployments or fleet.fitted_deployments(model)
+    if not deployments:
+        print("Error: no Modal deployment has a latency fit with cold starts (run fit_latency_model.py)")
+        return 1
+    overhead_source = "--overhead"
+    if args.overhead is None:
+        measured = fleet.measured_overhead()
+        args.overhead, overhead_source = measured or (fleet.DEFAULT_OVERHEAD, "default, no Worker run measured")
+
+    if args.trace:
+        jobs = fleet.trace_jobs(load_jobs(args.trace))
+        duration = jobs[-1]["arrival"] if jobs else 0.0
+        workloads = [(args.trace.name, jobs)]
+    else:
+        if min(args.rates) <= 0:
+            print("Error: --rates must be positive")
+            return 1
+        duration = args.duration
+        workloads = [
+            (
+                f"{rate:g}/min {args.pattern}",
+                fleet.synthetic_jobs(rate, duration, args.pattern, args.period, args.caption_share, seed=args.seed),
+            )
+            for rate in args.rates
+        ]
+    grid = fleet_grid(args, deployments)
+
+    print("=" * 70)
+    print("Fleet Capacity Simulation")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Deployments: {', '.join(deployments)}")
+    print(f"Configurations: {len(grid)} x {len(workloads)} workloads  SLO: p95 completion <= {args.slo:g}s")
+    print(f"Per-job overhead: {args.overhead:.2f}s ({overhead_source})")
+    try:
+        services = {}
+        for workload, jobs in workloads:
+            services[workload] = fleet.ServiceModel(model, jobs, seed=args.seed)
+            for deployment in deployments:
+                services[workload].services(deployment)
+        boots = {deployment: fleet.boot_params(model, deployment) for deployment in deployments}
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    for deployment in deployments:
+        boot = math.exp(boots[deployment][0] + boots[deployment][1] ** 2 / 2)
+        hourly = config.DEPLOYMENTS.get(deployment, {}).get("usd_per_hour")
+        print(
+            f"  {deployment:<16} boot ~{boot:.0f}s  300 chars warm ~{model.predict(deployment, 300)[0]:.0f}s  "
+            + (f"${hourly:.2f}/h" if hourly is not None else "no GPU price")
+        )
+
+    rows = []
+    start = time.perf_counter()
+    for workload, jobs in workloads:
+        arrivals = [job["arrival"] for job in jobs]
+        audio_seconds = float(services[workload].audio_seconds.sum())
+        for settings in grid:
+            deployment = settings["deployment"]
+            run = fleet.simulate(
+                settings,
+                arrivals,
+                services[workload].services(deployment),
+                boots[deployment],
+                overhead=args.overhead,
+                duration=duration,
+                seed=args.seed,
+            )
+            row = fleet.summarize_run(settings, run, audio_seconds, duration)
+            row["workload"] = workload
+            row["meets_slo"] = row["completion"]["p95"] is not None and row["completion"]["p95"] <= args.slo
+            rows.append(row)
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {len(rows)} runs in {elapsed:.2f}s ({len(rows) / max(elapsed, 1e-9):,.0f} per second)")
+
+    best = {}
+    for workload, jobs in workloads:
+        subset = [r for r in rows if r["workload"] == workload]
+        meeting = [r for r in subset if r["meets_slo"] and r["usd_per_audio_hour"] is not None]
+        meeting.sort(key=lambda r: (r["usd_per_audio_hour"], r["completion"]["p95"]))
+        audio_hours = subset[0]["audio_hours"] if subset else 0.0
+        print("\n" + "=" * 70)
+        print(f"{workload}: {len(jobs)} jobs, {audio_hours * 60:.1f} audio minutes")
+        print("=" * 70)
+        print(f"Meeting the SLO: {len(meeting)}/{len(subset)} configurations")
+        if not meeting:
+            fastest = min(subset, key=lambda r: r["completion"]["p95"] or float("inf"))
+            print(f"Closest: p95 {fmt_seconds(fastest['completion']['p95']).strip()}")
+            print_rows([fastest])
+            best[workload] = None
+            continue
+        print(f"\nCheapest {min(args.top, len(meeting))}", end="")
+        print(" (Ctr = min-max containers, Queue = batch size/timeout/concurrency)")
+        print_rows(meeting[: args.top])
+        per_deployment = {}
+        for row in meeting:
+            per_deployment.setdefault(row["deployment"], row)
+        print("\nCheapest per deployment")
+        print_rows(sorted(per_deployment.values(), key=lambda r: r["usd_per_audio_hour"]))
+        best[workload] = meeting[0]
+
+    if not args.no_save:
+        path = results.save_runs(
+            "fleet_simulation",
+            "simulated",
+            rows,
+            extra={
+                "trace": str(args.trace) if args.trace else None,
+                "pattern": None if args.trace else args.pattern,
+                "duration": duration,
+                "overhead": args.overhead,
+                "overhead_source": overhead_source,
+                "slo": args.slo,
+                "boot": {d: {"mu": mu, "sigma": sigma} for d, (mu, sigma) in boots.items()},
+                "latency_model": {d: model.summary().get(d) for d in deployments},
+                "best": best,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
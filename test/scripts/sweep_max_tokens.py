@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+max_new_tokens sweep: latency and truncation per cap, per text-length bucket.
+
+Runs every text at each max_new_tokens value, detects truncated outputs
+(duration at the N/12 second frame cap, or audio ending mid-word well short
+of the expected length), and recommends the lowest cap that never truncated
+any text in each length bucket and leaves CAP_HEADROOM over the longest
+output seen there, so a slightly longer reading of a similar text is not
+cut off. The worst-case GPU time each cap allows is
+taken from the latency model, so the recommendation bounds runaway cost too.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python sweep_max_tokens.py
+    uv run --with requests --with numpy python sweep_max_tokens.py --caps 128 256 512 1024 2048 --runs 2
+    uv run --with requests --with numpy python sweep_max_tokens.py --deployment 0.6B-A10G-SDPA --texts short medium
+"""
+
+import argparse
+import math
+import sys
+import wave
+from datetime import datetime
+
+try:
+    import numpy  # noqa: F401
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python sweep_max_tokens.py")
+    sys.exit(1)
+
+from tts_bench import audio, client, config, results, truncation
+from tts_bench.latency_model import load_trained, speech_seconds
+from tts_bench.standin import add_standin_arguments, standin_kwargs, start_standin
+from tts_bench.stats import fmt_seconds, summarize
+from tts_bench.workload import text_of_length
+
+DEFAULT_CAPS = [256, 512, 1024, 2048, 4096]
+# A safe cap allows this many times the tokens of the bucket's longest output
+# (well above the 1/CAP_FRACTION slack truncation.check already tolerates)
+CAP_HEADROOM = 1.25
+
+# Text-length buckets (characters), upper bound inclusive
+BUCKETS = [(0, 100), (101, 300), (301, 800), (801, 1500), (1501, math.inf)]
+
+
+def bucket_label(chars: int) -> str:
+    for low, high in BUCKETS:
+        if low <= chars <= high:
+            return f"{low}-{high}" if high != math.inf else f"{low}+"
+    return "?"
+
+
+def build_texts(names: list[str], lengths: list[int]) -> list[tuple[str, str]]:
+    texts = [(name, client.load_text(name)) for name in names]
+    for i, chars in enumerate(lengths):
+        texts.append((f"corpus-{chars}", text_of_length(chars, offset=i * 3)))
+    return sorted(texts, key=lambda item: len(item[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="max_new_tokens sweep with truncation detection")
+    parser.add_argument("--caps", type=int, nargs="+", default=DEFAULT_CAPS, help="max_new_tokens values to sweep")
+    parser.add_argument("--texts", nargs="+", default=["short", "medium", "long"], help="inputs/texts names")
+    parser.add_argument(
+        "--lengths",
+        type=int,
+        nargs="*",
+        default=[150, 400],
+        help="Extra corpus texts of these lengths, to fill the buckets",
+    )
+    parser.add_argument("--runs", type=int, default=1, help="Runs per (text, cap)")
+    parser.add_argument("--deployment", default=None, help="Target deployment (default: local stand-in)")
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    parser.add_argument(
+        "--preprocess-reference",
+        action="store_true",
+        help="Send the trimmed/mono/24kHz reference instead of the raw file",
+    )
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    model = load_trained()
+    server = None
+    if args.deployment:
+        endpoint = config.get_deployment(args.deployment)
+        deployment = args.deployment
+        time_scale = 1.0
+    else:
+        server, endpoint = start_standin(model=model, **standin_kwargs(args))
+        deployment = args.emulate
+        time_scale = args.time_scale
+
+    caps = sorted(args.caps)
+    texts = build_texts(args.texts, args.lengths)
+    ref_audio_b64, ref_text = client.load_reference(preprocess=args.preprocess_reference)
+
+    print("=" * 70)
+    print("max_new_tokens Sweep")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {endpoint['name']}")
+    print(f"Caps: {caps}  Runs: {args.runs}")
+
+    records = []
+    for name, text in texts:
+        expected = speech_seconds(len(text))
+        print(f"\n[{name}] {len(text)} chars, ~{expected:.1f}s expected (needs ~{math.ceil(expected * 12)} tokens)")
+        for cap in caps:
+            timeout = model.timeout_for(deployment, len(text), max_new_tokens=cap) * time_scale
+            for run in range(1, args.runs + 1):
+                payload = client.build_payload(text, ref_audio_b64, ref_text, max_new_tokens=cap)
+                record, wav = client.measure_request(endpoint, payload, timeout=max(timeout, 5.0))
+                record.update({"name": name, "bucket": bucket_label(len(text)), "run": run})
+                samples = None
+                if wav:
+                    try:
+                        samples, rate = audio.decode_wav(wav)
+                    except (wave.Error, EOFError, ValueError) as e:
+                        record["error"] = f"Undecodable WAV: {e}"
+                elif "error" not in record:
+                    record["error"] = "Empty response body"
+                if samples is not None:
+                    finding = truncation.check(samples, rate, expected, cap)
+                    record.update(
+                        {
+                            "duration": finding["duration"],
+                            "truncated": finding["truncated"],
+                            "reasons": finding["reasons"],
+                        }
+                    )
+                    status = "TRUNCATED " + "; ".join(finding["reasons"]) if finding["truncated"] else "ok"
+                    print(
+                        f"  cap {cap:>5}: {record['time'] / time_scale:>7.2f}s  "
+                        f"{finding['duration']:>6.1f}s audio  {status}"
+                    )
+                else:
+                    print(f"  cap {cap:>5}: ERROR - {record['error']}")
+                records.append(record)
+
+    # Per-bucket recommendation
+    print("\n" + "=" * 70)
+    print("SUMMARY (latency in emulated seconds)" if server else "SUMMARY")
+    print("=" * 70)
+    print(f"\n{'Bucket':<10} {'Cap':>6} │ {'Truncated':>10} {'Mean':>8} {'p95':>8} │ {'Worst case':>10}")
+    print("-" * 62)
+
+    recommendations = {}
+    for label in dict.fromkeys(r["bucket"] for r in records):
+        bucket_records = [r for r in records if r["bucket"] == label]
+        longest = max(
+            (r["duration"] for r in bucket_records if "error" not in r and not r["truncated"]), default=None
+        )
+        needed = math.ceil(longest * 12) if longest else None
+        safe_cap = None
+        for cap in caps:
+            at_cap = [r for r in bucket_records if r["max_new_tokens"] == cap]
+            ok = [r for r in at_cap if "error" not in r]
+            truncated = sum(1 for r in ok if r["truncated"])
+            latency = summarize([r["time"] / time_scale for r in ok])
+            # Worst case: an output that runs all the way to the cap
+            worst = model.predict(deployment, 10**6, max_new_tokens=cap)
+            print(
+                f"{label:<10} {cap:>6} │ {f'{truncated}/{len(ok)}':>10} "
+                f"{fmt_seconds(latency['mean'])} {fmt_seconds(latency['p95'])} │ "
+                f"{fmt_seconds(worst[0] if worst else None, 10)}"
+            )
+            higher = [r for r in bucket_records if r["max_new_tokens"] >= cap and "error" not in r]
+            roomy = needed is not None and cap >= CAP_HEADROOM * needed
+            if safe_cap is None and ok and roomy and not any(r["truncated"] for r in higher):
+                safe_cap = cap
+        recommendations[label] = {
+            "lowest_safe_cap": safe_cap,
+            "longest_output_seconds": longest,
+            "tokens_needed": needed,
+        }
+        print("-" * 62)
+
+    print(f"\nSafe = never truncated and >= {CAP_HEADROOM:g}x the tokens of the longest output")
+    print(f"{'Bucket':<10} │ {'Longest output':>15} {'Tokens needed':>14} │ {'Lowest safe cap':>16}")
+    print("-" * 64)
+    for label, rec in recommendations.items():
+        longest = f"{rec['longest_output_seconds']:.1f}s" if rec["longest_output_seconds"] else "-"
+        needed = rec["tokens_needed"] or "-"
+        safe = rec["lowest_safe_cap"] or f"> {caps[-1]}"
+        print(f"{label:<10} │ {longest:>15} {needed:>14} │ {safe:>16}")
+
+    if server:
+        server.shutdown()
+
+    if not args.no_save:
+        path = results.save_runs(
+            "max_tokens_sweep",
+            args.deployment or "local",
+            records,
+            extra={
+                "stand_in": server is not None,
+                "caps": caps,
+                "time_scale": time_scale,
+                "recommendations": recommendations,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
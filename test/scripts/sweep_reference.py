@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Reference-audio sweep: upload size, latency and voice similarity per variant.
+
+Derives trimmed, resampled and mono-downmixed variants of the reference WAV
+in memory, runs the same text through /clone with each one, and reports:
+
+- payload bytes (base64 in the JSON body, what actually goes over the wire)
+- request latency (mean/p95 over --runs)
+- output similarity to the output of the unmodified reference, from the
+  spectral signature of each clip (1.0 = same timbre)
+
+compare_generation_only.py treats reference handling as "~constant
+overhead"; this measures it, to pick the cheapest reference format to store
+and send.
+
+Usage:
+    cd test/scripts
+    uv run --with requests --with numpy python sweep_reference.py
+    uv run --with requests --with numpy python sweep_reference.py --runs 3 --text medium
+    uv run --with requests --with numpy python sweep_reference.py --deployment 0.6B-A10G-SDPA
+"""
+
+import argparse
+import base64
+import sys
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy as np
+    import requests  # noqa: F401
+except ImportError:
+    print("Error: requests and numpy libraries required")
+    print("Run: uv run --with requests --with numpy python sweep_reference.py")
+    sys.exit(1)
+
+from tts_bench import audio, client, config, reference, results
+from tts_bench.standin import add_standin_arguments, standin_kwargs, start_standin
+from tts_bench.stats import fmt_seconds, summarize
+
+# (name, seconds, rate_to, mono); None keeps the reference's own value
+VARIANTS = [
+    ("baseline", None, None, False),
+    ("20s", 20.0, None, False),
+    ("10s", 10.0, None, False),
+    ("5s", 5.0, None, False),
+    ("3s", 3.0, None, False),
+    ("24kHz", None, 24000, False),
+    ("16kHz", None, 16000, False),
+    ("8kHz", None, 8000, False),
+    ("mono", None, None, True),
+    ("10s 24kHz mono", 10.0, 24000, True),
+    ("5s 16kHz mono", 5.0, 16000, True),
+]
+
+
+def build_variants(samples: np.ndarray, rate: int) -> list[tuple[str, bytes]]:
+    """Encode every variant; a mono reference also gets a stereo upper bound."""
+    duration = audio.duration_seconds(samples, rate)
+    variants = []
+    if samples.ndim == 1:
+        variants.append(("stereo (dup)", audio.encode_wav(np.stack([samples, samples], axis=1), rate)))
+    for name, seconds, rate_to, mono in VARIANTS:
+        if seconds is not None and seconds >= duration:
+            continue
+        if rate_to is not None and rate_to >= rate:
+            continue
+        if mono and samples.ndim == 1 and seconds is None and rate_to is None:
+            continue
+        variants.append((name, reference.make_variant(samples, rate, seconds, rate_to, mono)))
+    return variants
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reference-audio length/quality sweep")
+    parser.add_argument("--reference", type=Path, default=config.REFERENCE_AUDIO, help="Reference WAV")
+    parser.add_argument("--text", default="short", help="inputs/texts name to synthesize")
+    parser.add_argument("--runs", type=int, default=2, help="Runs per variant")
+    parser.add_argument("--deployment", default=None, help="Target deployment (default: local stand-in)")
+    parser.add_argument("--timeout", type=float, default=config.FALLBACK_TIMEOUT)
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results file")
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    if args.deployment:
+        endpoint = config.get_deployment(args.deployment)
+        time_scale = 1.0
+    else:
+        server, endpoint = start_standin(**standin_kwargs(args))
+        time_scale = args.time_scale
+
+    samples, rate = reference.load_samples(args.reference)
+    variants = build_variants(samples, rate)
+    _, ref_text = client.load_reference()
+    text = client.load_text(args.text)
+
+    print("=" * 70)
+    print("Reference-Audio Sweep")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(f"Target: {endpoint['name']}")
+    print(f"Reference: {args.reference.name} ({audio.duration_seconds(samples, rate):.1f}s, {rate}Hz)")
+    print(f"Text: {args.text} ({len(text)} chars)  Runs: {args.runs}")
+
+    # The transcript no longer matches a trimmed clip; the real server only
+    # uses it to align the prompt, so the full text is sent throughout.
+    records = []
+    outputs = {}
+    for name, wav in variants:
+        info = reference.describe(wav)
+        payload = client.build_payload(text, base64.b64encode(wav).decode("utf-8"), ref_text)
+        print(f"\n[{name}] {info['seconds']:.1f}s {info['rate']}Hz {info['channels']}ch, {info['payload_bytes']:,} bytes")
+        for run in range(1, args.runs + 1):
+            record, out = client.measure_request(endpoint, payload, timeout=args.timeout, ref_seconds=info["seconds"])
+            record.update({"variant": name, "run": run, **{f"ref_{k}": v for k, v in info.items()}})
+            if out:
+                outputs.setdefault(name, out)
+                print(f"  Run {run}: {record['time'] / time_scale:.2f}s")
+            else:
+                print(f"  Run {run}: ERROR - {record['error']}")
+            records.append(record)
+
+    # Similarity of each variant's first output to the baseline's
+    signatures = {}
+    for name, out in outputs.items():
+        out_samples, out_rate = audio.decode_wav(out)
+        signatures[name] = audio.spectral_signature(out_samples, out_rate)
+    baseline = signatures.get("baseline")
+
+    print("\n" + "=" * 70)
+    print("SUMMARY (latency in emulated seconds)" if server else "SUMMARY")
+    print("=" * 70)
+    print(f"\n{'Variant':<16} {'Payload':>11} {'vs base':>8} │ {'Mean':>8} {'p95':>8} │ {'Similarity':>10}")
+    print("-" * 72)
+
+    base_bytes = reference.describe(dict(variants)["baseline"])["payload_bytes"]
+    summary = {}
+    for name, wav in variants:
+        info = reference.describe(wav)
+        latency = summarize([r["time"] / time_scale for r in records if r["variant"] == name and "error" not in r])
+        similarity = (
+            audio.signature_similarity(signatures[name], baseline)
+            if baseline is not None and name in signatures
+            else None
+        )
+        summary[name] = {**info, "latency": latency, "similarity": similarity}
+        sim = f"{similarity:.3f}" if similarity is not None else "-"
+        print(
+            f"{name:<16} {info['payload_bytes']:>11,} {info['payload_bytes'] / base_bytes:>7.0%} │ "
+            f"{fmt_seconds(latency['mean'])} {fmt_seconds(latency['p95'])} │ {sim:>10}"
+        )
+
+    if server:
+        server.shutdown()
+
+    if not args.no_save:
+        path = results.save_runs(
+            "reference_sweep",
+            args.deployment or "local",
+            records,
+            extra={
+                "stand_in": server is not None,
+                "reference": args.reference.name,
+                "text": args.text,
+                "time_scale": time_scale,
+                "variants": summary,
+            },
+        )
+        print(f"\nResults saved to: {path.relative_to(config.TEST_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
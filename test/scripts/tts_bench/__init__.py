@@ -0,0 +1,38 @@
+"""
+Shared benchmark harness for the Qwen3-TTS Modal deployments.
+
+The standalone scripts in this folder each carry their own endpoint table and
+request helper. New benchmark modes build on this package instead:
+
+- config.py        Paths and the deployment/endpoint table
+- client.py        Shared HTTP client (clone, health, timing)
+- results.py       Loader that normalizes every results/*.json layout
+- latency_model.py Per-deployment latency model (adaptive timeouts, ordering)
+- standin.py       Local stand-in server with the clone/health contract
+- standin_h2.py    HTTP/2 (h2c) listener for the stand-in
+- standin_dashscope.py  Local stand-in for the Qwen cloud (DashScope) TTS APIs
+- dashscope.py     DashScope voice enrollment/design, synthesis, audio fetch
+- providers.py     Modal and DashScope generation behind one interface
+- prefetch.py      Bounded-pool audio-URL downloads with resume
+- asr.py           Qwen ASR reference transcription and transcript cache
+- worker_client.py API Worker job client: generate, poll task, download (sync + asyncio)
+- standin_worker.py     Local stand-in for the API Worker job flow (queue, rate limits)
+- polling.py       Task poll schedules (fixed/adaptive), bounded poller, virtual-time replay
+- job_latency.py   Worker job traces joined with task/generation rows -> per-stage latency
+- bulk.py          Long-document chunking, credit + token-bucket admission, in-order stitching
+- history.py       Synthetic History rows (COPY into local Supabase), listing SQL + EXPLAIN as a user
+- contention.py    Credit/rate-limit RPCs from parallel connections, lock waits from pg_stat_activity
+- cancellation.py  Cancellation storms: submit, cancel mid-flight, provider work after the cancel
+- export.py        Bulk export through the audio route and signed storage URL, bounded pool to disk
+- fleet.py         Discrete-event tts-jobs queue + autoscaling GPU fleet: wait, p95, utilization, cost
+- loadgen.py       Open-loop Poisson load timed from scheduled sends, SLO verdicts, max-rate bisection
+- cost.py          Cost per audio-hour / 1k chars with amortized boots and keep-warm, latency/cost frontier
+- audio.py         WAV encode/decode and synthetic speech (NumPy)
+- stats.py         Percentile summaries for reports
+- workload.py      Job sets (caption/paragraph mixes, JSON job files)
+- scheduler.py     FIFO / shortest-expected-job-first batch dispatcher
+- runaway.py       Looping/silence detection and streaming abort guard
+- truncation.py    max_new_tokens cap / mid-word truncation checks
+- reference.py     Reference-audio variants (trim, resample, downmix)
+- playback.py      Player simulation over streamed chunk timings (stalls)
+"""
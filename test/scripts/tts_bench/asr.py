@@ -0,0 +1,214 @@
+"""
+Qwen ASR client and transcript cache for clone reference text.
+
+The clone flow needs the transcript of the reference (`ref_text`). The API
+Worker gets it from Qwen ASR in OpenAI-compatible mode
+(workers/api/src/_shared/transcription/providers/qwen.ts, docs/qwen-api.md
+§17.5); `transcribe` sends the same request:
+
+    POST {base}/compatible-mode/v1/chat/completions
+         {model, messages: [{role: user, content: [{type: input_audio,
+          input_audio: {data: "data:audio/wav;base64,..."}}]}],
+          stream: false, asr_options: {enable_itn: false, language?}}
+         -> choices[0].message.content (+ annotations[].language),
+            usage.seconds
+
+The same reference is uploaded over and over (every retry, every clone of
+the same clip), so TranscriptCache keys transcripts by a hash of the audio
+bytes plus model and language, in memory and under results/_cache/. A
+concurrent miss on the same audio waits for the first transcription instead
+of sending its own.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from . import client, config
+from .dashscope import language_tag
+
+CACHE_VERSION = 1  # Bump when the cached record shape changes
+
+
+def _headers(endpoint: dict) -> dict:
+    api_key = endpoint.get("api_key") or os.getenv("DASHSCOPE_API_KEY")
+    if not api_key:
+        raise RuntimeError("Missing env var: DASHSCOPE_API_KEY")
+    return {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+
+
+def _error_detail(response, data: dict) -> str:
+    """Error message the way qwen.ts reads it: error.message, error, message."""
+    error = data.get("error")
+    if isinstance(error, dict) and error.get("message"):
+        return f"{error.get('code') or f'HTTP {response.status_code}'}: {error['message']}"
+    if isinstance(error, str) and error:
+        return f"HTTP {response.status_code}: {error}"
+    code = data.get("code") or f"HTTP {response.status_code}"
+    return f"{code}: {data.get('message') or response.text[:200]}"
+
+
+def build_payload(wav: bytes, model: str, language: str | None = None) -> dict:
+    """Chat-completions ASR body for a WAV, sent as a data URL."""
+    options = {"enable_itn": False}
+    tag = language_tag(language) if language and language != "Auto" else None
+    if tag:
+        options["language"] = tag
+    data_url = f"data:audio/wav;base64,{base64.b64encode(wav).decode('ascii')}"
+    return {
+        "model": model,
+        "messages": [{"role": "user", "content": [{"type": "input_audio", "input_audio": {"data": data_url}}]}],
+        "stream": False,
+        "asr_options": options,
+    }
+
+
+def _content_text(content) -> str:
+    if isinstance(content, str):
+        return content.strip()
+    if isinstance(content, list):
+        parts = [p if isinstance(p, str) else (p or {}).get("text") or "" for p in content]
+        return "".join(parts).strip()
+    return ""
+
+
+def transcribe(
+    endpoint: dict,
+    wav: bytes,
+    language: str | None = None,
+    timeout: float = 90.0,
+) -> dict:
+    """
+    Transcribe one WAV. Returns a record with "time", "text", "language"
+    (detected), "model", "usage_seconds", "audio_bytes" and "request_id"
+    (or "error").
+    """
+    model = endpoint.get("asr_model", config.QWEN_ASR_MODEL)
+    body = build_payload(wav, model, language)
+    url = f"{endpoint.get('base_url', config.DASHSCOPE_BASE_URL)}{config.DASHSCOPE_ASR_PATH}"
+    record = {"model": model, "audio_bytes": len(wav)}
+    start = time.perf_counter()
+    try:
+        response = client.get_session().post(url, json=body, headers=_headers(endpoint), timeout=timeout)
+        record["time"] = time.perf_counter() - start
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+    except Exception as e:
+        record["time"] = time.perf_counter() - start
+        record["error"] = "Timeout" if isinstance(e, requests.exceptions.Timeout) else str(e) or type(e).__name__
+        return record
+
+    record["request_id"] = data.get("request_id") or data.get("id")
+    if response.status_code >= 400:
+        record["error"] = _error_detail(response, data)
+        return record
+    message = ((data.get("choices") or [{}])[0] or {}).get("message") or {}
+    record["text"] = _content_text(message.get("content"))
+    record["model"] = data.get("model") or model
+    annotations = [a for a in message.get("annotations") or [] if isinstance(a, dict)]
+    record["language"] = next((a["language"] for a in annotations if a.get("language")), None)
+    try:
+        record["usage_seconds"] = float((data.get("usage") or {})["seconds"])
+    except (KeyError, TypeError, ValueError):
+        record["usage_seconds"] = None
+    if not record["text"]:
+        record["error"] = "Empty transcript"
+    return record
+
+
+class TranscriptCache:
+    """
+    Transcripts keyed by audio content hash, model and language.
+
+    `cache_dir=None` keeps the cache in memory only. Only successful,
+    non-empty transcripts are stored.
+    """
+
+    def __init__(self, cache_dir: Path | None = config.CACHE_DIR / "transcripts"):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.entries: dict[str, dict] = {}
+        self.inflight: dict[str, threading.Lock] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(wav: bytes, model: str = config.QWEN_ASR_MODEL, language: str | None = None) -> str:
+        digest = hashlib.sha256(wav)
+        digest.update(repr((CACHE_VERSION, model, language or "Auto")).encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path | None:
+        return self.cache_dir / f"{key[:32]}.json" if self.cache_dir is not None else None
+
+    def get(self, key: str) -> dict | None:
+        """Cached record for `key` (memory first, then disk) or None."""
+        with self.lock:
+            if key in self.entries:
+                return self.entries[key]
+        path = self._path(key)
+        if path is not None and path.exists():
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return None
+            with self.lock:
+                self.entries[key] = entry
+            return entry
+        return None
+
+    def put(self, key: str, record: dict):
+        entry = {k: record.get(k) for k in ("text", "language", "model", "usage_seconds", "request_id")}
+        with self.lock:
+            self.entries[key] = entry
+        path = self._path(key)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+
+    def transcribe(
+        self,
+        endpoint: dict,
+        wav: bytes,
+        language: str | None = None,
+        timeout: float = 90.0,
+    ) -> dict:
+        """
+        asr.transcribe through the cache. The record gains "cached" and
+        "time" covers hashing and lookup on a hit.
+        """
+        start = time.perf_counter()
+        key = self.key(wav, endpoint.get("asr_model", config.QWEN_ASR_MODEL), language)
+        entry = self.get(key)
+        if entry is None:
+            with self.lock:
+                flight = self.inflight.setdefault(key, threading.Lock())
+            with flight:  # One upstream call per key; the others wait for it
+                entry = self.get(key)
+                if entry is None:
+                    with self.lock:
+                        self.misses += 1
+                    try:
+                        record = transcribe(endpoint, wav, language, timeout)
+                        if "error" not in record:
+                            self.put(key, record)
+                    finally:
+                        # Also when transcribe raises (e.g. no API key), so the key isn't left locked
+                        with self.lock:
+                            self.inflight.pop(key, None)
+                    return {**record, "cached": False, "key": key}
+        with self.lock:
+            self.hits += 1
+        return {**entry, "time": time.perf_counter() - start, "audio_bytes": len(wav), "cached": True, "key": key}
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
@@ -0,0 +1,310 @@
+"""
+WAV encoding/decoding and synthetic speech-like audio, vectorized with NumPy.
+
+Samples are float32 arrays in [-1, 1], shaped (n,) for mono or (n, channels).
+"""
+
+import io
+import wave
+
+import numpy as np
+
+# Qwen3-TTS 12Hz models produce 24kHz mono output
+MODEL_SAMPLE_RATE = 24000
+
+
+def _pcm_to_float(frames: bytes, width: int, channels: int) -> np.ndarray:
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        ints = raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8) | (raw[:, 2].astype(np.int32) << 16)
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        samples = ints.astype(np.float32) / float(1 << 23)
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels)
+    return samples
+
+
+def decode_wav(data: bytes) -> tuple[np.ndarray, int]:
+    """Decode PCM WAV bytes into (float32 samples, sample_rate)."""
+    with wave.open(io.BytesIO(data), "rb") as w:
+        rate = w.getframerate()
+        channels = w.getnchannels()
+        width = w.getsampwidth()
+        frames = w.readframes(w.getnframes())
+    return _pcm_to_float(frames, width, channels), rate
+
+
+def encode_wav(samples: np.ndarray, rate: int) -> bytes:
+    """Encode float samples as 16-bit PCM WAV bytes."""
+    samples = np.asarray(samples, dtype=np.float32)
+    channels = 1 if samples.ndim == 1 else samples.shape[1]
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def duration_seconds(samples: np.ndarray, rate: int) -> float:
+    """Duration of a sample array in seconds."""
+    return samples.shape[0] / float(rate)
+
+
+def wav_duration(data: bytes) -> float:
+    """Duration of WAV bytes in seconds, read from the header only."""
+    with wave.open(io.BytesIO(data), "rb") as w:
+        return w.getnframes() / float(w.getframerate())
+
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    """Downmix (n, channels) to (n,) by averaging channels."""
+    return samples if samples.ndim == 1 else samples.mean(axis=1)
+
+
+def synth_speech(
+    seconds: float,
+    rate: int = MODEL_SAMPLE_RATE,
+    seed: int = 0,
+    syllable_rate: float = 4.0,
+) -> np.ndarray:
+    """
+    Speech-like test signal: band-limited noise plus a wandering pitch,
+    amplitude-modulated at a syllable rate with short pauses between words.
+
+    Not intelligible, but it has the energy envelope and lack of exact
+    periodicity that the repetition/silence detectors expect from speech.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * rate)
+    t = np.arange(n, dtype=np.float32) / rate
+
+    pitch = 120.0 + 30.0 * np.sin(2 * np.pi * 0.3 * t + rng.uniform(0, 2 * np.pi))
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voiced = 0.5 * np.sin(phase) + 0.25 * np.sin(2 * phase) + 0.12 * np.sin(3 * phase)
+
+    noise = rng.standard_normal(n).astype(np.float32)
+    kernel = np.ones(8, dtype=np.float32) / 8.0
+    noise = np.convolve(noise, kernel, mode="same") * 0.3
+
+    syllables = 0.5 * (1.0 + np.sin(2 * np.pi * syllable_rate * t + rng.uniform(0, 2 * np.pi)))
+    # Word gaps: zero the envelope in ~15% of 250ms blocks
+    blocks = rng.random(int(np.ceil(seconds * 4)) + 1) > 0.15
+    gate = np.repeat(blocks, rate // 4)[:n].astype(np.float32)
+    envelope = syllables * gate
+
+    return (0.6 * envelope * (voiced + noise)).astype(np.float32)
+
+
+# =============================================================================
+# Streaming WAV
+# =============================================================================
+
+# Data size written into headers of streamed WAVs whose length is unknown
+STREAMING_DATA_SIZE = 0xFFFFFFFF - 36
+
+
+def wav_header(rate: int, channels: int = 1, width: int = 2, data_size: int = STREAMING_DATA_SIZE) -> bytes:
+    """Canonical 44-byte PCM WAV header (data_size defaults to 'unknown')."""
+    byte_rate = rate * channels * width
+    return b"".join(
+        [
+            b"RIFF",
+            (min(data_size + 36, 0xFFFFFFFF)).to_bytes(4, "little"),
+            b"WAVEfmt ",
+            (16).to_bytes(4, "little"),
+            (1).to_bytes(2, "little"),
+            channels.to_bytes(2, "little"),
+            rate.to_bytes(4, "little"),
+            byte_rate.to_bytes(4, "little"),
+            (channels * width).to_bytes(2, "little"),
+            (width * 8).to_bytes(2, "little"),
+            b"data",
+            data_size.to_bytes(4, "little"),
+        ]
+    )
+
+
+def parse_wav_header(data: bytes) -> dict | None:
+    """
+    Parse a PCM WAV header from the first bytes of a (possibly partial) file.
+
+    Returns {"rate", "channels", "width", "data_offset"} or None if the
+    "data" chunk has not arrived yet.
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    pos = 12
+    fmt = None
+    while pos + 8 <= len(data):
+        chunk_id = data[pos : pos + 4]
+        size = int.from_bytes(data[pos + 4 : pos + 8], "little")
+        if chunk_id == b"fmt " and pos + 24 <= len(data):
+            fmt = {
+                "channels": int.from_bytes(data[pos + 10 : pos + 12], "little"),
+                "rate": int.from_bytes(data[pos + 12 : pos + 16], "little"),
+                "width": int.from_bytes(data[pos + 22 : pos + 24], "little") // 8,
+            }
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            return {**fmt, "data_offset": pos + 8}
+        pos += 8 + size + (size & 1)
+    return None
+
+
+# =============================================================================
+# Frame analysis
+# =============================================================================
+
+
+def decode_stream(data: bytes) -> tuple[np.ndarray, int]:
+    """
+    Decode a possibly truncated or streamed WAV (header sizes may be the
+    'unknown' placeholder) into (float32 samples, sample_rate).
+    """
+    header = parse_wav_header(data)
+    if header is None:
+        raise ValueError("No PCM WAV header in data")
+    frame_bytes = header["width"] * header["channels"]
+    body = data[header["data_offset"] :]
+    body = body[: len(body) - len(body) % frame_bytes]
+    return _pcm_to_float(body, header["width"], header["channels"]), header["rate"]
+
+
+def frame_signal(samples: np.ndarray, frame: int, hop: int) -> np.ndarray:
+    """Slice a mono signal into overlapping frames, shape (n_frames, frame)."""
+    if samples.shape[0] < frame:
+        samples = np.pad(samples, (0, frame - samples.shape[0]))
+    return np.lib.stride_tricks.sliding_window_view(samples, frame)[::hop]
+
+
+def frame_rms_db(samples: np.ndarray, rate: int, frame_ms: float = 20.0) -> np.ndarray:
+    """Per-frame RMS level in dBFS over non-overlapping frames."""
+    frame = max(int(rate * frame_ms / 1000), 1)
+    frames = frame_signal(to_mono(samples), frame, frame)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+def band_energies(samples: np.ndarray, rate: int, bands: int = 16, frame_ms: float = 40.0, hop_ms: float = 20.0) -> np.ndarray:
+    """Log energy in log-spaced bands (80Hz-8kHz) per frame, shape (n_frames, bands)."""
+    frame = int(rate * frame_ms / 1000)
+    hop = int(rate * hop_ms / 1000)
+    frames = frame_signal(to_mono(samples), frame, hop)
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(frame), axis=1)) ** 2
+
+    freqs = np.fft.rfftfreq(frame, 1.0 / rate)
+    edges = np.geomspace(80.0, 8000.0, bands + 1)
+    band_index = np.searchsorted(edges, freqs) - 1
+    valid = (band_index >= 0) & (band_index < bands)
+    # Sum bins into bands with one matrix product: (frames, bins) @ (bins, bands)
+    membership = np.zeros((freqs.size, bands))
+    membership[np.flatnonzero(valid), band_index[valid]] = 1.0
+    return np.log(spectrum @ membership + 1e-10)
+
+
+# =============================================================================
+# Reference preprocessing
+# =============================================================================
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """
+    Band-limited resampling along the time axis via the real FFT: the
+    spectrum is truncated (down) or zero-padded (up) and inverted. Works on
+    mono (n,) and multichannel (n, channels) arrays in one call.
+    """
+    if src_rate == dst_rate:
+        return samples
+    n = samples.shape[0]
+    m = int(round(n * dst_rate / src_rate))
+    spectrum = np.fft.rfft(samples.astype(np.float64), axis=0)
+    bins = m // 2 + 1
+    if bins <= spectrum.shape[0]:
+        spectrum = spectrum[:bins]
+    else:
+        pad = [(0, bins - spectrum.shape[0])] + [(0, 0)] * (samples.ndim - 1)
+        spectrum = np.pad(spectrum, pad)
+    out = np.fft.irfft(spectrum, n=m, axis=0) * (m / n)
+    return out.astype(np.float32)
+
+
+def trim_silence(
+    samples: np.ndarray,
+    rate: int,
+    threshold_db: float = -40.0,
+    pad_ms: float = 100.0,
+) -> np.ndarray:
+    """Drop leading/trailing frames quieter than `threshold_db` below the peak frame."""
+    frame_ms = 10.0
+    levels = frame_rms_db(samples, rate, frame_ms=frame_ms)
+    voiced = np.flatnonzero(levels > levels.max() + threshold_db)
+    if voiced.size == 0:
+        return samples
+    frame = int(rate * frame_ms / 1000)
+    pad = int(rate * pad_ms / 1000)
+    start = max(voiced[0] * frame - pad, 0)
+    end = min((voiced[-1] + 1) * frame + pad, samples.shape[0])
+    return samples[start:end]
+
+
+def trim_duration(samples: np.ndarray, rate: int, seconds: float) -> np.ndarray:
+    """Keep at most the first `seconds` of audio."""
+    return samples[: int(seconds * rate)]
+
+
+def normalize_loudness(samples: np.ndarray, rate: int, target_dbfs: float = -20.0, peak: float = 0.99) -> np.ndarray:
+    """
+    Scale so the RMS of voiced frames (within 30dB of the loudest) sits at
+    `target_dbfs`, limited so the peak stays below `peak`. An RMS stand-in
+    for LUFS that needs no K-weighting filter.
+    """
+    levels = frame_rms_db(samples, rate, frame_ms=20.0)
+    voiced = levels[levels > levels.max() - 30.0]
+    if voiced.size == 0:
+        return samples
+    current = 10 * np.log10(np.mean(10 ** (voiced / 10)))
+    gain = 10 ** ((target_dbfs - current) / 20)
+    max_abs = float(np.abs(samples).max()) or 1.0
+    gain = min(gain, peak / max_abs)
+    return (samples * gain).astype(np.float32)
+
+
+# =============================================================================
+# Similarity
+# =============================================================================
+
+
+def spectral_signature(samples: np.ndarray, rate: int) -> np.ndarray:
+    """
+    Crude voice timbre fingerprint: mean and std of the band energies over
+    voiced frames. Enough to tell a band-limited or distorted voice prompt
+    from the original, not a speaker embedding.
+    """
+    bands = band_energies(samples, rate)
+    loudness = bands.max(axis=1)
+    voiced = bands[loudness > loudness.max() - 30.0]
+    if voiced.shape[0] == 0:
+        voiced = bands
+    return np.concatenate([voiced.mean(axis=0), voiced.std(axis=0)])
+
+
+def signature_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Cosine similarity of two mean-centered spectral signatures."""
+    a = a - a.mean()
+    b = b - b.mean()
+    denom = float(np.linalg.norm(a) * np.linalg.norm(b)) or 1e-12
+    return float(a @ b) / denom
@@ -0,0 +1,361 @@
+"""
+Bulk generation of long documents through the API Worker.
+
+Long scripts are split into chunks the Worker accepts, priced, and
+generated under the account's limits:
+
+    split_document()  paragraph, then sentence boundaries, at most
+                      CHUNK_CHARS UTF-16 units per chunk (a sentence longer
+                      than that is split between words)
+    credits           credits_for_text() per chunk (1 credit per character,
+                      _shared/credits.ts); every debit is reserved against the
+                      /api/credits/usage balance before submitting, so none
+                      is refused (402) mid-document
+    rate limits       one TokenBucket per rate-limit tier a request falls in
+                      (generate: tier 1, task polls: tier 2, audio redirect:
+                      tier 3), sized from the Worker's RATE_LIMIT_* settings
+    active cap        at most `max_active` jobs in flight (4, 2 on free)
+
+The Worker counts requests in fixed windows (rate_limit_hit). A bucket of
+`burst` tokens refilled at (limit - burst) / window admits at most `limit`
+requests in any window-long span, aligned or not, so a client that is the
+only one using the account never sees a 429. A 429 anyway (another tab, a
+stale counter) drains the bucket until retry_after_seconds. The bucket uses
+min(user limit, IP limit): the middleware currently keys counters by IP hash
+(resolveRateLimitIdentity), and one client is one IP either way.
+
+Task polls follow polling.AdaptiveSchedule with a DurationPredictor, since
+every poll spends a tier-2 token. Results download as jobs finish and
+stitch() joins them in document order.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from . import audio, config
+from .polling import AdaptiveSchedule, DurationPredictor, jittered
+from .worker_client import (
+    RATE_LIMIT_DEFAULTS,
+    TERMINAL_STATUSES,
+    WorkerAPIError,
+    WorkerClient,
+    credits_for_text,
+    rate_limit_tier,
+    text_length,
+)
+from .workload import split_sentences
+
+TIERS = ("tier1", "tier2", "tier3")
+ACTIVE_JOB_CAPS = {"free": 2}  # _shared/tasks.ts; every other tier gets 4
+DEFAULT_ACTIVE_JOB_CAP = 4
+MAX_RETRIES = 10
+# The Worker accepts 1000 characters, but Qwen synthesis rejects more than 600
+# after the debit (refunded, yet a wasted job and tier-1 request)
+CHUNK_CHARS = min(config.WORKER_MAX_TEXT_CHARS, config.DASHSCOPE_MAX_TEXT_CHARS)
+
+
+def _split_words(text: str, max_chars: int) -> list[str]:
+    chunks, current = [], ""
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if current and text_length(candidate) > max_chars:
+            chunks.append(current)
+            candidate = word
+        while text_length(candidate) > max_chars:  # One unbroken "word" longer than a chunk
+            chunks.append(candidate[:max_chars])
+            candidate = candidate[max_chars:]
+        current = candidate
+    return chunks + ([current] if current else [])
+
+
+def split_document(text: str, max_chars: int = CHUNK_CHARS) -> list[str]:
+    """
+    Chunks of at most `max_chars` (JavaScript length): whole paragraphs when
+    they fit, otherwise runs of whole sentences, packed greedily. Paragraphs
+    are never merged, so chunk boundaries keep the document's pauses.
+    """
+    chunks = []
+    for paragraph in text.split("\n\n"):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if text_length(paragraph) <= max_chars:
+            chunks.append(paragraph)
+            continue
+        current = ""
+        for sentence in split_sentences(paragraph):
+            pieces = [sentence] if text_length(sentence) <= max_chars else _split_words(sentence, max_chars)
+            for piece in pieces:
+                candidate = f"{current} {piece}" if current else piece
+                if current and text_length(candidate) > max_chars:
+                    chunks.append(current)
+                    candidate = piece
+                current = candidate
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket on the caller's (possibly time-scaled) clock:
+    `capacity` tokens, refilled at `rate` per second.
+    """
+
+    def __init__(self, rate: float, capacity: float, time_scale: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.time_scale = time_scale
+        self.tokens = capacity
+        self.updated = self._now()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+        self.waited = 0.0  # Total seconds callers spent in acquire()
+        self.acquired = 0
+
+    @classmethod
+    def for_limit(cls, limit: int, window: float, burst: int = 1, time_scale: float = 1.0) -> "TokenBucket":
+        """At most `limit` acquisitions in any `window` seconds."""
+        burst = max(1, min(burst, limit - 1))
+        rate = (limit - burst) / window if limit > burst else limit / (2 * window)
+        return cls(rate, burst, time_scale)
+
+    def _now(self) -> float:
+        return time.perf_counter() / self.time_scale
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = self._now()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    self.waited += waited
+                    self.acquired += 1
+                    return waited
+                delay = max(self.blocked_until - now, (1.0 - self.tokens) / self.rate if self.rate else 1.0)
+            time.sleep(delay * self.time_scale)
+            waited += delay
+
+    def penalize(self, retry_after: float):
+        """The server said 429: no tokens until `retry_after` seconds from now."""
+        with self.lock:
+            now = self._now()
+            self.tokens = 0.0
+            self.updated = now
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+
+def tier_buckets(
+    limits: dict[str, int] | None = None, burst: int = 1, time_scale: float = 1.0
+) -> dict[str, TokenBucket]:
+    """One TokenBucket per rate-limit tier from RATE_LIMIT_* settings (Worker defaults + `limits`)."""
+    limits = {**RATE_LIMIT_DEFAULTS, **(limits or {})}
+    buckets = {}
+    for tier in TIERS:
+        number = tier[-1]
+        caps = [limits.get(f"RATE_LIMIT_TIER{number}_{actor}_LIMIT") for actor in ("USER", "IP")]
+        window = limits.get(f"RATE_LIMIT_TIER{number}_WINDOW_SECONDS", limits["RATE_LIMIT_WINDOW_SECONDS"])
+        buckets[tier] = TokenBucket.for_limit(min(c for c in caps if c), window, burst, time_scale)
+    return buckets
+
+
+class CreditBudget:
+    """
+    Credits reserved against a known balance; refunded reservations come
+    back. After the first refusal every later reservation is refused too, so
+    what gets generated is a prefix of the document.
+    """
+
+    def __init__(self, balance: int):
+        self.available = balance
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def reserve(self, amount: int) -> bool:
+        with self.lock:
+            if self.closed or amount > self.available:
+                self.closed = True
+                return False
+            self.available -= amount
+            return True
+
+    def release(self, amount: int):
+        with self.lock:
+            self.available += amount
+
+
+class BulkGenerator:
+    """
+    Generate chunks with one voice under credit, rate-limit and active-job
+    admission. `worker` must be signed in; `balance` and `max_active` come
+    from the caller (see plan()).
+    """
+
+    def __init__(
+        self,
+        worker: WorkerClient,
+        voice_id: str,
+        balance: int,
+        max_active: int = DEFAULT_ACTIVE_JOB_CAP,
+        limits: dict[str, int] | None = None,
+        burst: int = 1,
+        language: str = "Auto",
+        schedule: AdaptiveSchedule | None = None,
+        timeout: float = 900.0,
+        seed: int = 0,
+    ):
+        self.worker = worker
+        self.voice_id = voice_id
+        self.language = language
+        self.max_active = max_active
+        self.timeout = timeout
+        self.budget = CreditBudget(balance)
+        self.buckets = tier_buckets(limits, burst, worker.time_scale)
+        self.schedule = schedule or AdaptiveSchedule()
+        self.predictor = DurationPredictor()
+        self.predictor_lock = threading.Lock()
+        self.seed = seed
+        self.rate_limited = {tier: 0 for tier in TIERS}
+        self.counts_lock = threading.Lock()
+
+    def _call(self, method: str, path: str, call, record: dict):
+        """Run `call()` (one Worker request) under its tier's bucket, retrying 429s."""
+        tier = rate_limit_tier(method, path)
+        for _ in range(MAX_RETRIES):
+            if tier:
+                record["throttled"] += self.buckets[tier].acquire()
+            try:
+                return call()
+            except WorkerAPIError as e:
+                if e.status != 429 or not tier:
+                    raise
+                with self.counts_lock:
+                    self.rate_limited[tier] += 1
+                record["rate_limited"] += 1
+                self.buckets[tier].penalize(e.retry_after or 1.0)
+        raise WorkerAPIError(429, f"Still rate limited after {MAX_RETRIES} attempts")
+
+    def _submit(self, text: str, record: dict) -> dict:
+        for _ in range(MAX_RETRIES):
+            try:
+                return self._call(
+                    "POST", "/api/generate", lambda: self.worker.generate(self.voice_id, text, self.language), record
+                )
+            except WorkerAPIError as e:
+                if not e.retryable_admission:
+                    raise
+                record["cap_rejected"] += 1  # Another client's jobs count toward the cap too
+                self.worker.sleep(config.WORKER_POLL_INTERVAL)
+        raise WorkerAPIError(409, f"Active job cap still full after {MAX_RETRIES} attempts")
+
+    def _wait(self, task_id: str, predicted: float | None, record: dict) -> dict:
+        start = time.perf_counter()
+        path = f"/api/tasks/{task_id}"
+        rng = random.Random(self.seed * 1_000_003 + record["index"])
+        delay = jittered(self.schedule.first_delay(predicted), self.schedule.jitter, rng)
+        while True:
+            self.worker.sleep(delay)
+            record["polls"] += 1
+            task = self._call("GET", path, lambda: self.worker.get_task(task_id), record)
+            elapsed = (time.perf_counter() - start) / self.worker.time_scale
+            if task.get("status") in TERMINAL_STATUSES:
+                return task
+            if elapsed > self.timeout:
+                raise TimeoutError(f"Task {task_id} not finished after {record['polls']} polls")
+            delay = jittered(self.schedule.next_delay(elapsed, predicted, delay), self.schedule.jitter, rng)
+
+    def generate_chunk(self, index: int, text: str) -> dict:
+        """Reserve, submit, poll and download one chunk; the record carries its WAV bytes."""
+        credits = credits_for_text(text)
+        record = {
+            "index": index,
+            "text_chars": text_length(text),
+            "credits": credits,
+            "polls": 0,
+            "rate_limited": 0,
+            "cap_rejected": 0,
+            "throttled": 0.0,
+        }
+        if not self.budget.reserve(credits):
+            record.update(status="skipped", error="Not enough credits left for this chunk")
+            return record
+        start = time.perf_counter()
+        try:
+            job = self._submit(text, record)
+            record.update(task_id=job["task_id"], generation_id=job.get("generation_id"))
+            record["submit"] = (time.perf_counter() - start) / self.worker.time_scale
+            minutes = job.get("estimated_duration_minutes")
+            with self.predictor_lock:
+                predicted = self.predictor.predict(len(text), minutes * 60 if minutes else None)
+            task = self._wait(job["task_id"], predicted, record)
+            record["status"] = task["status"]
+            record["wait"] = (time.perf_counter() - start) / self.worker.time_scale - record["submit"]
+            if task["status"] != "completed":
+                raise RuntimeError(task.get("error") or task["status"])
+            with self.predictor_lock:
+                self.predictor.observe(len(text), record["submit"] + record["wait"])
+            audio_url = task["result"]["audio_url"]
+            wav, _ = self._call("GET", audio_url, lambda: self.worker.download_audio(audio_url), record)
+            record.update(wav=wav, bytes=len(wav), audio_seconds=audio.wav_duration(wav))
+        except (WorkerAPIError, RuntimeError, TimeoutError, requests.exceptions.RequestException) as e:
+            record["error"] = str(e) or type(e).__name__
+            record.setdefault("status", "error")
+            if isinstance(e, WorkerAPIError) and e.status == 402:
+                record["failed_debit"] = True
+            if "task_id" not in record or record["status"] in ("failed", "cancelled"):
+                self.budget.release(credits)  # Never debited, or refunded by the consumer
+        record["total"] = (time.perf_counter() - start) / self.worker.time_scale
+        return record
+
+    def run(self, chunks: list[str]) -> list[dict]:
+        """Generate every chunk, at most max_active at a time, in submission order; records in chunk order."""
+        with ThreadPoolExecutor(max_workers=self.max_active) as pool:
+            return list(pool.map(self.generate_chunk, range(len(chunks)), chunks))
+
+
+def plan(worker: WorkerClient, chunks: list[str]) -> dict:
+    """Balance, tier and active-job cap from /api/credits/usage, with the document's cost."""
+    usage = worker.credit_usage()
+    tier = usage.get("plan", {}).get("tier")
+    cost = sum(credits_for_text(c) for c in chunks)
+    balance = int(usage.get("balance", 0))
+    return {
+        "tier": tier,
+        "balance": balance,
+        "cost": cost,
+        "fits": cost <= balance,
+        "max_active": ACTIVE_JOB_CAPS.get(tier, DEFAULT_ACTIVE_JOB_CAP),
+    }
+
+
+def stitch(wavs: list[bytes], gap_seconds: float = 0.3) -> tuple[bytes, float]:
+    """
+    Join WAVs in order with `gap_seconds` of silence between them, at the
+    first one's sample rate (mono). Returns (wav, seconds).
+    """
+    parts, rate = [], None
+    for data in wavs:
+        samples, src_rate = audio.decode_wav(data)
+        samples = audio.to_mono(samples)
+        rate = rate or src_rate
+        if src_rate != rate:
+            samples = audio.resample(samples, src_rate, rate)
+        if parts and gap_seconds > 0:
+            parts.append(np.zeros(int(gap_seconds * rate), dtype=samples.dtype))
+        parts.append(samples)
+    if not parts:
+        return b"", 0.0
+    joined = np.concatenate(parts)
+    return audio.encode_wav(joined, rate), audio.duration_seconds(joined, rate)
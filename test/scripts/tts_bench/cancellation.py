@@ -0,0 +1,166 @@
+"""
+Cancellation storms: cancel jobs mid-flight and count the provider work they still cost.
+
+POST /api/tasks/:id/cancel (routes/tasks.ts) marks the task cancelled,
+sets cancellation_requested and refunds the debit at once. The tts-jobs
+consumer (processQwenGenerationTask, routes/generate.ts) only checks
+shouldCancelQwenTask before submitting to the provider, after synthesis
+and after the audio download: a synthesis or download already in flight
+runs to its end, so a job cancelled mid-synthesis still costs the rest of
+it (and the provider bills its characters).
+
+plan() picks `fraction` of the jobs to cancel, each after a random delay
+from its submit. run_job() drives one job with WorkerClient: submit at its
+arrival time, poll, and send the cancel when its delay is up (a job that
+finishes first is never cancelled, as the web app hides the button).
+match_provider_calls() joins the DashScope stand-in's `calls` log to the
+jobs: a synthesis by text (the first unclaimed one started after the
+submit) and its audio fetch by audio id. cancel_costs() then fills in, per
+cancelled job:
+
+    stage         where the cancel landed: queued, synthesis, download or
+                  persist (after the download)
+    after_cancel  provider seconds (synthesis + download) after the cancel
+                  request was sent
+    effective     cancel sent -> the end of the job's last provider call, or
+                  the cancel response when no provider work followed
+
+Times are wall-clock (time.time(), as the stand-in logs them) and divided
+by `time_scale` into emulated seconds.
+"""
+
+import random
+import time
+
+import requests
+
+from .worker_client import TERMINAL_STATUSES, WorkerAPIError, WorkerClient
+
+STAGES = ("queued", "synthesis", "download", "persist")
+
+
+def plan(jobs: list[dict], fraction: float, delay: tuple[float, float], seed: int = 0) -> list[dict]:
+    """Copies of `jobs` with "cancel_delay" (seconds after submit) on a random `fraction` of them."""
+    rng = random.Random(seed)
+    chosen = set(rng.sample(range(len(jobs)), round(len(jobs) * fraction)))
+    return [{**job, "cancel_delay": rng.uniform(*delay) if i in chosen else None} for i, job in enumerate(jobs)]
+
+
+def _cancel(worker: WorkerClient, task_id: str, record: dict):
+    record["cancel_sent"] = time.time()
+    try:
+        worker.cancel_task(task_id)
+        record["cancel_response"] = "cancelled"
+    except WorkerAPIError as e:
+        if e.status not in (400, 409):
+            raise
+        # 400: already terminal; 409: the consumer finished it under the cancel
+        record["cancel_response"] = "too_late" if e.status == 400 else "conflict"
+    record["cancel_done"] = time.time()
+
+
+def run_job(
+    worker: WorkerClient,
+    voice_id: str,
+    job: dict,
+    start_at: float,
+    interval: float,
+    timeout: float,
+) -> dict:
+    """
+    Submit `job` at `start_at` (time.time()), cancel it `job["cancel_delay"]`
+    emulated seconds after the submit returns, and poll it to a terminal
+    status. Returns a record with wall-clock "submit_start", "submit_end",
+    "cancel_sent", "cancel_done" and "detected_at", the "cancel_response",
+    "status" and "polls".
+    """
+    record = {
+        "id": job["id"],
+        "text": job["text"],
+        "text_chars": len(job["text"]),
+        "cancel_delay": job.get("cancel_delay"),
+        "admission_retries": 0,
+        "rate_limited": 0,
+        "cap_rejected": 0,
+        "polls": 0,
+    }
+    scale = worker.time_scale
+    if start_at > time.time():
+        time.sleep(start_at - time.time())
+    try:
+        record["submit_start"] = time.time()
+        submitted = worker.submit(voice_id, job["text"], "Auto", record, interval)
+        record["submit_end"] = time.time()
+        record.update(task_id=submitted["task_id"], generation_id=submitted.get("generation_id"))
+        cancel_at = None
+        if record["cancel_delay"] is not None:
+            cancel_at = record["submit_end"] + record["cancel_delay"] * scale
+        deadline = record["submit_end"] + timeout * scale
+        while True:
+            if cancel_at is not None and time.time() >= cancel_at and "cancel_sent" not in record:
+                _cancel(worker, record["task_id"], record)
+            record["polls"] += 1
+            try:
+                task = worker.get_task(record["task_id"])
+                delay = interval
+            except WorkerAPIError as e:
+                if e.status != 429:
+                    raise
+                task, delay = None, e.retry_after or interval
+            if task and task.get("status") in TERMINAL_STATUSES:
+                break
+            if time.time() + delay * scale > deadline:
+                raise TimeoutError(f"Task {record['task_id']} not finished after {record['polls']} polls")
+            wake = time.time() + delay * scale
+            if cancel_at is not None and "cancel_sent" not in record:
+                wake = min(wake, max(cancel_at, time.time()))
+            time.sleep(max(wake - time.time(), 0.0))
+        record.update(status=task["status"], detected_at=time.time())
+        if cancel_at is not None and "cancel_sent" not in record:
+            record["cancel_response"] = "finished_first"
+        if task["status"] not in ("completed", "cancelled"):
+            record["error"] = task.get("error") or task["status"]
+    except (WorkerAPIError, TimeoutError, requests.exceptions.RequestException) as e:
+        record["error"] = str(e) or type(e).__name__
+        record.setdefault("status", "error")
+    return record
+
+
+def match_provider_calls(records: list[dict], calls: list[dict]):
+    """Attach each record's provider "synthesis" and "fetch" calls (from the DashScope stand-in log)."""
+    syntheses = sorted((c for c in calls if c["kind"] == "synthesis"), key=lambda c: c["start"])
+    fetches = {}
+    for call in calls:
+        if call["kind"] == "fetch":
+            fetches.setdefault(call["audio_id"], []).append(call)
+    claimed = set()
+    for record in sorted((r for r in records if "submit_start" in r), key=lambda r: r["submit_start"]):
+        for index, call in enumerate(syntheses):
+            if index not in claimed and call["text"] == record["text"] and call["start"] >= record["submit_start"]:
+                claimed.add(index)
+                record["synthesis"] = {"start": call["start"], "end": call["end"]}
+                runs = fetches.get(call["audio_id"], [])
+                if runs:
+                    record["fetch"] = {"start": min(f["start"] for f in runs), "end": max(f["end"] for f in runs)}
+                break
+
+
+def cancel_costs(record: dict, time_scale: float):
+    """Stage, provider seconds (total and after the cancel) and cancel-to-effective for one record."""
+    calls = [record[kind] for kind in ("synthesis", "fetch") if kind in record]
+    record["provider_seconds"] = sum(c["end"] - c["start"] for c in calls) / time_scale
+    if record.get("cancel_response") != "cancelled":
+        return
+    sent = record["cancel_sent"]
+    synthesis, fetch = record.get("synthesis"), record.get("fetch")
+    if synthesis is None or sent < synthesis["start"]:
+        record["stage"] = "queued"
+    elif sent < synthesis["end"]:
+        record["stage"] = "synthesis"
+    elif fetch is not None and sent < fetch["end"]:
+        record["stage"] = "download"
+    else:
+        record["stage"] = "persist"
+    record["cancel_latency"] = (record["cancel_done"] - sent) / time_scale
+    record["after_cancel"] = sum(max(c["end"] - max(c["start"], sent), 0.0) for c in calls) / time_scale
+    record["effective"] = (max([c["end"] for c in calls] + [record["cancel_done"]]) - sent) / time_scale
@@ -0,0 +1,469 @@
+"""
+Shared HTTP client for the Modal clone/health endpoints.
+
+Every helper takes an endpoint dict with "clone" and "health" URLs (an entry of
+config.DEPLOYMENTS or any dict with the same keys). Requests go through one
+pooled session so repeated calls reuse connections.
+
+HTTP/2 is optional (needs `httpx[http2]`): after use_http2(), or for an
+endpoint with "http2": true, clone and health requests share one multiplexed
+connection per host instead of one HTTP/1.1 connection per in-flight request.
+https:// URLs negotiate it via ALPN; plain http:// URLs (the stand-in's h2c
+listener) use prior knowledge. stream_clone opens its own HTTP/2 connection
+per call, because httpx cannot reset a single stream and closing the
+connection is how an early abort reaches the server.
+
+Clone bodies can be sent three ways, negotiated per endpoint from its
+"encodings" list (JSON only when it has none):
+
+    json       the Modal contract, reference as base64 in the JSON body
+    gzip       the same JSON with Content-Encoding: gzip
+    multipart  multipart/form-data with the reference as a binary file part
+"""
+
+import asyncio
+import base64
+import gzip
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.filepost import encode_multipart_formdata
+
+from . import config
+
+POOL_MAXSIZE = 64  # Kept connections per host; concurrent benchmarks go up to 64
+
+_session: requests.Session | None = None
+_use_http2 = False
+
+# HTTP/2 requests run on one asyncio loop in a background thread: httpx's
+# sync HTTP/2 connection can interleave stream IDs out of order when several
+# threads share it, which servers reject as a protocol error.
+_http2_loop: asyncio.AbstractEventLoop | None = None
+_http2_clients: dict[bool, object] = {}
+_http2_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the shared pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=POOL_MAXSIZE)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+
+
+def use_http2(enabled: bool = True):
+    """Send clone/health requests over HTTP/2 for every endpoint."""
+    global _use_http2
+    _use_http2 = enabled
+
+
+def uses_http2(endpoint: dict) -> bool:
+    return bool(endpoint.get("http2", _use_http2))
+
+
+def _import_httpx(purpose: str = "HTTP/2 mode requires httpx with HTTP/2 support", package: str = "'httpx[http2]'"):
+    try:
+        import httpx
+    except ImportError:
+        raise RuntimeError(f"{purpose}: uv run --with {package} ...") from None
+    return httpx
+
+
+def _http2_event_loop() -> asyncio.AbstractEventLoop:
+    global _http2_loop
+    with _http2_lock:
+        if _http2_loop is None:
+            _http2_loop = asyncio.new_event_loop()
+            threading.Thread(target=_http2_loop.run_forever, name="http2-client", daemon=True).start()
+        return _http2_loop
+
+
+def _http2_request(method: str, url: str, timeout: float, data: bytes | None, headers: dict | None):
+    """Run one request on the shared HTTP/2 AsyncClient from any thread."""
+    httpx = _import_httpx()
+    # Plain http:// (the stand-in's h2c listener) needs prior knowledge
+    prior_knowledge = url.startswith("http://")
+
+    async def send():
+        if prior_knowledge not in _http2_clients:
+            _http2_clients[prior_knowledge] = httpx.AsyncClient(http1=not prior_knowledge, http2=True)
+        return await _http2_clients[prior_knowledge].request(
+            method, url, content=data, headers=headers, timeout=timeout
+        )
+
+    return asyncio.run_coroutine_threadsafe(send(), _http2_event_loop()).result()
+
+
+def reset_connections():
+    """Close pooled HTTP/1.1 and HTTP/2 connections (next request reconnects)."""
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
+    if _http2_loop is not None:
+
+        async def close_all():
+            for http2_client in _http2_clients.values():
+                await http2_client.aclose()
+            _http2_clients.clear()
+
+        asyncio.run_coroutine_threadsafe(close_all(), _http2_loop).result()
+
+
+def _request(endpoint: dict, method: str, url: str, timeout: float, **kwargs):
+    """Send through the endpoint's transport; responses expose .status_code/.content/.headers."""
+    if uses_http2(endpoint):
+        return _http2_request(method, url, timeout, kwargs.get("data"), kwargs.get("headers"))
+    return get_session().request(method, url, timeout=timeout, **kwargs)
+
+
+@contextmanager
+def _stream_request(endpoint: dict, url: str, timeout: float, data: bytes, headers: dict, chunk_size: int):
+    """POST with a streamed response; yields (response, chunk_iterator)."""
+    if uses_http2(endpoint):
+        httpx = _import_httpx()
+        # A private connection: closing it is how an abort reaches the server
+        with httpx.Client(http1=not url.startswith("http://"), http2=True) as http2_client:
+            with http2_client.stream("POST", url, content=data, headers=headers, timeout=timeout) as response:
+                if response.status_code >= 400:
+                    response.read()
+                yield response, response.iter_bytes(chunk_size)
+    else:
+        with get_session().post(url, data=data, headers=headers, timeout=timeout, stream=True) as response:
+            yield response, response.iter_content(chunk_size=chunk_size)
+
+
+def _is_timeout(error: Exception) -> bool:
+    if isinstance(error, requests.exceptions.Timeout):
+        return True
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(error, httpx.TimeoutException)
+
+
+def load_reference(
+    audio_path: Path = config.REFERENCE_AUDIO,
+    text_path: Path = config.REFERENCE_TEXT,
+    preprocess: bool = False,
+    normalize: bool = False,
+) -> tuple[str, str]:
+    """
+    Load reference audio (base64) and transcript.
+
+    With preprocess=True the WAV goes through reference.preprocessed (trim,
+    mono, 24kHz, optional loudness normalization; cached) before encoding.
+    """
+    with open(audio_path, "rb") as f:
+        wav = f.read()
+    if preprocess:
+        from . import reference  # NumPy only when preprocessing
+
+        wav = reference.preprocessed(wav, normalize=normalize)
+    audio_b64 = base64.b64encode(wav).decode("utf-8")
+    with open(text_path, "r", encoding="utf-8") as f:
+        ref_text = f.read().strip()
+    return audio_b64, ref_text
+
+
+def load_text(name: str) -> str:
+    """Load an input text from inputs/texts/{name}.txt."""
+    text_file = config.TEXTS_DIR / f"{name}.txt"
+    if not text_file.exists():
+        raise FileNotFoundError(f"Text file not found: {text_file}")
+    with open(text_file, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def build_payload(
+    text: str,
+    ref_audio_b64: str,
+    ref_text: str,
+    language: str = config.DEFAULT_LANGUAGE,
+    max_new_tokens: int | None = None,
+) -> dict:
+    """Build the JSON body for the clone endpoint."""
+    payload = {
+        "text": text,
+        "language": language,
+        "ref_audio_base64": ref_audio_b64,
+        "ref_text": ref_text,
+    }
+    if max_new_tokens is not None:
+        payload["max_new_tokens"] = max_new_tokens
+    return payload
+
+
+ENCODINGS = ("json", "gzip", "multipart")
+PREFERRED_ENCODINGS = ("multipart", "gzip", "json")  # No base64 and no compression CPU first
+GZIP_LEVEL = 6
+
+
+def supported_encodings(endpoint: dict) -> list[str]:
+    """Clone body encodings the endpoint accepts."""
+    return list(endpoint.get("encodings") or ["json"])
+
+
+def negotiate_encoding(endpoint: dict, preferred=PREFERRED_ENCODINGS) -> str:
+    """Pick the first encoding in `preferred` the endpoint supports."""
+    supported = supported_encodings(endpoint)
+    for encoding in preferred:
+        if encoding in supported:
+            return encoding
+    return "json"
+
+
+def encode_body(payload: dict, encoding: str = "json", gzip_level: int = GZIP_LEVEL) -> tuple[bytes, dict]:
+    """
+    Serialize a clone payload (as built by build_payload) for `encoding`.
+    Returns (body_bytes, headers).
+    """
+    if encoding == "json":
+        return json.dumps(payload).encode("utf-8"), {"Content-Type": "application/json"}
+    if encoding == "gzip":
+        body = gzip.compress(json.dumps(payload).encode("utf-8"), compresslevel=gzip_level)
+        return body, {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+    if encoding == "multipart":
+        fields = {k: str(v).lower() if isinstance(v, bool) else str(v) for k, v in payload.items() if k != "ref_audio_base64"}
+        fields["ref_audio"] = ("reference.wav", base64.b64decode(payload["ref_audio_base64"]), "audio/wav")
+        body, content_type = encode_multipart_formdata(fields)
+        return body, {"Content-Type": content_type}
+    raise ValueError(f"Unknown encoding '{encoding}' (expected one of {', '.join(ENCODINGS)})")
+
+
+def _server_timing(response) -> dict:
+    """Upload/decode/service seconds a stand-in reports in X-* headers."""
+    timing = {}
+    for header, key in [
+        ("X-Upload-Seconds", "upload_seconds"),
+        ("X-Decode-Seconds", "decode_seconds"),
+        ("X-Service-Seconds", "service_seconds"),
+    ]:
+        if header in response.headers:
+            timing[key] = float(response.headers[header])
+    return timing
+
+
+def _error_detail(response) -> str:
+    try:
+        return str(response.json().get("detail", response.text[:200]))
+    except Exception:
+        return f"HTTP {response.status_code}: {response.text[:200]}"
+
+
+def check_health(endpoint: dict, timeout: float = config.HEALTH_TIMEOUT) -> dict:
+    """Check endpoint health and return the JSON body (or an error dict)."""
+    try:
+        response = _request(endpoint, "GET", endpoint["health"], timeout)
+        if response.status_code >= 400:
+            return {"status": "error", "error": _error_detail(response)}
+        return response.json()
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+def _send_clone(
+    endpoint: dict,
+    payload: dict,
+    timeout: float,
+    encoding: str | None,
+) -> tuple[float, bytes | None, str | None, dict]:
+    """Encode and POST one clone request; the timer includes encoding."""
+    encoding = encoding or negotiate_encoding(endpoint)
+    start = time.perf_counter()
+    body, headers = encode_body(payload, encoding)
+    meta = {
+        "encoding": encoding,
+        "request_bytes": len(body),
+        "encode_seconds": time.perf_counter() - start,
+    }
+    try:
+        response = _request(endpoint, "POST", endpoint["clone"], timeout, data=body, headers=headers)
+        elapsed = time.perf_counter() - start
+        meta.update(_server_timing(response))
+        if response.status_code < 400:
+            return elapsed, response.content, None, meta
+        return elapsed, None, _error_detail(response), meta
+    except Exception as e:
+        return time.perf_counter() - start, None, "Timeout" if _is_timeout(e) else str(e) or type(e).__name__, meta
+
+
+def clone_voice(
+    endpoint: dict,
+    payload: dict,
+    timeout: float = config.FALLBACK_TIMEOUT,
+    encoding: str | None = None,
+) -> tuple[float, bytes | None, str | None]:
+    """
+    Call the clone endpoint and return (time_seconds, audio_bytes, error).
+
+    encoding=None negotiates the body encoding from the endpoint.
+    """
+    elapsed, audio, error, _ = _send_clone(endpoint, payload, timeout, encoding)
+    return elapsed, audio, error
+
+
+def measure_request(
+    endpoint: dict,
+    payload: dict,
+    timeout: float = config.FALLBACK_TIMEOUT,
+    ref_seconds: float | None = None,
+    encoding: str | None = None,
+) -> tuple[dict, bytes | None]:
+    """
+    Run one clone request and return (run_record, audio_bytes).
+
+    The run record uses the same keys as the results JSON ("time",
+    "audio_size", "error") plus the request features the latency model
+    trains on, so it can be appended to a results file as-is. It also
+    carries the body "encoding", "request_bytes", "encode_seconds" and any
+    server-reported timing.
+    """
+    elapsed, audio, error, meta = _send_clone(endpoint, payload, timeout, encoding)
+    record = {
+        "time": elapsed,
+        "text_chars": len(payload["text"]),
+        "language": payload.get("language", config.DEFAULT_LANGUAGE),
+        "max_new_tokens": payload.get("max_new_tokens"),
+        "ref_seconds": ref_seconds,
+        "timeout": timeout,
+        **meta,
+    }
+    if error:
+        record["error"] = error
+    else:
+        record["audio_size"] = len(audio)
+    return record, audio
+
+
+def _parse_sse(buffer: bytearray) -> list[tuple[str, dict]]:
+    """Pop complete server-sent events off `buffer` as (event, data) pairs."""
+    events = []
+    while (end := buffer.find(b"\n\n")) >= 0:
+        block = bytes(buffer[:end]).decode("utf-8")
+        del buffer[: end + 2]
+        event, data = "message", []
+        for line in block.splitlines():
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                data.append(line[5:].strip())
+        if data:
+            events.append((event, json.loads("\n".join(data))))
+    return events
+
+
+def stream_clone(
+    endpoint: dict,
+    payload: dict,
+    timeout: float = config.FALLBACK_TIMEOUT,
+    chunk_size: int | None = None,
+    on_chunk=None,
+    encoding: str | None = None,
+    sse: bool = False,
+) -> tuple[dict, bytes | None]:
+    """
+    Call the clone endpoint with `"stream": true` and read the body as it
+    arrives. Returns (record, wav_bytes).
+
+    The response may be a chunked WAV or, with sse=True (sent as Accept:
+    text/event-stream), server-sent events carrying base64 PCM; either way
+    the audio is reassembled into one WAV. chunk_size=None yields data as
+    each network read returns it, so chunk_times track server chunks.
+
+    on_chunk(wav_so_far, elapsed_seconds) is called after every chunk and may
+    return False to abort the request (the connection is closed, so a
+    streaming server stops generating). Endpoints that ignore "stream" still
+    work: their whole body simply arrives at once.
+
+    The record has "time", "encoding", "request_bytes", "format" ("wav" or
+    "sse"), "first_byte" (time to first body byte), "first_audio" (time to
+    the first audio sample), "chunk_times" (arrival offsets) with the
+    matching "chunk_audio" (seconds of audio each delivered),
+    "audio_seconds", "bytes", plus "aborted" or "error".
+    """
+    from . import audio  # WAV header helpers
+
+    payload = {**payload, "stream": True}
+    encoding = encoding or negotiate_encoding(endpoint)
+    start = time.perf_counter()
+    data, headers = encode_body(payload, encoding)
+    if sse:
+        headers["Accept"] = "text/event-stream"
+    record = {
+        "text_chars": len(payload["text"]),
+        "encoding": encoding,
+        "request_bytes": len(data),
+        "format": None,
+        "first_byte": None,
+        "first_audio": None,
+        "chunk_times": [],
+        "chunk_audio": [],
+        "audio_seconds": 0.0,
+        "bytes": 0,
+    }
+    body = bytearray()  # Reassembled WAV
+    received = 0
+    try:
+        with _stream_request(endpoint, endpoint["clone"], timeout, data, headers, chunk_size) as (response, chunks):
+            if response.status_code >= 400:
+                record["time"] = time.perf_counter() - start
+                record["error"] = _error_detail(response)
+                return record, None
+            is_sse = "text/event-stream" in response.headers.get("Content-Type", "")
+            record["format"] = "sse" if is_sse else "wav"
+            pending = bytearray()
+            header = None
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                elapsed = time.perf_counter() - start
+                received += len(chunk)
+                if record["first_byte"] is None:
+                    record["first_byte"] = elapsed
+                audio_bytes = 0
+                if is_sse:
+                    pending.extend(chunk)
+                    for event, event_data in _parse_sse(pending):
+                        if event == "start":
+                            header = {
+                                "rate": event_data["sample_rate"],
+                                "channels": event_data["channels"],
+                                "width": event_data["sample_width"],
+                            }
+                            body.extend(audio.wav_header(header["rate"], header["channels"], header["width"]))
+                        elif event == "audio":
+                            pcm = base64.b64decode(event_data["audio"])
+                            body.extend(pcm)
+                            audio_bytes += len(pcm)
+                else:
+                    before = len(body)
+                    body.extend(chunk)
+                    if header is None:
+                        header = audio.parse_wav_header(bytes(body[:256]))
+                    if header is not None:
+                        audio_bytes = len(body) - max(before, header["data_offset"])
+                seconds = 0.0
+                if header is not None and audio_bytes > 0:
+                    seconds = audio_bytes / (header["rate"] * header["channels"] * header["width"])
+                    if record["first_audio"] is None:
+                        record["first_audio"] = elapsed
+                record["chunk_times"].append(elapsed)
+                record["chunk_audio"].append(seconds)
+                record["audio_seconds"] += seconds
+                if on_chunk is not None and on_chunk(body, elapsed) is False:
+                    record["aborted"] = True
+                    break
+    except Exception as e:
+        record["error"] = "Timeout" if _is_timeout(e) else str(e) or type(e).__name__
+    record["time"] = time.perf_counter() - start
+    record["bytes"] = received
+    return record, bytes(body)
@@ -0,0 +1,233 @@
+"""
+Contention on the credit and rate-limit RPCs (supabase/schemas/03_functions.sql).
+
+Every rate-limited Worker request calls rate_limit_check_and_increment(),
+an upsert on the one rate_limit_counters row for its (actor, tier, window):
+all of a client's requests in a window update the same row, and the
+middleware keys that actor by IP hash today. Every generate debits through
+credit_apply_event(), which locks the user's profiles row FOR UPDATE, looks
+up the idempotency key and appends a credit_ledger row carrying
+balance_after; a failed job refunds through the same function. With one
+hot actor, both serialize on a single row.
+
+OPERATIONS drive the functions the way the Worker does, each call its own
+transaction (a PostgREST RPC) on the client's own connection, as
+service_role:
+
+    rate_limit  rate_limit_check_and_increment('ip', key, 'tier1', ...)
+    debit       credit_apply_event(user, 'debit', 'generate', ...) with a
+                fresh generate:<id>:debit key
+    generate    the generate route's sequence: rate limit, debit, and a
+                refund for `refund_share` of the jobs (the generation and
+                task inserts are per-row and left out)
+
+run_cell() runs `clients` connections for `duration` seconds, spread over
+`actors` users and IP keys (1 = every client is the same user and IP). A
+monitor connection samples pg_stat_activity for the clients: backends
+waiting on a heavyweight lock (wait_event_type 'Lock': transactionid and
+tuple waits on a row someone else has updated) and other wait events. By
+Little's law, mean waiting backends x duration / calls is the lock wait
+per call.
+
+Bench users are auth.users rows under BENCH_DOMAIN granted GRANT_CREDITS
+through credit_apply_event; drop() removes them (ledger rows cascade) and
+their rate-limit counters.
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+
+from . import history
+
+APP_NAME = "tts_bench_contention"
+BENCH_DOMAIN = "credit-bench.test"
+BENCH_KEY_PREFIX = "bench-"
+OPERATIONS = ("rate_limit", "debit", "generate")
+GRANT_CREDITS = 1_000_000_000
+RATE_LIMIT_WINDOW = 300  # RATE_LIMIT_WINDOW_SECONDS default
+UNLIMITED = 2**31 - 1  # counts every call, never refuses
+SAMPLE_INTERVAL = 0.05
+
+RATE_LIMIT_SQL = "SELECT allowed FROM public.rate_limit_check_and_increment(%s, %s, %s, %s, %s)"
+CREDIT_SQL = (
+    "SELECT applied, insufficient FROM public.credit_apply_event(%s::uuid, %s, %s, %s, %s, %s::uuid, %s, %s::jsonb)"
+)
+WAITS_SQL = """
+    SELECT wait_event_type, wait_event, count(*)
+    FROM pg_stat_activity
+    WHERE application_name = %s AND state = 'active' AND wait_event IS NOT NULL
+    GROUP BY 1, 2
+"""
+
+
+def create_users(conn, count: int) -> list[str]:
+    """Bench users, each granted GRANT_CREDITS; returns their ids."""
+    with conn.transaction():
+        users = history.create_users(conn, count, prefix="contention", domain=BENCH_DOMAIN)
+        with conn.cursor() as cur:
+            for user_id, _ in users:
+                cur.execute(
+                    CREDIT_SQL,
+                    [user_id, "grant", "manual_adjustment", GRANT_CREDITS, "system", None, "bench:grant", "{}"],
+                )
+    return [user_id for user_id, _ in users]
+
+
+def drop(conn) -> int:
+    """Delete the bench users (profiles and ledger rows cascade) and bench rate-limit counters."""
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM public.rate_limit_counters WHERE actor_key LIKE %s", [f"{BENCH_KEY_PREFIX}%"])
+        cur.execute("DELETE FROM auth.users WHERE email LIKE %s", [f"%@{BENCH_DOMAIN}"])
+        return cur.rowcount
+
+
+def balances_consistent(conn, users: list[str]) -> bool:
+    """Every bench user's balance equals the sum of their ledger (no lost or doubled update)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT bool_and(p.credits_remaining = l.total)
+            FROM public.profiles p
+            JOIN (SELECT user_id, sum(signed_amount) AS total FROM public.credit_ledger GROUP BY user_id) l
+              ON l.user_id = p.id
+            WHERE p.id = ANY(%s::uuid[])
+            """,
+            [users],
+        )
+        return bool(cur.fetchone()[0])
+
+
+def deadlocks(conn) -> int:
+    with conn.cursor() as cur:
+        cur.execute("SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()")
+        return cur.fetchone()[0]
+
+
+def _debit(cur, user_id: str, amount: int) -> str | None:
+    """One generate debit; returns the generation id it was keyed by (None if refused)."""
+    generation_id = str(uuid.uuid4())
+    metadata = json.dumps({"reason": "generate_request", "text_length": amount})
+    params = [user_id, "debit", "generate", amount, "generation", generation_id]
+    cur.execute(CREDIT_SQL, params + [f"generate:{generation_id}:debit", metadata])
+    applied, _ = cur.fetchone()
+    return generation_id if applied else None
+
+
+def call(cur, operation: str, user_id: str, actor_key: str, amount: int, refund_share: float, rng) -> int:
+    """One operation; returns the transactions it ran."""
+    transactions = 0
+    if operation in ("rate_limit", "generate"):
+        cur.execute(RATE_LIMIT_SQL, ["ip", actor_key, "tier1", UNLIMITED, RATE_LIMIT_WINDOW])
+        cur.fetchone()
+        transactions += 1
+    if operation in ("debit", "generate"):
+        generation_id = _debit(cur, user_id, amount)
+        transactions += 1
+        if operation == "generate" and generation_id and rng.random() < refund_share:
+            metadata = json.dumps({"reason": "generation_failed"})
+            params = [user_id, "refund", "generate", amount, "generation", generation_id]
+            cur.execute(CREDIT_SQL, params + [f"generate:{generation_id}:refund", metadata])
+            cur.fetchone()
+            transactions += 1
+    return transactions
+
+
+def run_cell(
+    url: str,
+    operation: str,
+    clients: int,
+    users: list[str],
+    actors: int,
+    duration: float = 10.0,
+    amount: int = 100,
+    refund_share: float = 0.1,
+    seed: int = 0,
+) -> dict:
+    """
+    `clients` connections calling `operation` back to back for `duration`
+    seconds; client i acts as users[i % actors] and IP key i % actors.
+    Returns calls, transactions, per-call latencies, errors and the sampled
+    wait events. A client whose connection drops stops there ("dropped").
+    Connections are autocommit: one transaction per statement, like a
+    PostgREST RPC.
+    """
+    psycopg = history._import_psycopg()
+    if actors > len(users):
+        raise ValueError(f"{actors} actors need as many bench users (have {len(users)})")
+    conns = [history.connect(url, role="service_role", application_name=APP_NAME) for _ in range(clients)]
+    monitor = history.connect(url, application_name=f"{APP_NAME}_monitor")
+    deadlocks_before = deadlocks(monitor)
+    barrier = threading.Barrier(clients + 1)
+    stop = threading.Event()
+    latencies = [[] for _ in range(clients)]
+    transactions = [0] * clients
+    errors = Counter()
+    dropped = [False] * clients
+    lock = threading.Lock()
+
+    def client(index: int):
+        rng = random.Random(seed + index)
+        user_id = users[index % actors]
+        actor_key = f"{BENCH_KEY_PREFIX}{seed}-{index % actors}"
+        with conns[index].cursor() as cur:
+            barrier.wait()
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    transactions[index] += call(cur, operation, user_id, actor_key, amount, refund_share, rng)
+                except psycopg.Error as e:
+                    with lock:
+                        errors[type(e).__name__] += 1
+                    if conns[index].closed:
+                        dropped[index] = True  # Lost the connection; retrying would only spin
+                        return
+                    continue
+                latencies[index].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    waits, samples = Counter(), 0
+    try:
+        barrier.wait()
+        start = time.perf_counter()
+        with monitor.cursor() as cur:
+            while time.perf_counter() - start < duration:
+                cur.execute(WAITS_SQL, [APP_NAME])
+                for wait_type, wait_event, count in cur.fetchall():
+                    waits[f"{wait_type}:{wait_event}"] += count
+                samples += 1
+                time.sleep(SAMPLE_INTERVAL)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        deadlock_count = deadlocks(monitor) - deadlocks_before
+    finally:
+        stop.set()
+        for conn in conns + [monitor]:
+            conn.close()
+
+    all_latencies = [value for per_client in latencies for value in per_client]
+    lock_waiting = sum(n for event, n in waits.items() if event.startswith("Lock:")) / max(samples, 1)
+    return {
+        "operation": operation,
+        "clients": clients,
+        "actors": actors,
+        "elapsed": elapsed,
+        "calls": len(all_latencies),
+        "transactions": sum(transactions),
+        "latencies": all_latencies,
+        "errors": dict(errors),
+        "dropped": sum(dropped),
+        "deadlocks": deadlock_count,
+        "samples": samples,
+        # Mean backends in each wait event per sample
+        "waits": {event: n / max(samples, 1) for event, n in waits.most_common()},
+        "lock_waiting": lock_waiting,
+        "lock_wait_per_call": lock_waiting * elapsed / len(all_latencies) if all_latencies else None,
+    }
@@ -0,0 +1,157 @@
+"""
+Cost per generated audio-hour and per 1k characters, and the latency/cost frontier.
+
+A request's GPU-seconds (providers.ModalProvider.request_cost) are only the
+floor of what a Modal deployment bills: a container is billed from boot until
+it scales down, so traffic also pays for boots and for the idle scaledown
+window after each burst, and a keep-warm container bills around the clock.
+operating_point() amortizes both over one workload: requests of `text_chars`
+arriving at `rate` per hour (Poisson) on autoscaling containers.
+
+    scale to zero  a container goes idle after (1 - utilization) of its
+                   requests (M/G/1); the idle gap is exponential, so each
+                   request is billed E[min(gap, scaledown)] of idle on
+                   average, and the gaps longer than `scaledown` stop the
+                   container and make the next request pay a boot
+    keep warm      `min_containers` bill all hour, requests never boot
+
+Warm synthesis time comes from the latency model; boot time is the measured
+cold start less a warm short request (fleet.boot_params); audio per character
+comes from the measured WAV sizes. Traffic that one container cannot keep
+up with is split evenly over as many containers as it needs. Queueing delay
+is not modeled, so latency near full utilization is optimistic:
+fleet.simulate() models queueing and scale-out in full, this is the closed
+form for comparing deployments.
+
+Latency is the expected warm time plus the boot time weighted by the share
+of requests that wait for one. pareto_front() keeps the operating points no
+other point beats on both latency and cost per audio-hour.
+"""
+
+import math
+
+from . import config
+from .audio import MODEL_SAMPLE_RATE
+from .fleet import boot_params
+from .latency_model import LatencyModel, speech_seconds
+
+WAV_HEADER_BYTES = 44
+WAV_BYTES_PER_SECOND = MODEL_SAMPLE_RATE * 2  # 16-bit mono, as the deployments return it
+DEFAULT_SCALEDOWN = 60.0  # Modal's default scaledown window (seconds)
+
+
+def hourly_usd(deployment: str) -> float | None:
+    """The deployment's "usd_per_hour" from the config (None if unpriced)."""
+    return config.DEPLOYMENTS.get(deployment, {}).get("usd_per_hour")
+
+
+def audio_seconds(audio_size: int) -> float:
+    """Duration of a WAV response from its size."""
+    return max(audio_size - WAV_HEADER_BYTES, 0) / WAV_BYTES_PER_SECOND
+
+
+def measured_totals(samples: list[dict]) -> dict:
+    """
+    Per deployment, the warm successful samples that recorded their audio
+    size: "requests", "text_chars", "audio_seconds" and "gpu_seconds".
+    """
+    totals = {}
+    for sample in samples:
+        if sample.get("cold") or "error" in sample or not sample.get("audio_size"):
+            continue
+        entry = totals.setdefault(
+            sample["deployment"], {"requests": 0, "text_chars": 0, "audio_seconds": 0.0, "gpu_seconds": 0.0}
+        )
+        entry["requests"] += 1
+        entry["text_chars"] += sample["text_chars"]
+        entry["audio_seconds"] += audio_seconds(sample["audio_size"])
+        entry["gpu_seconds"] += sample["time"]
+    return totals
+
+
+def gpu_only(deployment: str, totals: dict) -> dict:
+    """Measured GPU-seconds cost per audio-hour and per 1k characters (no boots or idle)."""
+    hourly = hourly_usd(deployment)
+    cost = totals["gpu_seconds"] * hourly / 3600 if hourly is not None else None
+    return {
+        "deployment": deployment,
+        **totals,
+        "gpu_seconds_per_audio_second": totals["gpu_seconds"] / totals["audio_seconds"],
+        "usd_per_audio_hour": cost / (totals["audio_seconds"] / 3600) if cost is not None else None,
+        "usd_per_1k_chars": cost / totals["text_chars"] * 1000 if cost is not None else None,
+    }
+
+
+def operating_point(
+    model: LatencyModel,
+    deployment: str,
+    text_chars: int,
+    rate: float,
+    scaledown: float | None = DEFAULT_SCALEDOWN,
+    min_containers: int = 0,
+    totals: dict | None = None,
+    language: str = config.DEFAULT_LANGUAGE,
+) -> dict:
+    """
+    Amortized cost and expected latency of `deployment` serving `rate`
+    requests per hour of `text_chars` each, scaling to zero after
+    `scaledown` idle seconds or keeping `min_containers` warm. `totals`
+    (measured_totals() for the deployment) supplies audio per character;
+    without it the latency model's speech rate is used.
+    """
+    busy = model.predict(deployment, text_chars, language)[0]
+    mu, sigma = boot_params(model, deployment)
+    boot = math.exp(mu + sigma**2 / 2)
+    if totals and totals["text_chars"]:
+        audio = text_chars * totals["audio_seconds"] / totals["text_chars"]
+    else:
+        audio = speech_seconds(text_chars, language)
+    arrival = rate / 3600
+    containers = max(math.ceil(arrival * busy), 1)
+    if min_containers or scaledown is None:
+        containers = max(containers, min_containers, 1)
+        policy = f"keep {max(min_containers, 1)} warm"
+        billed = max(containers / arrival, busy)
+        idle, cold_share = billed - busy, 0.0
+    else:
+        policy = f"scale to zero ({scaledown:g}s)"
+        # Each of the containers sees its share of the arrivals
+        per_container = arrival / containers
+        goes_idle = 1.0 - per_container * busy
+        idle = goes_idle * (1.0 - math.exp(-per_container * scaledown)) / per_container
+        cold_share = goes_idle * math.exp(-per_container * scaledown)
+        billed = busy + idle + cold_share * boot
+    hourly = hourly_usd(deployment)
+    cost = billed * hourly / 3600 if hourly is not None else None
+    entry = config.DEPLOYMENTS.get(deployment, {})
+    return {
+        "deployment": deployment,
+        "model": entry.get("model"),
+        "gpu": entry.get("gpu"),
+        "attention": entry.get("attention"),
+        "policy": policy,
+        "rate": rate,
+        "text_chars": text_chars,
+        "containers": containers,
+        "usd_per_hour": hourly,
+        "busy_seconds": busy,
+        "idle_seconds": idle,
+        "boot_seconds": boot,
+        "cold_share": cold_share,
+        "billed_seconds": billed,
+        "utilization": min(busy / billed, 1.0),
+        "latency": busy + cold_share * boot,
+        "audio_seconds": audio,
+        "usd_per_request": cost,
+        "usd_per_audio_hour": cost / audio * 3600 if cost is not None else None,
+        "usd_per_1k_chars": cost / text_chars * 1000 if cost is not None else None,
+    }
+
+
+def pareto_front(points: list[dict], cost: str = "usd_per_audio_hour") -> list[dict]:
+    """Points no other point beats on both latency and `cost`, fastest first."""
+    front = []
+    for point in sorted((p for p in points if p[cost] is not None), key=lambda p: (p["latency"], p[cost])):
+        if not front or point[cost] < front[-1][cost]:
+            front.append(point)
+    return front
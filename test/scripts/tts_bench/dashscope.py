@@ -0,0 +1,250 @@
+"""
+Client for the Qwen cloud (DashScope) non-streaming TTS APIs.
+
+Mirrors the request shapes the API Worker sends
+(workers/api/src/_shared/tts/providers/qwen_synthesis.ts and
+qwen_customization.ts; docs/qwen-api.md §7-9):
+
+    POST {base}/api/v1/services/audio/tts/customization
+         qwen-voice-enrollment create  -> output.voice  (voice clone, VC)
+         qwen-voice-design create      -> output.voice + preview_audio (VD)
+    POST {base}/api/v1/services/aigc/multimodal-generation/generation
+         {model, input: {text, voice, language_type}} -> output.audio.url
+    GET  output.audio.url                -> the WAV (temporary, 24h)
+
+Endpoints are config.DEPLOYMENTS entries with "provider": "dashscope" (or the
+dict start_dashscope_standin returns). The API key comes from the endpoint's
+"api_key" or the DASHSCOPE_API_KEY environment variable, like the Worker.
+Requests share client.get_session(), so connections are pooled.
+"""
+
+import os
+import re
+import time
+import uuid
+
+import requests
+
+from . import client, config
+
+# docs/qwen-api.md §9.2 language_type values; §7.1 language tags
+_LANGUAGE_TYPES = {
+    "auto": "Auto",
+    "english": "English",
+    "chinese": "Chinese",
+    "german": "German",
+    "italian": "Italian",
+    "portuguese": "Portuguese",
+    "spanish": "Spanish",
+    "japanese": "Japanese",
+    "korean": "Korean",
+    "french": "French",
+    "russian": "Russian",
+}
+_LANGUAGE_TAGS = {
+    "english": "en",
+    "chinese": "zh",
+    "german": "de",
+    "italian": "it",
+    "portuguese": "pt",
+    "spanish": "es",
+    "japanese": "ja",
+    "korean": "ko",
+    "french": "fr",
+    "russian": "ru",
+}
+
+
+def language_type(language: str | None) -> str | None:
+    """Synthesis `language_type` for a language name ("Auto" when unknown)."""
+    if not language:
+        return None
+    return _LANGUAGE_TYPES.get(language.strip().lower(), "Auto")
+
+
+def language_tag(language: str | None) -> str | None:
+    """Customization `language` tag ("en", "zh", ...) or None when unknown."""
+    if not language:
+        return None
+    return _LANGUAGE_TAGS.get(language.strip().lower())
+
+
+def preferred_name(prefix: str) -> str:
+    """A unique voice name within the <= 16 char [A-Za-z0-9_] limit."""
+    cleaned = re.sub(r"[^a-zA-Z0-9_]", "_", prefix)[:7]
+    return f"{cleaned}_{uuid.uuid4().hex[:8]}"
+
+
+def _url(endpoint: dict, path: str) -> str:
+    return f"{endpoint.get('base_url', config.DASHSCOPE_BASE_URL)}{path}"
+
+
+def _headers(endpoint: dict) -> dict:
+    api_key = endpoint.get("api_key") or os.getenv("DASHSCOPE_API_KEY")
+    if not api_key:
+        raise RuntimeError("Missing env var: DASHSCOPE_API_KEY")
+    return {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+
+
+def _post(endpoint: dict, path: str, body: dict, timeout: float) -> tuple[float, dict | None, str | None]:
+    """POST a JSON body; return (elapsed, response_json, error)."""
+    start = time.perf_counter()
+    try:
+        response = client.get_session().post(_url(endpoint, path), json=body, headers=_headers(endpoint), timeout=timeout)
+        elapsed = time.perf_counter() - start
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        if response.status_code >= 400:
+            code = data.get("code") or f"HTTP {response.status_code}"
+            return elapsed, data, f"{code}: {data.get('message') or response.text[:200]}"
+        return elapsed, data, None
+    except Exception as e:
+        error = "Timeout" if isinstance(e, requests.exceptions.Timeout) else str(e) or type(e).__name__
+        return time.perf_counter() - start, None, error
+
+
+def create_clone_voice(
+    endpoint: dict,
+    ref_audio_b64: str,
+    ref_text: str | None,
+    language: str = config.DEFAULT_LANGUAGE,
+    timeout: float = 90.0,
+) -> dict:
+    """
+    Enroll a cloned voice from a base64 WAV. Returns a record with "time",
+    "voice", "target_model" and "request_id" (or "error").
+    """
+    body = {
+        "model": endpoint.get("voice_model", "qwen-voice-enrollment"),
+        "input": {
+            "action": "create",
+            "target_model": endpoint["model"],
+            "preferred_name": preferred_name("clone"),
+            "audio": {"data": f"data:audio/wav;base64,{ref_audio_b64}"},
+            "language": language_tag(language),
+        },
+    }
+    if ref_text:
+        body["input"]["text"] = ref_text
+    return _voice_record("enroll", *_post(endpoint, config.DASHSCOPE_CUSTOMIZATION_PATH, body, timeout))
+
+
+def create_designed_voice(
+    endpoint: dict,
+    voice_prompt: str,
+    preview_text: str,
+    language: str = config.DEFAULT_LANGUAGE,
+    timeout: float = 90.0,
+) -> dict:
+    """
+    Design a voice from a description. Returns a record like
+    create_clone_voice plus "preview_bytes" (the base64 preview it returned).
+    """
+    body = {
+        "model": endpoint.get("voice_model", "qwen-voice-design"),
+        "input": {
+            "action": "create",
+            "target_model": endpoint["model"],
+            "voice_prompt": voice_prompt,
+            "preview_text": preview_text,
+            "preferred_name": preferred_name("design"),
+            "language": language_tag(language) or "en",
+        },
+        "parameters": {"sample_rate": 24000, "response_format": "wav"},
+    }
+    return _voice_record("design", *_post(endpoint, config.DASHSCOPE_CUSTOMIZATION_PATH, body, timeout))
+
+
+def _voice_record(kind: str, elapsed: float, data: dict | None, error: str | None) -> dict:
+    record = {"kind": kind, "time": elapsed, "request_id": (data or {}).get("request_id")}
+    output = (data or {}).get("output") or {}
+    if not error and not (isinstance(output.get("voice"), str) and isinstance(output.get("target_model"), str)):
+        error = "Response missing voice metadata"
+    if error:
+        record["error"] = error
+        return record
+    record["voice"] = output["voice"]
+    record["target_model"] = output["target_model"]
+    preview = output.get("preview_audio") or {}
+    if isinstance(preview.get("data"), str):
+        record["preview_bytes"] = len(preview["data"])
+    return record
+
+
+def synthesize(
+    endpoint: dict,
+    voice: str,
+    text: str,
+    language: str = config.DEFAULT_LANGUAGE,
+    timeout: float = 90.0,
+) -> dict:
+    """
+    One non-streaming synthesis call. Returns a record with "time",
+    "audio_url", "audio_expires_at", "characters" (billed) and "request_id"
+    (or "error"). The audio itself still has to be fetched.
+    """
+    body = {
+        "model": endpoint["model"],
+        "input": {"text": text, "voice": voice, "language_type": language_type(language)},
+    }
+    elapsed, data, error = _post(endpoint, config.DASHSCOPE_SYNTHESIS_PATH, body, timeout)
+    record = {"time": elapsed, "request_id": (data or {}).get("request_id")}
+    audio = ((data or {}).get("output") or {}).get("audio") or {}
+    if not error and not isinstance(audio.get("url"), str):
+        error = "Response missing audio url"
+    if error:
+        record["error"] = error
+        return record
+    record["audio_url"] = audio["url"]
+    record["audio_expires_at"] = audio.get("expires_at")
+    record["characters"] = ((data or {}).get("usage") or {}).get("characters", len(text))
+    return record
+
+
+def fetch_audio(url: str, timeout: float = 90.0) -> tuple[float, bytes | None, str | None]:
+    """Download an output.audio.url; return (elapsed, audio_bytes, error)."""
+    start = time.perf_counter()
+    try:
+        response = client.get_session().get(url, timeout=timeout)
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            return elapsed, None, f"HTTP {response.status_code}: {response.text[:200]}"
+        return elapsed, response.content, None
+    except Exception as e:
+        error = "Timeout" if isinstance(e, requests.exceptions.Timeout) else str(e) or type(e).__name__
+        return time.perf_counter() - start, None, error
+
+
+def measure_generation(
+    endpoint: dict,
+    voice: str,
+    text: str,
+    language: str = config.DEFAULT_LANGUAGE,
+    timeout: float = 90.0,
+) -> tuple[dict, bytes | None]:
+    """
+    Synthesize and fetch the audio URL, like the Worker does. Returns
+    (run_record, audio_bytes); "time" covers both calls, split into
+    "synth_seconds" and "fetch_seconds".
+    """
+    synth = synthesize(endpoint, voice, text, language, timeout)
+    record = {
+        "time": synth["time"],
+        "synth_seconds": synth["time"],
+        "text_chars": len(text),
+        "language": language,
+        "request_id": synth.get("request_id"),
+        "timeout": timeout,
+    }
+    if "error" in synth:
+        record["error"] = synth["error"]
+        return record, None
+    fetch_seconds, audio, error = fetch_audio(synth["audio_url"], timeout)
+    record.update({"time": synth["time"] + fetch_seconds, "fetch_seconds": fetch_seconds, "characters": synth["characters"]})
+    if error:
+        record["error"] = f"Audio fetch failed: {error}"
+        return record, None
+    record["audio_size"] = len(audio)
+    return record, audio
@@ -0,0 +1,170 @@
+"""
+Bulk export of a user's generations through the API Worker.
+
+The History page and exports fetch each clip the same way: GET
+/api/generations/:id/audio (auth, generation lookup, URL signing) answers
+302 to a signed URL, which with R2 storage is the Worker's own GET
+/api/storage/download?token=... (routes/storage.ts). export() walks the
+completed generations with `workers` clips in flight: it resolves each
+redirect with the user's session and streams the signed URL to
+out_dir/<id>.wav with tts_bench.prefetch.download (.part file, Range
+resume, restart when Range is ignored). Files already exported are skipped,
+so an interrupted export picks up where it stopped. A manifest.json next to
+them lists every clip.
+
+Both requests are rate-limited (tier 3, per IP, in the Worker's default
+limits); a 429 waits retry_after_seconds and retries, and a signed URL
+that expired or was refused is signed again. Per clip the record carries:
+
+    redirect  seconds in the audio route (the 302)
+    ttfb      signed-URL request -> response headers
+    fetch     the whole signed-URL download (ttfb included)
+    bytes, attempts, resumed_bytes / restarted_bytes, rate_limited
+
+routes/storage.ts reads the whole object from R2 into a Blob before the
+response starts and answers 200 to every request, so ttfb grows with the
+clip size and a dropped download starts over; range_supported() checks
+that on one URL.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import prefetch
+from .worker_client import WorkerAPIError, WorkerClient
+
+DEFAULT_WORKERS = 4
+PER_PAGE = 100  # GET /api/generations caps per_page at 100
+MAX_RATE_LIMITED = 30
+RATE_LIMIT_WAIT = 1.0  # When a 429 carries no retry_after_seconds
+
+
+def completed_generations(worker: WorkerClient, limit: int | None = None) -> list[dict]:
+    """The user's completed generations, newest first (GET /api/generations, every page)."""
+    generations, page = [], 1
+    while limit is None or len(generations) < limit:
+        body = worker.list_generations(page=page, per_page=PER_PAGE, status="completed")
+        generations.extend(body["generations"])
+        if page >= body["pagination"]["pages"]:
+            break
+        page += 1
+    return generations[:limit]
+
+
+def storage_session(workers: int) -> requests.Session:
+    """A credential-free session for signed URLs, pooled for `workers` downloads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=max(workers, 1))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def range_supported(worker: WorkerClient, generation: dict, session: requests.Session) -> dict:
+    """Ask for `Range: bytes=1-` of one clip; 206 means a dropped download can resume."""
+    url = worker.signed_audio_url(generation["audio_path"])
+    response = session.get(url, headers={"Range": "bytes=1-"}, timeout=worker.timeout)
+    return {"status": response.status_code, "supported": response.status_code == 206, "bytes": len(response.content)}
+
+
+def export_one(
+    worker: WorkerClient,
+    session: requests.Session,
+    generation: dict,
+    out_dir: Path,
+    timeout: float = 90.0,
+    retries: int = prefetch.DEFAULT_RETRIES,
+) -> dict:
+    """Download one generation's audio to out_dir/<id>.wav; returns its record."""
+    path = out_dir / f"{generation['id']}.wav"
+    record = {"id": generation["id"], "path": str(path), "rate_limited": 0, "signed": 0}
+    if path.exists():
+        record.update(bytes=path.stat().st_size, skipped=True)
+        return record
+    start = time.perf_counter()
+    while True:
+        began = time.perf_counter()
+        try:
+            url = worker.signed_audio_url(generation["audio_path"])
+        except WorkerAPIError as e:
+            if e.status != 429 or record["rate_limited"] >= MAX_RATE_LIMITED:
+                record["error"] = f"{e.status}: {e.detail}"
+                break
+            record["rate_limited"] += 1
+            worker.sleep(e.retry_after or RATE_LIMIT_WAIT)
+            continue
+        except requests.exceptions.RequestException as e:
+            record["error"] = str(e) or type(e).__name__
+            break
+        record["signed"] += 1
+        record["redirect"] = time.perf_counter() - began
+        fetched = prefetch.download(url, path, timeout, retries, session=session)
+        fetched["fetch"] = fetched.pop("seconds")
+        status = fetched.get("status")
+        if status == 429 and record["rate_limited"] < MAX_RATE_LIMITED:
+            record["rate_limited"] += 1
+            worker.sleep(fetched.get("retry_after") or RATE_LIMIT_WAIT)
+            continue
+        if status == 403 and record["signed"] <= retries:
+            continue  # Expired or refused token: sign again, resume from the .part file
+        record.update(fetched)
+        break
+    record["total"] = time.perf_counter() - start
+    return record
+
+
+def export(
+    worker: WorkerClient,
+    generations: list[dict],
+    out_dir: Path,
+    workers: int = DEFAULT_WORKERS,
+    timeout: float = 90.0,
+    retries: int = prefetch.DEFAULT_RETRIES,
+    on_done=None,
+) -> list[dict]:
+    """
+    Export `generations` to out_dir, `workers` at a time, and write
+    out_dir/manifest.json. `worker` must be signed in and pooled for
+    `workers` connections. `on_done(record)` sees each finished clip.
+    Records come back in `generations` order, each with "start"/"end"
+    offsets from the export's start.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    session = storage_session(workers)
+    started = time.perf_counter()
+
+    def run(generation: dict) -> dict:
+        began = time.perf_counter() - started
+        record = export_one(worker, session, generation, out_dir, timeout, retries)
+        record.update(start=began, end=time.perf_counter() - started)
+        if on_done is not None:
+            on_done(record)
+        return record
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export") as pool:
+            records = list(pool.map(run, generations))
+    finally:
+        session.close()
+    manifest = [
+        {
+            "id": g["id"],
+            "file": Path(r["path"]).name if "error" not in r else None,
+            "bytes": r.get("bytes"),
+            "text": g.get("text"),
+            "voice_name": g.get("voice_name"),
+            "language": g.get("language"),
+            "duration_seconds": g.get("duration_seconds"),
+            "created_at": g.get("created_at"),
+            "error": r.get("error"),
+        }
+        for g, r in zip(generations, records)
+    ]
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    return records
@@ -0,0 +1,367 @@
+"""
+Discrete-event simulator for the tts-jobs queue in front of a GPU fleet.
+
+GPU type, container count and queue settings have so far been chosen from
+single-request numbers. simulate() replays a job stream through the whole
+path instead:
+
+    queue    batches of up to max_batch_size messages, or whatever arrived
+             within max_batch_timeout; max_concurrency batches in flight,
+             messages handled in order within a batch (queues/consumer.ts,
+             as standin_worker.StandinQueue)
+    fleet    Modal-style autoscaling: a request takes an idle container or
+             waits; a container starts whenever the waiting requests
+             outnumber the containers already booting (up to
+             max_containers); one idle for `scaledown` seconds stops, down
+             to min_containers, which are warm from the start
+    persist  a fixed `overhead` per job after synthesis (provider download,
+             storage upload, row writes)
+
+Service times come from measurements. ServiceModel draws each job's warm
+synthesis time from the latency model's per-deployment fit (lognormal with
+the fitted mean and relative spread); boot_params() fits each boot from the
+cold-start samples, less the warm time of the short text those runs
+generated. Every
+configuration sees the same per-job draws (common random numbers), so two
+configurations differ by their settings rather than their luck.
+measured_overhead() takes the overhead from the newest
+job_latency_analysis run against a real Worker.
+
+summarize_run() reports, per configuration:
+
+    wait         arrival -> synthesis start (batching, waiting for a
+                 container, cold boots)
+    completion   arrival -> persisted
+    utilization  synthesis seconds / container seconds (boots and idle
+                 time included)
+    cost         container seconds at the deployment's "usd_per_hour"
+                 (Modal bills every second a container is up), per
+                 generated audio-hour
+
+Jobs are dicts with "arrival" (seconds), "text_chars" and optionally
+"language". synthetic_jobs() draws them from an arrival pattern; a job file
+with an "arrival" per job (workload.load_jobs) replays a trace.
+"""
+
+import heapq
+import json
+import math
+import random
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+from . import config, results
+from .latency_model import POOLED, LatencyModel, speech_seconds
+from .stats import summarize
+from .workload import corpus_sentences
+
+PATTERNS = ("poisson", "bursty", "diurnal")
+BURST_DUTY = 0.25  # bursty: the share of each period the whole rate arrives in
+DIURNAL_AMPLITUDE = 0.8  # diurnal: rate swings by +/-80% of the mean over a period
+COLD_TEXT_CHARS = 32  # Text the cold-start runs generated (results._from_single)
+MIN_BOOT_SECONDS = 1.0
+DEFAULT_OVERHEAD = 0.3  # Provider download + persist until a Worker run is measured
+OVERHEAD_STAGES = ("provider_download", "persist")
+
+_ARRIVE, _BATCH, _READY, _SYNTHESIZED, _PERSISTED, _SCALEDOWN = range(6)
+
+
+def synthetic_jobs(
+    rate: float,
+    duration: float,
+    pattern: str = "poisson",
+    period: float = 600.0,
+    caption_share: float = 0.7,
+    paragraph_sentences: tuple[int, int] = (2, 6),
+    seed: int = 0,
+) -> list[dict]:
+    """
+    Jobs arriving at a mean `rate` per minute over `duration` seconds:
+
+        poisson  a constant rate
+        bursty   the whole rate within the first BURST_DUTY of every period
+        diurnal  rate x (1 + DIURNAL_AMPLITUDE x sin(2 pi t / period))
+
+    Texts are corpus captions (one sentence) or paragraphs (consecutive
+    sentences), capped at the Worker's WORKER_MAX_TEXT_CHARS.
+    """
+    if pattern not in PATTERNS:
+        raise ValueError(f"Unknown pattern '{pattern}' (expected one of {PATTERNS})")
+    rng = random.Random(seed)
+    lengths = [len(s) for s in corpus_sentences()]
+    mean = rate / 60.0
+    peak = {"poisson": mean, "bursty": mean / BURST_DUTY, "diurnal": mean * (1 + DIURNAL_AMPLITUDE)}[pattern]
+    jobs, t = [], 0.0
+    while True:
+        t += rng.expovariate(peak)
+        if t >= duration:
+            return jobs
+        if pattern == "bursty" and t % period >= BURST_DUTY * period:
+            continue
+        if pattern == "diurnal":
+            rate_now = mean * (1 + DIURNAL_AMPLITUDE * math.sin(2 * math.pi * t / period))
+            if rng.random() * peak > rate_now:
+                continue
+        if rng.random() < caption_share:
+            chars = rng.choice(lengths)
+        else:
+            count = min(rng.randint(*paragraph_sentences), len(lengths))
+            start = rng.randrange(len(lengths) - count + 1)
+            chars = sum(lengths[start : start + count]) + count - 1
+        jobs.append({"id": f"job-{len(jobs)}", "arrival": t, "text_chars": min(chars, config.WORKER_MAX_TEXT_CHARS)})
+
+
+def trace_jobs(jobs: list[dict]) -> list[dict]:
+    """A loaded job file as simulator jobs, sorted by arrival ("text" or "text_chars" per job)."""
+    out = []
+    for job in jobs:
+        if "arrival" not in job:
+            raise ValueError(f"Job {job['id']} has no arrival time")
+        chars = job.get("text_chars", len(job.get("text", "")))
+        out.append({**job, "text_chars": min(chars, config.WORKER_MAX_TEXT_CHARS)})
+    return sorted(out, key=lambda job: job["arrival"])
+
+
+def measured_overhead(paths: list[Path] | None = None) -> tuple[float, str] | None:
+    """p50 provider download + persist from the newest real-Worker job_latency_analysis run, and its file name."""
+    for path in reversed(paths if paths is not None else results.result_files()):
+        if not path.name.startswith("job_latency_analysis_"):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("stand_in"):
+            continue
+        values = [data.get("stages", {}).get(stage, {}).get("p50") for stage in OVERHEAD_STAGES]
+        if all(v is not None for v in values):
+            return sum(values), path.name
+    return None
+
+
+def fitted_deployments(model: LatencyModel) -> list[str]:
+    """Modal deployments with their own warm fit and cold-start samples."""
+    return [
+        key
+        for key in sorted(model.stats)
+        if key != POOLED
+        and not config.DEPLOYMENTS.get(key, {}).get("provider")
+        and model.predict(key, COLD_TEXT_CHARS, pooled=False) is not None
+        and model.stats[key]["cold_n"] > 0
+    ]
+
+
+def _lognormal(mean: float, std: float) -> tuple[float, float]:
+    """(mu, sigma) of the lognormal with this mean and standard deviation."""
+    sigma2 = math.log1p((std / mean) ** 2)
+    return math.log(mean) - sigma2 / 2, math.sqrt(sigma2)
+
+
+class ServiceModel:
+    """Per-job warm synthesis times per deployment, drawn once for every configuration."""
+
+    def __init__(self, model: LatencyModel, jobs: list[dict], seed: int = 0):
+        self.model = model
+        self.jobs = jobs
+        self.z = np.random.default_rng(seed).standard_normal(len(jobs))
+        self.audio_seconds = np.array(
+            [speech_seconds(job["text_chars"], job.get("language", config.DEFAULT_LANGUAGE)) for job in jobs]
+        )
+        self._services: dict[str, list[float]] = {}
+
+    def services(self, deployment: str) -> list[float]:
+        """Warm synthesis seconds per job on `deployment`."""
+        if deployment not in self._services:
+            params = {}
+            mu, sigma = np.empty(len(self.jobs)), np.empty(len(self.jobs))
+            for i, job in enumerate(self.jobs):
+                key = (job["text_chars"], job.get("language", config.DEFAULT_LANGUAGE))
+                if key not in params:
+                    prediction = self.model.predict(deployment, *key)
+                    if prediction is None:
+                        raise ValueError(f"No latency fit for {deployment}")
+                    params[key] = _lognormal(*prediction)
+                mu[i], sigma[i] = params[key]
+            self._services[deployment] = np.exp(mu + sigma * self.z).tolist()
+        return self._services[deployment]
+
+
+def boot_params(model: LatencyModel, deployment: str) -> tuple[float, float]:
+    """(mu, sigma) of a container's boot seconds: cold-start time less a warm short request."""
+    cold = model.cold_start(deployment)
+    warm = model.predict(deployment, COLD_TEXT_CHARS)
+    if cold is None or warm is None:
+        raise ValueError(f"No cold-start samples for {deployment}")
+    mean = max(cold[0] - warm[0], MIN_BOOT_SECONDS)
+    return _lognormal(mean, min(cold[1], mean))
+
+
+def simulate(
+    fleet: dict,
+    arrivals: list[float],
+    services: list[float],
+    boot: tuple[float, float],
+    overhead: float = DEFAULT_OVERHEAD,
+    duration: float = 0.0,
+    seed: int = 0,
+) -> dict:
+    """
+    Run one configuration. `fleet` has min_containers, max_containers,
+    scaledown (seconds, None = never), max_batch_size, max_batch_timeout
+    and max_concurrency. Returns per-job "wait" and "completion" lists and
+    the fleet totals: "container_seconds", "busy_seconds", "cold_starts",
+    "peak_containers" and "horizon" (the last arrival or completion).
+    Containers still up at the end are billed to `duration` or the
+    horizon, whichever is later.
+    """
+    rng = random.Random(seed)
+    n = len(arrivals)
+    events, seq = [], 0
+
+    def push(at: float, kind: int, *payload):
+        nonlocal seq
+        seq += 1
+        heapq.heappush(events, (at, seq, kind, payload))
+
+    # Queue and consumers
+    pending = deque()
+    idle_consumers = list(range(fleet["max_concurrency"]))
+    idle_since = [0.0] * fleet["max_concurrency"]
+    batches: list[deque] = [deque() for _ in range(fleet["max_concurrency"])]
+    batch_timer = [None]
+
+    # Fleet
+    up_at: list[float] = []
+    idle: list[int] = []
+    idle_token: list[int] = []
+    waiting = deque()
+    booting = alive = peak = cold_starts = 0
+    container_seconds = busy_seconds = 0.0
+
+    gpu_start = [0.0] * n
+    done = [0.0] * n
+
+    def add_container(t: float) -> int:
+        nonlocal alive, peak
+        up_at.append(t)
+        idle_token.append(0)
+        alive += 1
+        peak = max(peak, alive)
+        return len(up_at) - 1
+
+    def start(container: int, job: int, consumer: int, t: float):
+        nonlocal busy_seconds
+        gpu_start[job] = t
+        busy_seconds += services[job]
+        push(t + services[job], _SYNTHESIZED, container, job, consumer)
+
+    def release(container: int, t: float):
+        if waiting:
+            job, consumer = waiting.popleft()
+            start(container, job, consumer, t)
+            return
+        idle.append(container)
+        idle_token[container] += 1
+        if fleet["scaledown"] is not None:
+            push(t + fleet["scaledown"], _SCALEDOWN, container, idle_token[container])
+
+    def request(job: int, consumer: int, t: float):
+        nonlocal booting, cold_starts
+        if idle:
+            start(idle.pop(), job, consumer, t)
+            return
+        waiting.append((job, consumer))
+        if len(waiting) > booting and alive < fleet["max_containers"]:
+            container = add_container(t)
+            booting += 1
+            cold_starts += 1
+            push(t + max(rng.lognormvariate(*boot), MIN_BOOT_SECONDS), _READY, container)
+
+    def next_message(consumer: int, t: float):
+        if batches[consumer]:
+            request(batches[consumer].popleft(), consumer, t)
+        else:
+            idle_consumers.append(consumer)
+            idle_since[consumer] = t
+            dispatch(t)
+
+    def dispatch(t: float):
+        while idle_consumers and pending:
+            consumer = idle_consumers[-1]
+            if len(pending) < fleet["max_batch_size"]:
+                deadline = max(arrivals[pending[0]], idle_since[consumer]) + fleet["max_batch_timeout"]
+                if t < deadline:
+                    if batch_timer[0] is None or batch_timer[0] > deadline:
+                        batch_timer[0] = deadline
+                        push(deadline, _BATCH)
+                    return
+            idle_consumers.pop()
+            size = min(len(pending), fleet["max_batch_size"])
+            batches[consumer].extend(pending.popleft() for _ in range(size))
+            next_message(consumer, t)
+
+    for _ in range(fleet["min_containers"]):
+        release(add_container(0.0), 0.0)
+    for job, at in enumerate(arrivals):
+        push(at, _ARRIVE, job)
+
+    while events:
+        t, _, kind, payload = heapq.heappop(events)
+        if kind == _ARRIVE:
+            pending.append(payload[0])
+            dispatch(t)
+        elif kind == _BATCH:
+            if batch_timer[0] == t:
+                batch_timer[0] = None
+            dispatch(t)
+        elif kind == _READY:
+            booting -= 1
+            release(payload[0], t)
+        elif kind == _SYNTHESIZED:
+            container, job, consumer = payload
+            release(container, t)
+            push(t + overhead, _PERSISTED, job, consumer)
+        elif kind == _PERSISTED:
+            job, consumer = payload
+            done[job] = t
+            next_message(consumer, t)
+        elif kind == _SCALEDOWN:
+            container, token = payload
+            if idle_token[container] == token and container in idle and alive > fleet["min_containers"]:
+                idle.remove(container)
+                alive -= 1
+                container_seconds += t - up_at[container]
+                up_at[container] = None
+
+    horizon = max([arrivals[-1] if arrivals else 0.0] + done)
+    end = max(horizon, duration)
+    container_seconds += sum(end - at for at in up_at if at is not None)
+    return {
+        "wait": [s - a for s, a in zip(gpu_start, arrivals)],
+        "completion": [d - a for d, a in zip(done, arrivals)],
+        "container_seconds": container_seconds,
+        "busy_seconds": busy_seconds,
+        "cold_starts": cold_starts,
+        "peak_containers": peak,
+        "horizon": horizon,
+    }
+
+
+def summarize_run(fleet: dict, run: dict, audio_seconds: float, duration: float) -> dict:
+    """One configuration's report row: wait/completion summaries, utilization and cost."""
+    hourly = config.DEPLOYMENTS.get(fleet["deployment"], {}).get("usd_per_hour")
+    cost = run["container_seconds"] * hourly / 3600 if hourly is not None else None
+    return {
+        **fleet,
+        "jobs": len(run["wait"]),
+        "wait": summarize(run["wait"]),
+        "completion": summarize(run["completion"]),
+        "utilization": run["busy_seconds"] / run["container_seconds"] if run["container_seconds"] else None,
+        "container_seconds": run["container_seconds"],
+        "cold_starts": run["cold_starts"],
+        "peak_containers": run["peak_containers"],
+        "drain_seconds": max(run["horizon"] - duration, 0.0),
+        "audio_hours": audio_seconds / 3600,
+        "cost_usd": cost,
+        "usd_per_audio_hour": cost / (audio_seconds / 3600) if cost is not None and audio_seconds else None,
+    }
@@ -0,0 +1,524 @@
+"""
+Synthetic History data in local Supabase and the History listing query.
+
+GET /api/generations (workers/api/src/routes/generations.ts) backs the
+History page. Its cost depends on how many rows the signed-in user has, so
+load() fills the local database with users whose generation counts follow
+a heavy tail (Zipf, rank k gets 1/k^skew of the rows) and gives each one
+what the Worker would have written:
+
+    voices       a few to MAX_VOICES per user, some soft-deleted
+    generations  texts from inputs/texts, created_at spread over `days`,
+                 STATUS_MIX statuses, voice_id NULL for VOICELESS_SHARE
+                 (hard-deleted voices); only the oldest MODAL_ERA_SHARE
+                 carry duration_seconds, as the Qwen path leaves it null
+    tasks        one generate task per generation with the same status
+
+Users are auth.users rows under LOAD_DOMAIN with LOAD_PASSWORD (the
+on_auth_user_created trigger adds their profiles), so the Worker can sign
+them in; drop() deletes them and everything cascades. Rows go in with COPY
+and the tables are vacuumed and analyzed afterwards.
+
+listing_sql() is the statement PostgREST builds for the route: the page
+with voices(name) embedded, plus the exact count over the same filters,
+both under the generations RLS policy (auth.uid() = user_id). The route
+sorts voice_name with order(..., { referencedTable: "voices" }), which
+orders the embedded resource, not the generations, so that page has no
+ORDER BY at all. run_listing() and explain_listing() execute it as the
+user (role authenticated, request.jwt.claims), the way PostgREST does.
+
+Needs psycopg (uv run --with 'psycopg[binary]' ...) and SUPABASE_DB_URL.
+"""
+
+import itertools
+import json
+import math
+import random
+import re
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from . import config
+from .workload import corpus_sentences
+
+LOAD_DOMAIN = "history-load.test"
+LOAD_PASSWORD = "history-load-password"
+PER_PAGE = 10  # frontend/src/features/history/queries.ts
+MAX_PER_PAGE = 100
+SORTS = ("created_at", "duration_seconds", "voice_name")  # routes/sort.ts GENERATIONS_SORT_ALLOWLIST
+STATUSES = ("pending", "processing", "completed", "failed", "cancelled")
+STATUS_MIX = {"completed": 0.9, "failed": 0.05, "cancelled": 0.045, "processing": 0.0025, "pending": 0.0025}
+LANGUAGE_MIX = {"Auto": 0.8, "English": 0.12, "Chinese": 0.05, "Japanese": 0.03}
+PROVIDER_STATUS = {
+    "pending": "provider_submitting",
+    "processing": "provider_synthesizing",
+    "completed": "completed",
+    "failed": "failed",
+    "cancelled": "cancelled",
+}
+ERRORS = [
+    "Provider request timed out.",
+    "Provider rejected the request.",
+    "Qwen synthesis failed: text exceeds 600 characters.",
+    "Failed to upload generation audio.",
+]
+VOICE_NAMES = ["Narrator", "Podcast", "Audiobook", "Calm", "Bright", "Deep", "Warm", "Studio", "Demo", "Character"]
+MAX_VOICES = 40
+DELETED_VOICE_SHARE = 0.15
+VOICELESS_SHARE = 0.02
+MODAL_ERA_SHARE = 0.3
+CHARS_PER_AUDIO_SECOND = 15.0
+COPY_BATCH = 50_000
+NO_MATCH_SEARCH = "zqxv no such phrase"
+
+VOICE_COLUMNS = [
+    "id",
+    "user_id",
+    "name",
+    "language",
+    "source",
+    "tts_provider",
+    "provider_voice_id",
+    "provider_target_model",
+    "provider_voice_kind",
+    "deleted_at",
+    "created_at",
+]
+GENERATION_COLUMNS = [
+    "id",
+    "user_id",
+    "voice_id",
+    "text",
+    "audio_object_key",
+    "duration_seconds",
+    "language",
+    "status",
+    "generation_time_seconds",
+    "error_message",
+    "provider_model",
+    "output_format",
+    "created_at",
+    "completed_at",
+]
+TASK_COLUMNS = [
+    "id",
+    "user_id",
+    "type",
+    "status",
+    "generation_id",
+    "voice_id",
+    "metadata",
+    "result",
+    "error",
+    "provider_status",
+    "created_at",
+    "updated_at",
+    "completed_at",
+]
+
+
+def _import_psycopg():
+    try:
+        import psycopg
+    except ImportError:
+        raise RuntimeError("Database load tests require psycopg: uv run --with 'psycopg[binary]' ...") from None
+    return psycopg
+
+
+def connect(url: str = config.SUPABASE_DB_URL, role: str | None = None, application_name: str | None = None):
+    """
+    Autocommit connection binding parameters client-side, so EXPLAIN sees
+    the same literals PostgREST's custom plans do. `role` is SET ROLE for
+    the session; `application_name` tags its backend in pg_stat_activity.
+    """
+    psycopg = _import_psycopg()
+    options = {"application_name": application_name} if application_name else {}
+    conn = psycopg.connect(url, autocommit=True, cursor_factory=psycopg.ClientCursor, **options)
+    if role:
+        conn.execute(f"SET ROLE {role}")
+    return conn
+
+
+def rows_per_user(rows: int, users: int, skew: float = 1.1) -> list[int]:
+    """Generation counts by user rank: Zipf weights, at least 1 each, summing to `rows`."""
+    weights = [1 / (rank**skew) for rank in range(1, users + 1)]
+    total = sum(weights)
+    counts = [max(1, int(rows * w / total)) for w in weights]
+    counts[0] += rows - sum(counts)
+    return counts
+
+
+def _weighted(rng: random.Random, mix: dict) -> str:
+    return rng.choices(list(mix), weights=list(mix.values()))[0]
+
+
+class HistoryRows:
+    """Deterministic voices, generations and tasks rows for one user at a time."""
+
+    def __init__(self, seed: int = 0, days: int = 365, now: datetime | None = None):
+        self.rng = random.Random(seed)
+        self.days = days
+        self.now = now or datetime.now(timezone.utc)
+        self.sentences = corpus_sentences()
+        self.models = {kind: config.DEPLOYMENTS[f"qwen-cloud-{kind}"]["model"] for kind in ("vc", "vd")}
+
+    def _text(self) -> str:
+        count = self.rng.choices([1, 2, 3, 4, 6], weights=[40, 25, 15, 12, 8])[0]
+        start = self.rng.randrange(len(self.sentences))
+        text = ""
+        for sentence in self.sentences[start : start + count]:
+            if text and len(text) + 1 + len(sentence) > config.WORKER_MAX_TEXT_CHARS:
+                break
+            text = f"{text} {sentence}" if text else sentence
+        return text[: config.WORKER_MAX_TEXT_CHARS]
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def voices(self, user_id: str, generations: int) -> list[tuple]:
+        count = min(MAX_VOICES, 2 + round(math.sqrt(generations) / 5))
+        start = self.now - timedelta(days=self.days)
+        rows = []
+        for i in range(count):
+            kind = "vc" if self.rng.random() < 0.7 else "vd"
+            created = start + timedelta(seconds=self.rng.uniform(0, self.days * 86400 * 0.8))
+            deleted = None
+            if self.rng.random() < DELETED_VOICE_SHARE:
+                deleted = created + timedelta(days=self.rng.uniform(1, 30))
+            rows.append(
+                (
+                    self._uuid(),
+                    user_id,
+                    f"{self.rng.choice(VOICE_NAMES)} {i + 1}",
+                    "Auto",
+                    "uploaded" if kind == "vc" else "designed",
+                    "qwen",
+                    f"qwen-tts-{kind}-{self._uuid()[-12:]}",
+                    self.models[kind],
+                    kind,
+                    deleted,
+                    created,
+                )
+            )
+        return rows
+
+    def generations(self, user_id: str, voices: list[tuple], count: int):
+        """Yield (generation row, task row) pairs in created_at order."""
+        span = self.days * 86400
+        first = self.rng.uniform(0, span * 0.8)
+        offsets = sorted(self.rng.uniform(first, span) for _ in range(count))
+        modal_until = span * MODAL_ERA_SHARE
+        voice_weights = list(itertools.accumulate(1 / (i + 1) for i in range(len(voices))))
+        start = self.now - timedelta(seconds=span)
+        for offset in offsets:
+            created = start + timedelta(seconds=offset)
+            text = self._text()
+            status = _weighted(self.rng, STATUS_MIX)
+            language = _weighted(self.rng, LANGUAGE_MIX)
+            voice = self.rng.choices(voices, cum_weights=voice_weights)[0]
+            voice_id = None if self.rng.random() < VOICELESS_SHARE else voice[0]
+            audio_seconds = len(text) / CHARS_PER_AUDIO_SECOND * self.rng.uniform(0.85, 1.15)
+            generation_time = {
+                "completed": 2 + audio_seconds * self.rng.uniform(0.5, 1.0),
+                "failed": self.rng.uniform(1, 30),
+                "cancelled": self.rng.uniform(1, 60),
+            }.get(status)
+            completed = created + timedelta(seconds=generation_time) if generation_time is not None else None
+            error = {"failed": self.rng.choice(ERRORS), "cancelled": "Cancelled by user"}.get(status)
+            generation_id = self._uuid()
+            done = status == "completed"
+            yield (
+                (
+                    generation_id,
+                    user_id,
+                    voice_id,
+                    text,
+                    f"{user_id}/{generation_id}.wav" if done else None,
+                    audio_seconds if done and offset < modal_until else None,
+                    language,
+                    status,
+                    generation_time,
+                    error,
+                    voice[7],
+                    "wav" if done else None,
+                    created,
+                    completed,
+                ),
+                (
+                    self._uuid(),
+                    user_id,
+                    "generate",
+                    status,
+                    generation_id,
+                    voice_id,
+                    json.dumps(
+                        {
+                            "voice_id": voice_id,
+                            "voice_name": voice[2],
+                            "text_length": len(text),
+                            "text_preview": f"{text[:50]}..." if len(text) > 50 else text,
+                            "language": language,
+                            "estimated_duration_minutes": round(audio_seconds / 60, 2),
+                            "credits_debited": len(text),
+                        }
+                    ),
+                    json.dumps({"audio_url": f"/api/generations/{generation_id}/audio"}) if done else None,
+                    error,
+                    PROVIDER_STATUS[status],
+                    created,
+                    completed or created,
+                    completed,
+                ),
+            )
+
+
+def create_users(
+    conn, count: int, prefix: str = "history", domain: str = LOAD_DOMAIN, password: str = LOAD_PASSWORD
+) -> list[tuple[str, str]]:
+    """Confirmed email/password users {prefix}NNNN@{domain}; returns (id, email) pairs."""
+    users = [(str(uuid.uuid4()), f"{prefix}{i:04d}@{domain}") for i in range(count)]
+    ids, emails = [u[0] for u in users], [u[1] for u in users]
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO auth.users (id, instance_id, role, aud, email, encrypted_password, email_confirmed_at,
+                created_at, updated_at, confirmation_token, recovery_token, email_change_token_new, email_change,
+                raw_app_meta_data, raw_user_meta_data)
+            SELECT u.id, '00000000-0000-0000-0000-000000000000', 'authenticated', 'authenticated', u.email,
+                extensions.crypt(%s, extensions.gen_salt('bf')), now(), now(), now(), '', '', '', '',
+                '{"provider": "email", "providers": ["email"]}', '{}'
+            FROM unnest(%s::uuid[], %s::text[]) AS u(id, email)
+            """,
+            [password, ids, emails],
+        )
+        cur.execute(
+            """
+            INSERT INTO auth.identities (id, user_id, provider_id, provider, identity_data,
+                last_sign_in_at, created_at, updated_at)
+            SELECT gen_random_uuid(), u.id, u.id::text, 'email',
+                jsonb_build_object('sub', u.id::text, 'email', u.email, 'email_verified', true), now(), now(), now()
+            FROM unnest(%s::uuid[], %s::text[]) AS u(id, email)
+            """,
+            [ids, emails],
+        )
+    return users
+
+
+def _copy(cur, table: str, columns: list[str], rows):
+    with cur.copy(f"COPY public.{table} ({', '.join(columns)}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row(row)
+
+
+def load(
+    conn,
+    rows: int,
+    users: int,
+    skew: float = 1.1,
+    days: int = 365,
+    seed: int = 0,
+    on_user=None,
+) -> dict:
+    """
+    Create `users` load users and COPY `rows` generations (one task each)
+    across them, then VACUUM ANALYZE. `on_user(index, email, count)` is
+    called after each user's rows are in. Returns counts and timings.
+    """
+    counts = rows_per_user(rows, users, skew)
+    source = HistoryRows(seed=seed, days=days)
+    start = time.perf_counter()
+    totals = {"users": users, "voices": 0, "generations": 0, "tasks": 0}
+    with conn.transaction():
+        created = create_users(conn, users)
+        with conn.cursor() as cur:
+            for index, ((user_id, email), count) in enumerate(zip(created, counts)):
+                voices = source.voices(user_id, count)
+                _copy(cur, "voices", VOICE_COLUMNS, voices)
+                totals["voices"] += len(voices)
+                pairs = source.generations(user_id, voices, count)
+                while batch := [pair for _, pair in zip(range(COPY_BATCH), pairs)]:
+                    _copy(cur, "generations", GENERATION_COLUMNS, (g for g, _ in batch))
+                    _copy(cur, "tasks", TASK_COLUMNS, (t for _, t in batch))
+                    totals["generations"] += len(batch)
+                    totals["tasks"] += len(batch)
+                if on_user:
+                    on_user(index, email, count)
+    loaded = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute("VACUUM (ANALYZE) public.voices, public.generations, public.tasks")
+    totals["load_seconds"] = loaded - start
+    totals["vacuum_seconds"] = time.perf_counter() - loaded
+    totals["heaviest"] = counts[0]
+    totals["median"] = counts[len(counts) // 2]
+    return totals
+
+
+def drop(conn) -> int:
+    """Delete every load user (voices, generations, tasks and profiles cascade)."""
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM auth.users WHERE email LIKE %s", [f"%@{LOAD_DOMAIN}"])
+        return cur.rowcount
+
+
+def load_users(conn) -> list[dict]:
+    """Load users by generation count, heaviest first: {"id", "email", "generations"}."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT u.id::text, u.email, count(g.id)
+            FROM auth.users u LEFT JOIN public.generations g ON g.user_id = u.id
+            WHERE u.email LIKE %s
+            GROUP BY u.id, u.email
+            ORDER BY count(g.id) DESC, u.email
+            """,
+            [f"%@{LOAD_DOMAIN}"],
+        )
+        return [{"id": i, "email": e, "generations": n} for i, e, n in cur.fetchall()]
+
+
+def top_voice(conn, user_id: str) -> str | None:
+    """The voice the user generated with most (the voice filter's busiest option)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT voice_id::text FROM public.generations
+            WHERE user_id = %s AND voice_id IS NOT NULL
+            GROUP BY voice_id ORDER BY count(*) DESC LIMIT 1
+            """,
+            [user_id],
+        )
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
+def search_terms() -> dict:
+    """
+    Searches from the corpus the rows are built from: "common" (the word in
+    the most sentences), "rare" (a long word in only one) and "none".
+    """
+    counts = Counter()
+    for sentence in corpus_sentences():
+        counts.update({w.lower() for w in re.findall(r"[A-Za-z]{5,}", sentence)})
+    common = max(counts, key=lambda w: (counts[w], w))
+    rare = min((w for w in counts if counts[w] == 1 and len(w) >= 7), default=common)
+    return {"common": common, "rare": rare, "none": NO_MATCH_SEARCH}
+
+
+def listing_sql(
+    status: str | None = None,
+    voice_id: str | None = None,
+    search: str | None = None,
+    sort: str = "created_at",
+    sort_dir: str = "desc",
+    page: int = 1,
+    per_page: int = PER_PAGE,
+) -> tuple[str, list]:
+    """
+    The route's PostgREST statement for one page: rows (with voices(name))
+    and the exact count. Filters are applied as the route validates them.
+    """
+    per_page = min(MAX_PER_PAGE, max(1, per_page))
+    sort = sort if sort in SORTS else "created_at"
+    direction = "ASC" if sort_dir == "asc" else "DESC"
+    where, params = [], []
+    if voice_id:
+        where.append("g.voice_id = %s")
+        params.append(voice_id)
+    if search and search.strip():
+        escaped = re.sub(r"([%_])", r"\\\1", search.strip())
+        where.append("g.text ILIKE %s")
+        params.append(f"%{escaped}%")
+    if status and status != "all":
+        where.append("g.status = %s")
+        params.append(status)
+    clause = f"WHERE {' AND '.join(where)}" if where else ""
+    order = "" if sort == "voice_name" else f"ORDER BY g.{sort} {direction}"
+    sql = f"""
+        WITH pgrst_source AS (
+            SELECT g.id, g.voice_id, g.text, g.duration_seconds, g.language, g.status,
+                g.generation_time_seconds, g.error_message, g.created_at, row_to_json(v.*) AS voices
+            FROM public.generations g
+            LEFT JOIN LATERAL (SELECT voices.name FROM public.voices WHERE voices.id = g.voice_id) v ON true
+            {clause}
+            {order}
+            LIMIT {per_page} OFFSET {(max(1, page) - 1) * per_page}
+        )
+        SELECT (SELECT count(*) FROM public.generations g {clause}) AS total,
+            coalesce(json_agg(pgrst_source), '[]') AS body
+        FROM pgrst_source
+    """
+    return sql, params * 2
+
+
+def _as_user(cur, user_id: str):
+    cur.execute("SET LOCAL role authenticated")
+    claims = {"sub": user_id, "role": "authenticated", "aud": "authenticated"}
+    cur.execute("SELECT set_config('request.jwt.claims', %s, true)", [json.dumps(claims)])
+
+
+def run_listing(conn, user_id: str, sql: str, params: list) -> tuple[float, int, list]:
+    """Execute a listing statement as the user; returns (seconds, total, rows)."""
+    with conn.transaction(), conn.cursor() as cur:
+        _as_user(cur, user_id)
+        start = time.perf_counter()
+        cur.execute(sql, params)
+        total, body = cur.fetchone()
+        elapsed = time.perf_counter() - start
+    return elapsed, total, body if isinstance(body, list) else json.loads(body)
+
+
+def explain_listing(conn, user_id: str, sql: str, params: list) -> dict:
+    """EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) of a listing statement, as the user."""
+    with conn.transaction(), conn.cursor() as cur:
+        _as_user(cur, user_id)
+        cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+        plan = cur.fetchone()[0]
+    return (plan if isinstance(plan, list) else json.loads(plan))[0]
+
+
+def _describe(node: dict) -> str:
+    text = node["Node Type"]
+    if node.get("Index Name"):
+        text += f" using {node['Index Name']}"
+    if node.get("Relation Name"):
+        text += f" on {node['Relation Name']}"
+    if node.get("Sort Key"):
+        text += f" by {', '.join(node['Sort Key'])}"
+    return text
+
+
+def plan_lines(node: dict, depth: int = 0, max_depth: int = 8) -> list[str]:
+    """Indented one-line-per-node rendering: actual rows, loops, time, filter losses."""
+    details = f"rows={node.get('Actual Rows', 0)} loops={node.get('Actual Loops', 1)}"
+    details += f" {node.get('Actual Total Time', 0):.2f} ms"
+    if node.get("Rows Removed by Filter"):
+        details += f", {node['Rows Removed by Filter']} removed by filter"
+    if node.get("Sort Method"):
+        details += f", {node['Sort Method']} {node.get('Sort Space Used', 0)}kB"
+    lines = [f"{'  ' * depth}{_describe(node)} ({details})"]
+    if depth < max_depth:
+        for child in node.get("Plans", []):
+            lines.extend(plan_lines(child, depth + 1, max_depth))
+    return lines
+
+
+def plan_summary(explained: dict) -> dict:
+    """Execution time, buffers, and the scans/sorts of one EXPLAIN (FORMAT JSON) result."""
+    nodes, stack = [], [explained["Plan"]]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.get("Plans", []))
+    root = explained["Plan"]
+    return {
+        "execution_ms": explained.get("Execution Time"),
+        "planning_ms": explained.get("Planning Time"),
+        "shared_hit_blocks": root.get("Shared Hit Blocks"),
+        "shared_read_blocks": root.get("Shared Read Blocks"),
+        "scans": sorted({_describe(n) for n in nodes if "Scan" in n["Node Type"] and n.get("Relation Name")}),
+        "seq_scans": sorted({n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan"}),
+        "sorts": [_describe(n) + f" ({n.get('Sort Method')})" for n in nodes if n["Node Type"] == "Sort"],
+        "rows_removed_by_filter": sum(n.get("Rows Removed by Filter", 0) * n.get("Actual Loops", 1) for n in nodes),
+    }
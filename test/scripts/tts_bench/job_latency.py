@@ -0,0 +1,202 @@
+"""
+Per-stage latency of API Worker jobs from client timings and table rows.
+
+A generation goes client -> Worker (/api/generate) -> tts-jobs queue ->
+consumer (provider synthesis, provider audio download, storage upload,
+status write-back) -> the client's next poll -> audio download. The rows
+keep only created_at, updated_at and completed_at, but the consumer moves
+tasks.provider_status through provider_queued, provider_synthesizing,
+provider_downloading and provider_persisting before completing. trace_job()
+polls one job densely and records when each provider_status was first seen
+(between the previous poll and this one); decompose() joins that with the
+task and generation rows:
+
+    submit             POST /api/generate round trip (client)
+    queue_wait         tasks.created_at -> provider_synthesizing
+    synthesis          provider_synthesizing -> provider_downloading
+    provider_download  provider_downloading -> provider_persisting
+    persist            provider_persisting -> tasks.completed_at
+                       (storage upload + generation/task updates)
+    notify             tasks.completed_at -> the poll that saw it
+    download           /api/generations/:id/audio redirect + storage fetch
+
+Boundaries seen by polling are the midpoint of their poll gap (narrowed to
+the task's created_at..completed_at), so each carries up to half the gap of
+error ("resolution"). A status that came and went between two polls takes
+the gap of the next status seen.
+
+Rows come from the service-role PostgREST API (rows_from_supabase: local
+`supabase start` gives updated_at, provider_poll_count and the generation's
+duration_seconds) or, without a key, from the Worker's own task and
+generation routes (rows_from_worker). Client and row times must share a
+clock: the default time.time for a local Worker and Supabase, the
+stand-in's emulated clock for the stand-in.
+"""
+
+import time
+
+import requests
+
+from . import audio, config
+from .polling import parse_timestamp
+from .worker_client import WorkerAPIError, WorkerClient
+
+STAGES = ["submit", "queue_wait", "synthesis", "provider_download", "persist", "notify", "download"]
+# provider_status values bounding each server-side stage, in consumer order
+PROVIDER_STATUSES = ["provider_synthesizing", "provider_downloading", "provider_persisting", "completed"]
+TASK_COLUMNS = "id,status,provider_status,provider_poll_count,created_at,updated_at,completed_at,generation_id"
+GENERATION_COLUMNS = "id,status,created_at,completed_at,generation_time_seconds,duration_seconds"
+IN_FILTER_CHUNK = 100
+
+
+def trace_job(
+    worker: WorkerClient,
+    voice_id: str,
+    text: str,
+    language: str = "Auto",
+    interval: float = 0.25,
+    clock=time.time,
+    timeout: float = 600.0,
+) -> dict:
+    """
+    Submit one job, poll it every `interval` seconds and download it. Times
+    are `clock()` readings: "submit_start", "submit_end", "detected_at",
+    "download_start", "download_end", plus "seen" mapping each status to the
+    (previous poll, this poll) pair in which it first appeared.
+    """
+    trace = {"text_chars": len(text), "seen": {}, "polls": 0}
+    try:
+        trace["submit_start"] = clock()
+        job = worker.generate(voice_id, text, language)
+        trace["submit_end"] = previous = clock()
+        trace.update(task_id=job["task_id"], generation_id=job.get("generation_id"))
+
+        def on_poll(task: dict):
+            nonlocal previous
+            now = clock()
+            status = task.get("provider_status") or task.get("status")
+            trace["seen"].setdefault(status, (previous, now))
+            previous = now
+
+        task, trace["polls"] = worker.wait(job["task_id"], interval, timeout, on_poll=on_poll)
+        trace["detected_at"] = previous
+        trace["status"] = task["status"]
+        if task["status"] != "completed":
+            trace["error"] = task.get("error") or task["status"]
+            return trace
+        trace["download_start"] = clock()
+        wav, _ = worker.download_audio(task["result"]["audio_url"])
+        trace["download_end"] = clock()
+        trace["audio_seconds"] = audio.wav_duration(wav)
+    except (WorkerAPIError, TimeoutError, requests.exceptions.RequestException) as e:
+        trace["error"] = str(e) or type(e).__name__
+    return trace
+
+
+def _chunks(values: list[str]):
+    for i in range(0, len(values), IN_FILTER_CHUNK):
+        yield values[i : i + IN_FILTER_CHUNK]
+
+
+def rows_from_supabase(
+    task_ids: list[str],
+    generation_ids: list[str],
+    url: str = config.SUPABASE_URL,
+    service_role_key: str | None = config.SUPABASE_SERVICE_ROLE_KEY,
+    timeout: float = 30.0,
+) -> tuple[dict, dict]:
+    """Task and generation rows by id through PostgREST with the service-role key."""
+    if not service_role_key:
+        raise RuntimeError("Missing env var: SUPABASE_SERVICE_ROLE_KEY")
+    headers = {"apikey": service_role_key, "Authorization": f"Bearer {service_role_key}"}
+    tables = {}
+    for table, columns, ids in (("tasks", TASK_COLUMNS, task_ids), ("generations", GENERATION_COLUMNS, generation_ids)):
+        rows = {}
+        for chunk in _chunks([i for i in ids if i]):
+            response = requests.get(
+                f"{url}/rest/v1/{table}",
+                params={"select": columns, "id": f"in.({','.join(chunk)})"},
+                headers=headers,
+                timeout=timeout,
+            )
+            if response.status_code >= 400:
+                raise RuntimeError(f"PostgREST {table}: HTTP {response.status_code}: {response.text[:200]}")
+            rows.update({row["id"]: row for row in response.json()})
+        tables[table] = rows
+    return tables["tasks"], tables["generations"]
+
+
+def rows_from_worker(worker: WorkerClient, task_ids: list[str], generation_ids: list[str]) -> tuple[dict, dict]:
+    """
+    The same rows through the Worker (no updated_at): GET /api/tasks/:id per
+    task and GET /api/generations pages until every generation is found.
+    """
+    tasks = {task_id: worker.get_task(task_id) for task_id in task_ids if task_id}
+    wanted = {g for g in generation_ids if g}
+    generations = {}
+    page = 1
+    while wanted - generations.keys():
+        data = worker.list_generations(page, per_page=100)
+        generations.update({g["id"]: g for g in data.get("generations", []) if g["id"] in wanted})
+        if page >= data.get("pagination", {}).get("pages", 1):
+            break
+        page += 1
+    return tasks, generations
+
+
+def _boundary(seen: dict, statuses: list[str], lower: float | None, upper: float | None) -> tuple[float, float] | None:
+    """
+    (midpoint, half-gap) of the poll gap in which the first of `statuses`
+    was seen, narrowed to the [lower, upper] the rows allow.
+    """
+    for status in statuses:
+        if status in seen:
+            before, after = seen[status]
+            if upper is not None:
+                after = min(after, upper)
+            if lower is not None:
+                before = max(before, lower)
+            before = min(before, after)
+            return (before + after) / 2, (after - before) / 2
+    return None
+
+
+def decompose(trace: dict, task: dict | None, generation: dict | None) -> dict:
+    """
+    Stage seconds for one traced job (None where a boundary is missing),
+    plus the row values the stages were built from.
+    """
+    task, generation = task or {}, generation or {}
+    created = parse_timestamp(task.get("created_at"))
+    completed = parse_timestamp(task.get("completed_at"))
+    updated = parse_timestamp(task.get("updated_at"))
+    seen = trace.get("seen", {})
+    # Every provider transition falls between the task's created_at and completed_at
+    marks = [_boundary(seen, PROVIDER_STATUSES[i:], created, completed) for i in range(len(PROVIDER_STATUSES) - 1)]
+    synth, download, persist = (m[0] if m else None for m in marks)
+
+    def span(start, end):
+        return end - start if start is not None and end is not None else None
+
+    stages = {
+        "submit": span(trace.get("submit_start"), trace.get("submit_end")),
+        "queue_wait": span(created, synth),
+        "synthesis": span(synth, download),
+        "provider_download": span(download, persist),
+        "persist": span(persist, completed),
+        "notify": span(completed, trace.get("detected_at")),
+        "download": span(trace.get("download_start"), trace.get("download_end")),
+    }
+    duration = generation.get("duration_seconds")
+    return {
+        "stages": stages,
+        "end_to_end": span(trace.get("submit_start"), trace.get("download_end")),
+        "server_total": span(created, completed),
+        "ingress": span(trace.get("submit_start"), created),
+        "resolution": max((m[1] for m in marks if m), default=None),
+        "generation_time_seconds": generation.get("generation_time_seconds"),
+        "duration_seconds": duration,
+        "audio_seconds": duration if duration is not None else trace.get("audio_seconds"),
+        "provider_poll_count": task.get("provider_poll_count"),
+        "updated_after_completed": span(completed, updated),
+    }
@@ -0,0 +1,383 @@
+"""
+Per-deployment latency model for clone requests.
+
+Predicts the expected request time (and its spread) from text length,
+language, reference duration and max_new_tokens, so callers can size
+timeouts per request and order work by expected duration instead of using
+one hardcoded timeout for everything.
+
+Model
+-----
+For each deployment we fit a weighted ridge regression
+
+    time ~ b0 + b1 * speech_seconds + b2 * ref_seconds
+
+where speech_seconds is the expected output duration (characters divided by
+a per-language speaking rate, capped by max_new_tokens at the 12Hz codec
+frame rate). Samples are weighted by 1/time^2, so the residual spread is
+relative: a request predicted at 100s has ten times the absolute spread of
+one predicted at 10s, which matches what the results show.
+
+Only sufficient statistics are stored (X'WX, X'Wy, y'Wy, n), so new results
+are folded in incrementally without revisiting old files. Each file's share
+is kept with its content hash: a file rewritten under the same name (the
+comparison scripts reuse theirs) has its old share backed out and the new
+contents folded in. Cold starts are tracked separately as a mean/variance
+of their total time.
+"""
+
+import hashlib
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+
+from . import config, results
+
+MODEL_PATH = config.RESULTS_DIR / "_latency_model.json"
+
+CODEC_FRAME_RATE = 12.0  # Qwen3-TTS-12Hz: one token per 1/12s of audio
+MIN_SAMPLES = 3  # Below this a deployment borrows the pooled fit
+RIDGE = 1e-3  # Keeps the fit solvable when ref_seconds never varies
+POOLED = "_all"
+
+# Approximate speaking rates (characters per second of speech)
+CHARS_PER_SECOND = {
+    "Chinese": 5.0,
+    "Japanese": 6.0,
+    "Korean": 6.0,
+}
+DEFAULT_CHARS_PER_SECOND = 15.0
+
+FEATURES = ["intercept", "speech_seconds", "ref_seconds"]
+
+
+def speech_seconds(
+    text_chars: int,
+    language: str = config.DEFAULT_LANGUAGE,
+    max_new_tokens: int | None = None,
+) -> float:
+    """Expected output audio duration for a text, capped by max_new_tokens."""
+    seconds = text_chars / CHARS_PER_SECOND.get(language, DEFAULT_CHARS_PER_SECOND)
+    if max_new_tokens:
+        seconds = min(seconds, max_new_tokens / CODEC_FRAME_RATE)
+    return seconds
+
+
+def feature_vector(
+    text_chars: int,
+    language: str = config.DEFAULT_LANGUAGE,
+    ref_seconds: float | None = None,
+    max_new_tokens: int | None = None,
+) -> np.ndarray:
+    """Build the regression features for one request."""
+    return np.array(
+        [
+            1.0,
+            speech_seconds(text_chars, language, max_new_tokens),
+            ref_seconds if ref_seconds is not None else config.DEFAULT_REF_SECONDS,
+        ]
+    )
+
+
+def t_quantile(z: float, dof: int) -> float:
+    """
+    Student-t quantile with `dof` degrees of freedom and the same upper tail
+    as `z` standard deviations of a normal, so a fit from few samples gets a
+    correspondingly wider interval. One and two degrees of freedom have
+    closed forms; above that P(T > t) is integrated in u = t/sqrt(dof + t^2),
+    where the density (1 - u^2)^((dof - 2)/2) is bounded on [0, 1).
+    """
+    tail = 0.5 * math.erfc(z / math.sqrt(2.0))
+    if dof == 1:
+        return 1.0 / math.tan(math.pi * tail)
+    if dof == 2:
+        return (1.0 - 2.0 * tail) / math.sqrt(2.0 * tail * (1.0 - tail))
+    scale = 2.0 * math.exp(math.lgamma((dof + 1) / 2) - math.lgamma(dof / 2)) / math.sqrt(math.pi)
+
+    def upper(t: float) -> float:
+        u = np.linspace(0.0, t / math.sqrt(dof + t * t), 2001)
+        density = scale * (1.0 - u * u) ** ((dof - 2) / 2)
+        return 0.5 - 0.25 * float((density[:-1] + density[1:]).sum() * (u[1] - u[0]))
+
+    low, high = z, z
+    while upper(high) > tail:
+        low, high = high, high * 2
+    for _ in range(50):
+        mid = (low + high) / 2
+        if upper(mid) > tail:
+            low = mid
+        else:
+            high = mid
+    return high
+
+
+def _add_stats(total: dict[str, dict], share: dict[str, dict], sign: int = 1):
+    """Add (sign=1) or back out (sign=-1) one file's per-deployment statistics."""
+    for key, stats in share.items():
+        target = total.setdefault(key, _empty_stats())
+        for name, value in stats.items():
+            target[name] = target[name] + sign * value
+        if not target["n"] and not target["cold_n"]:
+            del total[key]  # Backed out the last of its samples
+
+
+def _stats_to_json(stats: dict) -> dict:
+    return {**stats, "xtx": stats["xtx"].tolist(), "xty": stats["xty"].tolist()}
+
+
+def _stats_from_json(stats: dict) -> dict:
+    return {**stats, "xtx": np.array(stats["xtx"]), "xty": np.array(stats["xty"])}
+
+
+def _empty_stats() -> dict:
+    p = len(FEATURES)
+    return {
+        "xtx": np.zeros((p, p)),
+        "xty": np.zeros(p),
+        "yty": 0.0,
+        "n": 0,
+        "cold_n": 0,
+        "cold_sum": 0.0,
+        "cold_sumsq": 0.0,
+    }
+
+
+class LatencyModel:
+    """Incrementally trained latency predictor, keyed by deployment."""
+
+    def __init__(self):
+        self.stats: dict[str, dict] = {}
+        # File name -> {"sha256": content hash, "deployments": its share of stats}
+        self.ingested: dict[str, dict] = {}
+
+    # ------------------------------------------------------------------
+    # Training
+    # ------------------------------------------------------------------
+
+    def observe(self, sample: dict, into: dict[str, dict] | None = None):
+        """Fold one normalized sample (see results.py) into the model (or `into`)."""
+        if "error" in sample or sample.get("time", 0) <= 0:
+            return
+        keys = [sample["deployment"]]
+        if not config.DEPLOYMENTS.get(sample["deployment"], {}).get("provider"):
+            keys.append(POOLED)  # Cloud providers don't inform the Modal fit
+        for key in keys:
+            stats = (self.stats if into is None else into).setdefault(key, _empty_stats())
+            y = float(sample["time"])
+            if sample.get("cold"):
+                stats["cold_n"] += 1
+                stats["cold_sum"] += y
+                stats["cold_sumsq"] += y * y
+                continue
+            x = feature_vector(
+                sample["text_chars"],
+                sample.get("language", config.DEFAULT_LANGUAGE),
+                sample.get("ref_seconds"),
+                sample.get("max_new_tokens"),
+            )
+            w = 1.0 / (y * y)
+            stats["xtx"] += w * np.outer(x, x)
+            stats["xty"] += w * x * y
+            stats["yty"] += w * y * y
+            stats["n"] += 1
+
+    def update(self, paths: list[Path] | None = None) -> list[str]:
+        """
+        Ingest results files not seen before or changed since; return their
+        names. A changed file replaces its earlier share of the statistics.
+        """
+        new = []
+        for path in paths if paths is not None else results.result_files():
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            previous = self.ingested.get(path.name)
+            if previous and previous["sha256"] == digest:
+                continue
+            share = {}
+            for sample in results.load_file(path):
+                self.observe(sample, into=share)
+            if previous:
+                _add_stats(self.stats, previous["deployments"], sign=-1)
+            _add_stats(self.stats, share)
+            self.ingested[path.name] = {"sha256": digest, "deployments": share}
+            new.append(path.name)
+        return new
+
+    # ------------------------------------------------------------------
+    # Prediction
+    # ------------------------------------------------------------------
+
+    def _fit(self, deployment: str, pooled: bool = True) -> tuple[dict, np.ndarray, np.ndarray, float] | None:
+        stats = self.stats.get(deployment)
+        if (not stats or stats["n"] < MIN_SAMPLES) and pooled:
+            stats = self.stats.get(POOLED)
+        if not stats or stats["n"] < MIN_SAMPLES:
+            return None
+
+        p = len(FEATURES)
+        penalty = RIDGE * stats["n"] * np.eye(p)
+        penalty[0, 0] = 0.0  # Never shrink the intercept
+        inv = np.linalg.inv(stats["xtx"] + penalty)
+        beta = inv @ stats["xty"]
+        sse = stats["yty"] - 2 * beta @ stats["xty"] + beta @ stats["xtx"] @ beta
+        rel_var = max(sse, 0.0) / max(stats["n"] - p, 1)
+        return stats, beta, inv, rel_var
+
+    def predict(
+        self,
+        deployment: str,
+        text_chars: int,
+        language: str = config.DEFAULT_LANGUAGE,
+        ref_seconds: float | None = None,
+        max_new_tokens: int | None = None,
+        pooled: bool = True,
+    ) -> tuple[float, float] | None:
+        """
+        Return (expected_seconds, std_seconds) for a warm request, or None.
+        pooled=False returns None instead of borrowing the pooled fit.
+        """
+        fit = self._fit(deployment, pooled)
+        if fit is None:
+            return None
+        _, beta, inv, rel_var = fit
+        x = feature_vector(text_chars, language, ref_seconds, max_new_tokens)
+        mean = max(float(x @ beta), 0.1)
+        leverage = float(x @ inv @ x) / (mean * mean)
+        std = mean * math.sqrt(rel_var * (1.0 + leverage))
+        return mean, std
+
+    def cold_start(self, deployment: str) -> tuple[float, float] | None:
+        """Return (mean_seconds, std_seconds) of observed cold starts, or None."""
+        stats = self.stats.get(deployment)
+        if not stats or stats["cold_n"] == 0:
+            stats = self.stats.get(POOLED)
+        if not stats or stats["cold_n"] == 0:
+            return None
+        n = stats["cold_n"]
+        mean = stats["cold_sum"] / n
+        var = max(stats["cold_sumsq"] / n - mean * mean, 0.0)
+        return mean, math.sqrt(var)
+
+    def timeout_for(
+        self,
+        deployment: str,
+        text_chars: int,
+        language: str = config.DEFAULT_LANGUAGE,
+        ref_seconds: float | None = None,
+        max_new_tokens: int | None = None,
+        may_be_cold: bool = False,
+        z: float = 3.0,
+        min_timeout: float = 30.0,
+        max_timeout: float = 1800.0,
+    ) -> float:
+        """
+        Adaptive request timeout: expected time plus the prediction spread
+        (residual and leverage) at the Student-t quantile matching `z`
+        standard deviations, on the fit's residual degrees of freedom.
+
+        When the container may be cold, the cold-start mean and spread are
+        added on top. Falls back to config.FALLBACK_TIMEOUT without data.
+        """
+        prediction = self.predict(deployment, text_chars, language, ref_seconds, max_new_tokens)
+        if prediction is None:
+            return float(config.FALLBACK_TIMEOUT)
+        mean, std = prediction
+        stats = self._fit(deployment)[0]
+        timeout = mean + t_quantile(z, max(stats["n"] - len(FEATURES), 1)) * std
+        if may_be_cold:
+            cold = self.cold_start(deployment)
+            if cold:
+                timeout += cold[0] + z * cold[1]
+        return min(max(timeout, min_timeout), max_timeout)
+
+    def order(self, deployment: str, jobs: list[dict]) -> list[dict]:
+        """
+        Return jobs sorted by predicted duration (shortest first).
+
+        Jobs are dicts with "text" and optionally "language", "ref_seconds"
+        and "max_new_tokens"; jobs without a prediction keep their relative
+        order at the end.
+        """
+
+        def expected(job: dict) -> float:
+            prediction = self.predict(
+                deployment,
+                len(job["text"]),
+                job.get("language", config.DEFAULT_LANGUAGE),
+                job.get("ref_seconds"),
+                job.get("max_new_tokens"),
+            )
+            return prediction[0] if prediction else math.inf
+
+        return sorted(jobs, key=expected)
+
+    def summary(self) -> dict:
+        """Per-deployment coefficients and sample counts, for reporting."""
+        out = {}
+        for key in sorted(self.stats):
+            fit = self._fit(key)
+            stats = self.stats[key]
+            out[key] = {
+                "samples": stats["n"],
+                "cold_samples": stats["cold_n"],
+                "coefficients": dict(zip(FEATURES, fit[1].round(4).tolist())) if fit else None,
+                "relative_std": round(math.sqrt(fit[3]), 4) if fit else None,
+                "pooled": stats["n"] < MIN_SAMPLES,
+            }
+        return out
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "features": FEATURES,
+            "ingested": {
+                name: {
+                    "sha256": entry["sha256"],
+                    "deployments": {key: _stats_to_json(stats) for key, stats in entry["deployments"].items()},
+                }
+                for name, entry in self.ingested.items()
+            },
+            "deployments": {key: _stats_to_json(stats) for key, stats in self.stats.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyModel":
+        model = cls()
+        if data.get("features") != FEATURES or not isinstance(data.get("ingested", {}), dict):
+            # Feature set changed, or saved without per-file shares (which a
+            # rewritten file could not be backed out of): start over so every
+            # file is re-ingested
+            return model
+        for name, entry in data.get("ingested", {}).items():
+            model.ingested[name] = {
+                "sha256": entry["sha256"],
+                "deployments": {key: _stats_from_json(stats) for key, stats in entry["deployments"].items()},
+            }
+        for key, stats in data.get("deployments", {}).items():
+            model.stats[key] = _stats_from_json(stats)
+        return model
+
+    def save(self, path: Path = MODEL_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: Path = MODEL_PATH) -> "LatencyModel":
+        """Load the persisted model (empty model if none exists yet)."""
+        if not path.exists():
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def load_trained(path: Path = MODEL_PATH, save: bool = True) -> LatencyModel:
+    """Load the persisted model, fold in any new results files, and save it."""
+    model = LatencyModel.load(path)
+    if model.update() and save:
+        model.save(path)
+    return model
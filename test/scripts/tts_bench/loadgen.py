@@ -0,0 +1,205 @@
+"""
+Open-loop load and a search for the highest rate that meets a latency SLO.
+
+A closed loop (N workers, each sending its next request when the last one
+returns) slows down with the server, so it never shows the queue that
+builds behind an overloaded deployment. run_step() sends clone requests on
+a Poisson schedule at a fixed rate whatever is still in flight, and times
+each one from its scheduled send rather than the actual send, so a late
+send counts against the target instead of hiding (no coordinated
+omission). At most `max_in_flight` requests are outstanding; an arrival
+beyond that is shed and counted as an error.
+
+A step runs `warmup` + `measure` seconds at one rate and judges only the
+requests scheduled in the measurement window, after waiting for them to
+finish or time out. It passes when:
+
+    p95 latency <= slo
+    errors (timeouts and shed arrivals included) <= max_error_rate
+    the window is steady: median latency in its last third is at most
+    `drift` x that of its first third (a queue that keeps growing fails
+    even while its p95 is still under the SLO)
+
+find_max_rate() doubles the rate from `low` until a step fails (or `high`
+is reached), then bisects between the best passing and the lowest failing
+rate until they are within `tolerance` of each other.
+
+Rates are requests per minute and times are model seconds: with a
+stand-in, sleeps are multiplied and measured times divided by its
+`time_scale`. Records carry "latency" and "response" instead of "time", so
+timings taken under load never train the latency model.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import client, config
+from .stats import summarize
+
+DEFAULT_DRIFT = 2.0
+MIN_DRIFT_SAMPLES = 5  # Per third of the window; fewer and drift is not judged
+
+
+def arrival_times(rate: float, duration: float, rng: random.Random) -> list[float]:
+    """Poisson arrivals at `rate` per minute over `duration` seconds."""
+    times, t = [], 0.0
+    while True:
+        t += rng.expovariate(rate / 60.0)
+        if t >= duration:
+            return times
+        times.append(t)
+
+
+def run_step(
+    endpoint: dict,
+    jobs: list[dict],
+    ref_audio_b64: str,
+    ref_text: str,
+    rate: float,
+    warmup: float,
+    measure: float,
+    timeout: float = config.FALLBACK_TIMEOUT,
+    max_in_flight: int = 64,
+    time_scale: float = 1.0,
+    seed: int = 0,
+) -> list[dict]:
+    """
+    Drive `endpoint` at `rate` per minute for warmup + measure seconds with
+    jobs drawn at random from `jobs`. Returns one record per arrival with
+    "scheduled" (seconds from the step's start), "measured" (in the
+    measurement window), "latency" (scheduled -> response), "response"
+    (send -> response), "send_lag" and "text_chars", or "error".
+    """
+    rng = random.Random(seed)
+    schedule = [(at, rng.choice(jobs)) for at in arrival_times(rate, warmup + measure, rng)]
+    slots = threading.BoundedSemaphore(max_in_flight)
+    records = []
+    lock = threading.Lock()
+
+    def send(at: float, job: dict, due: float):
+        try:
+            payload = client.build_payload(
+                job["text"],
+                ref_audio_b64,
+                ref_text,
+                job.get("language", config.DEFAULT_LANGUAGE),
+                job.get("max_new_tokens"),
+            )
+            sent = time.perf_counter()
+            record, _ = client.measure_request(endpoint, payload, timeout=timeout * time_scale)
+            finished = time.perf_counter()
+        finally:
+            slots.release()
+        result = {
+            "id": job["id"],
+            "scheduled": at,
+            "measured": at >= warmup,
+            "text_chars": record["text_chars"],
+            "latency": (finished - due) / time_scale,
+            "response": record.pop("time") / time_scale,
+            "send_lag": (sent - due) / time_scale,
+        }
+        if "error" in record:
+            result["error"] = record["error"]
+        with lock:
+            records.append(result)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="load") as pool:
+        start = time.perf_counter()
+        for at, job in schedule:
+            due = start + at * time_scale
+            if due > time.perf_counter():
+                time.sleep(due - time.perf_counter())
+            if not slots.acquire(blocking=False):
+                with lock:
+                    records.append(
+                        {
+                            "id": job["id"],
+                            "scheduled": at,
+                            "measured": at >= warmup,
+                            "text_chars": len(job["text"]),
+                            "error": f"Shed: {max_in_flight} requests in flight",
+                        }
+                    )
+                continue
+            pool.submit(send, at, job, due)
+    return sorted(records, key=lambda r: r["scheduled"])
+
+
+def judge(
+    records: list[dict],
+    rate: float,
+    warmup: float,
+    measure: float,
+    slo: float,
+    max_error_rate: float = 0.01,
+    drift: float = DEFAULT_DRIFT,
+) -> dict:
+    """Summary and verdict for one step's measurement window."""
+    window = [r for r in records if r["measured"]]
+    ok = [r for r in window if "error" not in r]
+    latency = summarize([r["latency"] for r in ok])
+    error_rate = (len(window) - len(ok)) / len(window) if window else 0.0
+    thirds = [
+        [r["latency"] for r in ok if warmup + i * measure / 3 <= r["scheduled"] < warmup + (i + 1) * measure / 3]
+        for i in range(3)
+    ]
+    ratio = None
+    if min(len(thirds[0]), len(thirds[2])) >= MIN_DRIFT_SAMPLES:
+        ratio = summarize(thirds[2])["p50"] / max(summarize(thirds[0])["p50"], 1e-9)
+    reasons = []
+    if not ok:
+        reasons.append("no completed requests")
+    elif latency["p95"] > slo:
+        reasons.append(f"p95 {latency['p95']:.1f}s > {slo:g}s")
+    if error_rate > max_error_rate:
+        reasons.append(f"errors {error_rate:.1%}")
+    if ratio is not None and ratio > drift:
+        reasons.append(f"latency drifting x{ratio:.1f}")
+    return {
+        "rate": rate,
+        "requests": len(window),
+        "completed": len(ok),
+        "errors": len(window) - len(ok),
+        "error_rate": error_rate,
+        "throughput": len(ok) / measure * 60.0,
+        "latency": latency,
+        "response": summarize([r["response"] for r in ok]),
+        "send_lag": summarize([r["send_lag"] for r in ok]),
+        "drift": ratio,
+        "passed": not reasons,
+        "reason": "; ".join(reasons) or None,
+    }
+
+
+def find_max_rate(step, low: float, high: float, tolerance: float = 0.1, max_steps: int = 12) -> dict | None:
+    """
+    Highest passing rate found by doubling from `low`, then bisecting.
+    `step(rate)` runs one rate and returns judge()'s summary; the best
+    passing summary is returned (None when `low` already fails).
+    """
+    tried = []
+
+    def run(rate: float) -> bool:
+        summary = step(rate)
+        tried.append(summary)
+        return summary["passed"]
+
+    if not run(low):
+        return None
+    good, bad, rate = low, None, low
+    while bad is None and rate < high and len(tried) < max_steps:
+        rate = min(rate * 2, high)
+        if run(rate):
+            good = rate
+        else:
+            bad = rate
+    while bad is not None and (bad - good) / bad > tolerance and len(tried) < max_steps:
+        rate = (good + bad) / 2
+        if run(rate):
+            good = rate
+        else:
+            bad = rate
+    return next(s for s in tried if s["rate"] == good and s["passed"])
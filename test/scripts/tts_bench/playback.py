@@ -0,0 +1,125 @@
+"""
+Playback-buffer simulation for streamed clone responses.
+
+Time to first audio says when a player *could* start; whether playback then
+stalls depends on chunks keeping ahead of real time. Given a run's chunk
+arrival offsets and the seconds of audio each chunk carried (the
+"chunk_times"/"chunk_audio" fields `client.stream_clone` records), this
+replays a player that:
+
+- waits until `startup` seconds of audio are buffered (or the stream ends)
+- plays at real time, draining the buffer
+- on an empty buffer stalls until `rebuffer` seconds are buffered again
+  (0 = resume with the next chunk) or the stream ends
+
+`min_startup` finds the smallest startup buffer that plays a run through
+without a stall; its p95 across runs is the prebuffer a client needs.
+"""
+
+import numpy as np
+
+from .stats import percentile, summarize
+
+
+def _audio_chunks(chunk_times: list[float], chunk_audio: list[float]) -> tuple[np.ndarray, np.ndarray]:
+    """Arrival times and cumulative audio of the chunks that carried audio."""
+    times = np.asarray(chunk_times, dtype=float)
+    seconds = np.asarray(chunk_audio, dtype=float)
+    keep = seconds > 0
+    return times[keep], np.cumsum(seconds[keep])
+
+
+def simulate(
+    chunk_times: list[float],
+    chunk_audio: list[float],
+    startup: float = 0.0,
+    rebuffer: float = 0.0,
+) -> dict:
+    """
+    Replay one streamed run. Returns "start" (request to playback start),
+    "stalls", "stall_seconds" (time spent stalled after start), "end"
+    (playback end) and "audio_seconds".
+    """
+    times, cumulative = _audio_chunks(chunk_times, chunk_audio)
+    result = {"start": None, "stalls": 0, "stall_seconds": 0.0, "end": None, "audio_seconds": 0.0}
+    if times.size == 0:
+        return result
+    total = float(cumulative[-1])
+    result["audio_seconds"] = total
+
+    def ready_at(played: float, buffer: float) -> float:
+        """Arrival time at which `buffer` seconds beyond `played` are in (or the stream ends)."""
+        index = np.searchsorted(cumulative, min(played + buffer, total) - 1e-9, side="right")
+        index = min(index, times.size - 1)
+        # At least one chunk past what has been played
+        index = max(index, np.searchsorted(cumulative, played + 1e-9, side="left"))
+        return float(times[index])
+
+    clock = ready_at(0.0, startup)
+    result["start"] = clock
+    played = 0.0
+    while True:
+        # Play everything that has arrived by the time the buffer drains
+        arrived = float(cumulative[np.searchsorted(times, clock, side="right") - 1])
+        while True:
+            drained_at = clock + (arrived - played)
+            later = np.searchsorted(times, drained_at, side="right")
+            newest = float(cumulative[later - 1])
+            if newest <= arrived:
+                break
+            arrived = newest
+        clock, played = clock + (arrived - played), arrived
+        if played >= total - 1e-9:
+            break
+        resume = ready_at(played, rebuffer)
+        result["stalls"] += 1
+        result["stall_seconds"] += resume - clock
+        clock = resume
+    result["end"] = clock
+    return result
+
+
+def min_startup(chunk_times: list[float], chunk_audio: list[float], rebuffer: float = 0.0) -> float | None:
+    """
+    Smallest startup buffer (seconds of audio) with no stall for this run.
+
+    Only buffer levels the chunks can actually reach matter, so this checks
+    each cumulative audio amount in turn; None for a run without audio.
+    """
+    _, cumulative = _audio_chunks(chunk_times, chunk_audio)
+    for level in [0.0, *cumulative[:-1]]:
+        if simulate(chunk_times, chunk_audio, startup=float(level), rebuffer=rebuffer)["stalls"] == 0:
+            return float(level)
+    return float(cumulative[-1]) if cumulative.size else None
+
+
+def summarize_runs(runs: list[dict], startups: list[float], rebuffer: float = 0.0, q: float = 95.0) -> dict:
+    """
+    Stall statistics for `runs` (records with chunk_times/chunk_audio) at
+    each startup buffer, plus the q-th percentile minimum startup buffer and
+    the playback start delay it implies.
+    """
+    minimums = [min_startup(r["chunk_times"], r["chunk_audio"], rebuffer) for r in runs]
+    minimums = [m for m in minimums if m is not None]
+    by_startup = {}
+    for startup in startups:
+        sims = [simulate(r["chunk_times"], r["chunk_audio"], startup, rebuffer) for r in runs]
+        sims = [s for s in sims if s["start"] is not None]
+        by_startup[startup] = {
+            "runs": len(sims),
+            "stalled_runs": sum(1 for s in sims if s["stalls"]),
+            "stalls": summarize([s["stalls"] for s in sims]),
+            "stall_seconds": summarize([s["stall_seconds"] for s in sims]),
+            "start": summarize([s["start"] for s in sims]),
+        }
+    required = percentile(minimums, q)
+    start_delay = None
+    if required is not None:
+        starts = [simulate(r["chunk_times"], r["chunk_audio"], required, rebuffer)["start"] for r in runs]
+        start_delay = percentile([s for s in starts if s is not None], q)
+    return {
+        "by_startup": by_startup,
+        "min_startup": summarize(minimums),
+        "required_startup": required,
+        "required_start_delay": start_delay,
+    }
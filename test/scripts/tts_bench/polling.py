@@ -0,0 +1,276 @@
+"""
+Task-status polling schedules and a bounded async poller.
+
+The web app polls GET /api/tasks/:id every 3s for every active task
+(frontend TaskProvider.tsx), whatever the job's size. Each poll is a Worker
+request, a tier-2 rate-limit increment and a database read, and a user gets
+90 of them per 5 minutes by default. A schedule decides when to poll next:
+
+    FixedSchedule(3.0)        the frontend's schedule
+    AdaptiveSchedule(...)     stay quiet until close to the predicted
+                              duration, poll densely around it, then back
+                              off with elapsed time once the job overruns
+
+      elapsed < early * predicted               sleep until early * predicted
+      elapsed < overrun * predicted             near * predicted
+      later (or no prediction)                  near * elapsed
+
+so after an overrun the detection lag stays near `near` of the job's age.
+
+Every delay is clamped to [min_interval, max_interval] and jittered by
+±jitter so that tasks submitted together do not poll together.
+
+DurationPredictor supplies `predicted`: the Worker's estimated_duration_minutes
+until it has seen completions, then a running linear fit of the observed
+durations (queue wait included) on text length.
+
+TaskPoller watches any number of tasks on one event loop, with at most
+`max_in_flight` requests outstanding; a due poll waits for a slot. It honours
+429 retry_after_seconds and records polls and detection lag (time from the
+task's completed_at to the poll that saw it) per task. replay() runs the
+same schedules in virtual time over a list of task durations, which is how
+thousands of tasks are evaluated without submitting thousands of jobs.
+"""
+
+import asyncio
+import heapq
+import random
+import time
+from datetime import datetime
+
+from . import config
+from .worker_client import TERMINAL_STATUSES, WorkerAPIError
+
+
+class FixedSchedule:
+    """Poll every `interval` seconds (the frontend's 3s), first poll at submit."""
+
+    name = "fixed"
+
+    def __init__(self, interval: float = config.WORKER_POLL_INTERVAL, jitter: float = 0.0):
+        self.interval = interval
+        self.jitter = jitter
+
+    def first_delay(self, predicted: float | None) -> float:
+        return 0.0
+
+    def next_delay(self, elapsed: float, predicted: float | None, previous: float) -> float:
+        return self.interval
+
+
+class AdaptiveSchedule:
+    """Poll sparsely before the predicted duration, densely around it, backing off after."""
+
+    name = "adaptive"
+
+    def __init__(
+        self,
+        min_interval: float = 1.0,
+        max_interval: float = 10.0,
+        early: float = 0.8,
+        near: float = 0.1,
+        overrun: float = 1.5,
+        jitter: float = 0.1,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.early = early
+        self.near = near
+        self.overrun = overrun
+        self.jitter = jitter
+
+    def _clamp(self, seconds: float) -> float:
+        return min(max(seconds, self.min_interval), self.max_interval)
+
+    def first_delay(self, predicted: float | None) -> float:
+        return self._clamp(self.early * predicted) if predicted else self.min_interval
+
+    def next_delay(self, elapsed: float, predicted: float | None, previous: float) -> float:
+        if predicted and elapsed < self.early * predicted:
+            return self._clamp(self.early * predicted - elapsed)
+        if predicted and elapsed < self.overrun * predicted:
+            return self._clamp(self.near * predicted)
+        return self._clamp(self.near * elapsed)
+
+
+SCHEDULES = {"fixed": FixedSchedule, "adaptive": AdaptiveSchedule}
+
+
+def jittered(delay: float, jitter: float, rng: random.Random) -> float:
+    return delay * rng.uniform(1.0 - jitter, 1.0 + jitter) if jitter else delay
+
+
+class DurationPredictor:
+    """
+    Predicted job duration: the Worker's estimate until `min_samples` jobs
+    have completed, then a linear fit of duration on text length over the
+    completions so far, older ones down-weighted by `decay` per new sample.
+    """
+
+    def __init__(self, decay: float = 0.9, min_samples: int = 3):
+        self.decay = decay
+        self.min_samples = min_samples
+        self.samples = 0
+        self.sums = [0.0] * 5  # weight, x, y, x^2, xy
+
+    def predict(self, text_chars: int, estimate_seconds: float | None = None) -> float | None:
+        if self.samples < self.min_samples:
+            return estimate_seconds
+        w, sx, sy, sxx, sxy = self.sums
+        mean_x, mean_y = sx / w, sy / w
+        variance = sxx / w - mean_x**2
+        if variance < 1.0:  # Every job the same length so far
+            return mean_y
+        slope = (sxy / w - mean_x * mean_y) / variance
+        return max(mean_y + slope * (text_chars - mean_x), 0.1 * mean_y)
+
+    def observe(self, text_chars: int, seconds: float):
+        self.sums = [v * self.decay for v in self.sums]
+        for i, v in enumerate((1.0, text_chars, seconds, text_chars**2, text_chars * seconds)):
+            self.sums[i] += v
+        self.samples += 1
+
+
+def parse_timestamp(value: str | None) -> float | None:
+    """Epoch seconds from a task's ISO timestamp (Postgres or JS format)."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class TaskPoller:
+    """
+    Watch tasks until they are terminal under one schedule.
+
+    fetch: coroutine (task_id) -> task dict, e.g. AsyncWorkerClient.get_task;
+        a WorkerAPIError with status 429 postpones the poll by retry_after.
+    clock: epoch seconds on the same clock as the tasks' completed_at (a
+        time-scaled stand-in passes its emulated clock).
+    time_scale: wall seconds per schedule second, as in the other clients.
+    """
+
+    def __init__(
+        self,
+        fetch,
+        schedule,
+        max_in_flight: int = 16,
+        time_scale: float = 1.0,
+        clock=time.time,
+        seed: int = 0,
+    ):
+        self.fetch = fetch
+        self.schedule = schedule
+        self.time_scale = time_scale
+        self.clock = clock
+        self.rng = random.Random(seed)
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.poll_times: list[float] = []
+
+    async def _sleep(self, seconds: float):
+        await asyncio.sleep(seconds * self.time_scale)
+
+    async def _poll(self, task_id: str) -> tuple[dict | None, float | None]:
+        """One poll inside a slot; returns (task, retry_after)."""
+        async with self.slots:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.poll_times.append(self.clock())
+            try:
+                return await self.fetch(task_id), None
+            except WorkerAPIError as e:
+                if e.status != 429:
+                    raise
+                return None, e.retry_after or 1.0
+            finally:
+                self.in_flight -= 1
+
+    async def watch(self, task_id: str, predicted: float | None = None, submitted_at: float | None = None) -> dict:
+        """
+        Poll `task_id` until it is terminal. Returns a record with "polls",
+        "rate_limited", "status", "detected_at", "completed_at" and "lag"
+        "elapsed" and "duration" (schedule seconds from `submitted_at`).
+        """
+        submitted_at = self.clock() if submitted_at is None else submitted_at
+        record = {"task_id": task_id, "predicted": predicted, "polls": 0, "rate_limited": 0}
+        delay = jittered(self.schedule.first_delay(predicted), self.schedule.jitter, self.rng)
+        while True:
+            if delay > 0:
+                await self._sleep(delay)
+            record["polls"] += 1
+            task, retry_after = await self._poll(task_id)
+            now = self.clock()
+            if task is None:
+                record["rate_limited"] += 1
+                delay = retry_after
+                continue
+            if task.get("status") in TERMINAL_STATUSES:
+                completed_at = parse_timestamp(task.get("completed_at"))
+                record.update(
+                    status=task["status"],
+                    detected_at=now,
+                    completed_at=completed_at,
+                    lag=now - completed_at if completed_at is not None else None,
+                    elapsed=now - submitted_at,
+                    duration=completed_at - submitted_at if completed_at is not None else None,
+                )
+                return record
+            next_delay = self.schedule.next_delay(now - submitted_at, predicted, delay or 1.0)
+            delay = jittered(next_delay, self.schedule.jitter, self.rng)
+
+
+def replay(
+    schedule,
+    tasks: list[dict],
+    request_seconds: float = 0.05,
+    max_in_flight: int = 16,
+    seed: int = 0,
+) -> tuple[list[dict], list[float]]:
+    """
+    Run `schedule` in virtual time over tasks with "submitted", "duration"
+    and "predicted" (seconds). Each poll occupies one of `max_in_flight`
+    slots for `request_seconds`; a poll sees the task finished when it is
+    served at or after submitted + duration. Returns (records, poll_times):
+    one record per task with "polls", "lag", "elapsed" and "queued" (the
+    last poll's wait for a slot), and every poll's service time, sorted.
+    """
+    rng = random.Random(seed)
+    due = []  # (time, order, task index, delay used)
+    for i, task in enumerate(tasks):
+        first = jittered(schedule.first_delay(task.get("predicted")), schedule.jitter, rng)
+        heapq.heappush(due, (task["submitted"] + first, i, i, first))
+    free = [0.0] * max_in_flight  # When each request slot is next free
+    records = [{"polls": 0} for _ in tasks]
+    poll_times = []
+    order = len(tasks)
+    while due:
+        at, _, i, delay = heapq.heappop(due)
+        slot_free = heapq.heappop(free)
+        served = max(at, slot_free) + request_seconds
+        heapq.heappush(free, served)
+        poll_times.append(served)
+        task, record = tasks[i], records[i]
+        record["polls"] += 1
+        finished = task["submitted"] + task["duration"]
+        if served >= finished:
+            record.update(lag=served - finished, elapsed=served - task["submitted"], queued=max(0.0, slot_free - at))
+            continue
+        next_delay = schedule.next_delay(served - task["submitted"], task.get("predicted"), delay or 1.0)
+        delay = jittered(next_delay, schedule.jitter, rng)
+        order += 1
+        heapq.heappush(due, (served + delay, order, i, delay))
+    return records, sorted(poll_times)
+
+
+def peak_rate(times: list[float], window: float) -> int:
+    """Most events in any `window`-second span of sorted `times`."""
+    peak, start = 0, 0
+    for end, t in enumerate(times):
+        while times[start] < t - window:
+            start += 1
+        peak = max(peak, end - start + 1)
+    return peak
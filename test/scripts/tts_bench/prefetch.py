@@ -0,0 +1,165 @@
+"""
+Parallel prefetch of provider audio URLs.
+
+DashScope synthesis returns output.audio.url instead of audio, so each
+generation costs a second, serial round trip (docs/qwen-api.md §10.3).
+AudioPrefetcher takes URLs as soon as synthesis returns them and downloads
+them on a bounded worker pool while the caller moves on to the next
+synthesis call:
+
+    with AudioPrefetcher(out_dir, workers=4) as prefetcher:
+        for job in jobs:
+            record = dashscope.synthesize(endpoint, voice, job["text"])
+            prefetcher.submit(record["audio_url"], f"{job['id']}.wav")
+        downloads = prefetcher.results()
+
+Downloads stream to `<name>.part` and are renamed when complete. A dropped
+connection resumes from the bytes already on disk with `Range: bytes=N-`
+(restarting from zero if the server ignores it), up to `retries` times with
+exponential backoff.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from . import client
+
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 3
+CHUNK_SIZE = 64 * 1024
+BACKOFF_SECONDS = 0.2
+
+
+def _retry_after(response: requests.Response) -> float | None:
+    """Retry-After, or the API Worker's retry_after_seconds body field."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        try:
+            value = (response.json() or {}).get("retry_after_seconds")
+        except (ValueError, AttributeError):
+            value = None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def download(
+    url: str,
+    path: Path,
+    timeout: float = 90.0,
+    retries: int = DEFAULT_RETRIES,
+    chunk_size: int = CHUNK_SIZE,
+    backoff: float = BACKOFF_SECONDS,
+    session: requests.Session | None = None,
+) -> dict:
+    """
+    Stream `url` to `path`, resuming after partial failures. Returns a
+    record with "bytes", "seconds", "ttfb" (first request -> its response
+    headers), "attempts", "resumed_bytes" (bytes already on disk when a retry
+    started), "restarted_bytes" (of those, thrown away because the server
+    ignored Range) and "error" on failure ("status" for an HTTP error, and
+    "retry_after" seconds for a 429). `session` defaults to the shared
+    client session.
+    """
+    part = path.with_name(path.name + ".part")
+    offset = part.stat().st_size if part.exists() else 0
+    record = {"path": str(path), "bytes": 0, "attempts": 0, "resumed_bytes": 0, "restarted_bytes": 0}
+    session = session or client.get_session()
+    start = time.perf_counter()
+    while True:
+        record["attempts"] += 1
+        if offset:
+            record["resumed_bytes"] += offset
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                record.setdefault("ttfb", time.perf_counter() - start)
+                if response.status_code == 416:
+                    pass  # Everything is already on disk
+                elif response.status_code >= 400:
+                    record.update(error=f"HTTP {response.status_code}", status=response.status_code)
+                    if response.status_code == 429:
+                        record["retry_after"] = _retry_after(response)
+                    break
+                else:
+                    if offset and response.status_code != 206:
+                        record["restarted_bytes"] += offset
+                        offset = 0  # Range ignored: the body starts over
+                    with open(part, "ab" if offset else "wb") as f:
+                        for chunk in response.iter_content(chunk_size):
+                            f.write(chunk)
+                            offset += len(chunk)
+            part.replace(path)
+            record["bytes"] = offset
+            break
+        except requests.exceptions.RequestException as e:
+            if record["attempts"] > retries:
+                record["error"] = "Timeout" if isinstance(e, requests.exceptions.Timeout) else str(e) or type(e).__name__
+                break
+            time.sleep(backoff * 2 ** (record["attempts"] - 1))
+            offset = part.stat().st_size if part.exists() else 0
+    record["seconds"] = time.perf_counter() - start
+    return record
+
+
+class AudioPrefetcher:
+    """Bounded pool that downloads submitted URLs into `out_dir`."""
+
+    def __init__(
+        self,
+        out_dir: Path,
+        workers: int = DEFAULT_WORKERS,
+        timeout: float = 90.0,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = BACKOFF_SECONDS,
+    ):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self.futures: list[Future] = []
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def _run(self, url: str, name: str, submitted: float) -> dict:
+        began = time.perf_counter()
+        record = download(url, self.out_dir / name, self.timeout, self.retries, backoff=self.backoff)
+        record.update(
+            {
+                "name": name,
+                "queued_seconds": began - submitted,
+                # Offsets from the prefetcher's start, for overlap accounting
+                "start": began - self.started,
+                "end": time.perf_counter() - self.started,
+            }
+        )
+        return record
+
+    def submit(self, url: str, name: str) -> Future:
+        """Queue a download of `url` to out_dir/name; returns its future."""
+        future = self.pool.submit(self._run, url, name, time.perf_counter())
+        with self.lock:
+            self.futures.append(future)
+        return future
+
+    def results(self) -> list[dict]:
+        """Wait for every submitted download; records in submission order."""
+        with self.lock:
+            futures = list(self.futures)
+        return [future.result() for future in futures]
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+    def __enter__(self) -> "AudioPrefetcher":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,91 @@
+"""
+Provider-pluggable generation for cross-provider comparisons.
+
+Self-hosted Modal deployments and Qwen cloud (DashScope) differ in workflow:
+Modal takes the reference with every clone request, DashScope creates a voice
+once (enrollment or design) and then synthesizes by voice ID, returning an
+audio URL that is fetched separately. A provider hides that behind:
+
+    create_voice(ref_audio_b64, ref_text, language) -> record with "voice"
+    generate(voice, text, language, timeout)        -> (record, wav_bytes)
+    request_cost(record) / voice_cost()             -> USD
+
+Modal cost is the request's GPU-seconds at the entry's "usd_per_hour" (idle,
+boot and keep-warm time not included; tts_bench.cost amortizes them); DashScope cost is its per-character and
+per-voice price from the config entry.
+"""
+
+from . import client, config, dashscope
+
+# Voice-design description used when a benchmark designs a DashScope voice
+DEFAULT_VOICE_PROMPT = "A calm middle-aged male narrator with clear articulation."
+DEFAULT_PREVIEW_TEXT = "Hello everyone, welcome to today's program."
+
+
+class ModalProvider:
+    """Modal clone endpoint: the "voice" is the reference sent each time."""
+
+    kind = "modal"
+
+    def __init__(self, endpoint: dict):
+        self.endpoint = endpoint
+
+    def create_voice(self, ref_audio_b64: str, ref_text: str, language: str = config.DEFAULT_LANGUAGE) -> dict:
+        return {"kind": "reference", "time": 0.0, "voice": {"ref_audio_b64": ref_audio_b64, "ref_text": ref_text}}
+
+    def generate(
+        self,
+        voice: dict,
+        text: str,
+        language: str = config.DEFAULT_LANGUAGE,
+        timeout: float = config.FALLBACK_TIMEOUT,
+    ) -> tuple[dict, bytes | None]:
+        payload = client.build_payload(text, voice["ref_audio_b64"], voice["ref_text"], language)
+        return client.measure_request(self.endpoint, payload, timeout=timeout)
+
+    def request_cost(self, record: dict) -> float | None:
+        hourly = self.endpoint.get("usd_per_hour")
+        return record["time"] * hourly / 3600 if hourly is not None else None
+
+    def voice_cost(self) -> float:
+        return 0.0
+
+
+class DashScopeProvider:
+    """DashScope: create a VC/VD voice once, then synthesize + fetch the URL."""
+
+    kind = "dashscope"
+
+    def __init__(self, endpoint: dict):
+        self.endpoint = endpoint
+
+    def create_voice(self, ref_audio_b64: str, ref_text: str, language: str = config.DEFAULT_LANGUAGE) -> dict:
+        if self.endpoint.get("voice_type") == "vd":
+            return dashscope.create_designed_voice(self.endpoint, DEFAULT_VOICE_PROMPT, DEFAULT_PREVIEW_TEXT, language)
+        return dashscope.create_clone_voice(self.endpoint, ref_audio_b64, ref_text, language)
+
+    def generate(
+        self,
+        voice: str,
+        text: str,
+        language: str = config.DEFAULT_LANGUAGE,
+        timeout: float = 90.0,
+    ) -> tuple[dict, bytes | None]:
+        return dashscope.measure_generation(self.endpoint, voice, text, language, timeout)
+
+    def request_cost(self, record: dict) -> float | None:
+        return record.get("characters", record["text_chars"]) * self.endpoint["usd_per_10k_chars"] / 10_000
+
+    def voice_cost(self) -> float:
+        return self.endpoint.get("usd_per_voice", 0.0)
+
+
+PROVIDERS = {"modal": ModalProvider, "dashscope": DashScopeProvider}
+
+
+def get_provider(endpoint: dict) -> ModalProvider | DashScopeProvider:
+    """Provider for an endpoint dict (its "provider" key, Modal by default)."""
+    kind = endpoint.get("provider", "modal")
+    if kind not in PROVIDERS:
+        raise KeyError(f"Unknown provider '{kind}' (known: {', '.join(PROVIDERS)})")
+    return PROVIDERS[kind](endpoint)
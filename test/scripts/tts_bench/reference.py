@@ -0,0 +1,125 @@
+"""
+Reference-audio variants for the clone voice prompt.
+
+The clone request uploads the whole reference WAV as base64. A variant keeps
+the same voice with less data: a shorter clip, a lower sample rate or a mono
+downmix. Variants are derived in memory from one decoded reference, so a
+sweep needs no extra files on disk.
+
+`preprocess` is the lossless-for-cloning counterpart used on the clone path:
+it trims leading/trailing silence (the transcript still matches), downmixes,
+resamples to the model's native 24kHz and optionally normalizes loudness.
+Results are cached in memory and under results/_cache/ by content hash, so a
+script pays the NumPy cost once per reference.
+"""
+
+import base64
+import hashlib
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from . import audio, config
+
+
+def load_samples(path: Path = config.REFERENCE_AUDIO) -> tuple[np.ndarray, int]:
+    """Decode a reference WAV into float samples and its sample rate."""
+    return audio.decode_wav(Path(path).read_bytes())
+
+
+def make_variant(
+    samples: np.ndarray,
+    rate: int,
+    seconds: float | None = None,
+    rate_to: int | None = None,
+    mono: bool = False,
+) -> bytes:
+    """
+    Build a reference variant as 16-bit WAV bytes: keep the first `seconds`,
+    downmix to mono, then resample to `rate_to` (each step optional).
+    """
+    if seconds is not None:
+        samples = audio.trim_duration(samples, rate, seconds)
+    if mono:
+        samples = audio.to_mono(samples)
+    if rate_to is not None and rate_to != rate:
+        samples = audio.resample(samples, rate, rate_to)
+        rate = rate_to
+    return audio.encode_wav(samples, rate)
+
+
+def describe(wav: bytes) -> dict:
+    """Duration, format and upload size of a reference WAV."""
+    header = audio.parse_wav_header(wav[:256])
+    return {
+        "seconds": audio.wav_duration(wav),
+        "rate": header["rate"],
+        "channels": header["channels"],
+        "wav_bytes": len(wav),
+        "payload_bytes": len(base64.b64encode(wav)),
+    }
+
+
+# =============================================================================
+# Preprocessing
+# =============================================================================
+
+CACHE_VERSION = 1  # Bump when preprocess() output changes
+TRIM_THRESHOLD_DB = -40.0
+TRIM_PAD_MS = 100.0
+
+_cache: dict[str, bytes] = {}
+_cache_lock = threading.Lock()
+
+
+def preprocess(
+    wav: bytes,
+    rate: int = audio.MODEL_SAMPLE_RATE,
+    trim: bool = True,
+    normalize: bool = False,
+    target_dbfs: float = -20.0,
+) -> bytes:
+    """
+    Shrink a reference WAV without changing what it says: trim silence,
+    downmix to mono, resample to `rate` (never up) and optionally normalize
+    loudness. Returns 16-bit mono WAV bytes.
+    """
+    samples, src_rate = audio.decode_wav(wav)
+    samples = audio.to_mono(samples)
+    if trim:
+        samples = audio.trim_silence(samples, src_rate, TRIM_THRESHOLD_DB, TRIM_PAD_MS)
+    if src_rate > rate:
+        samples = audio.resample(samples, src_rate, rate)
+        src_rate = rate
+    if normalize:
+        samples = audio.normalize_loudness(samples, src_rate, target_dbfs)
+    return audio.encode_wav(samples, src_rate)
+
+
+def cache_key(wav: bytes, **options) -> str:
+    """Content hash of the input WAV plus the preprocessing options."""
+    digest = hashlib.sha256(wav)
+    digest.update(repr((CACHE_VERSION, sorted(options.items()))).encode())
+    return digest.hexdigest()
+
+
+def preprocessed(wav: bytes, use_disk: bool = True, **options) -> bytes:
+    """preprocess() with an in-memory and on-disk cache keyed by content hash."""
+    key = cache_key(wav, **options)
+    with _cache_lock:
+        if key in _cache:
+            return _cache[key]
+
+    path = config.CACHE_DIR / "reference" / f"{key[:32]}.wav"
+    if use_disk and path.exists():
+        result = path.read_bytes()
+    else:
+        result = preprocess(wav, **options)
+        if use_disk:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(result)
+
+    with _cache_lock:
+        _cache[key] = result
+    return result
@@ -0,0 +1,215 @@
+"""
+Normalize the results/*.json files into flat per-request samples.
+
+Each benchmark script wrote its own layout (model_comparison_*, comparison_*,
+06b_a10g_benchmark_*, generation_benchmark_results, comparison_results). This
+module flattens all of them into sample dicts:
+
+    {
+        "deployment": "0.6B-A10G-SDPA",
+        "source": "model_comparison_20260202_004032.json",
+        "text_chars": 56,
+        "language": "English",
+        "max_new_tokens": 2048 | None,
+        "ref_seconds": 40.0,
+        "cold": False,
+        "time": 11.1,
+        "audio_size": 180348,     # successful runs only
+        "error": "Timeout",       # failed runs only
+    }
+
+Harness runs are written in the "tts_bench" layout (see `save_runs`), which is
+already flat. Runs against the local stand-in are marked "stand_in" and
+skipped, so emulated timings never feed back into the latency model.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from . import config
+
+# max_new_tokens each legacy script sent (None = server default)
+_LEGACY_MAX_NEW_TOKENS = {
+    "model_comparison": None,
+    "06b_a10g": None,
+    "comparison_results": 2048,
+    "generation_benchmark": 4096,
+    "comparison": 4096,
+}
+
+# Variant keys used before health info carried model/GPU details
+_LEGACY_VARIANTS = {
+    "SDPA": "1.7B-A10G-SDPA",
+    "FA2": "1.7B-A10G-FA2",
+}
+
+
+def deployment_key(health: dict | None, fallback: str | None = None) -> str | None:
+    """Derive a `{MODEL}-{GPU}-{ATTENTION}` key from a health response."""
+    if not health or health.get("status") == "error":
+        return _LEGACY_VARIANTS.get(fallback, fallback)
+
+    model_name = health.get("model", "")
+    model = next((m for m in ("1.7B", "0.6B") if m in model_name), None)
+
+    gpu_name = health.get("gpu", "")
+    if "T4" in gpu_name:
+        gpu = "T4"
+    elif "A10" in gpu_name:
+        gpu = "A10G"
+    else:
+        gpu = gpu_name.replace("NVIDIA ", "") or None
+
+    attention_name = health.get("attention_implementation", "").lower()
+    attention = "FA2" if "flash" in attention_name else "SDPA"
+
+    if model and gpu:
+        return f"{model}-{gpu}-{attention}"
+    return _LEGACY_VARIANTS.get(fallback, fallback)
+
+
+def _sample(deployment, source, run, text_chars, max_new_tokens, cold=False) -> dict:
+    sample = {
+        "deployment": deployment,
+        "source": source,
+        "text_chars": text_chars,
+        "language": run.get("language", config.DEFAULT_LANGUAGE),
+        "max_new_tokens": run.get("max_new_tokens", max_new_tokens),
+        "ref_seconds": run.get("ref_seconds") or config.DEFAULT_REF_SECONDS,
+        "cold": cold,
+        "time": run["time"],
+    }
+    if "error" in run:
+        sample["error"] = run["error"]
+    else:
+        sample["audio_size"] = run.get("audio_size")
+    return sample
+
+
+def _from_models(data: dict, source: str, tokens) -> list[dict]:
+    # model_comparison_*.json
+    samples = []
+    for key, model in data.get("models", {}).items():
+        deployment = deployment_key(model.get("health"), key)
+        cold = model.get("cold_start")
+        if cold and "time" in cold:
+            samples.append(_sample(deployment, source, cold, cold.get("text_length", 32), tokens, cold=True))
+        for test in model.get("tests", {}).values():
+            for run in test.get("runs", []):
+                samples.append(_sample(deployment, source, run, test["text_length"], tokens))
+    return samples
+
+
+def _from_single(data: dict, source: str, tokens) -> list[dict]:
+    # 06b_a10g_benchmark_*.json
+    deployment = deployment_key(data.get("health")) or f"0.6B-{data.get('gpu', 'A10G')}-SDPA"
+    samples = []
+    cold = data.get("cold_start")
+    if cold and "time" in cold:
+        samples.append(_sample(deployment, source, cold, 32, tokens, cold=True))
+    for test in data.get("tests", {}).values():
+        for run in test.get("runs", []):
+            samples.append(_sample(deployment, source, run, test["text_length"], tokens))
+    return samples
+
+
+def _from_variants(data: dict, source: str, tokens) -> list[dict]:
+    # comparison_results.json / generation_benchmark_results.json
+    samples = []
+    for key, variant in data.get("variants", {}).items():
+        deployment = deployment_key(variant.get("health"), key)
+        cold = variant.get("cold_start") or variant.get("warmup")
+        if cold and "time" in cold:
+            samples.append(_sample(deployment, source, cold, cold.get("text_length", 55), tokens, cold=True))
+        for group in variant.get("warm_runs", []) + variant.get("generations", []):
+            for run in group.get("runs", []):
+                samples.append(_sample(deployment, source, run, group["text_chars"], tokens))
+    return samples
+
+
+def _from_result_rows(data: dict, source: str, tokens) -> list[dict]:
+    # comparison_*.json from run_comparison.py
+    samples = []
+    for row in data.get("results", []):
+        for key, run in row.get("variants", {}).items():
+            if "time" in run:
+                deployment = _LEGACY_VARIANTS.get(key, key)
+                samples.append(_sample(deployment, source, run, row["text_chars"], tokens))
+    return samples
+
+
+def load_file(path: Path) -> list[dict]:
+    """Return the normalized samples in one results file (empty if unknown)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    source = path.name
+
+    if data.get("harness") == "tts_bench":
+        if data.get("stand_in"):
+            # Stand-in timings are emulated (and time-scaled): never train on them
+            return []
+        return [
+            _sample(
+                run.get("deployment", data["deployment"]),
+                source,
+                run,
+                run["text_chars"],
+                None,
+                run.get("cold", False),
+            )
+            for run in data.get("runs", [])
+            if "time" in run and "text_chars" in run
+        ]
+    if "models" in data:
+        return _from_models(data, source, _LEGACY_MAX_NEW_TOKENS["model_comparison"])
+    if "tests" in data:
+        return _from_single(data, source, _LEGACY_MAX_NEW_TOKENS["06b_a10g"])
+    if isinstance(data.get("variants"), dict):
+        kind = "generation_benchmark" if data.get("test_type") == "generation_focused" else "comparison_results"
+        return _from_variants(data, source, _LEGACY_MAX_NEW_TOKENS[kind])
+    if isinstance(data.get("results"), list):
+        return _from_result_rows(data, source, _LEGACY_MAX_NEW_TOKENS["comparison"])
+    # voice_design_verification_* and other non-clone layouts
+    return []
+
+
+def result_files(results_dir: Path = config.RESULTS_DIR) -> list[Path]:
+    """List results files in a stable order (oldest name first)."""
+    return sorted(p for p in results_dir.glob("*.json") if not p.name.startswith("_"))
+
+
+def load_samples(
+    paths: list[Path] | None = None,
+    include_errors: bool = False,
+) -> list[dict]:
+    """Load and flatten samples from `paths` (default: every results file)."""
+    samples = []
+    for path in paths if paths is not None else result_files():
+        samples.extend(load_file(path))
+    if not include_errors:
+        samples = [s for s in samples if "error" not in s]
+    return samples
+
+
+def save_runs(
+    prefix: str,
+    deployment: str,
+    runs: list[dict],
+    extra: dict | None = None,
+    results_dir: Path = config.RESULTS_DIR,
+) -> Path:
+    """Write harness runs as results/{prefix}_{timestamp}.json and return the path."""
+    results_dir.mkdir(parents=True, exist_ok=True)
+    path = results_dir / f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    data = {
+        "harness": "tts_bench",
+        "timestamp": datetime.now().isoformat(),
+        "deployment": deployment,
+        "runs": runs,
+    }
+    if extra:
+        data.update(extra)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    return path
@@ -0,0 +1,190 @@
+"""
+Runaway-generation detection for clone outputs.
+
+Autoregressive TTS occasionally fails to emit its stop token and keeps going
+until max_new_tokens: the tail loops the same syllables or drifts into
+silence/babble. That burns GPU time and returns audio far longer than the
+text warrants. Three signals are combined:
+
+- Duration ratio: output seconds / expected speech seconds for the text
+  (latency_model.speech_seconds). Runaways overshoot by a wide margin, and
+  an output at the max_new_tokens frame cap is suspicious on its own.
+- Silence: per-frame RMS energy; a long silent tail or a mostly silent clip.
+- Repetition: the autocorrelation of band-energy trajectories over time,
+  computed with one FFT per band. Speech decorrelates within a few hundred
+  milliseconds; a loop shows a strong peak at its period.
+
+`abort_guard` applies the duration check while a streamed response arrives,
+so the request can be cut off as soon as it overshoots.
+"""
+
+import numpy as np
+
+from . import audio, config
+from .latency_model import speech_seconds
+from .truncation import hits_cap
+
+# Defaults (tuned on the synthetic stand-in failures and test/outputs/*)
+DURATION_RATIO = 2.0  # Flag / abort when output exceeds expected by this factor
+SILENCE_DB = -45.0  # Frame is silent below this level relative to the peak frame
+SILENT_TAIL_SECONDS = 3.0
+SILENT_FRACTION = 0.5
+REPETITION_SCORE = 0.75  # Autocorrelation peak that counts as looping
+# Syllable rhythm correlates at its harmonics (every 0.25s at 4 Hz), which a
+# few seconds of speech cannot tell apart from a loop: lags start above the
+# first harmonics, must fit REPETITION_MIN_CYCLES times, and clips shorter
+# than REPETITION_MIN_SECONDS are left to the duration checks.
+REPETITION_MIN_PERIOD = 0.8  # Seconds
+REPETITION_MAX_PERIOD = 8.0
+REPETITION_MIN_CYCLES = 3
+REPETITION_MIN_SECONDS = 10.0
+
+_FRAME_MS = 40.0
+_HOP_MS = 20.0
+_BANDS = 16
+
+
+def expected_seconds(
+    text: str,
+    language: str = config.DEFAULT_LANGUAGE,
+    max_new_tokens: int | None = None,
+) -> float:
+    """Speech duration the text should produce."""
+    return speech_seconds(len(text), language, max_new_tokens)
+
+
+def silence_profile(samples: np.ndarray, rate: int) -> dict:
+    """Silent fraction and trailing-silence length, relative to the loudest frame."""
+    levels = audio.frame_rms_db(samples, rate, frame_ms=_HOP_MS)
+    if levels.size == 0:
+        return {"silent_fraction": 1.0, "silent_tail": 0.0}
+    silent = levels < (levels.max() + SILENCE_DB)
+    voiced = np.flatnonzero(~silent)
+    tail_frames = silent.size - 1 - voiced[-1] if voiced.size else silent.size
+    return {
+        "silent_fraction": float(silent.mean()),
+        "silent_tail": tail_frames * _HOP_MS / 1000.0,
+    }
+
+
+def repetition_score(samples: np.ndarray, rate: int) -> tuple[float, float | None]:
+    """
+    Strongest normalized autocorrelation of the band-energy trajectories at
+    lags between REPETITION_MIN_PERIOD and REPETITION_MAX_PERIOD.
+
+    Returns (score, period_seconds); score is ~0 for speech and near 1 for
+    an exact loop, and (0.0, None) for clips under REPETITION_MIN_SECONDS.
+    """
+    if audio.duration_seconds(samples, rate) < REPETITION_MIN_SECONDS:
+        return 0.0, None
+    bands = audio.band_energies(samples, rate, bands=_BANDS, frame_ms=_FRAME_MS, hop_ms=_HOP_MS)
+    n = bands.shape[0]
+    min_lag = int(REPETITION_MIN_PERIOD * 1000 / _HOP_MS)
+    max_lag = min(int(REPETITION_MAX_PERIOD * 1000 / _HOP_MS), n // REPETITION_MIN_CYCLES)
+    if max_lag <= min_lag:
+        return 0.0, None
+
+    centered = bands - bands.mean(axis=0)
+    energy = (centered**2).sum(axis=0)
+    active = energy > 1e-6
+    if not active.any():
+        return 0.0, None
+    centered = centered[:, active]
+
+    # Autocorrelation of every band at once via the Wiener-Khinchin theorem
+    size = 1 << int(np.ceil(np.log2(2 * n)))
+    spectrum = np.fft.rfft(centered, n=size, axis=0)
+    acf = np.fft.irfft(spectrum * np.conj(spectrum), n=size, axis=0)[:n]
+    # Unbiased normalization so long lags are not penalized for overlap
+    overlap = (n - np.arange(n))[:, None]
+    acf = (acf / overlap) / (acf[0] / n)
+    mean_acf = acf.mean(axis=1)
+
+    window = mean_acf[min_lag : max_lag + 1]
+    lag = int(np.argmax(window)) + min_lag
+    return float(mean_acf[lag]), lag * _HOP_MS / 1000.0
+
+
+def analyze(
+    samples: np.ndarray,
+    rate: int,
+    text: str,
+    language: str = config.DEFAULT_LANGUAGE,
+    max_new_tokens: int | None = None,
+    duration_ratio: float = DURATION_RATIO,
+) -> dict:
+    """Run every check on one decoded output and return the findings."""
+    duration = audio.duration_seconds(samples, rate)
+    expected = expected_seconds(text, language)
+    silence = silence_profile(samples, rate)
+    score, period = repetition_score(samples, rate)
+
+    reasons = []
+    ratio = duration / expected if expected > 0 else float("inf")
+    if ratio > duration_ratio:
+        reasons.append(f"duration {ratio:.1f}x expected")
+    if hits_cap(duration, max_new_tokens):
+        reasons.append("hit max_new_tokens cap")
+    if silence["silent_tail"] > SILENT_TAIL_SECONDS:
+        reasons.append(f"{silence['silent_tail']:.1f}s silent tail")
+    if silence["silent_fraction"] > SILENT_FRACTION:
+        reasons.append(f"{silence['silent_fraction']:.0%} silent")
+    if score > REPETITION_SCORE:
+        reasons.append(f"repeats every {period:.2f}s (score {score:.2f})")
+
+    return {
+        "duration": duration,
+        "expected": expected,
+        "duration_ratio": ratio,
+        "silent_fraction": silence["silent_fraction"],
+        "silent_tail": silence["silent_tail"],
+        "repetition_score": score,
+        "repetition_period": period,
+        "runaway": bool(reasons),
+        "reasons": reasons,
+    }
+
+
+def analyze_wav(wav: bytes, text: str, **kwargs) -> dict:
+    """Decode WAV bytes (complete or streamed) and analyze them."""
+    samples, rate = audio.decode_stream(wav)
+    return analyze(samples, rate, text, **kwargs)
+
+
+def flag_outliers(ratios: list[float], threshold: float = 3.5) -> list[bool]:
+    """
+    Robust z-score outliers (median/MAD) among duration ratios from one batch,
+    catching overshoots that stay under the fixed ratio threshold.
+    """
+    values = np.asarray(ratios, dtype=float)
+    if values.size < 3:
+        return [False] * values.size
+    median = np.median(values)
+    mad = np.median(np.abs(values - median)) or 1e-9
+    z = 0.6745 * (values - median) / mad
+    return (z > threshold).tolist()
+
+
+def abort_guard(
+    text: str,
+    language: str = config.DEFAULT_LANGUAGE,
+    ratio: float = DURATION_RATIO,
+    min_seconds: float = 5.0,
+):
+    """
+    Build an on_chunk callback for client.stream_clone that aborts once the
+    streamed audio exceeds `ratio` x the expected duration (and at least
+    `min_seconds`, so very short texts get some slack).
+    """
+    limit = max(expected_seconds(text, language) * ratio, min_seconds)
+
+    def on_chunk(body: bytearray, elapsed: float) -> bool:
+        header = audio.parse_wav_header(bytes(body[:256]))
+        if header is None:
+            return True
+        bytes_per_second = header["rate"] * header["channels"] * header["width"]
+        received = (len(body) - header["data_offset"]) / bytes_per_second
+        return received <= limit
+
+    on_chunk.limit_seconds = limit
+    return on_chunk
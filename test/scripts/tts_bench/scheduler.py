@@ -0,0 +1,187 @@
+"""
+Batch dispatcher that orders clone jobs by predicted duration.
+
+Submitting a mix of captions and paragraphs in submission order (FIFO) lets
+one long paragraph block every caption queued behind it. The "sejf" policy
+(shortest expected job first) dispatches the job with the smallest predicted
+duration from the latency model instead, and an aging term keeps long jobs
+from being starved when short jobs keep arriving:
+
+    score = predicted_seconds - aging * waited_seconds      (lowest first)
+
+aging=0 is pure SEJF; a large aging value degrades towards FIFO. `max_wait`
+is a hard bound: any job waiting longer than that goes first.
+
+Each worker is one in-flight slot bound to an endpoint, so an endpoint list
+with N entries (or one stand-in with N GPU slots and N workers) runs N jobs at
+a time.
+"""
+
+import math
+import threading
+import time
+
+from . import client, config
+from .latency_model import LatencyModel
+
+POLICIES = ("fifo", "sejf")
+
+
+class BatchScheduler:
+    """Dispatch a job set across worker slots under a scheduling policy."""
+
+    def __init__(
+        self,
+        workers: list[tuple[str, dict]],
+        model: LatencyModel,
+        ref_audio_b64: str,
+        ref_text: str,
+        policy: str = "sejf",
+        aging: float = 0.0,
+        max_wait: float | None = None,
+        time_scale: float = 1.0,
+    ):
+        """
+        workers: (deployment_key, endpoint) per in-flight slot. The key picks
+            the latency model used for that slot's predictions.
+        time_scale: wall seconds per model second (the stand-in's time scale),
+            so waits and arrivals are compared with predictions in one unit.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}' (expected one of {POLICIES})")
+        self.workers = workers
+        self.model = model
+        self.ref_audio_b64 = ref_audio_b64
+        self.ref_text = ref_text
+        self.policy = policy
+        self.aging = aging
+        self.max_wait = max_wait
+        self.time_scale = time_scale
+
+        self._lock = threading.Lock()
+        self._pending: list[tuple[int, dict]] = []
+        self._records: list[dict] = []
+        self._predictions: dict[tuple[str, str], float] = {}
+        self._start = 0.0
+
+    # ------------------------------------------------------------------
+    # Policy
+    # ------------------------------------------------------------------
+
+    def predicted(self, deployment: str, job: dict) -> float:
+        key = (deployment, job["id"])
+        if key not in self._predictions:
+            prediction = self.model.predict(
+                deployment,
+                len(job["text"]),
+                job.get("language", config.DEFAULT_LANGUAGE),
+                job.get("ref_seconds"),
+                job.get("max_new_tokens"),
+            )
+            self._predictions[key] = prediction[0] if prediction else math.inf
+        return self._predictions[key]
+
+    def _now(self) -> float:
+        """Model seconds since the batch started."""
+        return (time.perf_counter() - self._start) / self.time_scale
+
+    def _pick(self, deployment: str) -> tuple[int, dict] | None:
+        """Remove and return the next arrived job for a slot (lock held)."""
+        now = self._now()
+        arrived = [(i, job) for i, job in self._pending if job.get("arrival", 0.0) <= now]
+        if not arrived:
+            return None
+
+        if self.policy == "fifo":
+            choice = min(arrived, key=lambda item: item[0])
+        else:
+
+            def score(item):
+                i, job = item
+                waited = now - job.get("arrival", 0.0)
+                if self.max_wait is not None and waited >= self.max_wait:
+                    return (0, -waited, i)
+                return (1, self.predicted(deployment, job) - self.aging * waited, i)
+
+            choice = min(arrived, key=score)
+        self._pending.remove(choice)
+        return choice
+
+    def _next_arrival(self) -> float | None:
+        arrivals = [job.get("arrival", 0.0) for _, job in self._pending]
+        return min(arrivals) if arrivals else None
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    def _worker(self, slot: int, deployment: str, endpoint: dict):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    return
+                picked = self._pick(deployment)
+                next_arrival = self._next_arrival() if picked is None else None
+            if picked is None:
+                # Nothing has arrived yet for this slot: sleep until it does
+                delay = max((next_arrival or 0.0) - self._now(), 0.0) * self.time_scale
+                time.sleep(min(max(delay, 0.001), 0.25))
+                continue
+
+            index, job = picked
+            started = self._now()
+            payload = client.build_payload(
+                job["text"],
+                self.ref_audio_b64,
+                self.ref_text,
+                job.get("language", config.DEFAULT_LANGUAGE),
+                job.get("max_new_tokens"),
+            )
+            timeout = self.model.timeout_for(
+                deployment,
+                len(job["text"]),
+                job.get("language", config.DEFAULT_LANGUAGE),
+                job.get("ref_seconds"),
+                job.get("max_new_tokens"),
+            )
+            record, _ = client.measure_request(
+                endpoint,
+                payload,
+                timeout=max(timeout * self.time_scale, 5.0),
+                ref_seconds=job.get("ref_seconds"),
+            )
+            finished = self._now()
+            arrival = job.get("arrival", 0.0)
+            record.update(
+                {
+                    "id": job["id"],
+                    "deployment": deployment,
+                    "kind": job.get("kind"),
+                    "submit_index": index,
+                    "slot": slot,
+                    "predicted": self.predicted(deployment, job),
+                    "arrival": arrival,
+                    "started": started,
+                    "finished": finished,
+                    "wait": started - arrival,
+                    "completion": finished - arrival,
+                }
+            )
+            with self._lock:
+                self._records.append(record)
+
+    def run(self, jobs: list[dict]) -> list[dict]:
+        """Dispatch every job and return per-job records in finish order."""
+        self._pending = list(enumerate(jobs))
+        self._records = []
+        self._start = time.perf_counter()
+
+        threads = [
+            threading.Thread(target=self._worker, args=(slot, deployment, endpoint), daemon=True)
+            for slot, (deployment, endpoint) in enumerate(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sorted(self._records, key=lambda r: r["finished"])
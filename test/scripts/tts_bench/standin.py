@@ -0,0 +1,691 @@
+"""
+Local stand-in for the Modal clone/health endpoints.
+
+Serves the same contract as the Qwen3TTSService web endpoints:
+
+    GET  /health     -> {"status": "healthy", "model": ..., "gpu": ..., ...}
+    GET  /languages  -> {"languages": [...]}
+    POST /clone      -> audio/wav (JSON body: text, language, ref_audio_base64,
+                        ref_text, optional max_new_tokens)
+
+Beyond the Modal contract, /clone also accepts the JSON body gzip-compressed
+(Content-Encoding: gzip) and multipart/form-data with the reference as a
+binary "ref_audio" file part; /health lists them under "encodings". Clone
+responses carry X-Upload-Seconds, X-Decode-Seconds and X-Service-Seconds so
+benchmarks can split request overhead from generation. `uplink_mbps`
+emulates a bandwidth-limited upload (in real seconds, not time-scaled).
+Accepted connections are counted per protocol and reported under "stats" in
+/health; tts_bench.standin_h2 adds an HTTP/2 (h2c) listener.
+
+With `"stream": true` in the clone body the WAV is sent with chunked transfer
+encoding as it is "generated", and closing the connection stops generation
+(the GPU slot is released immediately), like a streaming deployment would.
+A request with `Accept: text/event-stream` gets the same audio as server-sent
+events instead:
+
+    event: start   data: {"sample_rate": 24000, "channels": 1, "sample_width": 2}
+    event: audio   data: {"seq": 0, "audio": "<base64 16-bit PCM>"}   (repeated)
+    event: done    data: {"chunks": N}
+
+The first chunk arrives after the prefill/voice-prompt share of the service
+time; the rest is paced evenly, `stream_chunk_seconds` of audio per chunk.
+`runaway_rate` injects the looping/babbling failure mode: the output runs to
+max_new_tokens as a repeated segment or trailing silence, and the GPU time
+grows with it.
+
+Outputs depend on the reference like a voice prompt would: the output is
+shaped by the reference's long-term spectrum (so a band-limited reference
+yields a band-limited voice), and prompt processing costs time proportional
+to the reference duration.
+
+Latency follows the fitted latency model of the deployment it emulates (or a
+built-in default when none is fitted), scaled by `time_scale` so benchmarks
+can replay hours of traffic in minutes. The real time spent synthesizing the
+output is taken out of the emulated wait, so it is not divided by
+`time_scale` into emulated seconds. Generation is serialized through
+`gpu_slots` slots, like a single Modal container, so head-of-line blocking
+and queueing show up the same way they do against the real endpoints.
+
+Run standalone:
+    uv run --with numpy python -m tts_bench.standin --port 8765 --time-scale 0.05
+
+Or in-process from a benchmark:
+    server, endpoint = start_standin(time_scale=0.05)
+"""
+
+import argparse
+import base64
+import binascii
+import gzip
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from . import audio, config
+from .latency_model import LatencyModel, speech_seconds
+
+SUPPORTED_LANGUAGES = [
+    "Auto",
+    "Chinese",
+    "English",
+    "Japanese",
+    "Korean",
+    "German",
+    "French",
+    "Russian",
+    "Portuguese",
+    "Spanish",
+    "Italian",
+]
+
+# Used when the emulated deployment has no fitted model: 0.6B on A10G
+DEFAULT_INTERCEPT = 5.4
+DEFAULT_SECONDS_PER_SPEECH_SECOND = 1.53
+DEFAULT_RELATIVE_STD = 0.05
+DEFAULT_COLD_START = 29.0
+DEFAULT_MAX_NEW_TOKENS = 2048  # Server-side default when the request omits it
+PROMPT_SECONDS_PER_REF_SECOND = 0.02  # Voice-prompt extraction cost
+OUTPUT_CACHE_SIZE = 32  # Built output waveforms kept per server (oldest dropped first)
+ENCODINGS = ["json", "gzip", "multipart"]
+_DISPOSITION_NAME = re.compile(rb'name="([^"]*)"')
+_ENVELOPE_FFT = 2048
+
+
+class StandinServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the stand-in's emulation settings."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        deployment: str = config.DEFAULT_DEPLOYMENT,
+        time_scale: float = 1.0,
+        gpu_slots: int = 1,
+        cold_start: bool = False,
+        seed: int = 0,
+        model: LatencyModel | None = None,
+        runaway_rate: float = 0.0,
+        stream_chunk_seconds: float = 0.5,
+        uplink_mbps: float | None = None,
+    ):
+        super().__init__(address, StandinHandler)
+        self.deployment = deployment
+        self.time_scale = time_scale
+        self.gpu = threading.Semaphore(gpu_slots)
+        self.cold = cold_start
+        self.cold_lock = threading.Lock()
+        self.model = model if model is not None else LatencyModel.load()
+        self.rng = np.random.default_rng(seed)
+        self.rng_lock = threading.Lock()
+        self.runaway_rate = runaway_rate
+        self.stream_chunk_seconds = stream_chunk_seconds
+        self.uplink_mbps = uplink_mbps
+
+        self.prompts: dict[str, dict] = {}
+        self.prompts_lock = threading.Lock()
+        self.outputs: dict[tuple, np.ndarray] = {}
+        self.outputs_lock = threading.Lock()
+
+        # Counters (read by benchmarks after a run)
+        self.stats_lock = threading.Lock()
+        self.request_count = 0
+        self.runaway_count = 0
+        self.aborted_count = 0
+        self.gpu_seconds = 0.0  # Emulated (unscaled) generation seconds spent
+        self.connection_count = 0  # HTTP/1.1 connections accepted
+        self.h2_connection_count = 0  # HTTP/2 connections accepted (standin_h2)
+
+    def count(self, **increments):
+        with self.stats_lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    # ------------------------------------------------------------------
+    # Emulation
+    # ------------------------------------------------------------------
+
+    def service_time(
+        self,
+        text_chars: int,
+        language: str,
+        ref_seconds: float | None,
+        max_new_tokens: int | None,
+    ) -> float:
+        """Draw an (unscaled) generation time for one request."""
+        prediction = self.model.predict(self.deployment, text_chars, language, ref_seconds, max_new_tokens)
+        if prediction:
+            mean, std = prediction
+            rel_std = std / mean
+        else:
+            spoken = speech_seconds(text_chars, language, max_new_tokens)
+            mean = DEFAULT_INTERCEPT + DEFAULT_SECONDS_PER_SPEECH_SECOND * spoken
+            rel_std = DEFAULT_RELATIVE_STD
+        with self.rng_lock:
+            factor = self.rng.lognormal(-0.5 * rel_std**2, rel_std)
+        return mean * factor
+
+    def voice_prompt(self, ref_wav: bytes) -> dict:
+        """
+        Decode a reference once (cached by content hash) into its duration and
+        long-term magnitude spectrum.
+        """
+        key = hashlib.sha256(ref_wav).hexdigest()
+        with self.prompts_lock:
+            if key in self.prompts:
+                return self.prompts[key]
+        samples, rate = audio.decode_wav(ref_wav)
+        mono = audio.to_mono(samples)
+        frames = audio.frame_signal(mono, _ENVELOPE_FFT, _ENVELOPE_FFT // 2)
+        envelope = np.abs(np.fft.rfft(frames * np.hanning(_ENVELOPE_FFT), axis=1)).mean(axis=0)
+        prompt = {
+            "key": key,
+            "seconds": audio.duration_seconds(samples, rate),
+            "freqs": np.fft.rfftfreq(_ENVELOPE_FFT, 1.0 / rate),
+            "envelope": envelope,
+        }
+        with self.prompts_lock:
+            self.prompts[key] = prompt
+        return prompt
+
+    def apply_voice(self, samples: np.ndarray, prompt: dict) -> np.ndarray:
+        """Shape output samples by the reference's long-term spectrum."""
+        rate = audio.MODEL_SAMPLE_RATE
+        spectrum = np.fft.rfft(samples)
+        freqs = np.fft.rfftfreq(samples.shape[0], 1.0 / rate)
+        # Beyond the reference's Nyquist frequency there is no voice energy
+        gain = np.interp(freqs, prompt["freqs"], prompt["envelope"], right=0.0)
+        speech_band = (prompt["freqs"] > 100) & (prompt["freqs"] < 4000)
+        gain = np.sqrt(gain / (prompt["envelope"][speech_band].mean() or 1.0))
+        shaped = np.fft.irfft(spectrum * gain, n=samples.shape[0])
+        peak = float(np.abs(shaped).max()) or 1.0
+        return (shaped * (0.6 / peak)).astype(np.float32)
+
+    def plan_output(
+        self,
+        text: str,
+        language: str,
+        prompt: dict,
+        max_new_tokens: int | None,
+    ) -> tuple[np.ndarray, float, str | None]:
+        """
+        Decide what one request produces: (samples, service_seconds, failure).
+
+        failure is None for a normal generation, or "loop"/"silence" for an
+        injected runaway that runs to the max_new_tokens cap.
+        """
+        expected = speech_seconds(len(text), language, max_new_tokens)
+        # Recorded runs all used one reference, so the model cannot separate its
+        # cost; predict at the default and add the prompt cost explicitly.
+        service = self.service_time(len(text), language, None, max_new_tokens)
+        service += PROMPT_SECONDS_PER_REF_SECOND * prompt["seconds"]
+        with self.rng_lock:
+            runaway = self.rng.random() < self.runaway_rate
+            kind = "loop" if self.rng.random() < 0.5 else "silence"
+
+        if not runaway:
+            return self.build_output(len(text), expected, prompt, None, None), service, None
+
+        cap_seconds = (max_new_tokens or DEFAULT_MAX_NEW_TOKENS) / 12.0
+        samples = self.build_output(len(text), expected, prompt, kind, cap_seconds)
+        # Generation time grows with the number of tokens actually produced
+        service *= cap_seconds / max(expected, 0.1)
+        return samples, service, kind
+
+    def build_output(
+        self,
+        seed: int,
+        expected: float,
+        prompt: dict,
+        failure: str | None,
+        cap_seconds: float | None,
+    ) -> np.ndarray:
+        """
+        The output waveform for one plan: `expected` seconds of speech, or for
+        a "loop"/"silence" failure that speech run on to `cap_seconds`.
+
+        Building it costs real CPU (about 0.8s for long.txt), so outputs are
+        cached: a repeated text is sent without rebuilding it.
+        """
+        key = (prompt["key"], seed, expected, failure, cap_seconds)
+        with self.outputs_lock:
+            if key in self.outputs:
+                return self.outputs[key]
+        if failure is None:
+            samples = self.apply_voice(audio.synth_speech(expected, seed=seed), prompt)
+        else:
+            n = int(cap_seconds * audio.MODEL_SAMPLE_RATE)
+            lead = audio.synth_speech(min(expected, cap_seconds), seed=seed)
+            if failure == "loop":
+                segment = audio.synth_speech(1.2, seed=seed + 1)
+                tail = np.tile(segment, math.ceil(max(n - lead.shape[0], 0) / segment.shape[0]) + 1)
+            else:
+                tail = np.zeros(n, dtype=np.float32)
+            samples = self.apply_voice(np.concatenate([lead, tail])[:n], prompt)
+        with self.outputs_lock:
+            self.outputs[key] = samples
+            while len(self.outputs) > OUTPUT_CACHE_SIZE:
+                del self.outputs[next(iter(self.outputs))]
+        return samples
+
+    def prepare(
+        self,
+        texts: list[str],
+        ref_wav: bytes,
+        language: str = config.DEFAULT_LANGUAGE,
+        max_new_tokens: int | None = None,
+    ):
+        """
+        Build the clean outputs for `texts` ahead of time, so even the first
+        request for each is sent without waiting on the stand-in's own CPU.
+        """
+        prompt = self.voice_prompt(ref_wav)
+        for text in texts[-OUTPUT_CACHE_SIZE:]:
+            expected = speech_seconds(len(text), language, max_new_tokens)
+            self.build_output(len(text), expected, prompt, None, None)
+
+    def startup_time(self, language: str, prompt: dict) -> float:
+        """Emulated seconds before the first audio chunk: prefill + voice prompt."""
+        prediction = self.model.predict(self.deployment, 0, language)
+        prefill = prediction[0] if prediction else DEFAULT_INTERCEPT
+        return prefill + PROMPT_SECONDS_PER_REF_SECOND * prompt["seconds"]
+
+    def cold_start_time(self) -> float:
+        """Return the cold-start delay for this request (0 once warm)."""
+        with self.cold_lock:
+            if not self.cold:
+                return 0.0
+            self.cold = False
+        cold = self.model.cold_start(self.deployment)
+        return cold[0] if cold else DEFAULT_COLD_START
+
+    def sleep(self, seconds: float, since: float | None = None):
+        """
+        Wait `seconds` emulated seconds. With `since` (a time.perf_counter()
+        reading), wait until that long after it instead, so the stand-in's own
+        work since then (building the output) is not counted on top.
+        """
+        elapsed = time.perf_counter() - since if since is not None else 0.0
+        time.sleep(max(seconds * self.time_scale - elapsed, 0.0))
+
+    def health(self) -> dict:
+        info = config.DEPLOYMENTS.get(self.deployment, {})
+        return {
+            "status": "healthy",
+            "model": f"Qwen3-TTS-12Hz-{info.get('model', '0.6B')}-Base",
+            "gpu": info.get("gpu", "stand-in"),
+            "attention_implementation": "flash_attention_2" if info.get("attention") == "FA2" else "sdpa",
+            "supported_languages": SUPPORTED_LANGUAGES,
+            "stand_in": True,
+            "emulates": self.deployment,
+            "time_scale": self.time_scale,
+            "encodings": ENCODINGS,
+            "stats": {
+                "requests": self.request_count,
+                "connections": self.connection_count,
+                "h2_connections": self.h2_connection_count,
+            },
+        }
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the Modal endpoint contract."""
+
+    server: StandinServer
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.count(connection_count=1)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_error_detail(self, status: int, detail: str):
+        self.send_json(status, {"detail": detail})
+
+    def send_timing(self):
+        for header, value in getattr(self, "timing", {}).items():
+            self.send_header(header, f"{value:.6f}")
+
+    def send_wav(self, wav: bytes):
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/wav")
+        self.send_header("Content-Length", str(len(wav)))
+        self.send_timing()
+        self.end_headers()
+        self.wfile.write(wav)
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def read_json(self) -> dict | None:
+        try:
+            return json.loads(self.read_body() or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self.send_error_detail(400, "Invalid JSON body")
+            return None
+
+    def read_clone_payload(self) -> dict | None:
+        """
+        Read a clone body in any supported encoding. Multipart bodies yield
+        the reference as raw bytes under "ref_audio".
+        """
+        start = time.perf_counter()
+        body = self.read_body()
+        upload = time.perf_counter() - start
+        if self.server.uplink_mbps:
+            emulated = len(body) * 8 / (self.server.uplink_mbps * 1e6)
+            time.sleep(max(emulated - upload, 0.0))
+            upload = max(emulated, upload)
+
+        start = time.perf_counter()
+        content_type = self.headers.get("Content-Type", "application/json")
+        try:
+            if self.headers.get("Content-Encoding", "").lower() == "gzip":
+                body = gzip.decompress(body)
+            if content_type.startswith("multipart/form-data"):
+                payload = parse_multipart(body, content_type)
+            else:
+                payload = json.loads(body or b"{}")
+        except (OSError, EOFError, ValueError, UnicodeDecodeError):
+            self.send_error_detail(400, "Invalid request body")
+            return None
+        self.timing = {"X-Upload-Seconds": upload, "X-Decode-Seconds": time.perf_counter() - start}
+        return payload
+
+    # ------------------------------------------------------------------
+    # Routes
+    # ------------------------------------------------------------------
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/health":
+            self.send_json(200, self.server.health())
+        elif path == "/languages":
+            self.send_json(200, {"languages": SUPPORTED_LANGUAGES})
+        else:
+            self.send_error_detail(404, "Not Found")
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/clone":
+            payload = self.read_clone_payload()
+            if payload is not None:
+                self.handle_clone(payload)
+        else:
+            self.read_body()
+            self.send_error_detail(404, "Not Found")
+
+    def handle_clone(self, payload: dict):
+        text = payload.get("text")
+        if not text:
+            self.send_error_detail(400, "text is required")
+            return
+        if not payload.get("ref_text"):
+            self.send_error_detail(400, "ref_text is required")
+            return
+        try:
+            start = time.perf_counter()
+            ref_wav = payload.get("ref_audio")
+            if ref_wav is None:
+                ref_wav = base64.b64decode(payload.get("ref_audio_base64") or "", validate=True)
+            self.timing["X-Decode-Seconds"] += time.perf_counter() - start
+            prompt = self.server.voice_prompt(ref_wav)
+        except (binascii.Error, wave.Error, EOFError, ValueError):
+            self.send_error_detail(400, "ref_audio_base64 must be a base64-encoded WAV")
+            return
+
+        language = payload.get("language", config.DEFAULT_LANGUAGE)
+        max_new_tokens = payload.get("max_new_tokens")
+        self.generate(text, language, prompt, max_new_tokens, stream=bool(payload.get("stream")))
+
+    def generate(
+        self,
+        text: str,
+        language: str,
+        prompt: dict,
+        max_new_tokens: int | None,
+        stream: bool = False,
+    ):
+        """Hold a GPU slot for the emulated service time and send a WAV."""
+        server = self.server
+        with server.gpu:
+            server.count(request_count=1)
+            server.sleep(server.cold_start_time())
+            start = time.perf_counter()
+            samples, service, failure = server.plan_output(text, language, prompt, max_new_tokens)
+            self.timing["X-Service-Seconds"] = service
+            if failure:
+                server.count(runaway_count=1)
+            if stream:
+                startup = min(server.startup_time(language, prompt), 0.5 * service)
+                sse = "text/event-stream" in self.headers.get("Accept", "")
+                self.stream_audio(samples, service, startup, sse=sse, start=start)
+                return
+            wav = audio.encode_wav(samples, audio.MODEL_SAMPLE_RATE)
+            server.sleep(service, since=start)
+            server.count(gpu_seconds=service)
+        self.send_wav(wav)
+
+    def write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def write_event(self, event: str, data: dict):
+        self.write_chunk(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+
+    def stream_audio(
+        self,
+        samples: np.ndarray,
+        service: float,
+        startup: float,
+        sse: bool = False,
+        start: float | None = None,
+    ):
+        """
+        Send audio in chunks paced over `service` seconds (GPU slot held):
+        `startup` seconds before the first chunk, the rest evenly spread.
+        Chunked WAV by default, server-sent events with sse=True. A client
+        disconnect aborts generation and frees the slot. The schedule runs
+        from `start` (time.perf_counter(), default now), so time already
+        spent building `samples` counts towards it.
+        """
+        server = self.server
+        rate = audio.MODEL_SAMPLE_RATE
+        step = max(int(server.stream_chunk_seconds * rate), 1)
+        chunks = max(math.ceil(samples.shape[0] / step), 1)
+        per_chunk = (service - startup) / chunks
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+        start = time.perf_counter() if start is None else start
+
+        self.send_response(200)
+        if sse:
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+        else:
+            self.send_header("Content-Type", "audio/wav")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_timing()
+        self.end_headers()
+        spent = 0.0
+        try:
+            if sse:
+                self.write_event("start", {"sample_rate": rate, "channels": 1, "sample_width": 2})
+            else:
+                self.write_chunk(audio.wav_header(rate))
+            spent += startup
+            server.sleep(spent, since=start)
+            for i in range(chunks):
+                spent += per_chunk
+                server.sleep(spent, since=start)
+                data = pcm[i * step : (i + 1) * step].tobytes()
+                if sse:
+                    self.write_event("audio", {"seq": i, "audio": base64.b64encode(data).decode("ascii")})
+                else:
+                    self.write_chunk(data)
+            if sse:
+                self.write_event("done", {"chunks": chunks})
+            self.write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            server.count(aborted_count=1)
+            self.close_connection = True
+        finally:
+            server.count(gpu_seconds=spent)
+
+
+def parse_multipart(body: bytes, content_type: str) -> dict:
+    """
+    Parse a multipart/form-data clone body into a payload dict. File parts
+    stay bytes; max_new_tokens and stream are converted from their text form.
+    """
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not match:
+        raise ValueError("multipart body without boundary")
+    delimiter = b"--" + match.group(1).encode()
+    payload = {}
+    for part in body.split(delimiter)[1:-1]:
+        head, _, data = part.partition(b"\r\n\r\n")
+        name = _DISPOSITION_NAME.search(head)
+        if not name:
+            continue
+        data = data[:-2] if data.endswith(b"\r\n") else data
+        key = name.group(1).decode()
+        payload[key] = data if b"filename=" in head else data.decode("utf-8")
+    if "max_new_tokens" in payload:
+        payload["max_new_tokens"] = int(payload["max_new_tokens"])
+    if "stream" in payload:
+        payload["stream"] = payload["stream"].lower() in ("true", "1")
+    return payload
+
+
+def start_standin(
+    port: int = 0,
+    host: str = "127.0.0.1",
+    **kwargs,
+) -> tuple[StandinServer, dict]:
+    """
+    Start a stand-in server on a background thread.
+
+    Returns (server, endpoint) where endpoint has the same "clone"/"health"
+    keys as config.DEPLOYMENTS entries. Call server.shutdown() when done.
+    """
+    server = StandinServer((host, port), **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://{host}:{server.server_address[1]}"
+    endpoint = {
+        "name": f"Local stand-in ({server.deployment}, x{server.time_scale:g})",
+        "clone": f"{base}/clone",
+        "health": f"{base}/health",
+        "languages": f"{base}/languages",
+        "base_url": base,
+        "encodings": list(ENCODINGS),
+    }
+    return server, endpoint
+
+
+def add_standin_arguments(parser: argparse.ArgumentParser):
+    """Add the shared stand-in options to a benchmark's argument parser."""
+    group = parser.add_argument_group("local stand-in")
+    group.add_argument(
+        "--emulate",
+        default=config.DEFAULT_DEPLOYMENT,
+        help=f"Deployment whose latency the stand-in emulates (default: {config.DEFAULT_DEPLOYMENT})",
+    )
+    group.add_argument(
+        "--time-scale",
+        type=float,
+        default=0.05,
+        help="Multiply emulated latencies by this factor (default: 0.05)",
+    )
+    group.add_argument(
+        "--gpu-slots",
+        type=int,
+        default=1,
+        help="Concurrent generations the stand-in allows (default: 1)",
+    )
+    group.add_argument("--seed", type=int, default=0, help="Stand-in random seed")
+    group.add_argument(
+        "--runaway-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests that loop/babble until max_new_tokens (default: 0)",
+    )
+    group.add_argument(
+        "--stream-fps",
+        type=float,
+        default=2.0,
+        help="Audio chunks per second of audio when streaming (default: 2, i.e. 0.5s chunks)",
+    )
+    group.add_argument(
+        "--uplink-mbps",
+        type=float,
+        default=None,
+        help="Emulate a client upload bandwidth in Mbit/s (default: unlimited)",
+    )
+
+
+def standin_kwargs(args: argparse.Namespace) -> dict:
+    """Map parsed stand-in options to start_standin() keyword arguments."""
+    return {
+        "deployment": args.emulate,
+        "time_scale": args.time_scale,
+        "gpu_slots": args.gpu_slots,
+        "seed": args.seed,
+        "runaway_rate": args.runaway_rate,
+        "uplink_mbps": args.uplink_mbps,
+        "stream_chunk_seconds": 1.0 / args.stream_fps,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Modal TTS endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=config.STANDIN_PORT)
+    parser.add_argument("--cold-start", action="store_true", help="Emulate a cold start on the first request")
+    parser.add_argument("--http2-port", type=int, default=None, help="Also serve HTTP/2 (h2c) on this port")
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    server = StandinServer(
+        (args.host, args.port),
+        cold_start=args.cold_start,
+        **standin_kwargs(args),
+    )
+    print(f"Stand-in for {args.emulate} on http://{args.host}:{args.port} (time scale x{args.time_scale:g})")
+    if args.http2_port is not None:
+        from .standin_h2 import start_h2_frontend  # Needs the h2 package
+
+        start_h2_frontend(server, port=args.http2_port, host=args.host)
+        print(f"HTTP/2 (h2c) on http://{args.host}:{args.http2_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
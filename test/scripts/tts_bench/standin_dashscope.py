@@ -0,0 +1,589 @@
+"""
+Local stand-in for the Qwen cloud (DashScope) TTS APIs.
+
+Serves the contract tts_bench.dashscope (and the API Worker) calls:
+
+    POST /api/v1/services/audio/tts/customization
+         qwen-voice-enrollment create: decode the data-URL reference, return
+         output.voice / output.target_model
+         qwen-voice-design create: also return a base64 WAV preview_audio
+    POST /api/v1/services/aigc/multimodal-generation/generation
+         synthesize with a created voice, return output.audio.url
+    GET  /audio/<id>.wav   the generated audio behind that URL (Range: bytes=N-)
+    POST /compatible-mode/v1/chat/completions
+         qwen3-asr-flash transcription of a data-URL clip (OpenAI-compatible)
+    GET  /health           stand-in info and counters
+
+Requests need `Authorization: Bearer <api_key>`. Errors use DashScope's
+{"request_id", "code", "message"} body: a voice whose target_model differs
+from the synthesis model, an unknown voice or a text over the 600 character
+cap are rejected with 400 like the real service.
+
+Emulation reuses StandinServer: outputs are shaped by the enrolled
+reference, and generation runs through `gpu_slots` concurrent slots
+(default 8; the cloud is not one container). No DashScope runs are
+recorded yet, so enrollment, design, synthesis, audio-fetch and ASR times
+are rough placeholders below; once real runs exist fit_latency_model.py fits
+the "qwen-cloud-vc" key and synthesis follows that fit instead.
+
+The stand-in cannot recognize speech: the checked-in reference clip
+transcribes to its audio_text.txt, and any other clip to that transcript's
+words cut to the clip's duration at the reference's speaking rate.
+
+Every synthesis and audio fetch is appended to `calls` with its wall-clock
+start and end (synthesis from when it gets a slot), the text or audio id,
+so a benchmark can tell which provider work ran when. With `adopt_voices`
+an unknown voice id is synthesized with the checked-in reference's prompt
+instead of rejected, for a Worker whose voices were enrolled against the
+real service (`wrangler dev` pointed here with DASHSCOPE_BASE_URL).
+
+Run standalone:
+    uv run --with numpy python -m tts_bench.standin_dashscope --port 8767 --time-scale 0.05
+
+Or in-process from a benchmark:
+    server, endpoint = start_dashscope_standin(time_scale=0.05)
+"""
+
+import argparse
+import base64
+import binascii
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from . import audio, config
+from .latency_model import speech_seconds
+from .standin import StandinHandler, StandinServer, add_standin_arguments, standin_kwargs
+
+STANDIN_API_KEY = "sk-standin"
+DEFAULT_DEPLOYMENT = "qwen-cloud-vc"
+DEFAULT_GPU_SLOTS = 8
+
+# Placeholder emulated latencies (seconds) until real DashScope runs are fitted
+ENROLL_SECONDS = 4.0
+ENROLL_SECONDS_PER_REF_SECOND = 0.05
+DESIGN_SECONDS = 6.0
+SYNTH_INTERCEPT = 1.5
+SYNTH_SECONDS_PER_SPEECH_SECOND = 0.35
+SYNTH_RELATIVE_STD = 0.15
+FETCH_SECONDS = 0.25  # Object-storage first byte for output.audio.url
+FETCH_CHUNKS = 8  # Audio downloads are paced in this many writes
+AUDIO_URL_TTL = 24 * 3600
+ASR_INTERCEPT = 0.6
+ASR_SECONDS_PER_AUDIO_SECOND = 0.04
+ASR_RELATIVE_STD = 0.2
+DESIGN_SEED_SECONDS = 8.0  # Synthetic "reference" a designed voice is built from
+_RANGE = re.compile(r"bytes=(\d+)-")
+# Customization language tags (docs/qwen-api.md §7.1) back to language names
+_TAG_LANGUAGES = {
+    "zh": "Chinese",
+    "en": "English",
+    "de": "German",
+    "it": "Italian",
+    "pt": "Portuguese",
+    "es": "Spanish",
+    "ja": "Japanese",
+    "ko": "Korean",
+    "fr": "French",
+    "ru": "Russian",
+}
+
+
+class DashScopeStandinServer(StandinServer):
+    """StandinServer that speaks the DashScope customization/synthesis contract."""
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        deployment: str = DEFAULT_DEPLOYMENT,
+        api_key: str = STANDIN_API_KEY,
+        download_mbps: float | None = None,
+        fetch_failure_rate: float = 0.0,
+        adopt_voices: bool = False,
+        **kwargs,
+    ):
+        kwargs.setdefault("gpu_slots", DEFAULT_GPU_SLOTS)
+        super().__init__(address, deployment=deployment, **kwargs)
+        self.RequestHandlerClass = DashScopeHandler
+        self.api_key = api_key
+        self.download_mbps = download_mbps
+        self.fetch_failure_rate = fetch_failure_rate
+        self.adopt_voices = adopt_voices
+        self.voices: dict[str, dict] = {}
+        self.calls: list[dict] = []
+        self.outputs: dict[str, bytes] = {}
+        self.store_lock = threading.Lock()
+        self.voice_count = 0
+        self.fetch_count = 0
+        self.fetch_failure_count = 0
+        self.asr_count = 0
+        self.transcripts: dict[str, str] = {}
+        self.transcript_words: list[str] = []
+        self.words_per_second = 2.5
+        if config.REFERENCE_AUDIO.exists() and config.REFERENCE_TEXT.exists():
+            ref_wav = config.REFERENCE_AUDIO.read_bytes()
+            ref_text = config.REFERENCE_TEXT.read_text(encoding="utf-8").strip()
+            self.transcripts[hashlib.sha256(ref_wav).hexdigest()] = ref_text
+            self.transcript_words = ref_text.split()
+            self.words_per_second = len(self.transcript_words) / max(audio.wav_duration(ref_wav), 1e-6)
+
+    def service_time(
+        self,
+        text_chars: int,
+        language: str,
+        ref_seconds: float | None,
+        max_new_tokens: int | None,
+    ) -> float:
+        """Fitted time for this key if there is one, else the placeholder model."""
+        prediction = self.model.predict(self.deployment, text_chars, language, pooled=False)
+        if prediction:
+            mean, std = prediction
+            rel_std = std / mean
+        else:
+            mean = SYNTH_INTERCEPT + SYNTH_SECONDS_PER_SPEECH_SECOND * speech_seconds(text_chars, language)
+            rel_std = SYNTH_RELATIVE_STD
+        with self.rng_lock:
+            factor = self.rng.lognormal(-0.5 * rel_std**2, rel_std)
+        return mean * factor
+
+    def add_voice(self, kind: str, name: str, target_model: str, prompt: dict) -> str:
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        voice = f"qwen-tts-{kind}-{name}-voice-{stamp}-{uuid.uuid4().hex[:4]}"
+        with self.store_lock:
+            self.voices[voice] = {"kind": kind, "target_model": target_model, "prompt": prompt}
+        self.count(voice_count=1)
+        return voice
+
+    def adopt_voice(self, voice_id: str, target_model: str) -> dict:
+        """Register an unknown voice id with the reference clip's prompt."""
+        prompt = self.voice_prompt(config.REFERENCE_AUDIO.read_bytes())
+        with self.store_lock:
+            return self.voices.setdefault(voice_id, {"kind": "adopted", "target_model": target_model, "prompt": prompt})
+
+    def log_call(self, kind: str, start: float, **fields):
+        """Append a synthesis or fetch to `calls` (wall-clock start, end now)."""
+        with self.store_lock:
+            self.calls.append({"kind": kind, "start": start, "end": time.time(), **fields})
+
+    def store_output(self, wav: bytes) -> str:
+        audio_id = f"audio_{uuid.uuid4()}"
+        with self.store_lock:
+            self.outputs[audio_id] = wav
+        return audio_id
+
+    def transcript(self, wav: bytes, seconds: float) -> str:
+        """Known transcript for this clip, else reference words for its duration."""
+        known = self.transcripts.get(hashlib.sha256(wav).hexdigest())
+        if known is not None:
+            return known
+        words = self.transcript_words or ["speech"]
+        count = max(1, round(seconds * self.words_per_second))
+        return " ".join(words[i % len(words)] for i in range(count))
+
+    def asr_time(self, seconds: float) -> float:
+        with self.rng_lock:
+            factor = self.rng.lognormal(-0.5 * ASR_RELATIVE_STD**2, ASR_RELATIVE_STD)
+        return (ASR_INTERCEPT + ASR_SECONDS_PER_AUDIO_SECOND * seconds) * factor
+
+    def health(self) -> dict:
+        return {
+            "status": "healthy",
+            "stand_in": True,
+            "provider": "dashscope",
+            "emulates": self.deployment,
+            "time_scale": self.time_scale,
+            "stats": {
+                "requests": self.request_count,
+                "voices": self.voice_count,
+                "fetches": self.fetch_count,
+                "fetch_failures": self.fetch_failure_count,
+                "transcriptions": self.asr_count,
+                "connections": self.connection_count,
+            },
+        }
+
+
+class DashScopeHandler(StandinHandler):
+    """Request handler implementing the DashScope TTS contract."""
+
+    server: DashScopeStandinServer
+
+    def send_api_error(self, status: int, code: str, message: str):
+        self.send_json(status, {"request_id": str(uuid.uuid4()), "code": code, "message": message})
+
+    def send_compatible_error(self, status: int, code: str, message: str):
+        """OpenAI-compatible error body, as the ASR endpoint returns."""
+        error = {"message": message, "type": "invalid_request_error", "param": None, "code": code}
+        self.send_json(status, {"error": error, "request_id": str(uuid.uuid4())})
+
+    def authorized(self) -> bool:
+        if self.headers.get("Authorization") == f"Bearer {self.server.api_key}":
+            return True
+        self.send_api_error(401, "InvalidApiKey", "Invalid API-key provided.")
+        return False
+
+    # ------------------------------------------------------------------
+    # Routes
+    # ------------------------------------------------------------------
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/health":
+            self.send_json(200, self.server.health())
+        elif path.startswith("/audio/") and path.endswith(".wav"):
+            self.handle_fetch(path[len("/audio/") : -len(".wav")])
+        else:
+            self.send_api_error(404, "NotFound", "Not Found")
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        body = self.read_body()
+        if path not in (config.DASHSCOPE_CUSTOMIZATION_PATH, config.DASHSCOPE_SYNTHESIS_PATH, config.DASHSCOPE_ASR_PATH):
+            self.send_api_error(404, "NotFound", "Not Found")
+            return
+        if not self.authorized():
+            return
+        try:
+            payload = json.loads(body or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self.send_api_error(400, "InvalidParameter", "Request body is not valid JSON")
+            return
+        self.timing = {}
+        if path == config.DASHSCOPE_CUSTOMIZATION_PATH:
+            self.handle_customization(payload)
+        elif path == config.DASHSCOPE_ASR_PATH:
+            self.handle_asr(payload)
+        else:
+            self.handle_synthesis(payload)
+
+    def handle_customization(self, payload: dict):
+        model = payload.get("model")
+        data = payload.get("input") or {}
+        if data.get("action") != "create":
+            self.send_api_error(400, "InvalidParameter", "Only action=create is supported by the stand-in")
+            return
+        name = str(data.get("preferred_name") or "")
+        if not (0 < len(name) <= 16 and name.replace("_", "").isalnum()):
+            self.send_api_error(400, "InvalidParameter", "preferred_name must be <= 16 letters, digits or _")
+            return
+        target_model = data.get("target_model") or ""
+        if model == "qwen-voice-enrollment":
+            self.enroll(data, name, target_model)
+        elif model == "qwen-voice-design":
+            self.design(data, name, target_model, payload.get("parameters") or {})
+        else:
+            self.send_api_error(400, "InvalidParameter", f"Unsupported model: {model}")
+
+    def enroll(self, data: dict, name: str, target_model: str):
+        if "-vc" not in target_model:
+            self.send_api_error(400, "InvalidParameter", f"target_model {target_model} is not a voice-clone model")
+            return
+        source = (data.get("audio") or {}).get("data") or ""
+        if not source.startswith("data:"):
+            self.send_api_error(400, "InvalidParameter", "The stand-in only accepts data URLs for audio.data")
+            return
+        try:
+            ref_wav = base64.b64decode(source.split(",", 1)[-1], validate=True)
+            prompt = self.server.voice_prompt(ref_wav)
+        except (binascii.Error, EOFError, Exception):
+            self.send_api_error(400, "Audio.PreprocessError", "Reference audio could not be decoded")
+            return
+        server = self.server
+        with server.gpu:
+            server.count(request_count=1)
+            server.sleep(ENROLL_SECONDS + ENROLL_SECONDS_PER_REF_SECOND * prompt["seconds"])
+        voice = server.add_voice("vc", name, target_model, prompt)
+        self.send_json(
+            200,
+            {
+                "output": {"voice": voice, "target_model": target_model},
+                "usage": {"count": 1},
+                "request_id": str(uuid.uuid4()),
+            },
+        )
+
+    def design(self, data: dict, name: str, target_model: str, parameters: dict):
+        if "-vd" not in target_model:
+            self.send_api_error(400, "InvalidParameter", f"target_model {target_model} is not a voice-design model")
+            return
+        voice_prompt, preview_text = data.get("voice_prompt") or "", data.get("preview_text") or ""
+        if not voice_prompt or len(voice_prompt) > 2048:
+            self.send_api_error(400, "InvalidParameter", "voice_prompt is required (<= 2048 chars)")
+            return
+        if not preview_text or len(preview_text) > 1024:
+            self.send_api_error(400, "InvalidParameter", "preview_text is required (<= 1024 chars)")
+            return
+        if parameters.get("response_format", "wav") != "wav":
+            self.send_api_error(400, "InvalidParameter", "The stand-in only returns wav previews")
+            return
+
+        # The description picks a deterministic synthetic voice
+        seed = int(hashlib.sha256(voice_prompt.encode()).hexdigest()[:8], 16)
+        seed_wav = audio.encode_wav(audio.synth_speech(DESIGN_SEED_SECONDS, seed=seed), audio.MODEL_SAMPLE_RATE)
+        prompt = self.server.voice_prompt(seed_wav)
+        server = self.server
+        language = _TAG_LANGUAGES.get(data.get("language") or "zh", config.DEFAULT_LANGUAGE)
+        with server.gpu:
+            server.count(request_count=1)
+            begin = time.perf_counter()
+            samples, service, _ = server.plan_output(preview_text, language, prompt, None)
+            server.sleep(DESIGN_SECONDS + service, since=begin)
+            server.count(gpu_seconds=service)
+        voice = server.add_voice("vd", name, target_model, prompt)
+        preview = audio.encode_wav(samples, audio.MODEL_SAMPLE_RATE)
+        self.send_json(
+            200,
+            {
+                "output": {
+                    "preview_audio": {
+                        "data": base64.b64encode(preview).decode("ascii"),
+                        "sample_rate": audio.MODEL_SAMPLE_RATE,
+                        "response_format": "wav",
+                    },
+                    "target_model": target_model,
+                    "voice": voice,
+                },
+                "usage": {"count": 1},
+                "request_id": str(uuid.uuid4()),
+            },
+        )
+
+    def handle_synthesis(self, payload: dict):
+        model = payload.get("model")
+        data = payload.get("input") or {}
+        text, voice_id = data.get("text") or "", data.get("voice") or ""
+        if not text:
+            self.send_api_error(400, "InvalidParameter", "input.text is required")
+            return
+        if len(text) > config.DASHSCOPE_MAX_TEXT_CHARS:
+            self.send_api_error(
+                400, "InvalidParameter", f"input.text exceeds {config.DASHSCOPE_MAX_TEXT_CHARS} characters"
+            )
+            return
+        with self.server.store_lock:
+            voice = self.server.voices.get(voice_id)
+        if voice is None and self.server.adopt_voices:
+            voice = self.server.adopt_voice(voice_id, model)
+        if voice is None:
+            self.send_api_error(400, "InvalidParameter", f"Voice not found: {voice_id}")
+            return
+        if voice["target_model"] != model:
+            self.send_api_error(
+                400, "InvalidParameter", f"Model {model} does not match the voice's target_model {voice['target_model']}"
+            )
+            return
+
+        language = data.get("language_type") or "Auto"
+        if language == "Auto":
+            language = config.DEFAULT_LANGUAGE
+        server = self.server
+        with server.gpu:
+            start = time.time()
+            server.count(request_count=1)
+            begin = time.perf_counter()
+            samples, service, _ = server.plan_output(text, language, voice["prompt"], None)
+            server.sleep(service, since=begin)
+            server.count(gpu_seconds=service)
+        audio_id = server.store_output(audio.encode_wav(samples, audio.MODEL_SAMPLE_RATE))
+        server.log_call("synthesis", start, text=text, audio_id=audio_id, service=service)
+        request_id = str(uuid.uuid4())
+        self.send_json(
+            200,
+            {
+                "status_code": 200,
+                "request_id": request_id,
+                "code": "",
+                "message": "",
+                "output": {
+                    "text": None,
+                    "finish_reason": "stop",
+                    "choices": None,
+                    "audio": {
+                        "data": "",
+                        "url": f"http://{self.headers.get('Host')}/audio/{audio_id}.wav",
+                        "id": audio_id,
+                        "expires_at": int(time.time()) + AUDIO_URL_TTL,
+                    },
+                },
+                "usage": {"input_tokens": 0, "output_tokens": 0, "characters": len(text)},
+            },
+        )
+
+    def handle_asr(self, payload: dict):
+        model = payload.get("model") or ""
+        if not model.startswith("qwen3-asr-flash") or "filetrans" in model or "realtime" in model:
+            self.send_compatible_error(400, "invalid_parameter_error", f"Unsupported model: {model}")
+            return
+        if payload.get("stream"):
+            self.send_compatible_error(400, "invalid_parameter_error", "The stand-in only supports stream=false")
+            return
+        contents = [part for message in payload.get("messages") or [] for part in message.get("content") or []]
+        sources = [((part or {}).get("input_audio") or {}).get("data") for part in contents if isinstance(part, dict)]
+        source = next((s for s in sources if s), "")
+        if not source.startswith("data:"):
+            self.send_compatible_error(400, "invalid_parameter_error", "The stand-in only accepts data URLs for input_audio")
+            return
+        try:
+            wav = base64.b64decode(source.split(",", 1)[-1], validate=True)
+            seconds = audio.wav_duration(wav)
+        except (binascii.Error, EOFError, Exception):
+            self.send_compatible_error(400, "invalid_parameter_error", "Audio could not be decoded")
+            return
+        if len(wav) > config.QWEN_ASR_MAX_BYTES or seconds > config.QWEN_ASR_MAX_SECONDS:
+            self.send_compatible_error(
+                400,
+                "invalid_parameter_error",
+                f"Audio exceeds {config.QWEN_ASR_MAX_SECONDS}s / {config.QWEN_ASR_MAX_BYTES // (1024 * 1024)}MB",
+            )
+            return
+
+        server = self.server
+        server.count(asr_count=1)
+        server.sleep(server.asr_time(seconds))
+        language = (payload.get("asr_options") or {}).get("language") or "en"
+        request_id = str(uuid.uuid4())
+        self.send_json(
+            200,
+            {
+                "id": f"chatcmpl-{request_id}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {
+                            "role": "assistant",
+                            "content": server.transcript(wav, seconds),
+                            "annotations": [{"type": "audio_info", "language": language, "emotion": "neutral"}],
+                        },
+                    }
+                ],
+                "usage": {"seconds": max(1, round(seconds))},
+                "request_id": request_id,
+            },
+        )
+
+    def handle_fetch(self, audio_id: str):
+        """
+        Serve a generated WAV, honouring `Range: bytes=N-` so interrupted
+        downloads can resume. The body is paced over the emulated transfer
+        time, and `fetch_failure_rate` of responses drop the connection
+        halfway through.
+        """
+        with self.server.store_lock:
+            wav = self.server.outputs.get(audio_id)
+        if wav is None:
+            self.send_api_error(404, "NotFound", "Audio not found or expired")
+            return
+        server = self.server
+        server.count(fetch_count=1)
+        started = time.time()
+        start = 0
+        match = _RANGE.fullmatch(self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            if start >= len(wav):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(wav)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        body = wav[start:]
+        with server.rng_lock:
+            fail = server.rng.random() < server.fetch_failure_rate
+        server.sleep(FETCH_SECONDS)
+
+        self.send_response(206 if match else 200)
+        self.send_header("Content-Type", "audio/wav")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Accept-Ranges", "bytes")
+        if match:
+            self.send_header("Content-Range", f"bytes {start}-{len(wav) - 1}/{len(wav)}")
+        self.end_headers()
+        step = max(len(body) // FETCH_CHUNKS, 1)
+        per_chunk = len(body[:step]) * 8 / (server.download_mbps * 1e6) if server.download_mbps else 0.0
+        try:
+            for offset in range(0, len(body), step):
+                if fail and offset >= len(body) // 2:
+                    server.count(fetch_failure_count=1)
+                    self.close_connection = True
+                    return
+                server.sleep(per_chunk)
+                self.wfile.write(body[offset : offset + step])
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        finally:
+            server.log_call("fetch", started, audio_id=audio_id)
+
+
+def start_dashscope_standin(
+    port: int = 0,
+    host: str = "127.0.0.1",
+    **kwargs,
+) -> tuple[DashScopeStandinServer, dict]:
+    """
+    Start a DashScope stand-in on a background thread.
+
+    Returns (server, endpoint) for the server's deployment key; see
+    standin_endpoint for the other voice type. Call server.shutdown() when done.
+    """
+    server = DashScopeStandinServer((host, port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, standin_endpoint(server)
+
+
+def standin_endpoint(server: DashScopeStandinServer, key: str | None = None) -> dict:
+    """Endpoint dict for config.DEPLOYMENTS[key] served by `server`."""
+    key = key or server.deployment
+    base = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    return {
+        **config.DEPLOYMENTS[key],
+        "name": f"Local DashScope stand-in ({key}, x{server.time_scale:g})",
+        "base_url": base,
+        "health": f"{base}/health",
+        "api_key": server.api_key,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the DashScope TTS APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--api-key", default=STANDIN_API_KEY)
+    parser.add_argument("--download-mbps", type=float, default=None, help="Emulated audio URL download bandwidth")
+    parser.add_argument(
+        "--fetch-failure-rate", type=float, default=0.0, help="Fraction of audio downloads dropped halfway"
+    )
+    parser.add_argument(
+        "--adopt-voices", action="store_true", help="Synthesize unknown voice ids with the reference clip"
+    )
+    add_standin_arguments(parser)
+    parser.set_defaults(emulate=DEFAULT_DEPLOYMENT, gpu_slots=DEFAULT_GPU_SLOTS)
+    args = parser.parse_args()
+
+    server = DashScopeStandinServer(
+        (args.host, args.port),
+        api_key=args.api_key,
+        download_mbps=args.download_mbps,
+        fetch_failure_rate=args.fetch_failure_rate,
+        adopt_voices=args.adopt_voices,
+        **standin_kwargs(args),
+    )
+    print(f"DashScope stand-in on http://{args.host}:{args.port} (time scale x{args.time_scale:g})")
+    print(f"  DASHSCOPE_BASE_URL=http://{args.host}:{args.port} DASHSCOPE_API_KEY={args.api_key}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
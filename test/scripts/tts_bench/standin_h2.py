@@ -0,0 +1,278 @@
+"""
+HTTP/2 (h2c, prior knowledge) listener for the local stand-in.
+
+Runs next to a StandinServer and feeds every HTTP/2 stream through the same
+StandinHandler routes, so latency emulation, GPU slots and counters are
+shared with the HTTP/1.1 listener. Each client connection gets a reader and
+a writer thread, so reading never waits on a blocked send; each request
+stream is handled on its own thread and queues DATA frames as the stream's
+flow-control window allows. A stream reset by the
+client surfaces as ConnectionResetError, which aborts a streamed generation
+exactly like a closed HTTP/1.1 connection.
+
+Requires the `h2` package:
+    uv run --with numpy --with h2 python -m tts_bench.standin --http2-port 8766
+"""
+
+import queue
+import socket
+import threading
+from email.message import Message
+
+import h2.config
+import h2.connection
+import h2.events
+import h2.exceptions
+import h2.settings
+
+from .standin import ENCODINGS, StandinHandler, StandinServer
+
+# Large windows and frames so multi-MB reference uploads aren't throttled by
+# WINDOW_UPDATE round trips or split into thousands of 16KB DATA frames
+INITIAL_WINDOW = 1 << 22
+MAX_FRAME_SIZE = 1 << 20
+# Connection-specific headers HTTP/2 forbids
+_HOP_BY_HOP = {"connection", "transfer-encoding", "keep-alive"}
+
+
+class H2Connection:
+    """One client connection: reads frames, dispatches finished requests."""
+
+    def __init__(self, frontend: "H2Frontend", sock: socket.socket):
+        self.frontend = frontend
+        self.sock = sock
+        self.conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        self.lock = threading.Condition()
+        self.streams: dict[int, dict] = {}
+        self.reset: set[int] = set()
+        self.closed = False
+        self.outbox: queue.Queue[bytes | None] = queue.Queue()
+
+    def flush(self):
+        """Queue pending frames for the writer; call with the lock held."""
+        data = self.conn.data_to_send()
+        if data:
+            self.outbox.put(data)
+
+    def write_loop(self):
+        while (data := self.outbox.get()) is not None:
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                with self.lock:
+                    self.closed = True
+                    self.lock.notify_all()
+                return
+
+    def serve(self):
+        writer = threading.Thread(target=self.write_loop, daemon=True)
+        writer.start()
+        with self.lock:
+            self.conn.initiate_connection()
+            self.conn.update_settings(
+                {
+                    h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: INITIAL_WINDOW,
+                    h2.settings.SettingCodes.MAX_FRAME_SIZE: MAX_FRAME_SIZE,
+                }
+            )
+            self.conn.increment_flow_control_window(INITIAL_WINDOW)
+            self.flush()
+        try:
+            while True:
+                data = self.sock.recv(65536)
+                if not data:
+                    break
+                with self.lock:
+                    events = self.conn.receive_data(data)
+                    for event in events:
+                        self.handle_event(event)
+                    self.flush()
+                    self.lock.notify_all()
+                if any(isinstance(e, h2.events.ConnectionTerminated) for e in events):
+                    break
+        except (OSError, h2.exceptions.ProtocolError):
+            pass  # Client went away or broke the protocol; drop the connection
+        finally:
+            with self.lock:
+                self.closed = True
+                self.lock.notify_all()
+            self.outbox.put(None)
+            writer.join()
+            self.sock.close()
+
+    def handle_event(self, event):
+        if isinstance(event, h2.events.RequestReceived):
+            self.streams[event.stream_id] = {"headers": event.headers, "body": bytearray()}
+        elif isinstance(event, h2.events.DataReceived):
+            if event.stream_id in self.streams:
+                self.streams[event.stream_id]["body"].extend(event.data)
+            self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, h2.events.StreamEnded):
+            request = self.streams.pop(event.stream_id, None)
+            if request is None:
+                return
+            threading.Thread(
+                target=self.dispatch,
+                args=(event.stream_id, request["headers"], bytes(request["body"])),
+                daemon=True,
+            ).start()
+        elif isinstance(event, h2.events.StreamReset):
+            self.reset.add(event.stream_id)
+            self.streams.pop(event.stream_id, None)
+
+    def dispatch(self, stream_id: int, headers, body: bytes):
+        exchange = H2Exchange(self, stream_id, headers, body)
+        try:
+            handler = getattr(exchange, f"do_{exchange.command}", None)
+            if handler is None:
+                exchange.send_error_detail(405, "Method Not Allowed")
+            else:
+                handler()
+            self.send_data(stream_id, b"", end_stream=True)
+        except ConnectionResetError:
+            pass
+        except Exception:
+            # Don't leave the client waiting on a stream that will never end
+            with self.lock:
+                if not self.closed and stream_id not in self.reset:
+                    self.conn.reset_stream(stream_id)
+                    self.flush()
+            raise
+
+    def send_headers(self, stream_id: int, headers: list[tuple[str, str]]):
+        with self.lock:
+            if self.closed or stream_id in self.reset:
+                raise ConnectionResetError(f"stream {stream_id} reset")
+            try:
+                self.conn.send_headers(stream_id, headers)
+            except h2.exceptions.ProtocolError as e:
+                raise ConnectionResetError(str(e)) from e
+            self.flush()
+
+    def send_data(self, stream_id: int, data: bytes, end_stream: bool = False):
+        """Send DATA frames, waiting for WINDOW_UPDATEs when the window is exhausted."""
+        view = memoryview(data)
+        with self.lock:
+            while True:
+                if self.closed or stream_id in self.reset:
+                    raise ConnectionResetError(f"stream {stream_id} reset")
+                try:
+                    if not view:
+                        if end_stream:
+                            self.conn.end_stream(stream_id)
+                            self.flush()
+                        return
+                    window = min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+                    if window <= 0:
+                        self.lock.wait(timeout=1.0)
+                        continue
+                    chunk, view = view[:window], view[window:]
+                    self.conn.send_data(stream_id, chunk.tobytes(), end_stream=end_stream and not view)
+                    self.flush()
+                    if not view:
+                        return
+                except h2.exceptions.ProtocolError as e:
+                    raise ConnectionResetError(str(e)) from e
+
+
+class _StreamWriter:
+    """wfile stand-in that turns writes into DATA frames on one stream."""
+
+    def __init__(self, connection: H2Connection, stream_id: int):
+        self.connection = connection
+        self.stream_id = stream_id
+
+    def write(self, data: bytes):
+        self.connection.send_data(self.stream_id, data)
+
+    def flush(self):
+        pass
+
+
+class H2Exchange(StandinHandler):
+    """
+    A StandinHandler bound to one HTTP/2 stream instead of a socket: request
+    line and body come from the stream, responses go out as HEADERS/DATA.
+    """
+
+    def __init__(self, connection: H2Connection, stream_id: int, headers, body: bytes):
+        # No BaseRequestHandler.__init__: there is no per-request socket
+        self.server = connection.frontend.server
+        self.connection_h2 = connection
+        self.stream_id = stream_id
+        self.body = body
+        self.headers = Message()
+        for name, value in headers:
+            if name.startswith(":"):
+                if name == ":method":
+                    self.command = value
+                elif name == ":path":
+                    self.path = value
+            else:
+                self.headers[name] = value
+        self.wfile = _StreamWriter(connection, stream_id)
+        self.response_headers: list[tuple[str, str]] = []
+        self.close_connection = False
+
+    def read_body(self) -> bytes:
+        return self.body
+
+    def send_response(self, code: int, message: str | None = None):
+        self.response_headers = [(":status", str(code))]
+
+    def send_header(self, keyword: str, value: str):
+        if keyword.lower() not in _HOP_BY_HOP:
+            self.response_headers.append((keyword.lower(), str(value)))
+
+    def end_headers(self):
+        self.connection_h2.send_headers(self.stream_id, self.response_headers)
+
+    def write_chunk(self, data: bytes):
+        if data:
+            self.wfile.write(data)
+
+
+class H2Frontend:
+    """Accept h2c connections for a StandinServer on its own port."""
+
+    def __init__(self, server: StandinServer, address: tuple[str, int]):
+        self.server = server
+        self.sock = socket.create_server(address)
+        self.server_address = self.sock.getsockname()
+        self.running = True
+
+    def serve_forever(self):
+        while self.running:
+            try:
+                sock, _ = self.sock.accept()
+            except OSError:
+                break
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.server.count(h2_connection_count=1)
+            threading.Thread(target=H2Connection(self, sock).serve, daemon=True).start()
+
+    def shutdown(self):
+        self.running = False
+        self.sock.close()
+
+
+def start_h2_frontend(server: StandinServer, port: int = 0, host: str = "127.0.0.1") -> tuple[H2Frontend, dict]:
+    """
+    Serve `server` over h2c on a background thread. Returns (frontend,
+    endpoint) where the endpoint is marked "http2" so the client uses it.
+    """
+    frontend = H2Frontend(server, (host, port))
+    threading.Thread(target=frontend.serve_forever, daemon=True).start()
+    base = f"http://{host}:{frontend.server_address[1]}"
+    endpoint = {
+        "name": f"Local stand-in h2c ({server.deployment}, x{server.time_scale:g})",
+        "clone": f"{base}/clone",
+        "health": f"{base}/health",
+        "languages": f"{base}/languages",
+        "base_url": base,
+        "encodings": list(ENCODINGS),
+        "http2": True,
+    }
+    return frontend, endpoint
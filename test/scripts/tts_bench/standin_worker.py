@@ -0,0 +1,1307 @@
+"""
+Local stand-in for the API Worker job flow (workers/api).
+
+Serves the routes tts_bench.worker_client calls, with the Worker's status
+codes and {"detail": ...} error bodies:
+
+    POST /api/auth/sign-in          email/password -> utter_sb_* session cookies
+    POST /api/auth/refresh          refresh cookie -> new session cookies
+    GET  /api/auth/session
+    GET  /api/voices                the user's voices
+    GET  /api/credits/usage         balance, plan tier, recent ledger events
+    POST /api/generate              validate, active-job cap, debit credits,
+                                    insert task + generation, enqueue
+    GET  /api/tasks/:id             the task as routes/tasks.ts serializes it
+    POST /api/tasks/:id/cancel      cancel and refund
+    GET  /api/generations           the user's generations, newest first
+    GET  /api/generations/:id/audio 302 to a signed storage URL
+    GET  /api/storage/download      the stored WAV behind a signed token, read
+                                    whole before answering, Range ignored
+                                    (routes/storage.ts on R2)
+    GET  /api/health
+    GET  /rest/v1/<table>           service-role reads of tasks, generations
+                                    and credit_ledger (select=, col=eq./in.)
+
+Behind /api/generate an in-process queue mirrors the tts-jobs consumer
+(queues/consumer.ts, wrangler.jsonc): batches of up to `max_batch_size`
+messages or whatever arrived within `max_batch_timeout`, `max_concurrency`
+batches in flight, messages handled in order within a batch, retries with
+the consumer's exponential backoff and, after `max_retries`, the dead-letter
+queue. Each message runs processQwenGenerationTask: cancellation checks,
+synthesis and audio download through a DashScope endpoint (a DashScope
+stand-in by default), the storage upload, and the provider_status updates
+between them.
+
+Requests authenticate with a Bearer token or the cookies sign-in sets;
+unsafe requests carrying cookies need an allowed Origin. Rate limits follow
+_shared/rate_limit.ts per user (or IP) over fixed windows, with the same
+RATE_LIMIT_* names for overrides, and answer 429 with retry_after_seconds.
+Every database round trip costs DB_QUERY_SECONDS, a placeholder until
+measured against local Supabase.
+
+Times are emulated seconds scaled by `time_scale` like the other stand-ins.
+Row timestamps (created_at, updated_at, completed_at) run on the emulated
+clock, so a run's rows read like a real one. `traces` keeps the stand-in's
+own view of each job (enqueue, deliveries, provider and storage times) for
+checking analyses built on the rows.
+
+Run standalone:
+    uv run --with requests --with numpy python -m tts_bench.standin_worker --port 8788 --time-scale 0.05
+
+Or in-process from a benchmark:
+    server, endpoint = start_worker_standin(time_scale=0.05)
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import re
+import secrets
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from http.cookies import SimpleCookie
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from . import audio, client, config, dashscope
+from .standin import StandinHandler
+from .standin_dashscope import start_dashscope_standin
+from .worker_client import RATE_LIMIT_DEFAULTS, credits_for_text, rate_limit_tier, text_length
+
+STANDIN_EMAIL = "bench@example.com"
+STANDIN_PASSWORD = "Standin-pass1"
+STANDIN_CREDITS = 1_000_000
+ACCESS_COOKIE = "utter_sb_access_token"
+REFRESH_COOKIE = "utter_sb_refresh_token"
+ACCESS_TOKEN_TTL = 3600
+SIGNED_URL_TTL = 3600
+
+# Placeholder emulated latencies (seconds) until measured against wrangler dev
+DB_QUERY_SECONDS = 0.02  # One Supabase round trip from the Worker
+QUEUE_SEND_SECONDS = 0.03  # TTS_QUEUE.send()
+STORAGE_PUT_SECONDS = 0.08  # R2 put, plus size / storage_mbps
+STORAGE_GET_SECONDS = 0.03  # R2 get, plus size / storage_mbps (read whole before the response)
+
+ACTIVE_STATUSES = ("pending", "processing")
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+_UUID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+
+
+def backoff_delay_seconds(attempts: int) -> float:
+    """consumer.ts backoffDelaySeconds: 1, 2, 4, ... capped at 300."""
+    return min(300, 2 ** min(8, max(0, attempts - 1)))
+
+
+class StandinQueue:
+    """The tts-jobs queue and its consumer, run on the stand-in's threads."""
+
+    def __init__(
+        self,
+        server: "WorkerStandinServer",
+        max_batch_size: int = 1,
+        max_batch_timeout: float = 2.0,
+        max_concurrency: int = 1,
+        max_retries: int = 3,
+        failure_rate: float = 0.0,
+    ):
+        self.server = server
+        self.max_batch_size = max_batch_size
+        self.max_batch_timeout = max_batch_timeout
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.failure_rate = failure_rate
+        self.pending: list[dict] = []
+        self.dead_letters: list[dict] = []
+        self.cond = threading.Condition()
+        self.stopped = False
+        self.batches = 0
+        self.deliveries = 0
+        self.threads = [
+            threading.Thread(target=self.consume, daemon=True, name=f"consumer-{i}") for i in range(max_concurrency)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def send(self, body: dict, delay: float = 0.0, attempts: int = 0):
+        now = self.server.now()
+        with self.cond:
+            self.pending.append({"body": body, "attempts": attempts, "ready_at": now + delay})
+            self.cond.notify_all()
+
+    def depth(self) -> int:
+        with self.cond:
+            return len(self.pending)
+
+    def next_batch(self) -> list[dict]:
+        """Block until a batch is full or its oldest message waited max_batch_timeout."""
+        first_ready = None
+        with self.cond:
+            while not self.stopped:
+                now = self.server.now()
+                ready = [m for m in self.pending if m["ready_at"] <= now]
+                if ready:
+                    first_ready = first_ready if first_ready is not None else now
+                    if len(ready) >= self.max_batch_size or now - first_ready >= self.max_batch_timeout:
+                        batch = ready[: self.max_batch_size]
+                        self.pending = [m for m in self.pending if m not in batch]
+                        self.batches += 1
+                        return batch
+                waits = [m["ready_at"] - now for m in self.pending if m["ready_at"] > now]
+                if first_ready is not None:
+                    waits.append(first_ready + self.max_batch_timeout - now)
+                timeout = max(min(waits), 0.0) * self.server.time_scale if waits else None
+                self.cond.wait(timeout=timeout)
+        return []
+
+    def consume(self):
+        while True:
+            batch = self.next_batch()
+            if not batch:
+                return
+            for message in batch:
+                self.deliver(message)
+
+    def deliver(self, message: dict):
+        message["attempts"] += 1
+        body = message["body"]
+        with self.cond:
+            self.deliveries += 1
+        self.server.trace(body["task_id"], "deliveries", self.server.now())
+        try:
+            with self.server.rng_lock:
+                fail = self.server.rng.random() < self.failure_rate
+            if fail:
+                raise RuntimeError("Consumer invocation failed (injected)")
+            self.server.process_generation(body)
+        except Exception as error:
+            if message["attempts"] > self.max_retries:
+                with self.cond:
+                    self.dead_letters.append({**message, "error": str(error)})
+                self.server.trace(body["task_id"], "dead_lettered", self.server.now())
+                return
+            self.send(body, delay=backoff_delay_seconds(message["attempts"]), attempts=message["attempts"])
+
+    def stop(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+
+
+class WorkerStandinServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the Worker stand-in's tables and queue."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        provider: dict,
+        time_scale: float = 1.0,
+        seed: int = 0,
+        allowed_origins: tuple[str, ...] = (config.WORKER_ORIGIN,),
+        rate_limits: dict[str, int] | None = None,
+        storage_mbps: float | None = None,
+        max_batch_size: int = 1,
+        max_batch_timeout: float = 2.0,
+        max_concurrency: int = 1,
+        max_retries: int = 3,
+        consumer_failure_rate: float = 0.0,
+    ):
+        super().__init__(address, WorkerHandler)
+        self.provider = provider
+        self.provider_server = None  # The DashScope stand-in start_worker_standin() started, if any
+        self.time_scale = time_scale
+        self.allowed_origins = allowed_origins
+        self.rate_limits = {**RATE_LIMIT_DEFAULTS, **(rate_limits or {})}
+        self.storage_mbps = storage_mbps
+        self.signing_secret = secrets.token_bytes(16)
+        self.service_role_key = f"standin-service-{secrets.token_hex(8)}"
+        self.rng = np.random.default_rng(seed)
+        self.rng_lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.epoch = datetime.now(timezone.utc)
+
+        # Tables (one lock; the stand-in is not a database benchmark)
+        self.db_lock = threading.Lock()
+        self.users: dict[str, dict] = {}
+        self.tokens: dict[str, str] = {}  # access token -> user id
+        self.refresh_tokens: dict[str, str] = {}
+        self.voices: dict[str, dict] = {}
+        self.tasks: dict[str, dict] = {}
+        self.generations: dict[str, dict] = {}
+        self.credit_ledger: list[dict] = []
+        self.objects: dict[str, bytes] = {}
+        self.rate_counters: dict[tuple, int] = defaultdict(int)
+        self.traces: dict[str, dict] = {}
+
+        # Counters (read by benchmarks after a run)
+        self.stats_lock = threading.Lock()
+        self.connection_count = 0
+        self.request_count = 0
+        self.task_poll_count = 0
+        self.rate_limited_count = 0
+        self.queue = StandinQueue(
+            self, max_batch_size, max_batch_timeout, max_concurrency, max_retries, consumer_failure_rate
+        )
+
+    def count(self, **increments):
+        with self.stats_lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    # ------------------------------------------------------------------
+    # Clock and emulation
+    # ------------------------------------------------------------------
+
+    def now(self) -> float:
+        """Emulated seconds since the stand-in started."""
+        return (time.perf_counter() - self.started) / self.time_scale
+
+    def iso(self, at: float | None = None) -> str:
+        return (self.epoch + timedelta(seconds=self.now() if at is None else at)).isoformat()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds * self.time_scale)
+
+    def query(self, count: int = 1):
+        """Pay for `count` database round trips."""
+        self.sleep(DB_QUERY_SECONDS * count)
+
+    def trace(self, task_id: str, key: str, value):
+        """Record stand-in ground truth for a job; list-valued keys append."""
+        with self.db_lock:
+            entry = self.traces.setdefault(task_id, {})
+            if key == "deliveries":
+                entry.setdefault(key, []).append(value)
+            else:
+                entry[key] = value
+
+    # ------------------------------------------------------------------
+    # Users, voices, sessions
+    # ------------------------------------------------------------------
+
+    def add_user(
+        self,
+        email: str = STANDIN_EMAIL,
+        password: str = STANDIN_PASSWORD,
+        credits: int = STANDIN_CREDITS,
+        subscription_tier: str = "pro",
+    ) -> dict:
+        user = {
+            "id": str(uuid.uuid4()),
+            "email": email,
+            "password": password,
+            "credits": credits,
+            "subscription_tier": subscription_tier,
+        }
+        with self.db_lock:
+            self.users[user["id"]] = user
+        return user
+
+    def issue_session(self, user_id: str) -> dict:
+        session = {
+            "access_token": f"sat_{secrets.token_hex(16)}",
+            "refresh_token": f"srt_{secrets.token_hex(16)}",
+            "expires_at": self.now() + ACCESS_TOKEN_TTL,
+        }
+        with self.db_lock:
+            self.tokens[session["access_token"]] = user_id
+            self.refresh_tokens[session["refresh_token"]] = user_id
+        return session
+
+    def add_voice(self, user_id: str, provider_voice_id: str, target_model: str, name: str = "Bench voice") -> dict:
+        voice = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "name": name,
+            "source": "uploaded",
+            "language": config.DEFAULT_LANGUAGE,
+            "tts_provider": "qwen",
+            "provider_voice_id": provider_voice_id,
+            "provider_target_model": target_model,
+            "provider_voice_kind": "vc" if "-vc" in target_model else "vd",
+            "created_at": self.iso(),
+            "deleted_at": None,
+        }
+        with self.db_lock:
+            self.voices[voice["id"]] = voice
+        return voice
+
+    def seed_voice(self, user_id: str) -> dict:
+        """Enroll the reference clip on the provider and store it as the user's voice."""
+        ref_audio_b64, ref_text = client.load_reference()
+        record = dashscope.create_clone_voice(self.provider, ref_audio_b64, ref_text)
+        if "error" in record:
+            raise RuntimeError(f"Voice enrollment failed: {record['error']}")
+        return self.add_voice(user_id, record["voice"], record["target_model"])
+
+    def seed_generation(self, user_id: str, voice_id: str, text: str, wav: bytes) -> dict:
+        """A completed generation with `wav` in storage, as if the consumer had finished it."""
+        generation_id = str(uuid.uuid4())
+        key = f"{user_id}/{generation_id}.wav"
+        now = self.iso()
+        generation = {
+            "id": generation_id,
+            "user_id": user_id,
+            "voice_id": voice_id,
+            "text": text,
+            "language": config.DEFAULT_LANGUAGE,
+            "status": "completed",
+            "tts_provider": "qwen",
+            "provider_model": self.voices[voice_id]["provider_target_model"],
+            "audio_object_key": key,
+            "duration_seconds": audio.wav_duration(wav),
+            "generation_time_seconds": None,
+            "error_message": None,
+            "created_at": now,
+            "completed_at": now,
+        }
+        with self.db_lock:
+            self.generations[generation_id] = generation
+            self.objects[key] = wav
+        return generation
+
+    # ------------------------------------------------------------------
+    # Credits and rate limits
+    # ------------------------------------------------------------------
+
+    def apply_credit_event(self, user_id: str, kind: str, amount: int, reference_id: str, reason: str) -> dict:
+        """credit_apply_event: debits fail (insufficient) rather than go negative."""
+        self.query()
+        with self.db_lock:
+            user = self.users[user_id]
+            key = f"generate:{reference_id}:{kind}"
+            if any(e["idempotency_key"] == key for e in self.credit_ledger):
+                return {"insufficient": False, "balance_remaining": user["credits"], "duplicate": True}
+            if kind == "debit" and user["credits"] < amount:
+                return {"insufficient": True, "balance_remaining": user["credits"]}
+            user["credits"] += -amount if kind == "debit" else amount
+            self.credit_ledger.append(
+                {
+                    "user_id": user_id,
+                    "event_kind": kind,
+                    "operation": "generate",
+                    "amount": amount,
+                    "balance_after": user["credits"],
+                    "reference_id": reference_id,
+                    "idempotency_key": key,
+                    "reason": reason,
+                    "created_at": self.iso(),
+                }
+            )
+            return {"insufficient": False, "balance_remaining": user["credits"]}
+
+    def check_rate_limit(self, tier: str, user_id: str | None, ip: str) -> int | None:
+        """Increment the actor's counter; return retry_after_seconds when over the limit."""
+        self.query()
+        number = tier[-1]
+        if user_id and tier != "tier3":
+            actor, limit = ("user", user_id), self.rate_limits[f"RATE_LIMIT_TIER{number}_USER_LIMIT"]
+        else:
+            actor, limit = ("ip", ip), self.rate_limits[f"RATE_LIMIT_TIER{number}_IP_LIMIT"]
+        window = self.rate_limits.get(
+            f"RATE_LIMIT_TIER{number}_WINDOW_SECONDS", self.rate_limits["RATE_LIMIT_WINDOW_SECONDS"]
+        )
+        now = self.now()
+        window_start = int(now // window)
+        with self.db_lock:
+            key = (*actor, tier, window_start)
+            self.rate_counters[key] += 1
+            if self.rate_counters[key] <= limit:
+                return None
+        self.count(rate_limited_count=1)
+        return max(1, int((window_start + 1) * window - now))
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def update_task(self, task_id: str, only_active: bool = True, **fields) -> bool:
+        """One UPDATE ... WHERE status IN active (updated_at via the trigger)."""
+        self.query()
+        with self.db_lock:
+            task = self.tasks.get(task_id)
+            if task is None or (only_active and task["status"] not in ACTIVE_STATUSES):
+                return False
+            task.update(fields, updated_at=self.iso())
+            return True
+
+    def update_generation(self, generation_id: str, **fields) -> bool:
+        self.query()
+        with self.db_lock:
+            generation = self.generations.get(generation_id)
+            if generation is None or generation["status"] in TERMINAL_STATUSES:
+                return False
+            generation.update(fields)
+            return True
+
+    def sign_storage_token(self, bucket: str, key: str, expires_in: int) -> str:
+        """createSignedStorageToken: base64url JSON claims + "." + base64url HMAC-SHA256."""
+        exp = int(self.epoch.timestamp() + self.now()) + expires_in
+        claims = {"v": 1, "action": "download", "bucket": bucket, "key": key, "exp": exp}
+        payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
+        signature = hmac.new(self.signing_secret, payload.encode(), hashlib.sha256).digest()
+        return f"{payload}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode()}"
+
+    def verify_storage_token(self, token: str) -> dict | None:
+        """verifySignedStorageToken for downloads: claims, or None if forged or expired."""
+        payload, _, signature = token.partition(".")
+        expected = hmac.new(self.signing_secret, payload.encode(), hashlib.sha256).digest()
+        try:
+            valid = hmac.compare_digest(base64.urlsafe_b64decode(signature + "=" * (-len(signature) % 4)), expected)
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        except ValueError:
+            return None
+        if not valid or claims.get("action") != "download":
+            return None
+        return claims if claims.get("exp", 0) >= self.epoch.timestamp() + self.now() else None
+
+    def should_cancel(self, task_id: str) -> bool:
+        self.query()
+        with self.db_lock:
+            task = self.tasks.get(task_id)
+            return task is None or task["cancellation_requested"] or task["status"] == "cancelled"
+
+    def generation_seconds(self, generation_id: str) -> float:
+        """generation_time_seconds: completion minus created_at, on the emulated clock."""
+        with self.db_lock:
+            created = self.generations[generation_id]["created_at"]
+        return self.now() - (datetime.fromisoformat(created) - self.epoch).total_seconds()
+
+    def cancel_generation_job(self, body: dict, reason: str):
+        """markQwenGenerationCancelled: cancel rows and refund the debit."""
+        now = self.iso()
+        self.update_task(
+            body["task_id"],
+            status="cancelled",
+            provider_status="cancelled",
+            completed_at=now,
+            error="Cancelled by user",
+        )
+        self.update_generation(
+            body["generation_id"],
+            status="cancelled",
+            error_message="Cancelled by user",
+            completed_at=now,
+            generation_time_seconds=self.generation_seconds(body["generation_id"]),
+        )
+        payload = body["payload"]
+        self.apply_credit_event(body["user_id"], "refund", payload["credits_to_debit"], body["generation_id"], reason)
+        self.trace(body["task_id"], "cancelled_at", self.now())
+
+    def process_generation(self, body: dict):
+        """processQwenGenerationTask against the provider endpoint."""
+        task_id, generation_id, payload = body["task_id"], body["generation_id"], body["payload"]
+        if self.should_cancel(task_id):
+            self.cancel_generation_job(body, "cancelled_before_submit")
+            return
+        self.update_task(task_id, status="processing", provider_status="provider_synthesizing")
+        try:
+            self.trace(task_id, "provider_start", self.now())
+            synth = dashscope.synthesize(
+                self.provider,
+                payload["provider_voice_id"],
+                payload["text"],
+                payload["language"],
+            )
+            self.trace(task_id, "synth_end", self.now())
+            if "error" in synth:
+                raise RuntimeError(f"Qwen synthesis failed: {synth['error']}")
+            if self.should_cancel(task_id):
+                self.cancel_generation_job(body, "cancelled_before_download")
+                return
+            self.update_task(task_id, provider_status="provider_downloading")
+            _, wav, error = dashscope.fetch_audio(synth["audio_url"])
+            self.trace(task_id, "provider_end", self.now())
+            if error:
+                raise RuntimeError(f"Qwen audio download failed: {error}")
+            if self.should_cancel(task_id):
+                self.cancel_generation_job(body, "cancelled_before_persist")
+                return
+            self.update_task(task_id, provider_status="provider_persisting")
+            self.query()  # Load the generation row
+            key = f"{body['user_id']}/{generation_id}.wav"
+            self.sleep(STORAGE_PUT_SECONDS + (len(wav) * 8 / (self.storage_mbps * 1e6) if self.storage_mbps else 0.0))
+            with self.db_lock:
+                self.objects[key] = wav
+            self.trace(task_id, "stored", self.now())
+
+            now = self.iso()
+            self.update_generation(
+                generation_id,
+                audio_object_key=key,
+                status="completed",
+                completed_at=now,
+                generation_time_seconds=self.generation_seconds(generation_id),
+                output_format="wav",
+                provider_metadata={
+                    "request_id": synth.get("request_id"),
+                    "audio_expires_at": synth.get("audio_expires_at"),
+                },
+            )
+            self.update_task(
+                task_id,
+                status="completed",
+                provider_status="completed",
+                completed_at=now,
+                result={"audio_url": f"/api/generations/{generation_id}/audio"},
+                error=None,
+            )
+            self.trace(task_id, "completed", self.now())
+        except Exception as error:
+            now = self.iso()
+            message = str(error)
+            self.update_task(task_id, status="failed", provider_status="failed", completed_at=now, error=message)
+            self.update_generation(generation_id, status="failed", error_message=message, completed_at=now)
+            self.apply_credit_event(
+                body["user_id"], "refund", payload["credits_to_debit"], generation_id, "qwen_generate_failed"
+            )
+            self.trace(task_id, "failed", self.now())
+
+    def health(self) -> dict:
+        with self.db_lock:
+            active = sum(1 for t in self.tasks.values() if t["status"] in ACTIVE_STATUSES)
+        return {
+            "ok": True,
+            "stand_in": True,
+            "time_scale": self.time_scale,
+            "provider": self.provider.get("name"),
+            "queue": {
+                "max_batch_size": self.queue.max_batch_size,
+                "max_batch_timeout": self.queue.max_batch_timeout,
+                "max_concurrency": self.queue.max_concurrency,
+                "max_retries": self.queue.max_retries,
+                "depth": self.queue.depth(),
+                "batches": self.queue.batches,
+                "deliveries": self.queue.deliveries,
+                "dead_letters": len(self.queue.dead_letters),
+            },
+            "stats": {
+                "requests": self.request_count,
+                "connections": self.connection_count,
+                "task_polls": self.task_poll_count,
+                "rate_limited": self.rate_limited_count,
+                "active_tasks": active,
+            },
+        }
+
+    def shutdown(self):
+        self.queue.stop()
+        super().shutdown()
+
+
+class WorkerHandler(StandinHandler):
+    """Request handler implementing the API Worker routes the job client uses."""
+
+    server: WorkerStandinServer
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def end_headers(self):
+        self.send_header("x-request-id", str(uuid.uuid4()))  # Every Worker response carries one
+        super().end_headers()
+
+    def cookies(self) -> dict[str, str]:
+        jar = SimpleCookie()
+        try:
+            jar.load(self.headers.get("Cookie", ""))
+        except Exception:
+            return {}
+        return {name: morsel.value for name, morsel in jar.items()}
+
+    def access_token(self) -> str | None:
+        header = self.headers.get("Authorization", "")
+        if header.startswith("Bearer "):
+            return header[len("Bearer ") :].strip() or None
+        return self.cookies().get(ACCESS_COOKIE)
+
+    def current_user(self) -> dict | None:
+        """requireUser: the token's user, or None after sending 401."""
+        token = self.access_token()
+        if not token:
+            self.send_error_detail(401, "Authentication required.")
+            return None
+        self.server.query()  # auth.getUser
+        with self.server.db_lock:
+            user_id = self.server.tokens.get(token)
+            user = self.server.users.get(user_id) if user_id else None
+        if user is None:
+            self.send_error_detail(401, "Invalid or expired session.")
+        return user
+
+    def send_session(self, status: int, body: dict, session: dict | None):
+        """JSON response with Set-Cookie for a new session (or cleared cookies)."""
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        for name, value, max_age in (
+            (ACCESS_COOKIE, session["access_token"] if session else "", ACCESS_TOKEN_TTL if session else 0),
+            (REFRESH_COOKIE, session["refresh_token"] if session else "", 30 * 24 * 3600 if session else 0),
+        ):
+            self.send_header("Set-Cookie", f"{name}={value}; Path=/; HttpOnly; SameSite=Lax; Max-Age={max_age}")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def guard(self, method: str, path: str) -> dict | None:
+        """
+        The Worker's middleware: Origin check for cookie-authenticated unsafe
+        requests, then the rate limiter. Returns {"user_id": ...} to continue,
+        or None after sending the rejection.
+        """
+        server = self.server
+        server.count(request_count=1)
+        cookies = self.cookies()
+        unsafe = method in ("POST", "PUT", "PATCH", "DELETE")
+        if unsafe and (path.startswith("/api/auth/") or ACCESS_COOKIE in cookies or REFRESH_COOKIE in cookies):
+            if "*" not in server.allowed_origins:
+                origin = self.headers.get("Origin")
+                if not origin:
+                    self.send_error_detail(403, "Missing Origin header.")
+                    return None
+                if origin not in server.allowed_origins:
+                    self.send_error_detail(403, "Origin not allowed.")
+                    return None
+        tier = rate_limit_tier(method, path)
+        token = self.access_token()
+        with server.db_lock:
+            user_id = server.tokens.get(token) if token else None
+        if tier:
+            retry_after = server.check_rate_limit(tier, user_id, self.client_address[0])
+            if retry_after is not None:
+                self.send_json(
+                    429, {"detail": "Rate limit exceeded. Please retry later.", "retry_after_seconds": retry_after}
+                )
+                return None
+        return {"user_id": user_id}
+
+    # ------------------------------------------------------------------
+    # Routes
+    # ------------------------------------------------------------------
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/")
+        if path.startswith("/rest/v1/"):
+            self.handle_rest(path[len("/rest/v1/") :], parse_qs(url.query))
+            return
+        if self.guard("GET", path) is None:
+            return
+        if path == "/api/health":
+            self.send_json(200, self.server.health())
+        elif path == "/api/auth/session":
+            self.handle_session()
+        elif path == "/api/voices":
+            self.handle_voices()
+        elif path == "/api/credits/usage":
+            self.handle_credit_usage()
+        elif match := re.fullmatch(r"/api/tasks/([^/]+)", path):
+            self.handle_task(match.group(1))
+        elif path == "/api/generations":
+            self.handle_generations(parse_qs(url.query))
+        elif match := re.fullmatch(r"/api/generations/([^/]+)/audio", path):
+            self.handle_audio(match.group(1))
+        elif path == "/api/storage/download":
+            self.handle_storage_download(parse_qs(url.query))
+        else:
+            self.send_error_detail(404, "Not Found")
+
+    def do_POST(self):
+        path = urlsplit(self.path).path.rstrip("/")
+        if self.guard("POST", path) is None:
+            self.read_body()
+            return
+        if path == "/api/auth/sign-in":
+            self.handle_sign_in()
+        elif path == "/api/auth/refresh":
+            self.read_body()
+            self.handle_refresh()
+        elif path == "/api/generate":
+            self.handle_generate()
+        elif match := re.fullmatch(r"/api/tasks/([^/]+)/cancel", path):
+            self.read_body()
+            self.handle_cancel(match.group(1))
+        else:
+            self.read_body()
+            self.send_error_detail(404, "Not Found")
+
+    def handle_sign_in(self):
+        body = self.read_json()
+        if body is None:
+            return
+        email, password = str(body.get("email") or "").strip(), str(body.get("password") or "").strip()
+        if not email:
+            self.send_error_detail(400, "Email is required.")
+            return
+        if not password:
+            self.send_error_detail(400, "Password is required.")
+            return
+        self.server.query()  # signInWithPassword
+        with self.server.db_lock:
+            user = next((u for u in self.server.users.values() if u["email"] == email), None)
+        if user is None or user["password"] != password:
+            self.send_error_detail(400, "Invalid login credentials")
+            return
+        session = self.server.issue_session(user["id"])
+        self.send_session(200, {"signed_in": True, "user": {"email": user["email"], "id": user["id"]}}, session)
+
+    def handle_refresh(self):
+        refresh = self.cookies().get(REFRESH_COOKIE)
+        if not refresh:
+            self.send_session(401, {"detail": "No refresh token present."}, None)
+            return
+        self.server.query()  # refreshSession
+        with self.server.db_lock:
+            user_id = self.server.refresh_tokens.pop(refresh, None)
+        if user_id is None:
+            self.send_session(401, {"detail": "Invalid Refresh Token: Already Used"}, None)
+            return
+        user = self.server.users[user_id]
+        session = self.server.issue_session(user_id)
+        self.send_session(200, {"signed_in": True, "user": {"email": user["email"], "id": user["id"]}}, session)
+
+    def handle_session(self):
+        token = self.cookies().get(ACCESS_COOKIE)
+        with self.server.db_lock:
+            user = self.server.users.get(self.server.tokens.get(token)) if token else None
+        if user is None:
+            self.send_json(200, {"signed_in": False, "user": None})
+            return
+        self.send_json(200, {"signed_in": True, "user": {"email": user["email"], "id": user["id"]}, "identities": []})
+
+    def handle_voices(self):
+        user = self.current_user()
+        if user is None:
+            return
+        self.server.query(2)  # Voices page + generation counts
+        with self.server.db_lock:
+            voices = [
+                {k: v[k] for k in ("id", "name", "language", "source", "created_at", "tts_provider")}
+                for v in self.server.voices.values()
+                if v["user_id"] == user["id"] and not v["deleted_at"]
+            ]
+        voices.sort(key=lambda v: v["created_at"], reverse=True)
+        pagination = {"page": 1, "per_page": 20, "total": len(voices), "pages": 1}
+        self.send_json(200, {"voices": voices, "pagination": pagination})
+
+    def handle_generate(self):
+        """routes/generate.ts POST /generate, in the same order of checks."""
+        server = self.server
+        user = self.current_user()
+        if user is None:
+            self.read_body()
+            return
+        try:
+            body = json.loads(self.read_body() or b"null")
+        except (ValueError, UnicodeDecodeError):
+            body = None
+        if not isinstance(body, dict):
+            self.send_error_detail(400, "Invalid JSON body")
+            return
+        voice_id = str(body.get("voice_id") or "").strip()
+        text = str(body.get("text") or "").strip()
+        language = str(body.get("language") or "").strip() or "Auto"
+        if not voice_id:
+            self.send_error_detail(400, "Please select a voice")
+            return
+        if not _UUID.match(voice_id):
+            self.send_error_detail(400, "Invalid voice_id")
+            return
+        if not text:
+            self.send_error_detail(400, "Please enter text to speak")
+            return
+        if text_length(text) > config.WORKER_MAX_TEXT_CHARS:
+            self.send_error_detail(400, f"Text cannot exceed {config.WORKER_MAX_TEXT_CHARS} characters")
+            return
+
+        server.query()  # Load the voice
+        with server.db_lock:
+            voice = server.voices.get(voice_id)
+        if voice is None or voice["user_id"] != user["id"] or voice["deleted_at"]:
+            self.send_error_detail(404, "Voice not found")
+            return
+
+        server.query(2)  # Profile tier + active tasks
+        limit = 2 if user["subscription_tier"] == "free" else 4
+        with server.db_lock:
+            active = sum(
+                1 for t in server.tasks.values() if t["user_id"] == user["id"] and t["status"] in ACTIVE_STATUSES
+            )
+        if active >= limit:
+            self.send_error_detail(
+                409,
+                f"Active job limit reached ({active}/{limit}). Wait for a running job to finish or cancel one "
+                f"before starting another. Active: {active} generate.",
+            )
+            return
+
+        server.query()  # Insert the generation
+        generation_id = str(uuid.uuid4())
+        now = server.iso()
+        with server.db_lock:
+            server.generations[generation_id] = {
+                "id": generation_id,
+                "user_id": user["id"],
+                "voice_id": voice_id,
+                "text": text,
+                "language": language,
+                "status": "processing",
+                "tts_provider": "qwen",
+                "provider_model": voice["provider_target_model"],
+                "audio_object_key": None,
+                "duration_seconds": None,
+                "generation_time_seconds": None,
+                "error_message": None,
+                "created_at": now,
+                "completed_at": None,
+            }
+
+        credits = credits_for_text(text)
+        debit = server.apply_credit_event(user["id"], "debit", credits, generation_id, "generate_request")
+        if debit["insufficient"]:
+            server.query()
+            with server.db_lock:
+                server.generations.pop(generation_id, None)
+            self.send_error_detail(
+                402,
+                f"Insufficient credits: need {credits:,}, have {debit['balance_remaining']:,}. 1 credit = 1 character.",
+            )
+            return
+
+        server.query()  # Insert the task
+        task_id = str(uuid.uuid4())
+        minutes = max(0.1, round(len(text) / 375 * 10) / 10)
+        with server.db_lock:
+            server.tasks[task_id] = {
+                "id": task_id,
+                "user_id": user["id"],
+                "type": "generate",
+                "status": "pending",
+                "generation_id": generation_id,
+                "voice_id": voice_id,
+                "provider": "qwen",
+                "provider_status": "provider_submitting",
+                "provider_poll_count": 0,
+                "cancellation_requested": False,
+                "result": None,
+                "error": None,
+                "metadata": {
+                    "voice_id": voice_id,
+                    "voice_name": voice["name"],
+                    "text_length": len(text),
+                    "text_preview": f"{text[:50]}..." if len(text) > 50 else text,
+                    "language": language,
+                    "estimated_duration_minutes": minutes,
+                    "credits_debited": credits,
+                    "credits_remaining_after_debit": debit["balance_remaining"],
+                },
+                "created_at": now,
+                "updated_at": now,
+                "completed_at": None,
+            }
+
+        message = {
+            "version": 1,
+            "type": "generate.qwen.start",
+            "task_id": task_id,
+            "user_id": user["id"],
+            "generation_id": generation_id,
+            "provider": "qwen",
+            "payload": {
+                "text": text,
+                "language": language,
+                "provider_voice_id": voice["provider_voice_id"],
+                "provider_target_model": voice["provider_target_model"],
+                "credits_to_debit": credits,
+            },
+            "enqueued_at": server.iso(),
+        }
+        server.sleep(QUEUE_SEND_SECONDS)
+        server.trace(task_id, "enqueued", server.now())
+        server.queue.send(message)
+        server.update_task(task_id, provider_status="provider_queued")
+        self.send_json(
+            200,
+            {
+                "task_id": task_id,
+                "status": "processing",
+                "is_long_running": True,
+                "estimated_duration_minutes": minutes,
+                "generation_id": generation_id,
+            },
+        )
+
+    def handle_task(self, task_id: str):
+        user = self.current_user()
+        if user is None:
+            return
+        server = self.server
+        server.query()
+        server.count(task_poll_count=1)
+        with server.db_lock:
+            task = server.tasks.get(task_id)
+            task = dict(task) if task and task["user_id"] == user["id"] else None
+        if task is None:
+            self.send_error_detail(404, "Task not found.")
+            return
+        metadata = task["metadata"]
+        body = {
+            "id": task["id"],
+            "type": task["type"],
+            "status": task["status"],
+            "result": task["result"],
+            "error": task["error"],
+            "provider": task["provider"],
+            "provider_status": task["provider_status"],
+            "provider_poll_count": task["provider_poll_count"],
+            "created_at": task["created_at"],
+            "completed_at": task["completed_at"],
+            "title": "Generate",
+            "subtitle": metadata.get("voice_name"),
+            "language": metadata.get("language"),
+            "voice_name": metadata.get("voice_name"),
+            "text_preview": metadata.get("text_preview"),
+            "estimated_duration_minutes": metadata.get("estimated_duration_minutes"),
+            "origin_page": "/generate",
+            "supports_cancel": task["status"] in ACTIVE_STATUSES,
+        }
+        if body["result"] is None:
+            del body["result"]
+        if task["status"] == "completed" and task["generation_id"]:
+            body["result"] = {**(task["result"] or {}), "audio_url": f"/api/generations/{task['generation_id']}/audio"}
+        self.send_json(200, body)
+
+    def handle_cancel(self, task_id: str):
+        """routes/tasks.ts POST /tasks/:id/cancel."""
+        server = self.server
+        user = self.current_user()
+        if user is None:
+            return
+        server.query()
+        with server.db_lock:
+            task = server.tasks.get(task_id)
+            task = dict(task) if task and task["user_id"] == user["id"] else None
+        if task is None:
+            self.send_error_detail(404, "Task not found.")
+            return
+        if task["status"] not in ACTIVE_STATUSES:
+            self.send_error_detail(400, f"Cannot cancel task with status: {task['status']}")
+            return
+        now = server.iso()
+        if not server.update_task(
+            task_id,
+            cancellation_requested=True,
+            status="cancelled",
+            provider_status="cancelled",
+            error="Cancelled by user",
+            completed_at=now,
+        ):
+            self.send_error_detail(409, "Task is no longer cancellable.")
+            return
+        server.trace(task_id, "cancel_requested", server.now())
+        if task["generation_id"]:
+            server.update_generation(
+                task["generation_id"],
+                status="cancelled",
+                error_message="Cancelled by user",
+                completed_at=now,
+                generation_time_seconds=server.generation_seconds(task["generation_id"]),
+            )
+            server.apply_credit_event(
+                user["id"], "refund", task["metadata"]["credits_debited"], task["generation_id"], "cancelled_by_user"
+            )
+        self.send_json(200, {"cancelled": True, "task_id": task_id})
+
+    def handle_credit_usage(self):
+        """routes/credits.ts GET /credits/usage (30-day window, last 20 events)."""
+        server = self.server
+        user = self.current_user()
+        if user is None:
+            return
+        server.query(3)  # Profile, usage totals, ledger page
+        since = (server.epoch + timedelta(seconds=server.now() - 30 * 86400)).isoformat()
+        with server.db_lock:
+            events = [e for e in server.credit_ledger if e["user_id"] == user["id"]]
+            balance, tier = user["credits"], user["subscription_tier"]
+        recent = [e for e in events if e["created_at"] >= since]
+        debited = sum(e["amount"] for e in recent if e["event_kind"] == "debit")
+        credited = sum(e["amount"] for e in recent if e["event_kind"] != "debit")
+        self.send_json(
+            200,
+            {
+                "credit_unit": "1 credit = 1 character",
+                "window_days": 30,
+                "plan": {"tier": tier},
+                "balance": balance,
+                "usage": {"debited": debited, "credited": credited, "net": credited - debited},
+                "events": [
+                    {
+                        "event_kind": e["event_kind"],
+                        "operation": e["operation"],
+                        "amount": e["amount"],
+                        "signed_amount": -e["amount"] if e["event_kind"] == "debit" else e["amount"],
+                        "balance_after": e["balance_after"],
+                        "reference_id": e["reference_id"],
+                        "created_at": e["created_at"],
+                    }
+                    for e in reversed(events[-20:])
+                ],
+            },
+        )
+
+    def handle_generations(self, query: dict):
+        """routes/generations.ts GET /generations (newest first)."""
+        server = self.server
+        user = self.current_user()
+        if user is None:
+            return
+
+        def positive_int(name: str, fallback: int) -> int:
+            try:
+                value = int(float((query.get(name) or [""])[0]))
+            except ValueError:
+                return fallback
+            return value if value >= 1 else fallback
+
+        page = positive_int("page", 1)
+        per_page = min(100, positive_int("per_page", 20))
+        status = (query.get("status") or [""])[0].strip()
+        voice_id = (query.get("voice_id") or [""])[0].strip()
+        search = (query.get("search") or [""])[0].strip().lower()
+        server.query()
+        with server.db_lock:
+            rows = [
+                g
+                for g in server.generations.values()
+                if g["user_id"] == user["id"]
+                and (not status or status == "all" or g["status"] == status)
+                and (not _UUID.match(voice_id) or g["voice_id"] == voice_id)
+                and (not search or search in g["text"].lower())
+            ]
+            names = {v["id"]: v["name"] for v in server.voices.values()}
+        rows.sort(key=lambda g: g["created_at"], reverse=True)
+        generations = [
+            {
+                "id": g["id"],
+                "voice_id": g["voice_id"],
+                "voice_name": names.get(g["voice_id"]),
+                "text": g["text"],
+                "audio_path": f"/api/generations/{g['id']}/audio",
+                "duration_seconds": g["duration_seconds"],
+                "language": g["language"],
+                "status": g["status"],
+                "generation_time_seconds": g["generation_time_seconds"],
+                "error_message": g["error_message"],
+                "created_at": g["created_at"],
+            }
+            for g in rows[(page - 1) * per_page : page * per_page]
+        ]
+        pages = max(1, -(-len(rows) // per_page))
+        pagination = {"page": page, "per_page": per_page, "total": len(rows), "pages": pages}
+        self.send_json(200, {"generations": generations, "pagination": pagination})
+
+    def handle_rest(self, table: str, query: dict):
+        """
+        Service-role PostgREST reads (GET /rest/v1/<table>?select=...&id=in.(...)),
+        for analyses that need columns the Worker does not return.
+        """
+        server = self.server
+        if self.headers.get("apikey") != server.service_role_key:
+            self.send_json(401, {"message": "Invalid API key"})
+            return
+        tables = {
+            "tasks": lambda: server.tasks.values(),
+            "generations": lambda: server.generations.values(),
+            "credit_ledger": lambda: server.credit_ledger,
+        }
+        if table not in tables:
+            self.send_json(404, {"message": f'relation "public.{table}" does not exist'})
+            return
+        server.query()
+        with server.db_lock:
+            rows = [dict(r) for r in tables[table]()]
+        for column, values in query.items():
+            if column in ("select", "order", "limit"):
+                continue
+            op, _, operand = values[0].partition(".")
+            if op == "eq":
+                rows = [r for r in rows if str(r.get(column)) == operand]
+            elif op == "in":
+                wanted = set(operand.strip("()").split(","))
+                rows = [r for r in rows if str(r.get(column)) in wanted]
+        columns = (query.get("select") or ["*"])[0]
+        if columns != "*":
+            names = [c.strip() for c in columns.split(",")]
+            rows = [{c: r.get(c) for c in names} for r in rows]
+        self.send_json(200, rows)
+
+    def handle_audio(self, generation_id: str):
+        server = self.server
+        user = self.current_user()
+        if user is None:
+            return
+        server.query()
+        with server.db_lock:
+            generation = server.generations.get(generation_id)
+        if generation is None or generation["user_id"] != user["id"]:
+            self.send_error_detail(404, "Generation not found.")
+            return
+        key = generation["audio_object_key"]
+        if not key:
+            self.send_error_detail(404, "Generation audio not available.")
+            return
+        if not key.startswith(f"{user['id']}/"):
+            self.send_error_detail(403, "Invalid storage object key.")
+            return
+        token = server.sign_storage_token("generations", key, SIGNED_URL_TTL)
+        self.send_response(302)
+        self.send_header("Location", f"http://{self.headers.get('Host')}/api/storage/download?token={token}")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def handle_storage_download(self, query: dict):
+        """routes/storage.ts GET /storage/download: the whole object, no Range."""
+        server = self.server
+        claims = server.verify_storage_token((query.get("token") or [""])[0].strip())
+        if claims is None:
+            self.send_error_detail(403, "Invalid or expired storage token.")
+            return
+        with server.db_lock:
+            data = server.objects.get(claims["key"])
+        # r2Download reads the object into a Blob before the Response starts
+        size = len(data or b"")
+        server.sleep(STORAGE_GET_SECONDS + (size * 8 / (server.storage_mbps * 1e6) if server.storage_mbps else 0.0))
+        if data is None:
+            self.send_error_detail(404, "Object not found.")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/wav")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "private, max-age=300")
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_worker_standin(
+    port: int = 0,
+    host: str = "127.0.0.1",
+    provider: dict | None = None,
+    seed_voice: bool = True,
+    provider_kwargs: dict | None = None,
+    **kwargs,
+) -> tuple[WorkerStandinServer, dict]:
+    """
+    Start a Worker stand-in (and, without `provider`, a DashScope stand-in
+    behind it) on background threads, with one signed-up user and, with
+    `seed_voice`, one enrolled voice.
+
+    Returns (server, endpoint) where endpoint has "base_url", "email",
+    "password" and "voice_id" for WorkerClient. Call server.shutdown() when
+    done; it stops the provider stand-in it started too (server.provider_server).
+    """
+    provider_server = None
+    if provider is None:
+        provider_kwargs = {"time_scale": kwargs.get("time_scale", 1.0), **(provider_kwargs or {})}
+        provider_server, provider = start_dashscope_standin(**provider_kwargs)
+    server = WorkerStandinServer((host, port), provider, **kwargs)
+    if provider_server is not None:
+        server.provider_server = provider_server
+        stop = server.shutdown
+
+        def shutdown():
+            stop()
+            provider_server.shutdown()
+
+        server.shutdown = shutdown
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    user = server.add_user()
+    base = f"http://{host}:{server.server_address[1]}"
+    endpoint = {
+        "name": f"Local API Worker stand-in (x{server.time_scale:g})",
+        "base_url": base,
+        "health": f"{base}/api/health",
+        "email": user["email"],
+        "password": user["password"],
+        "origin": config.WORKER_ORIGIN,
+        "supabase_url": base,
+        "service_role_key": server.service_role_key,
+    }
+    if seed_voice:
+        endpoint["voice_id"] = server.seed_voice(user["id"])["id"]
+    return server, endpoint
+
+
+def add_worker_arguments(parser: argparse.ArgumentParser):
+    """Add the Worker stand-in's queue and rate-limit options to a parser."""
+    group = parser.add_argument_group("API Worker stand-in")
+    group.add_argument("--max-batch-size", type=int, default=1, help="Queue consumer max_batch_size (default: 1)")
+    group.add_argument(
+        "--max-batch-timeout", type=float, default=2.0, help="Queue consumer max_batch_timeout (default: 2)"
+    )
+    group.add_argument("--max-concurrency", type=int, default=1, help="Concurrent consumer batches (default: 1)")
+    group.add_argument(
+        "--rate-limit",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Override a Worker rate limit, e.g. RATE_LIMIT_TIER2_USER_LIMIT=1000 (repeatable)",
+    )
+
+
+def parse_rate_limits(items: list[str]) -> dict[str, int]:
+    """NAME=VALUE overrides (--rate-limit) -> {name: value}, rejecting unknown names."""
+    rate_limits = {}
+    for item in items:
+        name, _, value = item.partition("=")
+        if name not in RATE_LIMIT_DEFAULTS and not re.fullmatch(r"RATE_LIMIT_TIER\d_WINDOW_SECONDS", name):
+            raise SystemExit(f"Unknown rate limit '{name}' (known: {', '.join(RATE_LIMIT_DEFAULTS)})")
+        rate_limits[name] = int(value)
+    return rate_limits
+
+
+def worker_kwargs(args: argparse.Namespace) -> dict:
+    """Map parsed Worker stand-in options to start_worker_standin() keyword arguments."""
+    return {
+        "max_batch_size": args.max_batch_size,
+        "max_batch_timeout": args.max_batch_timeout,
+        "max_concurrency": args.max_concurrency,
+        "rate_limits": parse_rate_limits(args.rate_limit),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the API Worker job flow")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=config.WORKER_STANDIN_PORT)
+    parser.add_argument("--time-scale", type=float, default=0.05, help="Multiply emulated latencies by this factor")
+    parser.add_argument("--seed", type=int, default=0, help="Stand-in random seed")
+    add_worker_arguments(parser)
+    args = parser.parse_args()
+
+    server, endpoint = start_worker_standin(
+        port=args.port, host=args.host, time_scale=args.time_scale, seed=args.seed, **worker_kwargs(args)
+    )
+    print(f"API Worker stand-in on {endpoint['base_url']} (time scale x{args.time_scale:g})")
+    print(f"  UTTER_API_URL={endpoint['base_url']}")
+    print(f"  UTTER_EMAIL={endpoint['email']} UTTER_PASSWORD={endpoint['password']}")
+    print(f"  voice_id={endpoint['voice_id']}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
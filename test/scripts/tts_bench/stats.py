@@ -0,0 +1,35 @@
+"""
+Summary statistics shared by the benchmark reports.
+"""
+
+import numpy as np
+
+
+def percentile(values, q: float) -> float | None:
+    """q-th percentile (0-100) of `values`, or None when empty."""
+    if len(values) == 0:
+        return None
+    return float(np.percentile(np.asarray(values, dtype=float), q))
+
+
+def summarize(values) -> dict:
+    """Count, mean, p50/p95/p99 and max of `values` (None fields when empty)."""
+    arr = np.asarray(values, dtype=float)
+    if arr.size == 0:
+        return {"n": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {
+        "n": int(arr.size),
+        "mean": float(arr.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(arr.max()),
+    }
+
+
+def fmt_seconds(value: float | None, width: int = 8) -> str:
+    """Right-aligned seconds for report tables ('-' when missing)."""
+    if value is None:
+        return f"{'-':>{width}}"
+    return f"{value:>{width - 1}.2f}s"
@@ -0,0 +1,71 @@
+"""
+Truncation checks for outputs generated under a max_new_tokens cap.
+
+The 12Hz codec emits one token per 1/12s of audio, so a cap of N tokens
+bounds the output at N/12 seconds. An output that reaches that bound was cut
+off by the cap rather than by the stop token. A cut-off clip also tends to
+end mid-word: the last frames are still near speech level instead of having
+decayed into the trailing pause a finished utterance has.
+"""
+
+import numpy as np
+
+from . import audio
+from .latency_model import CODEC_FRAME_RATE
+
+CAP_FRACTION = 0.98  # Within 2% of N/12 seconds counts as hitting the cap
+END_WINDOW_MS = 80.0  # Final stretch inspected for an abrupt ending
+END_LEVEL_DB = -8.0  # End still this close to the voiced level = mid-word
+SHORT_FRACTION = 0.8  # Mid-word ending only counts if output is this short
+
+
+def cap_seconds(max_new_tokens: int | None) -> float | None:
+    """Maximum output duration a max_new_tokens cap allows."""
+    return max_new_tokens / CODEC_FRAME_RATE if max_new_tokens else None
+
+
+def hits_cap(duration: float, max_new_tokens: int | None) -> bool:
+    """Whether an output of `duration` seconds reached its max_new_tokens cap."""
+    cap = cap_seconds(max_new_tokens)
+    return bool(cap and duration >= CAP_FRACTION * cap)
+
+
+def end_level_db(samples: np.ndarray, rate: int) -> float:
+    """Level of the final END_WINDOW_MS relative to the median voiced frame."""
+    levels = audio.frame_rms_db(samples, rate, frame_ms=20.0)
+    if levels.size == 0:
+        return -120.0
+    voiced = levels[levels > levels.max() - 30.0]
+    reference = float(np.median(voiced)) if voiced.size else float(levels.max())
+    tail = max(int(END_WINDOW_MS / 20.0), 1)
+    return float(levels[-tail:].max() - reference)
+
+
+def check(
+    samples: np.ndarray,
+    rate: int,
+    expected_seconds: float,
+    max_new_tokens: int | None,
+) -> dict:
+    """Return truncation findings for one output."""
+    duration = audio.duration_seconds(samples, rate)
+    cap = cap_seconds(max_new_tokens)
+    end_db = end_level_db(samples, rate)
+
+    hit_cap = hits_cap(duration, max_new_tokens)
+    mid_word = end_db > END_LEVEL_DB and duration < SHORT_FRACTION * expected_seconds
+    reasons = []
+    if hit_cap:
+        reasons.append(f"hit {max_new_tokens}-token cap ({cap:.1f}s)")
+    if mid_word:
+        reasons.append(f"ends mid-word ({end_db:+.0f} dB at end)")
+
+    return {
+        "duration": duration,
+        "cap_seconds": cap,
+        "end_level_db": end_db,
+        "hit_cap": hit_cap,
+        "mid_word": bool(mid_word),
+        "truncated": hit_cap or bool(mid_word),
+        "reasons": reasons,
+    }
@@ -0,0 +1,479 @@
+"""
+Client for the API Worker job flow (workers/api/src/routes).
+
+Production generations do not call Modal or DashScope directly; the web app
+goes through the Worker:
+
+    POST /api/auth/sign-in            -> utter_sb_* session cookies
+    POST /api/generate                -> {task_id, generation_id, ...}
+                                         (tts-jobs queue -> consumer)
+    GET  /api/tasks/:id               poll until completed/failed/cancelled
+    GET  /api/generations/:id/audio   302 -> signed storage URL -> WAV
+    GET  /api/credits/usage           balance and plan tier
+
+WorkerClient does this on a pooled requests.Session; AsyncWorkerClient has
+the same methods as coroutines on an httpx.AsyncClient (httpx is optional,
+imported on first use); they share the route definitions, response
+parsing and record keeping, and differ only in transport and awaits. Both
+sign in with email/password (cookies, with the Origin header the Worker
+requires for cookie-authenticated writes) or take an access token
+(Bearer), and refresh the cookie session once on a 401.
+
+Non-2xx responses raise WorkerAPIError carrying the Worker's {"detail"},
+the x-request-id header and, for 429s, retry_after_seconds. run_job()
+submits, polls and downloads one generation and returns a timing record;
+it retries admission on 429 (after retry_after_seconds) and on the
+active-job cap (409), counting both, and reports the time spent on those
+retries ("admission") apart from the accepted POST ("submit"). RATE_LIMIT_DEFAULTS and
+rate_limit_tier() mirror the Worker's limiter (_shared/rate_limit.ts), for
+client-side pacing (tts_bench.bulk) and the stand-in alike.
+
+`time_scale` multiplies every wait the client makes (poll interval,
+retry-after) so the same code drives a time-scaled stand-in.
+"""
+
+import asyncio
+import re
+import time
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import client, config
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+ACTIVE_JOB_LIMIT = "Active job limit reached"
+MAX_ADMISSION_RETRIES = 30
+
+# _shared/rate_limit.ts defaults; override with the same names
+RATE_LIMIT_DEFAULTS = {
+    "RATE_LIMIT_WINDOW_SECONDS": 300,
+    "RATE_LIMIT_TIER1_USER_LIMIT": 10,
+    "RATE_LIMIT_TIER1_IP_LIMIT": 30,
+    "RATE_LIMIT_TIER2_USER_LIMIT": 90,
+    "RATE_LIMIT_TIER2_IP_LIMIT": 180,
+    "RATE_LIMIT_TIER3_IP_LIMIT": 300,
+}
+_RATE_LIMIT_RULES = [
+    ("POST", re.compile(r"^/api/generate$"), "tier1"),
+    ("POST", re.compile(r"^/api/clone/(upload-url|finalize)$"), "tier1"),
+    ("POST", re.compile(r"^/api/voices/design(/preview)?$"), "tier1"),
+    ("POST", re.compile(r"^/api/transcriptions$"), "tier1"),
+    ("GET", re.compile(r"^/api/tasks(/[^/]+)?$"), "tier2"),
+    ("POST", re.compile(r"^/api/tasks/[^/]+/cancel$"), "tier2"),
+    ("DELETE", re.compile(r"^/api/tasks/[^/]+$"), "tier2"),
+]
+
+
+class WorkerAPIError(Exception):
+    """Non-2xx response from the API Worker."""
+
+    def __init__(self, status: int, detail: str, request_id: str | None = None, retry_after: float | None = None):
+        super().__init__(f"HTTP {status}: {detail}")
+        self.status = status
+        self.detail = detail
+        self.request_id = request_id
+        self.retry_after = retry_after
+
+    @property
+    def retryable_admission(self) -> bool:
+        """Rejected by the rate limiter or the active-job cap; worth retrying."""
+        return self.status == 429 or (self.status == 409 and self.detail.startswith(ACTIVE_JOB_LIMIT))
+
+
+def text_length(text: str) -> int:
+    """JavaScript String.length (UTF-16 code units), which the Worker validates and prices."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def credits_for_text(text: str) -> int:
+    """creditsForGenerateText (_shared/credits.ts): 1 credit per character of the trimmed text."""
+    return text_length(text.strip())
+
+
+def rate_limit_tier(method: str, path: str) -> str | None:
+    """resolveRateLimitTier: tier1/tier2 by route, tier3 for the rest of /api."""
+    if method == "OPTIONS" or path == "/api/health":
+        return None
+    for rule_method, pattern, tier in _RATE_LIMIT_RULES:
+        if rule_method == method and pattern.match(path):
+            return tier
+    return "tier3" if path.startswith("/api/") else None
+
+
+def _error(status: int, headers, data, text: str) -> WorkerAPIError:
+    """WorkerAPIError from a response's status, headers and parsed body."""
+    data = data if isinstance(data, dict) else {}
+    detail = data.get("detail") or data.get("error") or text[:200] or f"HTTP {status}"
+    retry_after = data.get("retry_after_seconds") or headers.get("Retry-After")
+    try:
+        retry_after = float(retry_after) if retry_after is not None else None
+    except ValueError:
+        retry_after = None
+    return WorkerAPIError(status, str(detail), headers.get("x-request-id"), retry_after)
+
+
+def _new_record(text: str) -> dict:
+    return {"text_chars": len(text), "admission_retries": 0, "rate_limited": 0, "cap_rejected": 0, "polls": 0}
+
+
+def _json(response):
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def _parse(response) -> dict:
+    """A Worker JSON body (requests or httpx response), raising WorkerAPIError on non-2xx."""
+    data = _json(response)
+    if response.status_code >= 400:
+        raise _error(response.status_code, response.headers, data, response.text)
+    return data if isinstance(data, dict) else {}
+
+
+def _admission_delay(record: dict, error: WorkerAPIError, interval: float) -> float:
+    """Count a rejected generate() in `record`; the wait before retrying (re-raises the rest)."""
+    if not error.retryable_admission or record["admission_retries"] >= MAX_ADMISSION_RETRIES:
+        raise error
+    record["admission_retries"] += 1
+    record["rate_limited" if error.status == 429 else "cap_rejected"] += 1
+    return error.retry_after or interval
+
+
+def _poll_delay(task_id: str, polls: int, delay: float, deadline: float, time_scale: float) -> float:
+    """`delay` before the next poll, or TimeoutError when it would pass `deadline`."""
+    if time.perf_counter() + delay * time_scale > deadline:
+        raise TimeoutError(f"Task {task_id} not finished after {polls} polls")
+    return delay
+
+
+def _finish_task(record: dict, task: dict) -> str | None:
+    """Record a terminal task's status; its audio URL when it completed."""
+    record["status"] = task["status"]
+    if task["status"] != "completed":
+        record["error"] = task.get("error") or task["status"]
+        return None
+    return task["result"]["audio_url"]
+
+
+def _record_error(record: dict, error: Exception):
+    record["error"] = str(error) or type(error).__name__
+    record.setdefault("status", "error")
+
+
+class _WorkerRoutes:
+    """
+    The Worker routes, built once on top of `_request()`: WorkerClient's
+    returns the parsed body, AsyncWorkerClient's a coroutine for it.
+    """
+
+    def _request(self, method: str, path: str, body: dict | None = None, refresh: bool = True):
+        raise NotImplementedError
+
+    def sign_in(self, email: str, password: str) -> dict:
+        """Cookie session for the user; returns {"signed_in", "user"}."""
+        return self._request("POST", "/api/auth/sign-in", {"email": email, "password": password}, refresh=False)
+
+    def refresh(self) -> dict:
+        return self._request("POST", "/api/auth/refresh", refresh=False)
+
+    def session(self) -> dict:
+        return self._request("GET", "/api/auth/session")
+
+    def list_generations(self, page: int = 1, per_page: int = 20, **filters) -> dict:
+        """One history page: {"generations", "pagination"}; filters are status, voice_id, search, sort."""
+        params = urlencode({"page": page, "per_page": per_page, **filters})
+        return self._request("GET", f"/api/generations?{params}")
+
+    def credit_usage(self) -> dict:
+        """{"balance", "plan": {"tier"}, "usage", "events", ...} for the signed-in user."""
+        return self._request("GET", "/api/credits/usage")
+
+    def generate(self, voice_id: str, text: str, language: str = "Auto") -> dict:
+        """Submit a job; returns {"task_id", "generation_id", "estimated_duration_minutes", ...}."""
+        return self._request("POST", "/api/generate", {"voice_id": voice_id, "text": text, "language": language})
+
+    def get_task(self, task_id: str) -> dict:
+        return self._request("GET", f"/api/tasks/{task_id}")
+
+    def cancel_task(self, task_id: str) -> dict:
+        return self._request("POST", f"/api/tasks/{task_id}/cancel")
+
+
+class WorkerClient(_WorkerRoutes):
+    """Synchronous API Worker client on one pooled requests.Session."""
+
+    def __init__(
+        self,
+        base_url: str = config.WORKER_API_URL,
+        access_token: str | None = None,
+        origin: str = config.WORKER_ORIGIN,
+        pool_size: int = client.POOL_MAXSIZE,
+        timeout: float = 30.0,
+        time_scale: float = 1.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.time_scale = time_scale
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        self.http.headers["Origin"] = origin
+        if access_token:
+            self.http.headers["Authorization"] = f"Bearer {access_token}"
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds * self.time_scale)
+
+    def _request(self, method: str, path: str, body: dict | None = None, refresh: bool = True) -> dict:
+        response = self.http.request(method, f"{self.base_url}{path}", json=body, timeout=self.timeout)
+        if response.status_code == 401 and refresh and "utter_sb_refresh_token" in self.http.cookies:
+            try:
+                self.refresh()
+            except WorkerAPIError:
+                pass
+            else:
+                return self._request(method, path, body, refresh=False)
+        return _parse(response)
+
+    def list_voices(self) -> list[dict]:
+        return self._request("GET", "/api/voices").get("voices", [])
+
+    def wait(
+        self,
+        task_id: str,
+        interval: float = config.WORKER_POLL_INTERVAL,
+        timeout: float = 600.0,
+        on_poll=None,
+    ) -> tuple[dict, int]:
+        """
+        Poll a task every `interval` seconds until it is terminal. Returns
+        (task, polls); polls include rate-limited ones, which wait
+        retry_after_seconds instead of `interval`. `on_poll(task)` sees every
+        successful poll's body.
+        """
+        polls = 0
+        deadline = time.perf_counter() + timeout * self.time_scale
+        while True:
+            polls += 1
+            try:
+                task = self.get_task(task_id)
+                if on_poll is not None:
+                    on_poll(task)
+                if task.get("status") in TERMINAL_STATUSES:
+                    return task, polls
+                delay = interval
+            except WorkerAPIError as e:
+                if e.status != 429:
+                    raise
+                delay = e.retry_after or interval
+            self.sleep(_poll_delay(task_id, polls, delay, deadline, self.time_scale))
+
+    def signed_audio_url(self, audio_url: str) -> str:
+        """The signed storage URL /api/generations/:id/audio redirects to."""
+        response = self.http.get(f"{self.base_url}{audio_url}", allow_redirects=False, timeout=self.timeout)
+        if response.status_code not in (301, 302, 303, 307, 308):
+            raise _error(response.status_code, response.headers, _json(response), response.text)
+        return response.headers["Location"]
+
+    def download_audio(self, audio_url: str) -> tuple[bytes, dict]:
+        """
+        Follow /api/generations/:id/audio to storage. Returns (wav, timings)
+        with "redirect" (Worker, signing) and "fetch" (storage) seconds.
+        """
+        start = time.perf_counter()
+        location = self.signed_audio_url(audio_url)
+        redirect = time.perf_counter() - start
+        # Signed URL: no Worker credentials to the storage host
+        storage = self.http.get(location, headers={"Authorization": None, "Origin": None}, timeout=self.timeout)
+        fetch = time.perf_counter() - start - redirect
+        if storage.status_code >= 400:
+            raise _error(storage.status_code, storage.headers, None, storage.text)
+        return storage.content, {"redirect": redirect, "fetch": fetch}
+
+    def submit(self, voice_id: str, text: str, language: str, record: dict, interval: float) -> dict:
+        """
+        generate(), retrying admission rejections; counts them in `record`
+        and sets its "admission" to the seconds before the accepted attempt.
+        """
+        start = time.perf_counter()
+        while True:
+            attempt = time.perf_counter()
+            try:
+                job = self.generate(voice_id, text, language)
+                record["admission"] = attempt - start
+                return job
+            except WorkerAPIError as e:
+                self.sleep(_admission_delay(record, e, interval))
+
+    def run_job(
+        self,
+        voice_id: str,
+        text: str,
+        language: str = "Auto",
+        interval: float = config.WORKER_POLL_INTERVAL,
+        timeout: float = 600.0,
+    ) -> dict:
+        """
+        Submit, poll and download one generation. Returns a record with
+        "admission" (waiting out 429/409 rejections), "submit" (the accepted
+        POST), "wait", "download" and "total" seconds, "polls", "status",
+        "bytes" and "error" on failure.
+        """
+        record = _new_record(text)
+        start = time.perf_counter()
+        try:
+            job = self.submit(voice_id, text, language, record, interval)
+            record.update(task_id=job["task_id"], generation_id=job.get("generation_id"))
+            accepted = time.perf_counter()
+            record["submit"] = accepted - start - record["admission"]
+            task, record["polls"] = self.wait(job["task_id"], interval, timeout)
+            record["wait"] = time.perf_counter() - accepted
+            audio_url = _finish_task(record, task)
+            if audio_url:
+                wav, timings = self.download_audio(audio_url)
+                record.update(bytes=len(wav), download=timings["redirect"] + timings["fetch"], **timings)
+        except (WorkerAPIError, TimeoutError, requests.exceptions.RequestException) as e:
+            _record_error(record, e)
+        record["total"] = time.perf_counter() - start
+        return record
+
+    def close(self):
+        self.http.close()
+
+    def __enter__(self) -> "WorkerClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncWorkerClient(_WorkerRoutes):
+    """WorkerClient's API as coroutines on one pooled httpx.AsyncClient."""
+
+    def __init__(
+        self,
+        base_url: str = config.WORKER_API_URL,
+        access_token: str | None = None,
+        origin: str = config.WORKER_ORIGIN,
+        pool_size: int = client.POOL_MAXSIZE,
+        timeout: float = 30.0,
+        time_scale: float = 1.0,
+    ):
+        httpx = client._import_httpx("AsyncWorkerClient requires httpx", "httpx")
+        self.base_url = base_url.rstrip("/")
+        self.time_scale = time_scale
+        headers = {"Origin": origin}
+        if access_token:
+            headers["Authorization"] = f"Bearer {access_token}"
+        self.http = httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+        self.transport_errors = (httpx.HTTPError,)
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds * self.time_scale)
+
+    async def _request(self, method: str, path: str, body: dict | None = None, refresh: bool = True) -> dict:
+        response = await self.http.request(method, f"{self.base_url}{path}", json=body)
+        if response.status_code == 401 and refresh and "utter_sb_refresh_token" in self.http.cookies:
+            try:
+                await self.refresh()
+            except WorkerAPIError:
+                pass
+            else:
+                return await self._request(method, path, body, refresh=False)
+        return _parse(response)
+
+    async def list_voices(self) -> list[dict]:
+        return (await self._request("GET", "/api/voices")).get("voices", [])
+
+    async def wait(
+        self,
+        task_id: str,
+        interval: float = config.WORKER_POLL_INTERVAL,
+        timeout: float = 600.0,
+        on_poll=None,
+    ) -> tuple[dict, int]:
+        polls = 0
+        deadline = time.perf_counter() + timeout * self.time_scale
+        while True:
+            polls += 1
+            try:
+                task = await self.get_task(task_id)
+                if on_poll is not None:
+                    on_poll(task)
+                if task.get("status") in TERMINAL_STATUSES:
+                    return task, polls
+                delay = interval
+            except WorkerAPIError as e:
+                if e.status != 429:
+                    raise
+                delay = e.retry_after or interval
+            await self.sleep(_poll_delay(task_id, polls, delay, deadline, self.time_scale))
+
+    async def download_audio(self, audio_url: str) -> tuple[bytes, dict]:
+        start = time.perf_counter()
+        response = await self.http.get(f"{self.base_url}{audio_url}")
+        redirect = time.perf_counter() - start
+        if not response.is_redirect:
+            raise _error(response.status_code, response.headers, _json(response), response.text)
+        request = self.http.build_request("GET", response.headers["Location"])
+        for name in ("Authorization", "Origin", "Cookie"):
+            request.headers.pop(name, None)
+        storage = await self.http.send(request)
+        fetch = time.perf_counter() - start - redirect
+        if storage.status_code >= 400:
+            raise _error(storage.status_code, storage.headers, None, storage.text)
+        return storage.content, {"redirect": redirect, "fetch": fetch}
+
+    async def submit(self, voice_id: str, text: str, language: str, record: dict, interval: float) -> dict:
+        start = time.perf_counter()
+        while True:
+            attempt = time.perf_counter()
+            try:
+                job = await self.generate(voice_id, text, language)
+                record["admission"] = attempt - start
+                return job
+            except WorkerAPIError as e:
+                await self.sleep(_admission_delay(record, e, interval))
+
+    async def run_job(
+        self,
+        voice_id: str,
+        text: str,
+        language: str = "Auto",
+        interval: float = config.WORKER_POLL_INTERVAL,
+        timeout: float = 600.0,
+    ) -> dict:
+        record = _new_record(text)
+        start = time.perf_counter()
+        try:
+            job = await self.submit(voice_id, text, language, record, interval)
+            record.update(task_id=job["task_id"], generation_id=job.get("generation_id"))
+            accepted = time.perf_counter()
+            record["submit"] = accepted - start - record["admission"]
+            task, record["polls"] = await self.wait(job["task_id"], interval, timeout)
+            record["wait"] = time.perf_counter() - accepted
+            audio_url = _finish_task(record, task)
+            if audio_url:
+                wav, timings = await self.download_audio(audio_url)
+                record.update(bytes=len(wav), download=timings["redirect"] + timings["fetch"], **timings)
+        except (WorkerAPIError, TimeoutError, *self.transport_errors) as e:
+            _record_error(record, e)
+        record["total"] = time.perf_counter() - start
+        return record
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def __aenter__(self) -> "AsyncWorkerClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
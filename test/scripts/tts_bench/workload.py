@@ -0,0 +1,87 @@
+"""
+Job sets for batch benchmarks.
+
+A job is a dict with at least "id" and "text"; optional keys ("language",
+"max_new_tokens", "ref_seconds", "arrival") are passed through to the
+request and the latency model.
+"""
+
+import json
+import random
+import re
+from pathlib import Path
+
+from . import config
+
+_SENTENCE_END = re.compile(r"(?<=[.!?。！？])\s+")
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences on terminal punctuation."""
+    return [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+
+
+def corpus_sentences() -> list[str]:
+    """All sentences from inputs/texts/*.txt, in file order."""
+    sentences = []
+    for path in sorted(config.TEXTS_DIR.glob("*.txt")):
+        sentences.extend(split_sentences(path.read_text(encoding="utf-8")))
+    return sentences
+
+
+def mixed_jobs(
+    captions: int = 12,
+    paragraphs: int = 4,
+    paragraph_sentences: tuple[int, int] = (4, 10),
+    seed: int = 0,
+) -> list[dict]:
+    """
+    Build a shuffled mix of short captions (single sentences) and long
+    paragraphs (runs of consecutive sentences) from the input texts.
+    """
+    rng = random.Random(seed)
+    sentences = corpus_sentences()
+    if not sentences:
+        raise FileNotFoundError(f"No input texts found in {config.TEXTS_DIR}")
+
+    jobs = []
+    for i in range(captions):
+        jobs.append({"id": f"caption-{i}", "kind": "caption", "text": rng.choice(sentences)})
+    for i in range(paragraphs):
+        length = min(rng.randint(*paragraph_sentences), len(sentences))
+        start = rng.randrange(0, len(sentences) - length + 1)
+        text = " ".join(sentences[start : start + length])
+        jobs.append({"id": f"paragraph-{i}", "kind": "paragraph", "text": text})
+    rng.shuffle(jobs)
+    return jobs
+
+
+def load_jobs(path: Path) -> list[dict]:
+    """
+    Load a job set from JSON: a list of strings or of job dicts.
+    Missing ids are filled in from the list position.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    jobs = []
+    for i, item in enumerate(data):
+        job = {"text": item} if isinstance(item, str) else dict(item)
+        job.setdefault("id", f"job-{i}")
+        jobs.append(job)
+    return jobs
+
+
+def text_of_length(chars: int, offset: int = 0) -> str:
+    """
+    Consecutive corpus sentences (starting at sentence `offset`, wrapping
+    around) joined until the text reaches at least `chars` characters.
+    """
+    sentences = corpus_sentences()
+    if not sentences:
+        raise FileNotFoundError(f"No input texts found in {config.TEXTS_DIR}")
+    parts = []
+    i = offset
+    while len(" ".join(parts)) < chars:
+        parts.append(sentences[i % len(sentences)])
+        i += 1
+    return " ".join(parts)